@@ -5,25 +5,40 @@ This module provides FastAPI routes for DuckDB analytics functionality.
 """
 
 import logging
+from dataclasses import asdict
+from datetime import datetime
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from backend.database import get_db
 from backend.services.analytics import get_duckdb_analytics
+from backend.services.export import ParquetSnapshotExporter
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 class AnalyticsSyncRequest(BaseModel):
-    sync_type: str = "full"  # "full" or "incremental"
+    sync_type: Literal["full", "incremental"] = "full"
 
 
 class AnalyticsSyncResponse(BaseModel):
     status: str
+    sync_type: str
+    # Warehouse totals after the sync
     documents_synced: int
     chunks_synced: int
+    # Rows touched by this sync
+    documents_upserted: int
+    documents_deleted: int
+    chunks_written: int
+    chunks_deleted: int
+    changes_applied: int
+    watermark: int
+    duration_ms: float
 
 
 class CategoryStatsResponse(BaseModel):
@@ -33,6 +48,45 @@ class CategoryStatsResponse(BaseModel):
     avg_pages: float
 
 
+class OutcomeStatsResponse(BaseModel):
+    deal_outcome: str
+    document_count: int
+    chunk_count: int
+    avg_pages: float
+
+
+class DealStatsResponse(BaseModel):
+    deal_id: str
+    document_count: int
+    total_chunks: int
+    categories: list[str]
+    last_document_upload: datetime | None
+
+
+class ConsistencyResponse(BaseModel):
+    consistent: bool
+    mismatches: dict[str, list[dict]]
+
+
+class SnapshotExportRequest(BaseModel):
+    datasets: list[str] | None = None  # default: every exportable dataset
+    full: bool = False  # rewrite every partition instead of only changed ones
+    compression: str | None = None
+    row_group_size: int | None = Field(default=None, gt=0)
+
+
+class SnapshotExportResult(BaseModel):
+    dataset: str
+    path: str
+    partitions_written: int
+    partitions_skipped: int
+    partitions_removed: int
+    rows_written: int
+    total_rows: int
+    duration_ms: float
+    written: list[str]
+
+
 class DealComparisonRequest(BaseModel):
     deal_ids: list[str]
 
@@ -46,20 +100,28 @@ class DealComparisonResponse(BaseModel):
 
 @router.post("/sync", response_model=AnalyticsSyncResponse)
 def analytics_sync(request: AnalyticsSyncRequest, db: Session = Depends(get_db)):
-    """Sync SQLite data to DuckDB analytics warehouse."""
+    """Sync SQLite data to DuckDB analytics warehouse.
+
+    ``full`` rewrites the warehouse; ``incremental`` replays only the
+    document changes logged since the last applied watermark.
+    """
     try:
         analytics = get_duckdb_analytics()
-        analytics.sync_from_sqlite(db)
+        if request.sync_type == "incremental":
+            result = analytics.sync_incremental(db)
+        else:
+            result = analytics.sync_from_sqlite(db)
 
         # Get counts for response
         with analytics.session() as conn:
-            doc_count = conn.execute("SELECT COUNT(DISTINCT document_id) FROM document_chunks").fetchone()[0]
+            doc_count = conn.execute("SELECT COUNT(*) FROM document_stats").fetchone()[0]
             chunk_count = conn.execute("SELECT COUNT(*) FROM document_chunks").fetchone()[0]
 
         return AnalyticsSyncResponse(
             status="success",
             documents_synced=doc_count,
             chunks_synced=chunk_count,
+            **asdict(result),
         )
     except Exception as exc:
         logger.exception("Analytics sync failed")
@@ -78,6 +140,55 @@ def analytics_category_stats():
         raise HTTPException(status_code=500, detail=f"Query failed: {exc}") from exc
 
 
+@router.get("/outcome-stats", response_model=list[OutcomeStatsResponse])
+def analytics_outcome_stats():
+    """Get document statistics grouped by deal outcome."""
+    try:
+        analytics = get_duckdb_analytics()
+        stats = analytics.query_outcome_stats()
+        return [OutcomeStatsResponse(**row) for row in stats]
+    except Exception as exc:
+        logger.exception("Outcome stats query failed")
+        raise HTTPException(status_code=500, detail=f"Query failed: {exc}") from exc
+
+
+@router.get("/deal/{deal_id}/stats", response_model=DealStatsResponse)
+def analytics_deal_stats(deal_id: str):
+    """Get precomputed document metrics for a single deal."""
+    try:
+        analytics = get_duckdb_analytics()
+        stats = analytics.query_deal_stats(deal_id)
+    except Exception as exc:
+        logger.exception(f"Deal stats query failed for {deal_id}")
+        raise HTTPException(status_code=500, detail=f"Query failed: {exc}") from exc
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No analytics for deal")
+    return DealStatsResponse(**stats)
+
+
+@router.get("/consistency", response_model=ConsistencyResponse)
+def analytics_consistency():
+    """Compare the materialized aggregates against a full recompute."""
+    try:
+        analytics = get_duckdb_analytics()
+        return ConsistencyResponse(**analytics.check_consistency())
+    except Exception as exc:
+        logger.exception("Consistency check failed")
+        raise HTTPException(status_code=500, detail=f"Consistency check failed: {exc}") from exc
+
+
+@router.post("/rebuild-aggregates", response_model=ConsistencyResponse)
+def analytics_rebuild_aggregates():
+    """Rebuild the materialized aggregates and return the post-rebuild check."""
+    try:
+        analytics = get_duckdb_analytics()
+        analytics.rebuild_aggregates()
+        return ConsistencyResponse(**analytics.check_consistency())
+    except Exception as exc:
+        logger.exception("Aggregate rebuild failed")
+        raise HTTPException(status_code=500, detail=f"Rebuild failed: {exc}") from exc
+
+
 @router.post("/deal-comparison", response_model=list[DealComparisonResponse])
 def analytics_deal_comparison(request: DealComparisonRequest):
     """Compare multiple deals by document metrics."""
@@ -115,3 +226,26 @@ def analytics_search_tables(query: str):
     except Exception as exc:
         logger.exception("Table search failed")
         raise HTTPException(status_code=500, detail=f"Search failed: {exc}") from exc
+
+
+@router.post("/export", response_model=list[SnapshotExportResult])
+def analytics_export(request: SnapshotExportRequest):
+    """Write Hive-partitioned Parquet snapshots, rewriting only changed partitions."""
+    try:
+        exporter = ParquetSnapshotExporter(
+            compression=request.compression,
+            row_group_size=request.row_group_size,
+        )
+        results = exporter.export(request.datasets, full=request.full)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        logger.exception("Snapshot export failed")
+        raise HTTPException(status_code=500, detail=f"Export failed: {exc}") from exc
+    return [SnapshotExportResult(**asdict(result)) for result in results]
+
+
+@router.get("/export/manifest")
+def analytics_export_manifest():
+    """Return the manifests of the latest snapshot export."""
+    return ParquetSnapshotExporter().manifest()
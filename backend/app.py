@@ -79,8 +79,17 @@ def main():
     port = 8000
 
     def open_browser():
-        """Open browser after a short delay to let server start."""
-        time.sleep(2)
+        """Open the browser as soon as the server answers /health (models keep warming up)."""
+        import urllib.error
+        import urllib.request
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(f"http://{host}:{port}/health", timeout=1)
+                break
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.1)
         webbrowser.open(f"http://{host}:{port}")
 
     # Open browser in a separate thread
@@ -14,13 +14,72 @@ class Settings(BaseSettings):
     templates_root: str = Field(default="./workspace/templates")
     postmortems_root: str = Field(default="./workspace/postmortems")
     cache_root: str = Field(default="./workspace/cache")
+    parsed_chunks_compression: str = Field(
+        default="gzip", description="Parsed chunk JSONL codec: 'none', 'gzip' or 'zstd' (needs zstandard)"
+    )
     logs_root: str = Field(default="./workspace/logs")
+    audit_cold_root: str = Field(default="./workspace/cold", description="Tiered-out workflow run outputs")
+    audit_hot_days: int = Field(default=30, description="Workflow run outputs older than this move to the cold store")
+    analytics_sync_batch_size: int = Field(default=5000, description="Rows per batch when streaming SQLite into DuckDB")
+    exports_root: str = Field(default="./workspace/exports")
+    artifacts_root: str = Field(default="./workspace/artifacts", description="Content-addressed workflow reports")
+    report_formats: list[str] = Field(
+        default=["md"], description="Formats rendered for each workflow run: md, html, pdf (needs weasyprint)"
+    )
+    render_workers: int = Field(default=1, description="Threads rendering workflow reports in the background")
+    render_stale_after_seconds: float = Field(
+        default=600.0, description="Reports still pending after this long are rendered again at start-up"
+    )
+    export_compression: str = Field(default="zstd", description="Parquet codec for analytics snapshots")
+    export_row_group_size: int = Field(default=122_880, description="Rows per Parquet row group")
     qdrant_url: str = Field(default="http://localhost:6333")
     qdrant_path: str | None = Field(default=None)
     qdrant_api_key: str | None = Field(default=None)
     qdrant_collection: str = Field(default="pe_docs")
+    qdrant_serving_ttl_seconds: float = Field(
+        default=30.0, description="How long searches trust the resolved alias before following it again"
+    )
+    qdrant_deal_collection: str = Field(default="pe_deals", description="One point per deal, for similar-deal search")
+    deal_index_attribute_weight: float = Field(
+        default=0.25, description="Weight of the structured deal profile vs. the chunk centroid in deal vectors"
+    )
     embedding_model_name: str = Field(default="sentence-transformers/all-MiniLM-L6-v2")
     embedding_dim: int = Field(default=384)
+    embedding_batch_size: int = Field(default=64, description="Texts per embedding call during ingestion")
+    embedding_query_cache_size: int = Field(default=1024, description="Query embeddings kept in an in-process LRU")
+    reindex_workers: int = Field(default=2, description="Embedding batches in flight while rebuilding the index")
+    embedding_workers: int = Field(default=2, description="Threads running embedding inference for requests")
+    db_workers: int = Field(default=4, description="Threads running SQLite work for async routes")
+    io_workers: int = Field(default=8, description="Threads for other blocking I/O from async routes")
+    retrieval_max_in_flight: int = Field(default=8, description="Concurrent /chat, /precedents and /workflow/run requests")
+    retrieval_max_queued: int = Field(default=32, description="Retrieval requests allowed to wait; beyond this -> 429")
+    retrieval_queue_timeout_seconds: float = Field(default=10.0, description="Max wait for a retrieval slot; then 503")
+    metadata_cache_mode: str = Field(
+        default="shared",
+        description="'process' trusts in-process invalidation; 'shared' also notices other workers via change_log",
+    )
+    metadata_cache_check_interval_seconds: float = Field(
+        default=1.0, description="How often shared mode checks change_log for writes from other processes"
+    )
+    llm_timeout_seconds: float = Field(default=120.0)
+    llm_max_concurrency: int = Field(default=4, description="Concurrent completions per process (gateway limit)")
+    llm_stream_usage: bool = Field(
+        default=True,
+        description="Ask streamed completions for token usage (stream_options); off for gateways that reject it",
+    )
+    warmup_on_startup: bool = Field(
+        default=True, description="Load Qdrant, the embedding model, docling and DuckDB in the background after start-up"
+    )
+    profiling_enabled: bool = Field(
+        default=False, description="Honour X-Profile / ?profile= and the upload profile flag; set PROFILING_TOKEN too"
+    )
+    profiling_engine: str = Field(default="sampling", description="'sampling' (all request threads) or 'cprofile'")
+    profiling_token: str | None = Field(default=None, description="If set, profiled requests must send X-Profile-Token")
+    profiling_min_interval_seconds: float = Field(default=30.0, description="Minimum gap between two captures")
+    profiling_max_concurrent: int = Field(default=1)
+    profiling_sample_interval_ms: float = Field(default=5.0)
+    profiling_max_duration_seconds: float = Field(default=300.0, description="Sampling stops after this long")
+    profiling_max_profiles: int = Field(default=100, description="Profiles kept under logs_root/profiles")
     llm_provider: str = Field(
         default="openai_compatible",
         description="Use 'openai_compatible' for local vLLM/Ollama gateways or 'provider' for hosted APIs.",
@@ -53,6 +112,9 @@ def get_settings() -> Settings:
         settings.postmortems_root,
         settings.cache_root,
         settings.logs_root,
+        settings.audit_cold_root,
+        settings.exports_root,
+        settings.artifacts_root,
         settings.mempalace_root,
         settings.connectors_root,
     ):
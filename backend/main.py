@@ -1,9 +1,15 @@
+import asyncio
+import base64
 import json
 import hashlib
 import logging
-from datetime import datetime
+import math
+import threading
+from dataclasses import asdict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import (
     BackgroundTasks,
@@ -12,16 +18,26 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
+    Request,
+    Response,
     UploadFile,
 )
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 
 from backend.config import get_settings
 from backend.database import Base, engine, get_db
+from backend.migrations import run_migrations
 from backend.models import (
+    Artifact,
     AuditLog,
+    ChangeLogEntry,
     ChatLog,
     Chunk,
     Deal,
@@ -31,13 +47,56 @@ from backend.models import (
     RetrievalTrace,
     WorkflowRun,
 )
-from backend.services.parser import ParsedChunk, parse_and_chunk
-from backend.services.precedent import find_precedents, summarize_precedents
-from backend.services.rag import generate_answer
-from backend.services.vector import QdrantVectorStore
+from backend.services import change_tracking  # noqa: F401 — registers change-log listeners
+from backend.services.chunk_view import primary_deal_subquery
+from backend.services.deal_index import DealIndex
+from backend.services.evidence import TRACE_VIEW
+from backend.services.ingest_events import TERMINAL_STAGES, get_ingestion_broker
+from backend.services.metadata_cache import get_metadata_cache
+from backend.services.metrics import collect_timings, count_cache, count_chunks, render_prometheus, span
+from backend.services.parser import ParsedChunk, parse_and_chunk, warm_up_parser
+from backend.services.artifacts import (
+    FAILED as ARTIFACT_FAILED,
+    MEDIA_TYPES as ARTIFACT_MEDIA_TYPES,
+    PENDING as ARTIFACT_PENDING,
+    describe as describe_artifact,
+    get_artifact_service,
+)
+from backend.services.concurrency import (
+    AdmissionRejected,
+    get_retrieval_admission,
+    run_db,
+    run_io,
+    shutdown_executors,
+)
+from backend.services.precedent import (
+    afind_precedent_groups,
+    flatten_groups,
+    summarize_groups,
+    summarize_precedents,
+)
+from backend.services.profiling import ProfilingMiddleware, get_profiler, parse_profile_flag
+from backend.services.rag import agenerate_answer, close_async_clients
+from backend.services.reindex import (
+    MIGRATION,
+    REBUILD,
+    EmbeddingMigration,
+    IndexJob,
+    IndexRebuild,
+    get_job,
+    start_job,
+)
+from backend.services.run_store import load_output, store_output
+from backend.services.vector import (
+    QdrantVectorStore,
+    ServingIndex,
+    close_async_qdrant_client,
+    get_embedding_model,
+)
+from backend.services.warmup import get_readiness, start_warmup
 from backend.services.workspace import WorkspaceManager
-from backend.services.workflow import run_ic_workflow
-from backend.services.analytics import DuckDBAnalytics, get_duckdb_analytics
+from backend.services.workflow import arun_ic_workflow, astream_ic_workflow
+from backend.services.analytics import get_duckdb_analytics
 from backend.api import analytics as analytics_api
 
 logger = logging.getLogger(__name__)
@@ -62,8 +121,11 @@ app.add_middleware(
     allow_origins=_ALLOWED_ORIGINS,
     allow_credentials=False,  # False: no cookies/auth headers cross-origin
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match", "If-Modified-Since", "X-Profile", "X-Profile-Token"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "X-Profile-Id", "X-Profile-Skipped"],
 )
+# Outermost, so a profile covers CORS and the whole response body.
+app.add_middleware(ProfilingMiddleware)
 
 # ---------------------------------------------------------------------------
 # Singletons — initialized once at startup via app.state
@@ -71,13 +133,36 @@ app.add_middleware(
 workspace_manager: WorkspaceManager | None = None
 
 
+_vector_store: QdrantVectorStore | None = None
+_vector_store_lock = threading.Lock()
+
+
 def get_vector_store() -> QdrantVectorStore:
-    """Create a new QdrantVectorStore per call to avoid thread issues.
+    """Return the process-wide QdrantVectorStore.
 
-    QdrantClient (embedded mode) uses SQLite internally which is thread-unsafe.
-    Each thread should have its own instance.
+    Embedded mode allows a single client per storage folder, so the store is
+    shared and its client serializes calls (QdrantClient uses SQLite
+    internally, which is thread-unsafe). In server mode the client talks
+    HTTP and is thread-safe.
     """
-    return QdrantVectorStore()
+    global _vector_store
+    with _vector_store_lock:
+        if _vector_store is None:
+            _vector_store = QdrantVectorStore()
+        return _vector_store
+
+
+_deal_index: DealIndex | None = None
+_deal_index_lock = threading.Lock()
+
+
+def get_deal_index() -> DealIndex:
+    """Return the process-wide deal similarity index (shares the vector store's client)."""
+    global _deal_index
+    with _deal_index_lock:
+        if _deal_index is None:
+            _deal_index = DealIndex(get_vector_store())
+        return _deal_index
 
 
 def get_workspace_manager() -> WorkspaceManager:
@@ -110,6 +195,12 @@ class DocumentStatusOut(BaseModel):
     id: str
     status: str
     status_error: str | None
+    stage: str | None = None
+    progress: float | None = None
+
+
+class DocumentStatusBatchRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=1000)
 
 
 class DealOut(BaseModel):
@@ -160,6 +251,16 @@ class ChatRequest(BaseModel):
     filters: ChatFilters | None = None
 
 
+CHAT_BATCH_MAX_QUERIES = 100
+
+
+class ChatBatchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=CHAT_BATCH_MAX_QUERIES)
+    doc_ids: Optional[List[str]] = None
+    analysis_mode: str = "document_search"
+    filters: ChatFilters | None = None
+
+
 class ChatResponse(BaseModel):
     answer: str
     sources: List[dict]
@@ -173,6 +274,45 @@ class PrecedentRequest(BaseModel):
     categories: list[str] | None = None
     deal_outcomes: list[str] | None = None
     top_k: int = 12
+    # At most this many chunks from any one deal, so one long CIM cannot fill the scan.
+    per_deal: int = Field(default=3, ge=1)
+
+
+class DealFilters(BaseModel):
+    sector: list[str] | None = None
+    stage: list[str] | None = None
+    geography: list[str] | None = None
+    strategy: list[str] | None = None
+    decision_status: list[str] | None = None
+    outcome_status: list[str] | None = None
+    vintage_from: int | None = None
+    vintage_to: int | None = None
+
+
+class SimilarDealsRequest(BaseModel):
+    # Exactly one of deal_id ("deals like this one") or query (free text).
+    deal_id: str | None = None
+    query: str | None = None
+    top_k: int = Field(default=10, ge=1, le=100)
+    filters: DealFilters | None = None
+
+
+class ReindexRequest(BaseModel):
+    document_ids: list[str] | None = None
+    # Defaults to the model the live collection was built with.
+    model_name: str | None = None
+    swap: bool = True
+    replace_legacy: bool = False
+    drop_previous: bool = False
+    # Swap even if some documents have no parsed artifact; they drop out of the index.
+    force: bool = False
+
+
+class MigrationRequest(BaseModel):
+    model_name: str
+    # Cut over as soon as the shadow collection has caught up; otherwise wait for POST .../cutover.
+    auto_cutover: bool = True
+    replace_legacy: bool = False
 
 
 class WorkflowRequest(BaseModel):
@@ -181,6 +321,10 @@ class WorkflowRequest(BaseModel):
     doc_ids: list[str] | None = None
     categories: list[str] | None = None
     deal_outcomes: list[str] | None = None
+    # Also draft each IC memo section with the LLM, concurrently.
+    draft_sections: bool = False
+    # Report formats rendered in the background; defaults to REPORT_FORMATS.
+    report_formats: list[Literal["md", "html", "pdf"]] | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -217,6 +361,26 @@ def _link_document_to_deal(db: Session, document_id: str, deal_id: str | None) -
     )
 
 
+def _refresh_deal_vector(deal_id: str | None) -> None:
+    """Recompute one deal's point in the deal index. The index is derived data,
+    so failures are logged and never fail the write that triggered them."""
+    if not deal_id:
+        return
+    from backend.database import SessionLocal  # avoid circular at module level
+
+    db = SessionLocal()
+    try:
+        deal = get_metadata_cache().get(db).deal(deal_id)
+        if deal is None:
+            get_deal_index().remove_deal(deal_id)
+        else:
+            get_deal_index().refresh_deal(deal)
+    except Exception as exc:
+        logger.warning("Deal index refresh failed for deal_id=%s: %s", deal_id, exc)
+    finally:
+        db.close()
+
+
 def _store_chunks(db: Session, document_id: str, chunks: list[ParsedChunk]) -> None:
     for chunk in chunks:
         db.add(
@@ -232,18 +396,73 @@ def _store_chunks(db: Session, document_id: str, chunks: list[ParsedChunk]) -> N
 
 
 def _build_retrieval_trace_payload(retrieved: list) -> list[dict]:
-    return [
-        {
-            "doc_id": item.document_id,
-            "filename": item.filename,
-            "page_number": item.page_number,
-            "chunk_index": item.chunk_index,
-            "score": item.score,
-            "category": item.category,
-            "deal_outcome": item.deal_outcome,
-        }
-        for item in retrieved
-    ]
+    return TRACE_VIEW.many(retrieved)
+
+
+def _encode_keyset_cursor(upload_timestamp: datetime, document_id: str) -> str:
+    raw = json.dumps([upload_timestamp.isoformat(), document_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_keyset_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, document_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), str(document_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        return etag in candidates or "*" in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+_SSE_HEARTBEAT_SECONDS = 15.0
+
+
+def _sse(event: str, data: dict, event_id: int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _document_statuses(db: Session, document_ids: list[str]) -> list[DocumentStatusOut]:
+    """Batch status lookup; unknown ids are omitted."""
+    rows = (
+        db.query(Document.id, Document.status, Document.status_error)
+        .filter(Document.id.in_(document_ids))
+        .all()
+    )
+    live = get_ingestion_broker().latest(document_ids)
+    statuses = []
+    for doc_id, status, status_error in rows:
+        event = live.get(doc_id)
+        if event is not None:
+            stage, progress = event.stage, event.progress
+        else:
+            # Nothing in flight in this process: derive the stage from SQLite.
+            stage = {"ready": "done", "failed": "failed"}.get(status, "queued")
+            progress = 0.0 if stage == "queued" else 1.0
+        statuses.append(
+            DocumentStatusOut(
+                id=doc_id, status=status, status_error=status_error, stage=stage, progress=progress
+            )
+        )
+    return statuses
 
 
 # ---------------------------------------------------------------------------
@@ -258,13 +477,36 @@ def _ingest_document(
     deal_id: str | None,
     content: bytes,
     metadata: dict,
+    profile: str | None = None,
+) -> None:
+    """Parse, embed, and index a document. Runs in a BackgroundTask.
+
+    ``profile`` names a profiling engine to capture this ingestion with.
+    """
+    if profile:
+        with get_profiler().capture("ingestion", document_id, profile):
+            _ingest_document(document_id, file_location, filename, deal_id, content, metadata)
+        return
+    with collect_timings() as timings, span("ingest_total"):
+        _run_ingestion(timings, document_id, file_location, filename, deal_id, content, metadata)
+
+
+def _run_ingestion(
+    timings: dict,
+    document_id: str,
+    file_location: Path,
+    filename: str,
+    deal_id: str | None,
+    content: bytes,
+    metadata: dict,
 ) -> None:
-    """Parse, embed, and index a document. Runs in a BackgroundTask."""
     from backend.database import SessionLocal  # avoid circular at module level
 
+    events = get_ingestion_broker()
     db = SessionLocal()
     try:
         # Parse
+        events.publish(document_id, "processing", "parsing", 0.05)
         parse_result = parse_and_chunk(file_location)
         chunks = parse_result.chunks
         tables = parse_result.tables
@@ -285,8 +527,13 @@ def _ingest_document(
                 metadata_json={**metadata.get("extra", {}), **parsed_artifacts},
             )
         )
-        _store_chunks(db, document_id, chunks)
-        db.commit()
+        with span("sqlite_store"):
+            _store_chunks(db, document_id, chunks)
+            db.commit()
+        count_chunks("parsed", len(chunks))
+        events.publish(
+            document_id, "processing", "embedding", 0.3, detail=f"{len(chunks)} chunks, {len(tables)} tables"
+        )
 
         # Extract and store tables to DuckDB
         if tables:
@@ -306,6 +553,18 @@ def _ingest_document(
             except Exception as table_exc:
                 logger.warning("Failed to store tables in DuckDB for document_id=%s: %s", document_id, table_exc)
 
+        def _report_vector_progress(stage: str, done: int, total: int) -> None:
+            # Embedding spans 30-80% of the overall progress, the upsert 80-90%.
+            if stage == "embedding":
+                events.publish(
+                    document_id, "processing", "embedding", 0.3 + 0.5 * done / max(total, 1),
+                    detail=f"{done}/{total} chunks embedded",
+                )
+                if done == total:
+                    events.publish(document_id, "processing", "indexing", 0.8)
+            else:
+                events.publish(document_id, "processing", "indexing", 0.9, detail=f"{done} vectors indexed")
+
         # Embed + upsert to Qdrant — if this fails, document stays "processing" → "failed"
         get_vector_store().upsert_chunks(
             chunks,
@@ -316,6 +575,7 @@ def _ingest_document(
                 "deal_outcome": metadata.get("deal_outcome"),
                 "deal_id": deal_id,
             },
+            on_progress=_report_vector_progress,
         )
 
         # Mark ready
@@ -323,20 +583,25 @@ def _ingest_document(
         if doc:
             doc.status = "ready"
             db.commit()
+        _refresh_deal_vector(deal_id)
+        events.publish(document_id, "ready", "analytics_sync", 0.95)
 
         # Sync to DuckDB analytics (incremental sync for this document only)
         try:
             from backend.services.analytics import get_duckdb_analytics
             analytics = get_duckdb_analytics()
-            analytics.sync_from_sqlite(db, document_id=document_id)
+            with span("analytics_sync"):
+                analytics.sync_from_sqlite(db, document_id=document_id)
             logger.info("DuckDB sync complete for document_id=%s", document_id)
         except Exception as sync_exc:
             logger.warning("DuckDB sync failed for document_id=%s: %s", document_id, sync_exc)
             # Don't fail ingestion if DuckDB sync fails
 
         logger.info(
-            "Ingestion complete: document_id=%s chunks=%d tables=%d", document_id, len(chunks), len(tables)
+            "Ingestion complete: document_id=%s chunks=%d tables=%d timings_ms=%s",
+            document_id, len(chunks), len(tables), timings,
         )
+        events.publish(document_id, "ready", "done", 1.0, detail=f"{len(chunks)} chunks indexed")
 
     except Exception as exc:
         logger.exception("Ingestion failed: document_id=%s error=%s", document_id, exc)
@@ -348,6 +613,7 @@ def _ingest_document(
                 db.commit()
         except Exception:
             pass
+        events.publish(document_id, "failed", "failed", 1.0, error=str(exc))
     finally:
         db.close()
 
@@ -357,11 +623,34 @@ def _ingest_document(
 # ---------------------------------------------------------------------------
 
 
+def _warm_analytics() -> None:
+    with get_duckdb_analytics().session():
+        pass
+
+
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
-    get_vector_store()
+    run_migrations(engine)
     get_workspace_manager()
+    get_readiness().mark_ready("database")
+    # Reports a previous process left pending (crash, shutdown mid-render).
+    get_artifact_service().recover_stale()
+    # Heavy imports and model loads happen after the server starts accepting requests.
+    if settings.warmup_on_startup:
+        start_warmup(get_readiness(), [
+            ("vector_store", get_vector_store),
+            ("embedding_model", lambda: get_embedding_model().embed(["warm-up"])),
+            ("parser", warm_up_parser),
+            ("analytics", _warm_analytics),
+        ])
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_async_qdrant_client()
+    await close_async_clients()
+    shutdown_executors()
 
 
 # ---------------------------------------------------------------------------
@@ -369,30 +658,157 @@ def on_startup():
 # ---------------------------------------------------------------------------
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of stage latencies and counters."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/profiles")
+def list_profiles(
+    kind: str | None = Query(None, description="request or ingestion"),
+    target: str | None = Query(None, description="Substring of the route or document id"),
+    limit: int = Query(50, ge=1, le=500),
+) -> dict:
+    profiler = get_profiler()
+    return {
+        "profiles": [asdict(record) for record in profiler.store.list(limit=limit, kind=kind, target=target)],
+        "rejected": dict(profiler.rejected),
+    }
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str) -> dict:
+    """Profile metadata plus its text summary."""
+    store = get_profiler().store
+    record = store.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    summary_path = store.artifact_path(record, "txt")
+    summary = summary_path.read_text(encoding="utf-8") if summary_path and summary_path.exists() else None
+    return {**asdict(record), "summary": summary}
+
+
+@app.get("/profiles/{profile_id}/{artifact}")
+def download_profile_artifact(profile_id: str, artifact: str) -> FileResponse:
+    """Raw artifact: ``txt``, ``folded`` (sampling) or ``prof`` (cprofile, load with pstats/snakeviz)."""
+    store = get_profiler().store
+    record = store.get(profile_id)
+    path = store.artifact_path(record, artifact) if record else None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile artifact not found")
+    media_type = "application/octet-stream" if artifact == "prof" else "text/plain; charset=utf-8"
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
+
 @app.get("/health")
-def health() -> dict:
-    return {"status": "ok"}
+async def health() -> dict:
+    """Liveness (``status``) plus per-subsystem warm-up state (``ready``, ``subsystems``)."""
+    return {"status": "ok", **get_readiness().snapshot(), "retrieval": get_retrieval_admission().snapshot()}
+
+
+_DOCUMENTS_PAGE_SIZE = 200
 
 
 @app.get("/documents", response_model=List[DocumentOut])
-def list_documents(db: Session = Depends(get_db)):
-    documents = db.query(Document).order_by(Document.upload_timestamp.desc()).all()
-    result = []
-    for doc in documents:
-        # Get primary deal_id from deal_links (first link if any)
-        deal_id = doc.deal_links[0].deal_id if doc.deal_links else None
-        result.append(
-            DocumentOut(
-                id=doc.id,
-                filename=doc.filename,
-                upload_timestamp=doc.upload_timestamp,
-                tags=doc.tags,
-                category=doc.category,
-                deal_outcome=doc.deal_outcome,
-                status=doc.status,
-                deal_id=deal_id,
+def list_documents(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    status: str | None = None,
+    category: str | None = None,
+    deal_id: str | None = None,
+    tag: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """List documents newest first, one page at a time.
+
+    Pages are keyed on (upload_timestamp, id); the next page's cursor is
+    returned in the ``X-Next-Cursor`` header. Without ``limit`` or ``cursor``
+    every document is returned, for clients that predate paging; with only a
+    cursor, pages hold 200 documents. Responses carry an ETag and
+    Last-Modified derived from the document change log, so polling clients
+    get a 304 until a document, chunk or deal link actually changes.
+    """
+    latest_change = (
+        db.query(ChangeLogEntry.id, ChangeLogEntry.created_at)
+        .order_by(ChangeLogEntry.id.desc())
+        .first()
+    )
+    version = latest_change.id if latest_change else 0
+    query_key = json.dumps(
+        [limit, cursor, status, category, deal_id, tag], separators=(",", ":")
+    )
+    etag = f'"docs-{version}-{hashlib.sha1(query_key.encode()).hexdigest()[:12]}"'
+    last_modified = (
+        format_datetime(latest_change.created_at.replace(tzinfo=timezone.utc), usegmt=True)
+        if latest_change
+        else None
+    )
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        cache_headers["Last-Modified"] = last_modified
+
+    not_modified = _is_not_modified(request, etag, latest_change.created_at if latest_change else None)
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        count_cache("documents_listing", hit=not_modified)
+    if not_modified:
+        return Response(status_code=304, headers=cache_headers)
+
+    primary = primary_deal_subquery()
+    stmt = select(Document, primary.c.deal_id).outerjoin(
+        primary, primary.c.document_id == Document.id
+    )
+    if status:
+        stmt = stmt.where(Document.status == status)
+    if category:
+        stmt = stmt.where(Document.category == category)
+    if deal_id:
+        stmt = stmt.where(
+            select(DealDocumentLink.id)
+            .where(
+                DealDocumentLink.document_id == Document.id,
+                DealDocumentLink.deal_id == deal_id,
+            )
+            .exists()
+        )
+    if tag:
+        tag_values = func.json_each(Document.tags).table_valued("value")
+        stmt = stmt.where(select(1).select_from(tag_values).where(tag_values.c.value == tag).exists())
+    if cursor:
+        after_timestamp, after_id = _decode_keyset_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                Document.upload_timestamp < after_timestamp,
+                and_(Document.upload_timestamp == after_timestamp, Document.id < after_id),
             )
         )
+    page_size = limit or (_DOCUMENTS_PAGE_SIZE if cursor else None)
+    stmt = stmt.order_by(Document.upload_timestamp.desc(), Document.id.desc())
+    if page_size is not None:
+        stmt = stmt.limit(page_size + 1)
+
+    rows = db.execute(stmt).all()
+    page = rows[:page_size]
+    result = [
+        DocumentOut(
+            id=doc.id,
+            filename=doc.filename,
+            upload_timestamp=doc.upload_timestamp,
+            tags=doc.tags,
+            category=doc.category,
+            deal_outcome=doc.deal_outcome,
+            status=doc.status,
+            deal_id=primary_deal_id,
+        )
+        for doc, primary_deal_id in page
+    ]
+
+    response.headers.update(cache_headers)
+    if page_size is not None and len(rows) > page_size:
+        last = page[-1][0]
+        response.headers["X-Next-Cursor"] = _encode_keyset_cursor(last.upload_timestamp, last.id)
     return result
 
 
@@ -406,11 +822,65 @@ def document_status(document_id: str, db: Session = Depends(get_db)):
     )
 
 
+@app.post("/documents/status", response_model=List[DocumentStatusOut])
+def documents_status_batch(request: DocumentStatusBatchRequest, db: Session = Depends(get_db)):
+    """Status of many documents in one query, merged with live ingestion stage."""
+    return _document_statuses(db, request.ids)
+
+
+@app.get("/documents/events")
+async def document_events(
+    request: Request,
+    ids: list[str] | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    """Server-Sent Events stream of ingestion state transitions.
+
+    ``ids`` may be repeated or comma-separated; without it every document's
+    events are streamed. The stream opens with one snapshot event per
+    requested document and, when ids were given, closes once all of them
+    reached a terminal stage (``done`` or ``failed``).
+    """
+    document_ids = sorted({part for value in ids or [] for part in value.split(",") if part}) or None
+    broker = get_ingestion_broker()
+    subscription = broker.subscribe(document_ids)
+    snapshot = await run_in_threadpool(_document_statuses, db, document_ids) if document_ids else []
+
+    async def _stream():
+        with subscription:
+            pending = set(document_ids or [])
+            for status in snapshot:
+                if status.stage in TERMINAL_STAGES:
+                    pending.discard(status.id)
+                yield _sse("snapshot", status.model_dump())
+            if document_ids and not pending:
+                return
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=_SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse("ingestion", event.to_dict(), event_id=event.sequence)
+                if document_ids and event.terminal:
+                    pending.discard(event.document_id)
+                    if not pending:
+                        return
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.delete("/documents/{document_id}")
 def delete_document(document_id: str, db: Session = Depends(get_db)):
     document = db.query(Document).filter(Document.id == document_id).first()
     if document is None:
         raise HTTPException(status_code=404, detail="Document not found")
+    linked_deal_ids = [
+        deal_id for (deal_id,) in db.query(DealDocumentLink.deal_id).filter(DealDocumentLink.document_id == document_id)
+    ]
 
     # Vector store deletion — fail loudly so orphaned vectors are visible
     try:
@@ -448,6 +918,9 @@ def delete_document(document_id: str, db: Session = Depends(get_db)):
     )
     db.delete(document)
     db.commit()
+    get_metadata_cache().invalidate()
+    for deal_id in linked_deal_ids:
+        _refresh_deal_vector(deal_id)
 
     # Also delete from DuckDB analytics
     try:
@@ -463,18 +936,144 @@ def delete_document(document_id: str, db: Session = Depends(get_db)):
 
 @app.get("/deals", response_model=List[DealOut])
 def list_deals(db: Session = Depends(get_db)):
-    return db.query(Deal).order_by(Deal.updated_at.desc()).all()
+    return get_metadata_cache().get(db).list_deals()
 
 
 @app.post("/deals", response_model=DealOut)
-def create_deal(payload: DealCreate, db: Session = Depends(get_db)):
+def create_deal(payload: DealCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     deal = Deal(**payload.model_dump())
     db.add(deal)
     db.commit()
+    get_metadata_cache().invalidate()
     db.refresh(deal)
+    # Placed by its profile until documents are linked.
+    background_tasks.add_task(_refresh_deal_vector, deal.id)
     return deal
 
 
+@app.post("/deals/similar")
+async def similar_deals(request: SimilarDealsRequest):
+    """Deals most similar to an indexed deal or to a free-text description."""
+    if (request.deal_id is None) == (request.query is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of deal_id or query")
+    filters = (request.filters or DealFilters()).model_dump()
+    index = await run_io(get_deal_index)
+    results = await run_io(index.similar_deals, request.deal_id, request.query, request.top_k, **filters)
+    return {"deals": [asdict(result) for result in results]}
+
+
+@app.post("/deals/similar/rebuild")
+async def rebuild_deal_index(db: Session = Depends(get_db)):
+    """Recompute every deal's vector, e.g. after a backfill or an embedding model change."""
+    deals = (await run_db(get_metadata_cache().get, db)).list_deals()
+    index = await run_io(get_deal_index)
+    return {"indexed": await run_io(index.rebuild, deals)}
+
+
+def _rebuild_deal_index(_serving: ServingIndex | None = None) -> None:
+    """Recompute every deal vector after the chunk index changed model."""
+    from backend.database import SessionLocal  # avoid circular at module level
+
+    db = SessionLocal()
+    try:
+        get_deal_index().rebuild(get_metadata_cache().get(db).list_deals())
+    except Exception as exc:
+        logger.warning("Deal index rebuild after model change failed: %s", exc)
+    finally:
+        db.close()
+
+
+async def _start_index_job(job: IndexJob) -> dict:
+    try:
+        await run_io(start_job, job)
+    except RuntimeError as exc:  # another job is active, or a legacy collection without replace_legacy
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return job.status()
+
+
+def _get_index_job_or_404(job_id: str, kind: str) -> IndexJob:
+    job = get_job(job_id)
+    if job is None or job.kind != kind:
+        raise HTTPException(status_code=404, detail=f"Index {kind} not found")
+    return job
+
+
+@app.post("/index/rebuild", status_code=202)
+async def rebuild_index(request: ReindexRequest):
+    """Re-embed the parsed chunk artifacts into a new collection in the background, then swap the live alias to it."""
+    from backend.database import SessionLocal  # avoid circular at module level
+
+    try:
+        rebuild = IndexRebuild(
+            await run_io(get_vector_store),
+            SessionLocal,
+            request.model_name,
+            document_ids=request.document_ids,
+            swap=request.swap,
+            replace_legacy=request.replace_legacy,
+            drop_previous=request.drop_previous,
+            force=request.force,
+            on_model_change=_rebuild_deal_index,
+        )
+    except ValueError as exc:  # document_ids with swap
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return await _start_index_job(rebuild)
+
+
+@app.get("/index/rebuild/{job_id}")
+def rebuild_index_status(job_id: str):
+    """State, percent done, chunks/s and ETA of a rebuild."""
+    return _get_index_job_or_404(job_id, REBUILD).status()
+
+
+@app.delete("/index/rebuild/{job_id}")
+def cancel_rebuild_index(job_id: str):
+    """Stop a running rebuild; its unfinished collection is deleted."""
+    rebuild = _get_index_job_or_404(job_id, REBUILD)
+    rebuild.cancel()
+    return rebuild.status()
+
+
+@app.post("/index/migrations", status_code=202)
+async def start_embedding_migration(request: MigrationRequest):
+    """Re-embed all stored chunks with another model into a shadow collection, in the background."""
+    from backend.database import SessionLocal  # avoid circular at module level
+
+    migration = EmbeddingMigration(
+        await run_io(get_vector_store),
+        SessionLocal,
+        request.model_name,
+        auto_cutover=request.auto_cutover,
+        replace_legacy=request.replace_legacy,
+        on_model_change=_rebuild_deal_index,
+    )
+    return await _start_index_job(migration)
+
+
+@app.get("/index/migrations/{migration_id}")
+def embedding_migration_status(migration_id: str):
+    """State, percent done, chunks/s and ETA of a migration."""
+    return _get_index_job_or_404(migration_id, MIGRATION).status()
+
+
+@app.post("/index/migrations/{migration_id}/cutover")
+async def cut_over_embedding_migration(migration_id: str):
+    migration = _get_index_job_or_404(migration_id, MIGRATION)
+    try:
+        await run_io(migration.cutover)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return migration.status()
+
+
+@app.delete("/index/migrations/{migration_id}")
+def cancel_embedding_migration(migration_id: str):
+    """Stop a migration before it goes live; its shadow collection is deleted."""
+    migration = _get_index_job_or_404(migration_id, MIGRATION)
+    migration.cancel()
+    return migration.status()
+
+
 @app.post("/upload", response_model=DocumentOut)
 async def upload_document(
     background_tasks: BackgroundTasks,
@@ -486,6 +1085,7 @@ async def upload_document(
     document_type: str | None = Form(None),
     language: str | None = Form(None),
     metadata_json: str | None = Form(None),
+    profile: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
     parsed_tags = _normalize_json_list(tags)
@@ -520,6 +1120,7 @@ async def upload_document(
         db.delete(document)
         db.commit()
         raise
+    get_metadata_cache().invalidate()
 
     # Save raw file to workspace
     file_location = get_workspace_manager().store_raw_document(
@@ -540,6 +1141,8 @@ async def upload_document(
     )
     db.commit()
 
+    get_ingestion_broker().publish(document.id, "processing", "queued", 0.0)
+
     # Kick off async ingestion — returns immediately to client
     background_tasks.add_task(
         _ingest_document,
@@ -555,31 +1158,99 @@ async def upload_document(
             "language": language,
             "extra": extra_metadata,
         },
+        profile=parse_profile_flag(profile),
     )
 
     return document
 
 
-@app.post("/precedents")
-def precedents(request: PrecedentRequest, db: Session = Depends(get_db)):
-    results = find_precedents(
+async def retrieval_admission():
+    """Admit a retrieval request or fail fast with 429/503 and ``Retry-After``."""
+    controller = get_retrieval_admission()
+    try:
+        await controller.acquire()
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.detail,
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    try:
+        yield
+    finally:
+        controller.release()
+
+
+@app.post("/precedents", dependencies=[Depends(retrieval_admission)])
+async def precedents(request: PrecedentRequest, db: Session = Depends(get_db)):
+    groups = await afind_precedent_groups(
         db,
-        get_vector_store(),
+        await run_io(get_vector_store),
         request.query,
         doc_ids=request.doc_ids,
         categories=request.categories,
         deal_outcomes=request.deal_outcomes,
-        top_k=request.top_k,
+        max_deals=math.ceil(request.top_k / request.per_deal),
+        per_deal=request.per_deal,
+    )
+    # Already plain JSON types: skip FastAPI's re-encoding walk over every evidence dict.
+    return JSONResponse({
+        **summarize_precedents(flatten_groups(groups, request.top_k)),
+        "deals": summarize_groups(groups),
+    })
+
+
+def _record_chat(
+    db: Session, request: ChatRequest, answer_payload: dict, retrieved: list, timings: dict
+) -> None:
+    log = ChatLog(user_query=request.query, ai_response=answer_payload["answer"])
+    db.add(log)
+    db.flush()
+    db.add(
+        RetrievalTrace(
+            chat_log_id=log.id,
+            query=request.query,
+            analysis_mode=request.analysis_mode,
+            prompt_version=answer_payload["prompt_version"],
+            model_name=answer_payload["model_name"],
+            selected_doc_ids=request.doc_ids or [],
+            retrieved_chunks=_build_retrieval_trace_payload(retrieved),
+            timings_json=timings,
+        )
     )
-    return summarize_precedents(results)
+    db.commit()
 
 
-@app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest, db: Session = Depends(get_db)):
+def _record_chat_in_own_session(
+    request: ChatRequest, answer_payload: dict, retrieved: list, timings: dict
+) -> None:
+    """``_record_chat`` for concurrent writers, which must not share a Session."""
+    from backend.database import SessionLocal  # avoid circular at module level
+
+    db = SessionLocal()
+    try:
+        _record_chat(db, request, answer_payload, retrieved, timings)
+    finally:
+        db.close()
+
+
+@app.post("/chat", response_model=ChatResponse, dependencies=[Depends(retrieval_admission)])
+async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+    with collect_timings() as timings:
+        with span("chat_total"):
+            retrieved, answer_payload = await _answer_chat(request)
+        logger.info("Chat answered: chunks=%d timings_ms=%s", len(retrieved), timings)
+        await run_db(_record_chat, db, request, answer_payload, retrieved, dict(timings))
+
+    return ChatResponse(**answer_payload)
+
+
+async def _answer_chat(request: ChatRequest) -> tuple[list, dict]:
     try:
         categories = request.filters.categories if request.filters else None
         deal_outcomes = request.filters.deal_outcomes if request.filters else None
-        retrieved = get_vector_store().search(
+        vector_store = await run_io(get_vector_store)
+        retrieved = await vector_store.asearch(
             request.query,
             doc_ids=request.doc_ids,
             categories=categories,
@@ -596,52 +1267,102 @@ def chat(request: ChatRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="No relevant context found")
 
     try:
-        answer_payload = generate_answer(request.query, retrieved)
+        answer_payload = await agenerate_answer(request.query, retrieved)
     except Exception as exc:
         import traceback
 
         error_detail = f"Generate answer failed: {exc}\n{traceback.format_exc()}"
         raise HTTPException(status_code=500, detail=error_detail) from exc
+    return retrieved, answer_payload
 
-    log = ChatLog(user_query=request.query, ai_response=answer_payload["answer"])
-    db.add(log)
-    db.flush()
-    db.add(
-        RetrievalTrace(
-            chat_log_id=log.id,
-            query=request.query,
-            analysis_mode=request.analysis_mode,
-            prompt_version=answer_payload["prompt_version"],
-            model_name=answer_payload["model_name"],
-            selected_doc_ids=request.doc_ids or [],
-            retrieved_chunks=_build_retrieval_trace_payload(retrieved),
-        )
-    )
-    db.commit()
 
-    return ChatResponse(**answer_payload)
+def _normalize_question(query: str) -> str:
+    return " ".join(query.lower().split())
 
 
-@app.post("/workflow/run")
-def workflow_run(request: WorkflowRequest, db: Session = Depends(get_db)):
-    payload = run_ic_workflow(
-        db,
-        get_vector_store(),
-        request.query,
-        deal_id=request.deal_id,
-        doc_ids=request.doc_ids,
-        categories=request.categories,
-        deal_outcomes=request.deal_outcomes,
-    )
+@app.post("/chat/batch", dependencies=[Depends(retrieval_admission)])
+async def chat_batch(request: ChatBatchRequest) -> StreamingResponse:
+    """Answer a checklist of questions against one evidence set.
+
+    Questions that differ only in case or whitespace share one retrieval and
+    one answer. All remaining questions are embedded in one call and searched
+    in one Qdrant batch query. The LLM calls then run concurrently under
+    ``llm_max_concurrency``.
+
+    The response is NDJSON. Each line is one answer
+    (``{"index", "query", "status", ...}``), in completion order. A final
+    ``{"done": true, ...}`` line ends the stream. Each distinct question is
+    logged like a ``/chat`` call, in a Session of its own: the answers are
+    recorded concurrently on the db executor while the response streams.
+    """
+    positions: dict[str, list[int]] = {}  # normalized question -> indexes in request.queries
+    for index, query in enumerate(request.queries):
+        positions.setdefault(_normalize_question(query), []).append(index)
+    questions = [request.queries[indexes[0]] for indexes in positions.values()]
+    categories = request.filters.categories if request.filters else None
+    deal_outcomes = request.filters.deal_outcomes if request.filters else None
+
+    with collect_timings() as retrieval_timings:
+        try:
+            vector_store = await run_io(get_vector_store)
+            evidence = await vector_store.asearch_batch(
+                questions,
+                doc_ids=request.doc_ids,
+                categories=categories,
+                deal_outcomes=deal_outcomes,
+                top_k=3,  # same context budget as /chat
+            )
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Vector search failed: {exc}") from exc
+    shared_timings = {**retrieval_timings, "batch_size": len(questions)}
+
+    async def answer(query: str, retrieved: list) -> dict:
+        if not retrieved:
+            return {"query": query, "status": "no_context", "error": "No relevant context found"}
+        with collect_timings() as timings:
+            try:
+                with span("chat_total"):
+                    payload = await agenerate_answer(query, retrieved)
+            except Exception as exc:
+                logger.warning("Batch answer failed for %r: %s", query, exc)
+                return {"query": query, "status": "error", "error": f"Generate answer failed: {exc}"}
+        single = ChatRequest(
+            query=query, doc_ids=request.doc_ids, analysis_mode=request.analysis_mode, filters=request.filters
+        )
+        await run_db(_record_chat_in_own_session, single, payload, retrieved, {**shared_timings, **timings})
+        return {"query": query, "status": "ok", **payload}
+
+    async def stream():
+        tasks = [asyncio.create_task(answer(q, retrieved)) for q, retrieved in zip(questions, evidence)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                for index in positions[_normalize_question(result["query"])]:
+                    line = {**result, "index": index, "query": request.queries[index]}
+                    yield json.dumps(line, default=str) + "\n"
+            yield json.dumps({
+                "done": True,
+                "questions": len(request.queries),
+                "unique_questions": len(questions),
+                "timings_ms": retrieval_timings,
+            }) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _record_workflow_run(db: Session, request: WorkflowRequest, payload: dict) -> tuple[str, list[dict]]:
     workflow = WorkflowRun(
         deal_id=request.deal_id,
         workflow_type="ic_copilot",
         status="completed",
         input_json=request.model_dump(),
-        output_json=payload,
         model_name=payload.get("model_name"),
         prompt_version=payload.get("prompt_version"),
     )
+    store_output(workflow, payload)
     db.add(workflow)
     db.add(
         AuditLog(
@@ -652,40 +1373,183 @@ def workflow_run(request: WorkflowRequest, db: Session = Depends(get_db)):
         )
     )
     db.flush()
+    artifacts = get_artifact_service().request(
+        db, workflow.id, request.deal_id, request.report_formats or settings.report_formats
+    )
     db.commit()
-    db.refresh(workflow)
+    return workflow.id, [describe_artifact(artifact) for artifact in artifacts]
 
-    report_path = get_workspace_manager().write_workflow_output(
-        workflow.id, request.deal_id, "IC Workflow Output", payload
+
+@app.post("/workflow/run", dependencies=[Depends(retrieval_admission)])
+async def workflow_run(request: WorkflowRequest, db: Session = Depends(get_db)):
+    payload = await arun_ic_workflow(
+        db,
+        await run_io(get_vector_store),
+        request.query,
+        deal_id=request.deal_id,
+        doc_ids=request.doc_ids,
+        categories=request.categories,
+        deal_outcomes=request.deal_outcomes,
+        draft_sections=request.draft_sections,
+        deal_index=await run_io(get_deal_index) if request.deal_id else None,
     )
+    return await _persist_workflow_run(db, request, payload)
+
+
+async def _persist_workflow_run(db: Session, request: WorkflowRequest, payload: dict) -> dict:
+    workflow_id, artifacts = await run_db(_record_workflow_run, db, request, payload)
+    # Reports render after the response; clients poll the artifact URLs.
+    get_artifact_service().schedule([artifact["id"] for artifact in artifacts], request.deal_id, payload)
 
     return {
-        "workflow_id": workflow.id,
+        "workflow_id": workflow_id,
         **payload,
-        "artifacts": {"report_path": str(report_path)},
+        "artifacts": artifacts,
+    }
+
+
+@app.post("/workflow/run/stream", dependencies=[Depends(retrieval_admission)])
+async def workflow_run_stream(request: WorkflowRequest):
+    """Stream the workflow as NDJSON: one line per DAG node as it settles, then
+    the full ``/workflow/run`` response with ``"done": true``.
+
+    The generator outlives the request, so it opens its own Session.
+    """
+    from backend.database import SessionLocal  # avoid circular at module level
+
+    vector_store = await run_io(get_vector_store)
+    deal_index = await run_io(get_deal_index) if request.deal_id else None
+
+    async def stream():
+        db = SessionLocal()
+        events = astream_ic_workflow(
+            db,
+            vector_store,
+            request.query,
+            deal_id=request.deal_id,
+            doc_ids=request.doc_ids,
+            categories=request.categories,
+            deal_outcomes=request.deal_outcomes,
+            draft_sections=request.draft_sections,
+            deal_index=deal_index,
+        )
+        try:
+            async for event in events:
+                if event["event"] == "node":
+                    yield json.dumps(event, default=str) + "\n"
+                else:
+                    response = await _persist_workflow_run(db, request, event["payload"])
+                    yield json.dumps({"event": "done", "done": True, **response}, default=str) + "\n"
+        except Exception as exc:
+            logger.warning("Streamed workflow failed: %s", exc)
+            yield json.dumps({"event": "error", "done": True, "error": f"Workflow failed: {exc}"}) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+_WORKFLOW_RUN_COLUMNS = (
+    WorkflowRun.id,
+    WorkflowRun.deal_id,
+    WorkflowRun.workflow_type,
+    WorkflowRun.status,
+    WorkflowRun.model_name,
+    WorkflowRun.prompt_version,
+    WorkflowRun.created_at,
+    WorkflowRun.input_json,
+)
+
+
+def _workflow_run_summary(run) -> dict:
+    return {
+        "id": run.id,
+        "deal_id": run.deal_id,
+        "workflow_type": run.workflow_type,
+        "status": run.status,
+        "model_name": run.model_name,
+        "prompt_version": run.prompt_version,
+        "created_at": run.created_at,
+        "query": (run.input_json or {}).get("query"),
     }
 
 
 @app.get("/workflow/runs")
-def list_workflow_runs(deal_id: str | None = None, db: Session = Depends(get_db)):
-    """Return workflow run history, optionally filtered by deal_id."""
-    query = db.query(WorkflowRun)
+def list_workflow_runs(
+    response: Response,
+    deal_id: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Workflow run history newest first, one page at a time, without outputs.
+
+    Pages are keyed on (created_at, id); the next page's cursor is returned in
+    the ``X-Next-Cursor`` header. Fetch a run's output with
+    ``GET /workflow/runs/{run_id}``.
+    """
+    query = db.query(*_WORKFLOW_RUN_COLUMNS)
     if deal_id:
         query = query.filter(WorkflowRun.deal_id == deal_id)
-    runs = query.order_by(WorkflowRun.created_at.desc()).all()
-    return [
-        {
-            "id": run.id,
-            "deal_id": run.deal_id,
-            "workflow_type": run.workflow_type,
-            "status": run.status,
-            "model_name": run.model_name,
-            "prompt_version": run.prompt_version,
-            "created_at": run.created_at,
-            "output": run.output_json,
-        }
-        for run in runs
-    ]
+    if cursor:
+        after_created_at, after_id = _decode_keyset_cursor(cursor)
+        query = query.filter(
+            or_(
+                WorkflowRun.created_at < after_created_at,
+                and_(WorkflowRun.created_at == after_created_at, WorkflowRun.id < after_id),
+            )
+        )
+    rows = query.order_by(WorkflowRun.created_at.desc(), WorkflowRun.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = _encode_keyset_cursor(page[-1].created_at, page[-1].id)
+    return [_workflow_run_summary(run) for run in page]
+
+
+@app.get("/workflow/runs/{run_id}")
+def get_workflow_run(run_id: str, db: Session = Depends(get_db)):
+    """One workflow run with its full output, rehydrated from compact storage."""
+    run = db.get(WorkflowRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    return {**_workflow_run_summary(run), "output": load_output(db, run)}
+
+
+@app.get("/workflow/runs/{run_id}/artifacts")
+def list_workflow_run_artifacts(run_id: str, db: Session = Depends(get_db)):
+    """Rendered reports of a workflow run and their rendering status."""
+    if db.get(WorkflowRun, run_id) is None:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    artifacts = (
+        db.query(Artifact).filter(Artifact.workflow_run_id == run_id).order_by(Artifact.created_at, Artifact.format)
+    )
+    return [describe_artifact(artifact) for artifact in artifacts]
+
+
+@app.get("/artifacts/{artifact_id}")
+def download_artifact(artifact_id: str, request: Request, db: Session = Depends(get_db)):
+    """The report's bytes once rendered; 202 with its status while pending, 409 if rendering failed."""
+    artifact = db.get(Artifact, artifact_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    if artifact.status == ARTIFACT_PENDING:
+        return JSONResponse(jsonable_encoder(describe_artifact(artifact)), status_code=202)
+    if artifact.status == ARTIFACT_FAILED:
+        raise HTTPException(status_code=409, detail=f"Rendering failed: {artifact.error}")
+    # Content-addressed: the hash is a strong validator and the bytes never change.
+    etag = f'"{artifact.sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    if _is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+    path = get_artifact_service().path(artifact)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Artifact content is no longer stored")
+    return FileResponse(
+        path,
+        media_type=ARTIFACT_MEDIA_TYPES[artifact.format],
+        filename=f"{artifact.workflow_run_id}_{artifact.kind}.{artifact.format}",
+        headers=headers,
+    )
 
 
 class LLMConfigUpdate(BaseModel):
@@ -0,0 +1,129 @@
+"""Minimal Alembic-style schema migrations for the SQLite core database.
+
+``Base.metadata.create_all`` creates missing tables but never alters existing
+ones, so indexes, constraints and columns added after a database was first
+created are applied here. Each module in ``backend.migrations.versions``
+declares::
+
+    revision = "0002"
+    down_revision = "0001"
+    description = "..."
+
+    def upgrade(conn): ...
+
+Revisions form a single chain. ``run_migrations`` applies the pending ones in
+order, each in its own transaction, and records them in ``schema_migrations``.
+Upgrades must be idempotent (``IF NOT EXISTS``, column checks), because on a
+fresh database ``create_all`` has usually created the objects already.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import pkgutil
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "schema_migrations"
+
+
+@dataclass
+class Migration:
+    revision: str
+    down_revision: str | None
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def load_migrations() -> list[Migration]:
+    """Discover migration modules and return them in chain order."""
+    from backend.migrations import versions
+
+    migrations: dict[str, Migration] = {}
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migration = Migration(
+            revision=module.revision,
+            down_revision=module.down_revision,
+            description=getattr(module, "description", module_info.name),
+            upgrade=module.upgrade,
+        )
+        if migration.revision in migrations:
+            raise RuntimeError(f"Duplicate migration revision {migration.revision}")
+        migrations[migration.revision] = migration
+
+    children = {m.down_revision: m for m in migrations.values()}
+    if len(children) != len(migrations):
+        raise RuntimeError("Migration history has branches; revisions must form a single chain")
+
+    ordered: list[Migration] = []
+    current = children.get(None)
+    while current is not None:
+        ordered.append(current)
+        current = children.get(current.revision)
+    if len(ordered) != len(migrations):
+        raise RuntimeError("Migration history is broken; some revisions are unreachable")
+    return ordered
+
+
+def _ensure_version_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            " revision VARCHAR PRIMARY KEY,"
+            " description VARCHAR,"
+            " applied_at TIMESTAMP NOT NULL"
+            ")"
+        ))
+
+
+def applied_revisions(engine: Engine) -> set[str]:
+    _ensure_version_table(engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT revision FROM {VERSION_TABLE}"))}
+
+
+def run_migrations(engine: Engine) -> list[str]:
+    """Apply pending migrations; returns the revisions applied."""
+    done = applied_revisions(engine)
+    applied: list[str] = []
+    for migration in load_migrations():
+        if migration.revision in done:
+            continue
+        logger.info("Applying migration %s: %s", migration.revision, migration.description)
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO {VERSION_TABLE} (revision, description, applied_at)"
+                    " VALUES (:revision, :description, :applied_at)"
+                ),
+                {
+                    "revision": migration.revision,
+                    "description": migration.description,
+                    "applied_at": datetime.utcnow(),
+                },
+            )
+        applied.append(migration.revision)
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# Helpers for migration modules
+# ---------------------------------------------------------------------------
+
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, ddl_type: str) -> None:
+    if not has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
@@ -0,0 +1,18 @@
+"""Apply pending schema migrations: ``python -m backend.migrations``."""
+
+import logging
+
+from backend.database import Base, engine
+from backend.migrations import run_migrations
+from backend import models  # noqa: F401 — register tables on Base.metadata
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s): {', '.join(applied) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
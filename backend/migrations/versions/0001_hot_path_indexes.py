@@ -0,0 +1,35 @@
+"""Index the hot lookup paths and make deal/document links unique."""
+
+from sqlalchemy import text
+
+revision = "0001"
+down_revision = None
+description = "hot path indexes and unique deal_document_links(deal_id, document_id)"
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_documents_upload_timestamp ON documents (upload_timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_status ON documents (status, upload_timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_category ON documents (category)",
+    "CREATE INDEX IF NOT EXISTS ix_deals_updated_at ON deals (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_workflow_runs_created_at ON workflow_runs (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_workflow_runs_deal_created_at ON workflow_runs (deal_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_entity ON audit_logs (entity_type, entity_id)",
+    "CREATE INDEX IF NOT EXISTS ix_document_provenance_sha256 ON document_provenance (sha256)",
+)
+
+
+def upgrade(conn):
+    for statement in INDEXES:
+        conn.execute(text(statement))
+
+    # Keep the earliest link of any duplicated (deal, document) pair before
+    # enforcing uniqueness.
+    conn.execute(text(
+        "DELETE FROM deal_document_links WHERE id NOT IN ("
+        " SELECT MIN(id) FROM deal_document_links GROUP BY deal_id, document_id"
+        ")"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_deal_document_links_deal_document"
+        " ON deal_document_links (deal_id, document_id)"
+    ))
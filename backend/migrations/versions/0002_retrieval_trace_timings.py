@@ -0,0 +1,11 @@
+"""Store per-stage request timings on retrieval traces."""
+
+from backend.migrations import add_column_if_missing
+
+revision = "0002"
+down_revision = "0001"
+description = "retrieval_traces.timings_json"
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "retrieval_traces", "timings_json", "JSON")
@@ -0,0 +1,12 @@
+"""Compact, compressed workflow run outputs with a cold-store location."""
+
+from backend.migrations import add_column_if_missing
+
+revision = "0003"
+down_revision = "0002"
+description = "workflow_runs.output_blob, workflow_runs.output_location"
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "workflow_runs", "output_blob", "BLOB")
+    add_column_if_missing(conn, "workflow_runs", "output_location", "VARCHAR")
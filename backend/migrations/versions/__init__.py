@@ -0,0 +1 @@
+# Schema migration modules, applied in revision order by backend.migrations.
@@ -1,8 +1,8 @@
 from datetime import datetime
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, LargeBinary, String, Text
+from sqlalchemy.orm import deferred, relationship
 
 from backend.database import Base
 
@@ -13,6 +13,12 @@ def _uuid() -> str:
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Listing order and keyset pagination: (upload_timestamp, id) DESC
+        Index("ix_documents_upload_timestamp", "upload_timestamp", "id"),
+        Index("ix_documents_status", "status", "upload_timestamp"),
+        Index("ix_documents_category", "category"),
+    )
 
     id = Column(String, primary_key=True, default=_uuid)
     filename = Column(String, nullable=False)
@@ -50,6 +56,7 @@ class Chunk(Base):
 
 class Deal(Base):
     __tablename__ = "deals"
+    __table_args__ = (Index("ix_deals_updated_at", "updated_at"),)
 
     id = Column(String, primary_key=True, default=_uuid)
     name = Column(String, nullable=False)
@@ -80,6 +87,9 @@ class Deal(Base):
 
 class DealDocumentLink(Base):
     __tablename__ = "deal_document_links"
+    __table_args__ = (
+        Index("uq_deal_document_links_deal_document", "deal_id", "document_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     deal_id = Column(String, ForeignKey("deals.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -93,6 +103,7 @@ class DealDocumentLink(Base):
 
 class DocumentProvenance(Base):
     __tablename__ = "document_provenance"
+    __table_args__ = (Index("ix_document_provenance_sha256", "sha256"),)
 
     document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
     sha256 = Column(String, nullable=False)
@@ -127,6 +138,7 @@ class RetrievalTrace(Base):
     model_name = Column(String, nullable=False)
     selected_doc_ids = Column(JSON, default=list)
     retrieved_chunks = Column(JSON, default=list)
+    timings_json = Column(JSON, default=dict)  # per-stage durations in ms, see services.metrics
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     chat_log = relationship("ChatLog", back_populates="traces")
@@ -134,22 +146,56 @@ class RetrievalTrace(Base):
 
 class WorkflowRun(Base):
     __tablename__ = "workflow_runs"
+    __table_args__ = (
+        Index("ix_workflow_runs_created_at", "created_at"),
+        Index("ix_workflow_runs_deal_created_at", "deal_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, default=_uuid)
     deal_id = Column(String, ForeignKey("deals.id", ondelete="CASCADE"), nullable=True, index=True)
     workflow_type = Column(String, default="ic_copilot", nullable=False)
     status = Column(String, default="completed", nullable=False)
     input_json = Column(JSON, default=dict)
-    output_json = Column(JSON, default=dict)
+    # Runs recorded before compact storage; new runs leave it NULL.
+    output_json = deferred(Column(JSON(none_as_null=True), nullable=True))
+    # Compact, compressed output (services.run_store) while the run is hot ...
+    output_blob = deferred(Column(LargeBinary, nullable=True))
+    # ... and its path under AUDIT_COLD_ROOT once it has been tiered out.
+    output_location = Column(String, nullable=True)
     model_name = Column(String, nullable=True)
     prompt_version = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     deal = relationship("Deal", back_populates="workflow_runs")
+    artifacts = relationship("Artifact", back_populates="workflow_run", cascade="all, delete-orphan")
+
+
+class Artifact(Base):
+    """A rendered report of a workflow run; the bytes live in the content-addressed artifact store."""
+
+    __tablename__ = "artifacts"
+    __table_args__ = (Index("ix_artifacts_workflow_run", "workflow_run_id", "format"),)
+
+    id = Column(String, primary_key=True, default=_uuid)
+    workflow_run_id = Column(String, ForeignKey("workflow_runs.id", ondelete="CASCADE"), nullable=False)
+    deal_id = Column(String, nullable=True)
+    kind = Column(String, default="ic_report", nullable=False)
+    # format: md | html | pdf
+    format = Column(String, nullable=False)
+    # status: pending | ready | failed
+    status = Column(String, default="pending", nullable=False)
+    sha256 = Column(String, nullable=True, index=True)
+    size_bytes = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    rendered_at = Column(DateTime, nullable=True)
+
+    workflow_run = relationship("WorkflowRun", back_populates="artifacts")
 
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (Index("ix_audit_logs_entity", "entity_type", "entity_id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     entity_type = Column(String, nullable=False)
@@ -157,3 +203,23 @@ class AuditLog(Base):
     action = Column(String, nullable=False)
     payload_json = Column(JSON, default=dict)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ChangeLogEntry(Base):
+    """Monotonic change log for documents and deals, consumed by downstream syncs.
+
+    Each row says that a document (including its chunks and deal links) or a
+    deal was upserted or deleted; consumers keep a watermark on ``id``.
+    """
+
+    __tablename__ = "change_log"
+    # AUTOINCREMENT guarantees ids are never reused, so watermarks stay valid.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # entity_type: document | deal
+    entity_type = Column(String, nullable=False, default="document")
+    entity_id = Column(String, nullable=False, index=True)
+    # operation: upsert | delete
+    operation = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
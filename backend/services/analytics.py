@@ -6,19 +6,98 @@ This module provides analytical capabilities using DuckDB for:
 - Workflow analysis outputs
 """
 
+from __future__ import annotations
+
 import logging
+import threading
+import time
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Generator, List, Optional
+from typing import TYPE_CHECKING, Any, Generator, Iterable, List, Optional
 
-import duckdb
 from sqlalchemy.orm import Session
 
 from backend.config import get_settings
-from backend.models import Document, Chunk
+from backend.services.change_tracking import changes_since, latest_change_id, net_changes
+from backend.services.chunk_view import (
+    CHUNK_VIEW_COLUMNS,
+    DOCUMENT_VIEW_COLUMNS,
+    iter_chunk_view,
+    iter_document_view,
+)
+
+if TYPE_CHECKING:  # imported on first connection to keep app start-up fast
+    import duckdb
 
 logger = logging.getLogger(__name__)
 
+# Group keys used by the materialized aggregates. NULLs cannot be primary keys,
+# so missing values are folded into an explicit bucket.
+DEFAULT_CATEGORY = "other"
+UNSPECIFIED_OUTCOME = "unspecified"
+
+# Tables that may be exported by name
+EXPORTABLE_TABLES = (
+    "document_chunks",
+    "extracted_tables",
+    "document_stats",
+    "deal_analytics",
+    "category_analytics",
+    "outcome_analytics",
+)
+
+# sync_state row tracking the change_log watermark of the SQLite sync
+SQLITE_SYNC_STATE = "sqlite"
+
+# Full-recompute queries over document_stats. They seed the materialized
+# aggregate tables on full sync and are the reference for the consistency check.
+_CATEGORY_RECOMPUTE_SQL = f"""
+    SELECT
+        COALESCE(category, '{DEFAULT_CATEGORY}') AS category,
+        COUNT(*) AS document_count,
+        COALESCE(SUM(total_chunks), 0) AS chunk_count,
+        COALESCE(SUM(total_pages), 0) AS total_pages
+    FROM document_stats
+    GROUP BY 1
+"""
+
+_OUTCOME_RECOMPUTE_SQL = f"""
+    SELECT
+        COALESCE(deal_outcome, '{UNSPECIFIED_OUTCOME}') AS deal_outcome,
+        COUNT(*) AS document_count,
+        COALESCE(SUM(total_chunks), 0) AS chunk_count,
+        COALESCE(SUM(total_pages), 0) AS total_pages
+    FROM document_stats
+    GROUP BY 1
+"""
+
+_DEAL_RECOMPUTE_SQL = f"""
+    SELECT
+        deal_id,
+        COUNT(*) AS document_count,
+        COALESCE(SUM(total_chunks), 0) AS total_chunks,
+        LIST(DISTINCT COALESCE(category, '{DEFAULT_CATEGORY}') ORDER BY COALESCE(category, '{DEFAULT_CATEGORY}')) AS categories,
+        MAX(upload_timestamp) AS last_document_upload
+    FROM document_stats
+    WHERE deal_id IS NOT NULL
+    GROUP BY deal_id
+"""
+
+
+@dataclass
+class SyncResult:
+    """Rows touched by one SQLite -> DuckDB sync."""
+
+    sync_type: str
+    documents_upserted: int = 0
+    documents_deleted: int = 0
+    chunks_written: int = 0
+    chunks_deleted: int = 0
+    changes_applied: int = 0
+    watermark: int = 0
+    duration_ms: float = 0.0
+
 
 class DuckDBAnalytics:
     """DuckDB analytics warehouse for document analysis."""
@@ -26,10 +105,15 @@ class DuckDBAnalytics:
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or get_settings().duckdb_path
         self._connection: Optional[duckdb.DuckDBPyConnection] = None
+        # A single DuckDB connection is shared by request handlers and
+        # background ingestion threads; serialize access to it.
+        self._lock = threading.RLock()
 
     def _get_connection(self) -> duckdb.DuckDBPyConnection:
         """Get or create DuckDB connection."""
         if self._connection is None:
+            import duckdb
+
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
             self._connection = duckdb.connect(self.db_path)
             self._init_tables()
@@ -81,6 +165,7 @@ class DuckDBAnalytics:
                 last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        conn.execute("ALTER TABLE document_stats ADD COLUMN IF NOT EXISTS deal_outcome VARCHAR")
 
         # Deal analytics aggregation
         conn.execute("""
@@ -94,103 +179,429 @@ class DuckDBAnalytics:
             )
         """)
 
+        # Category and outcome aggregates, maintained incrementally on write
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS category_analytics (
+                category VARCHAR PRIMARY KEY,
+                document_count INTEGER DEFAULT 0,
+                chunk_count INTEGER DEFAULT 0,
+                total_pages INTEGER DEFAULT 0,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS outcome_analytics (
+                deal_outcome VARCHAR PRIMARY KEY,
+                document_count INTEGER DEFAULT 0,
+                chunk_count INTEGER DEFAULT 0,
+                total_pages INTEGER DEFAULT 0,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Watermarks for change-log driven syncs
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                name VARCHAR PRIMARY KEY,
+                watermark BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         # Create indexes for common queries
         conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc_id ON document_chunks(document_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_category ON document_chunks(category)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_deal ON document_chunks(deal_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_tables_doc_id ON extracted_tables(document_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_stats_deal ON document_stats(deal_id)")
 
         logger.info("DuckDB analytics tables initialized")
 
     @contextmanager
     def session(self) -> Generator[duckdb.DuckDBPyConnection, None, None]:
         """Context manager for DuckDB sessions."""
-        conn = self._get_connection()
-        try:
-            yield conn
-        except Exception:
-            conn.rollback()
-            raise
-
-    def sync_from_sqlite(self, db: Session, document_id: Optional[str] = None) -> None:
-        """Sync document data from SQLite to DuckDB.
+        with self._lock:
+            conn = self._get_connection()
+            try:
+                yield conn
+            except Exception:
+                conn.rollback()
+                raise
 
-        Args:
-            db: SQLAlchemy session
-            document_id: If provided, only sync this specific document (incremental sync)
+    @contextmanager
+    def transaction(self) -> Generator[duckdb.DuckDBPyConnection, None, None]:
+        """Run a block in one explicit DuckDB transaction.
+
+        Used for writes that must keep the materialized aggregates in step
+        with document_stats: either everything commits or nothing does.
         """
-        # Query only the document(s) we need
-        if document_id:
-            documents = db.query(Document).filter(Document.id == document_id).all()
-            chunks = db.query(Chunk).filter(Chunk.document_id == document_id).all()
-            logger.info(f"Incremental sync for document {document_id}: {len(documents)} docs, {len(chunks)} chunks")
-        else:
-            documents = db.query(Document).all()
-            chunks = db.query(Chunk).all()
-            logger.info(f"Full sync: {len(documents)} docs, {len(chunks)} chunks")
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                yield conn
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    # ------------------------------------------------------------------
+    # Materialized aggregates
+    # ------------------------------------------------------------------
+
+    def _apply_stats_delta(self, conn: duckdb.DuckDBPyConnection, document_ids: List[str], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) documents' contribution to the
+        category and outcome aggregates, reading their current document_stats rows."""
+        conn.execute(f"""
+            INSERT INTO category_analytics (category, document_count, chunk_count, total_pages, last_updated)
+            SELECT
+                COALESCE(category, '{DEFAULT_CATEGORY}'),
+                ? * COUNT(*),
+                ? * COALESCE(SUM(total_chunks), 0),
+                ? * COALESCE(SUM(total_pages), 0),
+                CURRENT_TIMESTAMP
+            FROM document_stats
+            WHERE list_contains(?, document_id)
+            GROUP BY 1
+            ON CONFLICT (category) DO UPDATE SET
+                document_count = category_analytics.document_count + EXCLUDED.document_count,
+                chunk_count = category_analytics.chunk_count + EXCLUDED.chunk_count,
+                total_pages = category_analytics.total_pages + EXCLUDED.total_pages,
+                last_updated = EXCLUDED.last_updated
+        """, [sign, sign, sign, document_ids])
+        conn.execute(f"""
+            INSERT INTO outcome_analytics (deal_outcome, document_count, chunk_count, total_pages, last_updated)
+            SELECT
+                COALESCE(deal_outcome, '{UNSPECIFIED_OUTCOME}'),
+                ? * COUNT(*),
+                ? * COALESCE(SUM(total_chunks), 0),
+                ? * COALESCE(SUM(total_pages), 0),
+                CURRENT_TIMESTAMP
+            FROM document_stats
+            WHERE list_contains(?, document_id)
+            GROUP BY 1
+            ON CONFLICT (deal_outcome) DO UPDATE SET
+                document_count = outcome_analytics.document_count + EXCLUDED.document_count,
+                chunk_count = outcome_analytics.chunk_count + EXCLUDED.chunk_count,
+                total_pages = outcome_analytics.total_pages + EXCLUDED.total_pages,
+                last_updated = EXCLUDED.last_updated
+        """, [sign, sign, sign, document_ids])
+        if sign < 0:
+            conn.execute("DELETE FROM category_analytics WHERE document_count <= 0")
+            conn.execute("DELETE FROM outcome_analytics WHERE document_count <= 0")
+
+    def _deal_ids_for(self, conn: duckdb.DuckDBPyConnection, document_ids: List[str]) -> set[str]:
+        rows = conn.execute(
+            "SELECT DISTINCT deal_id FROM document_stats WHERE list_contains(?, document_id) AND deal_id IS NOT NULL",
+            [document_ids],
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _retract_documents(self, conn: duckdb.DuckDBPyConnection, document_ids: List[str]) -> set[str]:
+        """Remove documents from document_stats and the aggregates.
+
+        Returns the deal ids whose deal_analytics rows need refreshing.
+        """
+        deal_ids = self._deal_ids_for(conn, document_ids)
+        self._apply_stats_delta(conn, document_ids, -1)
+        conn.execute("DELETE FROM document_stats WHERE list_contains(?, document_id)", [document_ids])
+        return deal_ids
+
+    def _accumulate_documents(self, conn: duckdb.DuckDBPyConnection, document_ids: List[str]) -> set[str]:
+        """Fold freshly written document_stats rows into the aggregates."""
+        self._apply_stats_delta(conn, document_ids, 1)
+        return self._deal_ids_for(conn, document_ids)
+
+    def _refresh_deal_rows(self, conn: duckdb.DuckDBPyConnection, deal_ids: Iterable[str]) -> None:
+        """Recompute deal_analytics for the given deals only.
+
+        Deals hold a handful of documents, so re-aggregating the affected rows
+        is cheap and keeps the category list and last upload (neither of which
+        can be decremented) exact.
+        """
+        deal_list = sorted(deal_ids)
+        if not deal_list:
+            return
+        conn.execute("DELETE FROM deal_analytics WHERE list_contains(?, deal_id)", [deal_list])
+        conn.execute(f"""
+            INSERT INTO deal_analytics (
+                deal_id, document_count, total_chunks, categories, last_document_upload, last_updated
+            )
+            SELECT *, CURRENT_TIMESTAMP FROM ({_DEAL_RECOMPUTE_SQL})
+            WHERE list_contains(?, deal_id)
+        """, [deal_list])
+
+    def _rebuild_aggregates(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """Recompute every aggregate table from document_stats."""
+        conn.execute("DELETE FROM category_analytics")
+        conn.execute("DELETE FROM outcome_analytics")
+        conn.execute("DELETE FROM deal_analytics")
+        conn.execute(f"""
+            INSERT INTO category_analytics (category, document_count, chunk_count, total_pages)
+            {_CATEGORY_RECOMPUTE_SQL}
+        """)
+        conn.execute(f"""
+            INSERT INTO outcome_analytics (deal_outcome, document_count, chunk_count, total_pages)
+            {_OUTCOME_RECOMPUTE_SQL}
+        """)
+        conn.execute(f"""
+            INSERT INTO deal_analytics (deal_id, document_count, total_chunks, categories, last_document_upload)
+            {_DEAL_RECOMPUTE_SQL}
+        """)
+
+    def rebuild_aggregates(self) -> None:
+        """Rebuild the materialized aggregates from scratch."""
+        with self.transaction() as conn:
+            self._rebuild_aggregates(conn)
+        logger.info("Rebuilt DuckDB aggregate tables")
 
+    def check_consistency(self) -> dict[str, Any]:
+        """Compare the materialized aggregates against a full recompute.
+
+        Returns a report with the mismatching rows per table; an empty
+        ``mismatches`` dict means every aggregate matches.
+        """
+        checks = {
+            "category_analytics": (
+                "category",
+                ["document_count", "chunk_count", "total_pages"],
+                _CATEGORY_RECOMPUTE_SQL,
+            ),
+            "outcome_analytics": (
+                "deal_outcome",
+                ["document_count", "chunk_count", "total_pages"],
+                _OUTCOME_RECOMPUTE_SQL,
+            ),
+            "deal_analytics": (
+                "deal_id",
+                ["document_count", "total_chunks", "categories", "last_document_upload"],
+                _DEAL_RECOMPUTE_SQL,
+            ),
+            "document_stats": (
+                "document_id",
+                ["total_chunks"],
+                """
+                    SELECT s.document_id, COUNT(c.chunk_id) AS total_chunks
+                    FROM document_stats s
+                    LEFT JOIN document_chunks c ON c.document_id = s.document_id
+                    GROUP BY s.document_id
+                """,
+            ),
+        }
+        mismatches: dict[str, list[dict]] = {}
         with self.session() as conn:
-            if document_id:
-                # For incremental sync, only delete this document's existing data
-                conn.execute("DELETE FROM document_chunks WHERE document_id = ?", [document_id])
-                conn.execute("DELETE FROM document_stats WHERE document_id = ?", [document_id])
-            else:
-                # For full sync, clear all existing data
-                conn.execute("DELETE FROM document_chunks")
-                conn.execute("DELETE FROM document_stats")
+            for table, (key, columns, expected_sql) in checks.items():
+                select_cols = ", ".join(
+                    f"m.{col} AS materialized_{col}, e.{col} AS expected_{col}" for col in columns
+                )
+                differs = " OR ".join(f"m.{col} IS DISTINCT FROM e.{col}" for col in columns)
+                rows = conn.execute(f"""
+                    SELECT COALESCE(m.{key}, e.{key}) AS key, {select_cols}
+                    FROM (SELECT {key}, {", ".join(columns)} FROM {table}) m
+                    FULL OUTER JOIN ({expected_sql}) e ON m.{key} = e.{key}
+                    WHERE m.{key} IS NULL OR e.{key} IS NULL OR {differs}
+                    ORDER BY 1
+                """).fetchall()
+                if rows:
+                    names = [desc[0] for desc in conn.description]
+                    mismatches[table] = [dict(zip(names, row)) for row in rows]
+
+        if mismatches:
+            logger.warning("DuckDB aggregate consistency check failed: %s", sorted(mismatches))
+        return {"consistent": not mismatches, "mismatches": mismatches}
+
+    # ------------------------------------------------------------------
+    # SQLite -> DuckDB sync
+    # ------------------------------------------------------------------
+
+    def _get_watermark(self, conn: duckdb.DuckDBPyConnection, name: str = SQLITE_SYNC_STATE) -> int:
+        row = conn.execute("SELECT watermark FROM sync_state WHERE name = ?", [name]).fetchone()
+        return int(row[0]) if row else 0
+
+    def _set_watermark(self, conn: duckdb.DuckDBPyConnection, watermark: int, name: str = SQLITE_SYNC_STATE) -> None:
+        conn.execute("""
+            INSERT INTO sync_state (name, watermark, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (name) DO UPDATE SET
+                watermark = EXCLUDED.watermark,
+                updated_at = EXCLUDED.updated_at
+        """, [name, watermark])
+
+    def get_sync_watermark(self) -> int:
+        """Return the last change_log id applied to the warehouse."""
+        with self.session() as conn:
+            return self._get_watermark(conn)
+
+    def _write_documents(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        db: Session,
+        document_ids: Optional[List[str]],
+        result: SyncResult,
+    ) -> List[str]:
+        """Stream the denormalized chunk and document views into DuckDB.
+
+        Existing rows for these documents must already be retracted. Returns
+        the ids of the documents that exist in SQLite.
+        """
+        import pandas as pd
+
+        batch_size = get_settings().analytics_sync_batch_size
 
-            # Insert chunks
-            for chunk in chunks:
+        # Chunks: one join query, inserted a batch at a time
+        for rows in iter_chunk_view(db, document_ids, batch_size=batch_size):
+            frame = pd.DataFrame.from_records(rows, columns=CHUNK_VIEW_COLUMNS)
+            conn.register("chunk_batch", frame)
+            try:
                 conn.execute("""
-                    INSERT INTO document_chunks (
+                    INSERT OR REPLACE INTO document_chunks (
                         chunk_id, document_id, filename, content,
                         page_number, chunk_index, category, deal_outcome, deal_id
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT (chunk_id) DO UPDATE SET
-                        content = EXCLUDED.content,
-                        page_number = EXCLUDED.page_number,
-                        category = EXCLUDED.category,
-                        deal_outcome = EXCLUDED.deal_outcome,
-                        deal_id = EXCLUDED.deal_id
-                """, [
-                    f"{chunk.document_id}_{chunk.chunk_index}",
-                    chunk.document_id,
-                    chunk.filename,
-                    chunk.content,
-                    chunk.page_number,
-                    chunk.chunk_index,
-                    chunk.category,
-                    chunk.deal_outcome,
-                    chunk.deal_id,
-                ])
-
-            # Insert document stats
-            for doc in documents:
-                doc_chunks = [c for c in chunks if c.document_id == doc.id]
-                total_pages = max([c.page_number for c in doc_chunks], default=0)
-
+                    )
+                    SELECT
+                        document_id || '_' || CAST(chunk_index AS VARCHAR),
+                        document_id, filename, content,
+                        page_number, chunk_index, category, deal_outcome, deal_id
+                    FROM chunk_batch
+                """)
+            finally:
+                conn.unregister("chunk_batch")
+            result.chunks_written += len(rows)
+
+        # Document stats, counted from the chunks just written
+        present: List[str] = []
+        for rows in iter_document_view(db, document_ids, batch_size=batch_size):
+            frame = pd.DataFrame.from_records(rows, columns=DOCUMENT_VIEW_COLUMNS)
+            conn.register("document_batch", frame)
+            try:
                 conn.execute("""
-                    INSERT INTO document_stats (
+                    INSERT OR REPLACE INTO document_stats (
                         document_id, filename, total_chunks, total_pages,
-                        category, deal_id, upload_timestamp
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT (document_id) DO UPDATE SET
-                        total_chunks = EXCLUDED.total_chunks,
-                        total_pages = EXCLUDED.total_pages,
-                        last_updated = CURRENT_TIMESTAMP
-                """, [
-                    doc.id,
-                    doc.filename,
-                    len(doc_chunks),
-                    total_pages,
-                    doc.category,
-                    doc.deal_id,
-                    doc.upload_timestamp,
-                ])
+                        category, deal_id, deal_outcome, upload_timestamp, last_updated
+                    )
+                    SELECT
+                        d.document_id,
+                        d.filename,
+                        COUNT(c.chunk_id),
+                        COALESCE(MAX(c.page_number), 0),
+                        d.category,
+                        d.deal_id,
+                        d.deal_outcome,
+                        d.upload_timestamp,
+                        CURRENT_TIMESTAMP
+                    FROM document_batch d
+                    LEFT JOIN document_chunks c ON c.document_id = d.document_id
+                    GROUP BY ALL
+                """)
+            finally:
+                conn.unregister("document_batch")
+            present.extend(row[0] for row in rows)
+        result.documents_upserted += len(present)
+        return present
+
+    def _sync_documents(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        db: Session,
+        document_ids: List[str],
+        result: SyncResult,
+    ) -> None:
+        """Replace the warehouse rows of the given documents with their SQLite state.
+
+        Documents that no longer exist in SQLite are removed, together with
+        their extracted tables.
+        """
+        affected_deals = self._retract_documents(conn, document_ids)
+        result.chunks_deleted += conn.execute(
+            "DELETE FROM document_chunks WHERE list_contains(?, document_id)", [document_ids]
+        ).fetchone()[0]
 
-            conn.commit()
+        present = self._write_documents(conn, db, document_ids, result)
+        missing = sorted(set(document_ids) - set(present))
+        if missing:
+            conn.execute("DELETE FROM extracted_tables WHERE list_contains(?, document_id)", [missing])
+            result.documents_deleted += len(missing)
+
+        affected_deals |= self._accumulate_documents(conn, present)
+        self._refresh_deal_rows(conn, affected_deals)
+
+    def sync_from_sqlite(self, db: Session, document_id: Optional[str] = None) -> SyncResult:
+        """Sync document data from SQLite to DuckDB.
 
-        logger.info(f"Synced {len(documents)} documents and {len(chunks)} chunks to DuckDB")
+        Args:
+            db: SQLAlchemy session
+            document_id: If provided, only sync this specific document
+
+        A full sync rewrites the warehouse and moves the change-log watermark
+        to the latest change seen before reading, so a following incremental
+        sync replays anything written concurrently.
+        """
+        started = time.perf_counter()
+        if document_id:
+            result = SyncResult(sync_type="document")
+            with self.transaction() as conn:
+                self._sync_documents(conn, db, [document_id], result)
+                result.watermark = self._get_watermark(conn)
+        else:
+            result = SyncResult(sync_type="full")
+            watermark = latest_change_id(db)
+            with self.transaction() as conn:
+                # For full sync, clear all existing data
+                result.chunks_deleted = conn.execute("DELETE FROM document_chunks").fetchone()[0]
+                conn.execute("DELETE FROM document_stats")
+                present = self._write_documents(conn, db, None, result)
+                conn.execute(
+                    "DELETE FROM extracted_tables WHERE NOT list_contains(?, document_id)", [present]
+                )
+                self._rebuild_aggregates(conn)
+                self._set_watermark(conn, watermark)
+                result.watermark = watermark
+
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "DuckDB %s sync: upserted=%d deleted=%d chunks_written=%d chunks_deleted=%d in %.1fms",
+            result.sync_type,
+            result.documents_upserted,
+            result.documents_deleted,
+            result.chunks_written,
+            result.chunks_deleted,
+            result.duration_ms,
+        )
+        return result
+
+    def sync_incremental(self, db: Session, batch_size: int = 500) -> SyncResult:
+        """Apply change_log entries past the stored watermark.
+
+        Changes are applied in batches; each batch commits together with its
+        watermark, so an interrupted sync resumes where it stopped.
+        """
+        started = time.perf_counter()
+        result = SyncResult(sync_type="incremental")
+        with self.session() as conn:
+            watermark = self._get_watermark(conn)
+
+        while True:
+            entries = changes_since(db, watermark, limit=batch_size)
+            if not entries:
+                break
+            operations = net_changes(entries)
+            with self.transaction() as conn:
+                if operations:
+                    self._sync_documents(conn, db, sorted(operations), result)
+                watermark = entries[-1].id
+                self._set_watermark(conn, watermark)
+            result.changes_applied += len(entries)
+
+        result.watermark = watermark
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "DuckDB incremental sync: changes=%d upserted=%d deleted=%d watermark=%d in %.1fms",
+            result.changes_applied,
+            result.documents_upserted,
+            result.documents_deleted,
+            result.watermark,
+            result.duration_ms,
+        )
+        return result
 
     def add_chunk(self, chunk_data: dict[str, Any]) -> None:
         """Add a single chunk to analytics."""
@@ -239,11 +650,11 @@ class DuckDBAnalytics:
 
     def delete_document(self, document_id: str) -> None:
         """Delete all data for a specific document."""
-        with self.session() as conn:
+        with self.transaction() as conn:
+            affected_deals = self._retract_documents(conn, [document_id])
             conn.execute("DELETE FROM document_chunks WHERE document_id = ?", [document_id])
-            conn.execute("DELETE FROM document_stats WHERE document_id = ?", [document_id])
             conn.execute("DELETE FROM extracted_tables WHERE document_id = ?", [document_id])
-            conn.commit()
+            self._refresh_deal_rows(conn, affected_deals)
         logger.info("Deleted document %s from DuckDB analytics", document_id)
 
     def query_chunks_by_deal(self, deal_id: str, category: Optional[str] = None) -> List[dict]:
@@ -266,36 +677,60 @@ class DuckDBAnalytics:
             return [dict(zip(columns, row)) for row in result]
 
     def query_category_stats(self) -> List[dict]:
-        """Get document statistics by category."""
+        """Get document statistics by category from the materialized aggregate."""
         with self.session() as conn:
             result = conn.execute("""
                 SELECT
                     category,
-                    COUNT(DISTINCT document_id) as document_count,
-                    COUNT(*) as chunk_count,
-                    AVG(total_pages) as avg_pages
-                FROM document_stats
-                GROUP BY category
-                ORDER BY document_count DESC
+                    document_count,
+                    chunk_count,
+                    total_pages / document_count AS avg_pages
+                FROM category_analytics
+                ORDER BY document_count DESC, category
+            """).fetchall()
+
+            columns = [desc[0] for desc in conn.description]
+            return [dict(zip(columns, row)) for row in result]
+
+    def query_outcome_stats(self) -> List[dict]:
+        """Get document statistics by deal outcome from the materialized aggregate."""
+        with self.session() as conn:
+            result = conn.execute("""
+                SELECT
+                    deal_outcome,
+                    document_count,
+                    chunk_count,
+                    total_pages / document_count AS avg_pages
+                FROM outcome_analytics
+                ORDER BY document_count DESC, deal_outcome
             """).fetchall()
 
             columns = [desc[0] for desc in conn.description]
             return [dict(zip(columns, row)) for row in result]
 
+    def query_deal_stats(self, deal_id: str) -> Optional[dict]:
+        """Get the precomputed analytics row for a single deal."""
+        with self.session() as conn:
+            result = conn.execute("""
+                SELECT deal_id, document_count, total_chunks, categories, last_document_upload
+                FROM deal_analytics
+                WHERE deal_id = ?
+            """, [deal_id]).fetchone()
+
+            if result is None:
+                return None
+            columns = [desc[0] for desc in conn.description]
+            return dict(zip(columns, result))
+
     def query_deal_comparison(self, deal_ids: List[str]) -> List[dict]:
         """Compare multiple deals by document metrics."""
         with self.session() as conn:
-            placeholders = ", ".join(["?"] * len(deal_ids))
-            result = conn.execute(f"""
-                SELECT
-                    deal_id,
-                    COUNT(DISTINCT document_id) as document_count,
-                    COUNT(*) as total_chunks,
-                    ARRAY_AGG(DISTINCT category) as categories
-                FROM document_chunks
-                WHERE deal_id IN ({placeholders})
-                GROUP BY deal_id
-            """, deal_ids).fetchall()
+            result = conn.execute("""
+                SELECT deal_id, document_count, total_chunks, categories
+                FROM deal_analytics
+                WHERE list_contains(?, deal_id)
+                ORDER BY deal_id
+            """, [deal_ids]).fetchall()
 
             columns = [desc[0] for desc in conn.description]
             return [dict(zip(columns, row)) for row in result]
@@ -328,12 +763,16 @@ class DuckDBAnalytics:
             return {"table_count": 0, "table_types": []}
 
     def export_to_parquet(self, table_name: str, output_path: str) -> None:
-        """Export a table to Parquet format for external analysis."""
+        """Export a single table to one Parquet file for external analysis.
+
+        For partitioned, incremental snapshots use
+        ``backend.services.export.ParquetSnapshotExporter``.
+        """
+        if table_name not in EXPORTABLE_TABLES:
+            raise ValueError(f"Unknown analytics table: {table_name}")
         with self.session() as conn:
-            conn.execute(f"""
-                COPY (SELECT * FROM {table_name})
-                TO '{output_path}' (FORMAT PARQUET)
-            """)
+            # Table name is allow-listed; the path is passed as a value, not SQL.
+            conn.table(table_name).write_parquet(output_path, compression=get_settings().export_compression)
         logger.info(f"Exported {table_name} to {output_path}")
 
     def close(self) -> None:
@@ -0,0 +1,304 @@
+"""Rendered workflow reports and the content-addressed store they live in.
+
+``/workflow/run`` only records one pending ``Artifact`` row per format in
+``REPORT_FORMATS``. The rendering itself (markdown, HTML, and PDF when
+weasyprint is installed) runs on the ``render`` executor after the response
+has gone out. Each artifact ends up ``ready`` or ``failed``. A render cut
+short by a crash or a shutdown leaves rows ``pending``; at start-up,
+``recover_stale`` renders those older than ``RENDER_STALE_AFTER_SECONDS``
+again from the stored run output.
+
+Bytes are stored once per content hash under
+``ARTIFACTS_ROOT/objects/<sha[:2]>/<sha>.<format>``. Reports carry no run id,
+so re-running the same analysis yields the same bytes and nothing is
+rewritten. Files are written to a temporary name and renamed into place, so
+a reader never sees a partial file. Object directories are created once per
+process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import logging
+import threading
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Artifact, WorkflowRun
+from backend.services.concurrency import get_executor
+from backend.services.workspace import atomic_write
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PENDING, READY, FAILED = "pending", "ready", "failed"
+MEDIA_TYPES = {
+    "md": "text/markdown; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf",
+}
+FORMATS = tuple(MEDIA_TYPES)
+REPORT_TITLE = "IC Workflow Output"
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Report:
+    title: str
+    meta: list[tuple[str, str]]
+    # (heading, paragraph) or (heading, bullet items)
+    sections: list[tuple[str, str | list[str]]] = field(default_factory=list)
+
+
+def build_report(deal_id: Optional[str], payload: dict[str, Any], title: str = REPORT_TITLE) -> Report:
+    return Report(
+        title=title,
+        meta=[("deal_id", deal_id or "unassigned"), ("query", payload.get("query") or "")],
+        sections=[
+            ("Draft Answer", payload.get("draft_answer", "No answer")),
+            ("Risk Gaps", payload.get("risk_gaps", [])),
+            ("Diligence Questions", payload.get("diligence_questions", [])),
+            ("Committee Challenges", payload.get("committee_challenges", [])),
+        ],
+    )
+
+
+def render_markdown(report: Report) -> bytes:
+    lines = [f"# {report.title}", ""]
+    lines.extend(f"- {key}: `{value}`" for key, value in report.meta)
+    for heading, body in report.sections:
+        lines.extend(["", f"## {heading}"])
+        if isinstance(body, str):
+            lines.append(body)
+        else:
+            lines.extend([f"- {item}" for item in body] or ["- None"])
+    return "\n".join(lines).encode("utf-8")
+
+
+def render_html(report: Report) -> bytes:
+    esc = html.escape
+    parts = [
+        "<!DOCTYPE html>",
+        f'<html><head><meta charset="utf-8"><title>{esc(report.title)}</title></head><body>',
+        f"<h1>{esc(report.title)}</h1>",
+        "<ul>" + "".join(f"<li>{esc(key)}: <code>{esc(value)}</code></li>" for key, value in report.meta) + "</ul>",
+    ]
+    for heading, body in report.sections:
+        parts.append(f"<h2>{esc(heading)}</h2>")
+        if isinstance(body, str):
+            parts.extend(f"<p>{esc(paragraph)}</p>" for paragraph in body.split("\n\n") if paragraph.strip())
+        else:
+            parts.append("<ul>" + "".join(f"<li>{esc(item)}</li>" for item in body or ["None"]) + "</ul>")
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def render_pdf(report: Report) -> bytes:
+    try:
+        from weasyprint import HTML
+    except ImportError as exc:
+        raise RuntimeError("PDF reports need the optional weasyprint package") from exc
+    return HTML(string=render_html(report).decode("utf-8")).write_pdf()
+
+
+RENDERERS: dict[str, Callable[[Report], bytes]] = {"md": render_markdown, "html": render_html, "pdf": render_pdf}
+
+
+# ---------------------------------------------------------------------------
+# Content-addressed store
+# ---------------------------------------------------------------------------
+
+class ContentStore:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._dirs: set[Path] = set()
+        self._lock = threading.Lock()
+
+    def path_for(self, sha256: str, fmt: str) -> Path:
+        return self.root / "objects" / sha256[:2] / f"{sha256}.{fmt}"
+
+    def _ensure_dir(self, path: Path) -> None:
+        with self._lock:
+            if path in self._dirs:
+                return
+            path.mkdir(parents=True, exist_ok=True)
+            self._dirs.add(path)
+
+    def put(self, data: bytes, fmt: str) -> tuple[str, bool]:
+        """Store ``data``; returns its sha256 and whether it had to be written."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        target = self.path_for(sha256, fmt)
+        if target.exists():
+            return sha256, False
+        self._ensure_dir(target.parent)
+        atomic_write(target, data)
+        return sha256, True
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class ArtifactService:
+    def __init__(self, session_factory: Callable[[], Session], store: Optional[ContentStore] = None):
+        self.session_factory = session_factory
+        self.store = store or ContentStore(settings.artifacts_root)
+        self._futures: set[Future] = set()
+        self._futures_lock = threading.Lock()
+
+    def request(self, db: Session, workflow_run_id: str, deal_id: Optional[str], formats: Iterable[str]) -> list[Artifact]:
+        """Add (and flush) one pending artifact per format; the caller commits."""
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report formats {sorted(unknown)}")
+        artifacts = [
+            Artifact(workflow_run_id=workflow_run_id, deal_id=deal_id, format=fmt, status=PENDING)
+            for fmt in dict.fromkeys(formats)
+        ]
+        db.add_all(artifacts)
+        db.flush()
+        return artifacts
+
+    def schedule(self, artifact_ids: list[str], deal_id: Optional[str], payload: dict[str, Any]) -> Future:
+        """Render in the background; returns at once."""
+        return self._track(get_executor("render").submit(self.render, artifact_ids, deal_id, payload))
+
+    def _track(self, future: Future) -> Future:
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future: Future) -> None:
+        with self._futures_lock:
+            self._futures.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("Report rendering failed: %s", future.exception())
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for scheduled renders (tests, shutdown)."""
+        with self._futures_lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+    def render(self, artifact_ids: list[str], deal_id: Optional[str], payload: dict[str, Any]) -> None:
+        """Render each artifact; whatever fails outside one format's renderer fails every one still pending."""
+        try:
+            self._render(artifact_ids, deal_id, payload)
+        except Exception as exc:
+            logger.exception("Rendering reports %s failed", artifact_ids)
+            self._fail_pending(artifact_ids, f"{type(exc).__name__}: {exc}")
+
+    def _render(self, artifact_ids: list[str], deal_id: Optional[str], payload: dict[str, Any]) -> None:
+        report = build_report(deal_id, payload)
+        db = self.session_factory()
+        try:
+            for artifact in db.query(Artifact).filter(Artifact.id.in_(artifact_ids)):
+                try:
+                    data = RENDERERS[artifact.format](report)
+                    artifact.sha256, written = self.store.put(data, artifact.format)
+                    artifact.size_bytes, artifact.status, artifact.error = len(data), READY, None
+                    if not written:
+                        logger.debug("Report %s unchanged (sha256=%s)", artifact.id, artifact.sha256)
+                except Exception as exc:
+                    artifact.status, artifact.error = FAILED, str(exc)
+                artifact.rendered_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def _fail_pending(self, artifact_ids: list[str], error: str) -> None:
+        db = self.session_factory()
+        try:
+            db.query(Artifact).filter(Artifact.id.in_(artifact_ids), Artifact.status == PENDING).update(
+                {Artifact.status: FAILED, Artifact.error: error, Artifact.rendered_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            db.commit()
+        except Exception:
+            logger.exception("Could not mark reports %s failed", artifact_ids)
+        finally:
+            db.close()
+
+    def recover_stale(self, now: Optional[datetime] = None) -> int:
+        """Schedule the renders of artifacts left pending by an earlier process; returns how many."""
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=settings.render_stale_after_seconds)
+        db = self.session_factory()
+        try:
+            stale = (
+                db.query(Artifact.id, Artifact.workflow_run_id)
+                .filter(Artifact.status == PENDING, Artifact.created_at < cutoff)
+                .all()
+            )
+        finally:
+            db.close()
+        by_run: dict[str, list[str]] = {}
+        for artifact_id, run_id in stale:
+            by_run.setdefault(run_id, []).append(artifact_id)
+        for run_id, artifact_ids in by_run.items():
+            self._track(get_executor("render").submit(self._rerender, run_id, artifact_ids))
+        if stale:
+            logger.info("Re-rendering %d stale pending reports of %d runs", len(stale), len(by_run))
+        return len(stale)
+
+    def _rerender(self, run_id: str, artifact_ids: list[str]) -> None:
+        from backend.services.run_store import load_output
+
+        db = self.session_factory()
+        try:
+            run = db.get(WorkflowRun, run_id)
+            payload = load_output(db, run) if run is not None else None
+            deal_id = run.deal_id if run is not None else None
+        except Exception as exc:
+            logger.warning("Could not load workflow run %s to re-render: %s", run_id, exc)
+            payload = None
+        finally:
+            db.close()
+        if payload is None:
+            self._fail_pending(artifact_ids, "Rendering was interrupted and the run output is unavailable")
+            return
+        self.render(artifact_ids, deal_id, payload)
+
+    def path(self, artifact: Artifact) -> Path:
+        return self.store.path_for(artifact.sha256, artifact.format)
+
+
+def describe(artifact: Artifact) -> dict[str, Any]:
+    return {
+        "id": artifact.id,
+        "workflow_run_id": artifact.workflow_run_id,
+        "kind": artifact.kind,
+        "format": artifact.format,
+        "status": artifact.status,
+        "sha256": artifact.sha256,
+        "size_bytes": artifact.size_bytes,
+        "error": artifact.error,
+        "created_at": artifact.created_at,
+        "rendered_at": artifact.rendered_at,
+        "url": f"/artifacts/{artifact.id}",
+    }
+
+
+_artifact_service: Optional[ArtifactService] = None
+_artifact_service_lock = threading.Lock()
+
+
+def get_artifact_service() -> ArtifactService:
+    """Return the process-wide artifact service."""
+    global _artifact_service
+    with _artifact_service_lock:
+        if _artifact_service is None:
+            from backend.database import SessionLocal
+
+            _artifact_service = ArtifactService(SessionLocal)
+        return _artifact_service
@@ -0,0 +1,107 @@
+"""Change-data capture between the SQLite source of truth and its consumers.
+
+Every ORM flush that touches a ``Document``, one of its ``Chunk`` rows or a
+``DealDocumentLink`` appends one ``change_log`` row per affected document, in
+the same transaction as the write. Each inserted, updated or deleted
+``Deal`` also appends a row, with ``entity_type='deal'``. Downstream stores
+(the DuckDB warehouse) replay the log from their last watermark instead of
+re-reading everything. The metadata cache uses the latest id to notice
+writes from other processes.
+
+Writes that bypass the ORM unit of work (``session.execute(insert(...))``)
+are not seen by the listener; such callers must use ``record_changes``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session
+
+from backend.models import ChangeLogEntry, Chunk, Deal, DealDocumentLink, Document
+
+UPSERT = "upsert"
+DELETE = "delete"
+DOCUMENT = "document"
+DEAL = "deal"
+
+
+def _collect_changes(session: Session) -> dict[tuple[str, str], str]:
+    changes: dict[tuple[str, str], str] = {}
+
+    def _mark(entity_type: str, entity_id: str | None, operation: str) -> None:
+        if not entity_id:
+            return
+        # A delete within the same flush always wins over an upsert.
+        if changes.get((entity_type, entity_id)) != DELETE:
+            changes[(entity_type, entity_id)] = operation
+
+    for obj in session.deleted:
+        if isinstance(obj, Document):
+            _mark(DOCUMENT, obj.id, DELETE)
+        elif isinstance(obj, Deal):
+            _mark(DEAL, obj.id, DELETE)
+
+    for collection in (session.new, session.dirty, session.deleted):
+        for obj in collection:
+            if collection is session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            if isinstance(obj, Document):
+                _mark(DOCUMENT, obj.id, UPSERT)
+            elif isinstance(obj, Deal):
+                _mark(DEAL, obj.id, UPSERT)
+            elif isinstance(obj, (Chunk, DealDocumentLink)):
+                document_id = obj.document_id or (obj.document.id if obj.document is not None else None)
+                _mark(DOCUMENT, document_id, UPSERT)
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_changes(session: Session, flush_context) -> None:
+    # after_flush still exposes the pre-flush new/dirty/deleted sets, and
+    # primary keys generated by column defaults are populated by now.
+    changes = _collect_changes(session)
+    if changes:
+        _insert_entries(session, changes.items())
+
+
+def _insert_entries(session: Session, items: Iterable[tuple[tuple[str, str], str]]) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {"entity_type": entity_type, "entity_id": entity_id, "operation": operation, "created_at": now}
+        for (entity_type, entity_id), operation in items
+    ]
+    if rows:
+        session.connection().execute(insert(ChangeLogEntry.__table__), rows)
+
+
+def record_changes(
+    db: Session, entity_ids: Iterable[str], operation: str = UPSERT, entity_type: str = DOCUMENT
+) -> None:
+    """Explicitly log changes for writes made outside the ORM unit of work."""
+    _insert_entries(db, (((entity_type, entity_id), operation) for entity_id in entity_ids))
+
+
+def latest_change_id(db: Session) -> int:
+    return db.query(func.max(ChangeLogEntry.id)).scalar() or 0
+
+
+def changes_since(db: Session, watermark: int, limit: int = 1000) -> list[ChangeLogEntry]:
+    return (
+        db.query(ChangeLogEntry)
+        .filter(ChangeLogEntry.id > watermark)
+        .order_by(ChangeLogEntry.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def net_changes(entries: Iterable[ChangeLogEntry]) -> dict[str, str]:
+    """Collapse an ordered run of entries into the final operation per document."""
+    result: dict[str, str] = {}
+    for entry in entries:
+        if entry.entity_type == DOCUMENT:
+            result[entry.entity_id] = entry.operation
+    return result
@@ -0,0 +1,118 @@
+"""Denormalized chunk and document views over the SQLite source of truth.
+
+Each chunk row carries its document's filename, category and outcome plus the
+document's primary deal (its first ``DealDocumentLink``), resolved in a single
+join query instead of per-row relationship loads. Results are streamed in
+fixed-size batches so large corpora never have to fit in memory at once.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from backend.models import Chunk, DealDocumentLink, Document
+
+CHUNK_VIEW_COLUMNS = (
+    "document_id",
+    "chunk_index",
+    "content",
+    "page_number",
+    "filename",
+    "category",
+    "deal_outcome",
+    "deal_id",
+)
+
+DOCUMENT_VIEW_COLUMNS = (
+    "document_id",
+    "filename",
+    "category",
+    "deal_outcome",
+    "upload_timestamp",
+    "deal_id",
+)
+
+
+def primary_deal_subquery():
+    """Map each linked document to its primary deal (the earliest link)."""
+    first_link = (
+        select(
+            DealDocumentLink.document_id.label("document_id"),
+            func.min(DealDocumentLink.id).label("link_id"),
+        )
+        .group_by(DealDocumentLink.document_id)
+        .subquery("first_link")
+    )
+    return (
+        select(first_link.c.document_id, DealDocumentLink.deal_id)
+        .join(DealDocumentLink, DealDocumentLink.id == first_link.c.link_id)
+        .subquery("primary_deal")
+    )
+
+
+def chunk_view_query(document_ids: Optional[Sequence[str]] = None) -> Select:
+    primary = primary_deal_subquery()
+    stmt = (
+        select(
+            Chunk.document_id,
+            Chunk.chunk_index,
+            Chunk.content,
+            Chunk.page_number,
+            Document.filename,
+            Document.category,
+            Document.deal_outcome,
+            primary.c.deal_id,
+        )
+        .join(Document, Document.id == Chunk.document_id)
+        .outerjoin(primary, primary.c.document_id == Chunk.document_id)
+        .order_by(Chunk.document_id, Chunk.chunk_index)
+    )
+    if document_ids is not None:
+        stmt = stmt.where(Chunk.document_id.in_(document_ids))
+    return stmt
+
+
+def document_view_query(document_ids: Optional[Sequence[str]] = None) -> Select:
+    primary = primary_deal_subquery()
+    stmt = (
+        select(
+            Document.id,
+            Document.filename,
+            Document.category,
+            Document.deal_outcome,
+            Document.upload_timestamp,
+            primary.c.deal_id,
+        )
+        .outerjoin(primary, primary.c.document_id == Document.id)
+        .order_by(Document.id)
+    )
+    if document_ids is not None:
+        stmt = stmt.where(Document.id.in_(document_ids))
+    return stmt
+
+
+def _stream(db: Session, stmt: Select, batch_size: int) -> Iterator[list[tuple]]:
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+def iter_chunk_view(
+    db: Session,
+    document_ids: Optional[Sequence[str]] = None,
+    batch_size: int = 5000,
+) -> Iterator[list[tuple]]:
+    """Yield batches of chunk rows ordered as ``CHUNK_VIEW_COLUMNS``."""
+    yield from _stream(db, chunk_view_query(document_ids), batch_size)
+
+
+def iter_document_view(
+    db: Session,
+    document_ids: Optional[Sequence[str]] = None,
+    batch_size: int = 5000,
+) -> Iterator[list[tuple]]:
+    """Yield batches of document rows ordered as ``DOCUMENT_VIEW_COLUMNS``."""
+    yield from _stream(db, document_view_query(document_ids), batch_size)
@@ -0,0 +1,208 @@
+"""Executors and admission control for the async request path.
+
+Retrieval routes run on the event loop and push blocking work onto small,
+dedicated thread pools so that slow embedding or SQLite calls cannot starve
+the shared AnyIO threadpool that serves the sync routes (``/health``,
+``/documents``, ...):
+
+* ``embedding`` — CPU-bound fastembed inference, bounded to a few workers;
+* ``db``        — SQLite sessions (the driver is synchronous);
+* ``io``        — everything else that blocks: embedded-mode Qdrant, file writes;
+* ``render``    — report rendering, fire-and-forget after the response.
+
+``AdmissionController`` caps how many retrieval requests run at once and how
+many may wait for a slot. Beyond that, requests are rejected immediately with
+429, and queued requests that wait too long get 503, both with ``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from backend.config import get_settings
+from backend.services.profiling import profile_thread
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _worker_count(name: str) -> int:
+    return {
+        "embedding": settings.embedding_workers,
+        "db": settings.db_workers,
+        "io": settings.io_workers,
+        "render": settings.render_workers,
+    }[name]
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """Return the process-wide executor ``name`` (``embedding``, ``db``, ``io`` or ``render``)."""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max(1, _worker_count(name)), thread_name_prefix=name)
+            _executors[name] = executor
+        return executor
+
+
+def shutdown_executors() -> None:
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_profiled(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with profile_thread():
+        return fn(*args, **kwargs)
+
+
+async def run_in(name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn`` on executor ``name``, propagating context variables.
+
+    The worker thread joins the caller's profile, if one is being captured.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, _call_profiled, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(name), call)
+
+
+async def run_embedding(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await run_in("embedding", fn, *args, **kwargs)
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await run_in("db", fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await run_in("io", fn, *args, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Admission control
+# ---------------------------------------------------------------------------
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP response hints."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, time-limited wait queue.
+
+    Only touched from the event loop, so it needs no lock. Slots are handed
+    directly from a finishing request to the oldest waiter, which keeps
+    admission FIFO.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queued: int, queue_timeout: float):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def acquire(self) -> None:
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            raise AdmissionRejected(
+                429, f"{self.name} is at capacity; retry later", self.retry_after
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise AdmissionRejected(
+                503, f"Timed out waiting for a {self.name} slot", self.retry_after
+            ) from None
+        except BaseException:
+            # Cancelled after a slot was handed over: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self.admitted += 1
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot over; in-flight count unchanged
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+_retrieval_admission: AdmissionController | None = None
+
+
+def get_retrieval_admission() -> AdmissionController:
+    """Process-wide admission controller shared by the retrieval routes."""
+    global _retrieval_admission
+    if _retrieval_admission is None:
+        _retrieval_admission = AdmissionController(
+            "retrieval",
+            max_in_flight=settings.retrieval_max_in_flight,
+            max_queued=settings.retrieval_max_queued,
+            queue_timeout=settings.retrieval_queue_timeout_seconds,
+        )
+    return _retrieval_admission
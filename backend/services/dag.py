@@ -0,0 +1,140 @@
+"""A small async DAG executor for request-scoped pipelines.
+
+Each node is an async callable that receives its dependencies' results as
+keyword arguments (``results`` by node name)::
+
+    dag = DAG([
+        Node("deal", load_deal),
+        Node("hits", search),
+        Node("pack", build_pack, deps=("deal", "hits")),
+    ])
+    async for result in dag.stream():
+        ...  # NodeResult, in completion order
+
+A node starts as soon as all of its dependencies have finished, so
+independent branches overlap. When a node fails, the nodes downstream of it
+are reported as ``skipped`` and the other branches keep running. ``run()``
+raises the first failure after the graph has settled. Each node is timed as
+the ``dag_node`` stage, labelled with the node name, and its offset from the
+start of the run is recorded too. ``timings()`` returns that breakdown for
+persistence.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Sequence
+
+from backend.services.metrics import span
+
+OK, FAILED, SKIPPED = "ok", "failed", "skipped"
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+
+
+@dataclass
+class NodeResult:
+    name: str
+    status: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    started_ms: float = 0.0
+    duration_ms: float = 0.0
+
+
+@dataclass
+class DAG:
+    nodes: Sequence[Node]
+    results: dict[str, NodeResult] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        names = [node.name for node in self.nodes]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate node names in DAG")
+        known = set(names)
+        for node in self.nodes:
+            missing = set(node.deps) - known
+            if missing:
+                raise ValueError(f"Node {node.name!r} depends on unknown nodes {sorted(missing)}")
+        # Kahn's algorithm: anything left over sits on a cycle.
+        remaining = {node.name: set(node.deps) for node in self.nodes}
+        while True:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        if remaining:
+            raise ValueError(f"DAG has a cycle through {sorted(remaining)}")
+
+    async def _run_node(self, node: Node, started: float) -> NodeResult:
+        offset = time.perf_counter()
+        kwargs = {dep: self.results[dep].value for dep in node.deps}
+        try:
+            with span("dag_node", node=node.name):
+                value = await node.fn(**kwargs)
+        except Exception as exc:
+            result = NodeResult(node.name, FAILED, error=exc)
+        else:
+            result = NodeResult(node.name, OK, value=value)
+        result.started_ms = round((offset - started) * 1000, 3)
+        result.duration_ms = round((time.perf_counter() - offset) * 1000, 3)
+        return result
+
+    async def stream(self) -> AsyncIterator[NodeResult]:
+        """Run the graph, yielding each node's result as it settles."""
+        started = time.perf_counter()
+        pending = {node.name: node for node in self.nodes}
+        running: dict[asyncio.Task, str] = {}
+        try:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    settled = [dep for dep in node.deps if dep in self.results]
+                    blocked = next((dep for dep in settled if self.results[dep].status != OK), None)
+                    if blocked is not None:
+                        del pending[name]
+                        self.results[name] = NodeResult(
+                            name,
+                            SKIPPED,
+                            error=RuntimeError(f"dependency {blocked!r} did not complete"),
+                            started_ms=round((time.perf_counter() - started) * 1000, 3),
+                        )
+                        yield self.results[name]
+                    elif len(settled) == len(node.deps):
+                        del pending[name]
+                        running[asyncio.create_task(self._run_node(node, started))] = name
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del running[task]
+                    result = task.result()
+                    self.results[result.name] = result
+                    yield result
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def run(self) -> dict[str, Any]:
+        """Run to completion and return node values by name; raises the first node failure."""
+        async for _ in self.stream():
+            pass
+        for result in self.results.values():
+            if result.status == FAILED:
+                raise result.error
+        return {name: result.value for name, result in self.results.items()}
+
+    def timings(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {"status": result.status, "started_ms": result.started_ms, "duration_ms": result.duration_ms}
+            for name, result in self.results.items()
+        }
@@ -0,0 +1,287 @@
+"""Deal-level vector index for whole-deal precedent matching.
+
+Each deal is one point in ``settings.qdrant_deal_collection``. Its vector
+blends two parts:
+
+* the centroid of the deal's chunk vectors, read back from the chunk
+  collection (``deal_id`` payload);
+* an embedding of its structured profile: sector, stage, geography,
+  vintage, strategy and summary.
+
+The profile part is weighted by ``DEAL_INDEX_ATTRIBUTE_WEIGHT``. A deal with
+no indexed documents yet is placed by its profile alone.
+
+The index is maintained one deal at a time. Ingesting or deleting a document
+re-computes only that deal's point. "Deals like this one" is then a single
+ANN lookup over a few thousand points, with payload filters on the
+attributes.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from backend.config import get_settings
+from backend.services.metadata_cache import DealInfo
+from backend.services.metrics import span
+
+if TYPE_CHECKING:
+    from qdrant_client.http import models
+
+    from backend.services.vector import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Payload keys that similarity queries can filter on with MatchAny.
+KEYWORD_FILTERS = ("sector", "stage", "geography", "strategy", "decision_status", "outcome_status")
+_SCROLL_PAGE = 512
+
+
+def deal_point_id(deal_id: str) -> str:
+    """Stable Qdrant point id for a deal (Qdrant ids must be UUIDs or integers)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"pe-deal:{deal_id}"))
+
+
+def deal_profile_text(deal: DealInfo) -> str:
+    parts = [f"Deal: {deal.name}"]
+    for label, value in (
+        ("Company", deal.company_name),
+        ("Sector", deal.sector),
+        ("Stage", deal.stage),
+        ("Geography", deal.geography),
+        ("Vintage", deal.vintage_year),
+        ("Strategy", deal.strategy),
+        ("Summary", deal.summary),
+    ):
+        if value:
+            parts.append(f"{label}: {value}")
+    return ". ".join(parts)
+
+
+def blend_vectors(centroid: Optional[List[float]], profile: List[float], profile_weight: float) -> List[float]:
+    """Unit-normalised ``(1 - w) * centroid + w * profile``; just the profile without a centroid."""
+    import numpy as np
+
+    def unit(vector):
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+
+    blended = unit(profile)
+    if centroid is not None:
+        blended = unit((1.0 - profile_weight) * unit(centroid) + profile_weight * blended)
+    return blended.tolist()
+
+
+@dataclass
+class SimilarDeal:
+    deal_id: str
+    name: str
+    score: float
+    sector: Optional[str]
+    stage: Optional[str]
+    geography: Optional[str]
+    vintage_year: Optional[int]
+    strategy: Optional[str]
+    decision_status: Optional[str]
+    outcome_status: Optional[str]
+    document_count: int
+    chunk_count: int
+
+
+class DealIndex:
+    def __init__(self, vector_store: QdrantVectorStore):
+        # Shares the chunk store's client: embedded Qdrant allows one per path.
+        self.store = vector_store
+        self.client = vector_store.client
+        # Dimension the deal collection was last checked against; a model migration changes it.
+        self._collection_dimension: Optional[int] = None
+
+    @property
+    def collection(self) -> str:
+        return settings.qdrant_deal_collection
+
+    def ensure_collection(self) -> None:
+        """Create the deal collection, or recreate it if the chunk vectors changed dimension."""
+        from qdrant_client.http import models
+
+        dimension = self.store.serving.dimension
+        if self._collection_dimension == dimension:
+            return
+        if self.client.collection_exists(self.collection):
+            existing = self.client.get_collection(self.collection).config.params.vectors.size
+            if existing == dimension:
+                self._collection_dimension = dimension
+                return
+            # Deal vectors are derived data; rebuild() repopulates them.
+            logger.warning("Recreating %s: %d-d vectors, chunk index is %d-d", self.collection, existing, dimension)
+            self.client.delete_collection(self.collection)
+        self.client.create_collection(
+            collection_name=self.collection,
+            vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE),
+        )
+        self._collection_dimension = dimension
+
+    def _chunk_centroid(self, deal_id: str) -> tuple[Optional[List[float]], int, int]:
+        """Mean chunk vector of a deal, with its chunk and document counts."""
+        import numpy as np
+        from qdrant_client.http import models
+
+        total, chunks, documents = None, 0, set()
+        offset = None
+        deal_filter = models.Filter(
+            must=[models.FieldCondition(key="deal_id", match=models.MatchValue(value=deal_id))]
+        )
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.store.serving.collection,
+                scroll_filter=deal_filter,
+                limit=_SCROLL_PAGE,
+                offset=offset,
+                with_payload=["document_id"],
+                with_vectors=True,
+            )
+            if points:
+                page = np.asarray([point.vector for point in points], dtype=np.float32)
+                total = page.sum(axis=0) if total is None else total + page.sum(axis=0)
+                chunks += len(points)
+                documents.update((point.payload or {}).get("document_id") for point in points)
+            if offset is None:
+                break
+        return (None if total is None else (total / chunks).tolist()), chunks, len(documents)
+
+    def refresh_deal(self, deal: DealInfo) -> None:
+        """Recompute and upsert one deal's point."""
+        from qdrant_client.http import models
+
+        self.ensure_collection()
+        with span("deal_index_refresh"):
+            centroid, chunk_count, document_count = self._chunk_centroid(deal.id)
+            profile = self.store.embedding.embed([deal_profile_text(deal)])[0]
+            vector = blend_vectors(centroid, profile, settings.deal_index_attribute_weight)
+            self.client.upsert(
+                collection_name=self.collection,
+                points=[
+                    models.PointStruct(
+                        id=deal_point_id(deal.id),
+                        vector=vector,
+                        payload={
+                            "deal_id": deal.id,
+                            "name": deal.name,
+                            "sector": deal.sector,
+                            "stage": deal.stage,
+                            "geography": deal.geography,
+                            "vintage_year": deal.vintage_year,
+                            "strategy": deal.strategy,
+                            "decision_status": deal.decision_status,
+                            "outcome_status": deal.outcome_status,
+                            "document_count": document_count,
+                            "chunk_count": chunk_count,
+                        },
+                    )
+                ],
+                wait=True,
+            )
+
+    def remove_deal(self, deal_id: str) -> None:
+        from qdrant_client.http import models
+
+        self.ensure_collection()
+        self.client.delete(
+            collection_name=self.collection,
+            points_selector=models.PointIdsList(points=[deal_point_id(deal_id)]),
+            wait=True,
+        )
+
+    def rebuild(self, deals: Iterable[DealInfo]) -> int:
+        """Refresh every deal; returns how many were indexed."""
+        count = 0
+        for deal in deals:
+            self.refresh_deal(deal)
+            count += 1
+        return count
+
+    def similar_deals(
+        self,
+        deal_id: Optional[str] = None,
+        query: Optional[str] = None,
+        top_k: int = 10,
+        vintage_from: Optional[int] = None,
+        vintage_to: Optional[int] = None,
+        **filters: Optional[List[str]],
+    ) -> List[SimilarDeal]:
+        """Nearest deals to an indexed deal (``deal_id``) or to free text (``query``).
+
+        ``filters`` map ``KEYWORD_FILTERS`` names to allowed values. A deal is
+        never returned as similar to itself; an unindexed ``deal_id`` finds nothing.
+        """
+        from qdrant_client.http import models
+
+        if (deal_id is None) == (query is None):
+            raise ValueError("Pass exactly one of deal_id or query")
+        unknown = set(filters) - set(KEYWORD_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown deal filters {sorted(unknown)}")
+        self.ensure_collection()
+
+        if deal_id is not None:
+            points = self.client.retrieve(self.collection, ids=[deal_point_id(deal_id)], with_vectors=True)
+            if not points:
+                return []
+            vector = points[0].vector
+        else:
+            with span("embed_query"):
+                vector = self.store.embedding.embed_one(query)
+
+        with span("deal_search"):
+            results = self.client.query_points(
+                collection_name=self.collection,
+                query=vector,
+                query_filter=_deal_filter(deal_id, vintage_from, vintage_to, filters),
+                limit=top_k,
+                with_payload=True,
+            )
+        return [_to_similar_deal(point) for point in results.points]
+
+
+def _deal_filter(
+    exclude_deal_id: Optional[str],
+    vintage_from: Optional[int],
+    vintage_to: Optional[int],
+    filters: dict[str, Optional[List[str]]],
+) -> Optional[models.Filter]:
+    from qdrant_client.http import models
+
+    must = [
+        models.FieldCondition(key=key, match=models.MatchAny(any=values))
+        for key, values in filters.items()
+        if values
+    ]
+    if vintage_from is not None or vintage_to is not None:
+        must.append(models.FieldCondition(key="vintage_year", range=models.Range(gte=vintage_from, lte=vintage_to)))
+    must_not = []
+    if exclude_deal_id is not None:
+        must_not.append(models.HasIdCondition(has_id=[deal_point_id(exclude_deal_id)]))
+    return models.Filter(must=must or None, must_not=must_not or None) if must or must_not else None
+
+
+def _to_similar_deal(point) -> SimilarDeal:
+    payload = point.payload or {}
+    return SimilarDeal(
+        deal_id=payload["deal_id"],
+        name=payload.get("name", ""),
+        score=point.score or 0.0,
+        sector=payload.get("sector"),
+        stage=payload.get("stage"),
+        geography=payload.get("geography"),
+        vintage_year=payload.get("vintage_year"),
+        strategy=payload.get("strategy"),
+        decision_status=payload.get("decision_status"),
+        outcome_status=payload.get("outcome_status"),
+        document_count=payload.get("document_count", 0),
+        chunk_count=payload.get("chunk_count", 0),
+    )
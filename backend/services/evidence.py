@@ -0,0 +1,115 @@
+"""The evidence record shared by search, precedent enrichment, prompting and responses.
+
+A vector hit becomes an ``EvidenceRecord`` once, in ``vector._to_scored_chunks``.
+Precedent enrichment fills in its document and deal fields in place. The
+prompt context is built from it directly, and so are the trace rows and the
+API payloads. Nothing copies a hit into an intermediate object on the way.
+
+Each output shape is an ``EvidenceView``: a fixed mapping from JSON keys to
+record attributes. A view turns a record into one flat dict whose values are
+the record's own objects (the chunk text is shared, not copied). That dict is
+what ``json.dumps`` and the trace columns consume.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+if TYPE_CHECKING:
+    from backend.services.metadata_cache import DealInfo, DocumentInfo
+
+
+@dataclass(slots=True)
+class EvidenceRecord:
+    content: str
+    score: float
+    document_id: str
+    filename: str
+    page_number: int
+    chunk_index: int
+    source: str = ""
+    section: Optional[str] = None
+    category: Optional[str] = None
+    deal_outcome: Optional[str] = None
+    deal_id: Optional[str] = None
+    # Filled by ``enrich`` from the metadata cache.
+    deal_name: Optional[str] = None
+    sector: Optional[str] = None
+    stage: Optional[str] = None
+    geography: Optional[str] = None
+    decision_status: Optional[str] = None
+    outcome_status: Optional[str] = None
+
+    @property
+    def ref(self) -> str:
+        """Stable id of the chunk, ``document_id:chunk_index``."""
+        return f"{self.document_id}:{self.chunk_index}"
+
+    def enrich(self, document: Optional[DocumentInfo], deal: Optional[DealInfo]) -> None:
+        """Overlay the document's current category/outcome and its deal's attributes."""
+        if document is not None:
+            self.category = document.category
+            self.deal_outcome = document.deal_outcome
+        self.deal_id = deal.id if deal else None
+        self.deal_name = deal.name if deal else None
+        self.sector = deal.sector if deal else None
+        self.stage = deal.stage if deal else None
+        self.geography = deal.geography if deal else None
+        self.decision_status = deal.decision_status if deal else None
+        self.outcome_status = deal.outcome_status if deal else None
+
+
+class EvidenceView:
+    """One serialized shape of ``EvidenceRecord``: JSON key -> attribute name."""
+
+    __slots__ = ("keys", "_values")
+
+    def __init__(self, **attributes: str):
+        for attribute in attributes.values():
+            if attribute not in EvidenceRecord.__slots__:
+                raise ValueError(f"EvidenceRecord has no field {attribute!r}")
+        self.keys = tuple(attributes)
+        getter = attrgetter(*attributes.values())
+        # attrgetter returns a bare value, not a 1-tuple, for a single name.
+        self._values = getter if len(attributes) > 1 else lambda record: (getter(record),)
+
+    def __call__(self, record: EvidenceRecord) -> dict[str, Any]:
+        return dict(zip(self.keys, self._values(record)))
+
+    def many(self, records: Iterable[EvidenceRecord]) -> list[dict[str, Any]]:
+        keys, values = self.keys, self._values
+        return [dict(zip(keys, values(record))) for record in records]
+
+
+def _same(*names: str) -> dict[str, str]:
+    return {name: name for name in names}
+
+
+# ``/precedents`` and the workflow's ``precedent_scan`` buckets.
+PRECEDENT_VIEW = EvidenceView(
+    **_same("document_id", "filename", "deal_id", "deal_name", "category", "deal_outcome", "score",
+            "page_number", "chunk_index"),
+    evidence="content",
+    **_same("sector", "stage", "geography", "decision_status", "outcome_status"),
+)
+# ``sources`` of an LLM answer.
+SOURCE_VIEW = EvidenceView(
+    filename="filename", page_number="page_number", doc_id="document_id", chunk_text="content",
+    **_same("category", "deal_outcome", "chunk_index"),
+)
+# ``RetrievalTrace.retrieved_chunks``: a reference, not a copy. Filename and
+# outcome come from the document row; the page stays so retrieval evaluation
+# can match at page granularity without a join.
+TRACE_VIEW = EvidenceView(doc_id="document_id", **_same("chunk_index", "score", "page_number"))
+# Entries of the workflow's shared ``evidence`` map, before the snippet is added.
+CITATION_VIEW = EvidenceView(
+    **_same("document_id", "filename", "page_number", "chunk_index", "deal_outcome", "score"),
+)
+
+
+def citation(record: EvidenceRecord, snippet_chars: int) -> dict[str, Any]:
+    entry = CITATION_VIEW(record)
+    entry["snippet"] = record.content[:snippet_chars]
+    return entry
@@ -0,0 +1,294 @@
+"""Columnar Parquet snapshots of the DuckDB warehouse for offline analysis.
+
+Datasets are written as Hive-partitioned Parquet under ``settings.exports_root``::
+
+    exports/
+      _manifest.json
+      document_chunks/
+        _manifest.json
+        deal_id=<deal>/category=<category>/data.parquet
+      extracted_tables/...
+      document_stats/...
+      deal_analytics/data.parquet
+
+Partition columns are encoded in the directory names only, so readers should
+enable Hive partitioning, e.g. ``duckdb.read_parquet("exports/document_chunks/**/*.parquet",
+hive_partitioning=True)`` or ``polars.scan_parquet(..., hive_partitioning=True)``.
+NULL partition values use the Hive default partition name.
+
+Exports are incremental: every partition carries a row count and an
+order-independent content fingerprint in the dataset manifest, and only
+partitions whose fingerprint changed are rewritten. Files are written to a
+temporary name and renamed into place so readers never see partial files.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import quote
+
+from backend.config import get_settings
+from backend.services.analytics import DuckDBAnalytics, get_duckdb_analytics
+
+logger = logging.getLogger(__name__)
+
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+MANIFEST_NAME = "_manifest.json"
+DATA_FILE_NAME = "data.parquet"
+SUPPORTED_COMPRESSION = ("zstd", "snappy", "gzip", "lz4", "brotli", "uncompressed")
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    name: str
+    source_sql: str
+    partition_by: tuple[str, ...] = ()
+
+
+# Source queries are fixed strings; nothing user-supplied is interpolated.
+EXPORT_DATASETS: dict[str, ExportDataset] = {
+    dataset.name: dataset
+    for dataset in (
+        ExportDataset(
+            name="document_chunks",
+            source_sql="SELECT * FROM document_chunks",
+            partition_by=("deal_id", "category"),
+        ),
+        ExportDataset(
+            name="extracted_tables",
+            source_sql="""
+                SELECT t.*, s.deal_id, s.category
+                FROM extracted_tables t
+                LEFT JOIN document_stats s ON s.document_id = t.document_id
+            """,
+            partition_by=("deal_id", "category"),
+        ),
+        ExportDataset(
+            name="document_stats",
+            source_sql="SELECT * FROM document_stats",
+            partition_by=("deal_id", "category"),
+        ),
+        ExportDataset(name="deal_analytics", source_sql="SELECT * FROM deal_analytics"),
+        ExportDataset(name="category_analytics", source_sql="SELECT * FROM category_analytics"),
+        ExportDataset(name="outcome_analytics", source_sql="SELECT * FROM outcome_analytics"),
+    )
+}
+
+
+@dataclass
+class ExportResult:
+    dataset: str
+    path: str
+    partitions_written: int = 0
+    partitions_skipped: int = 0
+    partitions_removed: int = 0
+    rows_written: int = 0
+    total_rows: int = 0
+    duration_ms: float = 0.0
+    written: list[str] = field(default_factory=list)
+
+
+def _partition_dir(partition_by: tuple[str, ...], values: tuple[Any, ...]) -> str:
+    segments = []
+    for column, value in zip(partition_by, values):
+        encoded = HIVE_DEFAULT_PARTITION if value is None else quote(str(value), safe="")
+        segments.append(f"{column}={encoded}")
+    return "/".join(segments)
+
+
+def _write_json_atomic(path: Path, payload: dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _load_manifest(path: Path) -> dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+class ParquetSnapshotExporter:
+    """Write partitioned Parquet snapshots of the analytics warehouse."""
+
+    def __init__(
+        self,
+        analytics: Optional[DuckDBAnalytics] = None,
+        root: Optional[str | Path] = None,
+        compression: Optional[str] = None,
+        row_group_size: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.analytics = analytics or get_duckdb_analytics()
+        self.root = Path(root or settings.exports_root)
+        self.compression = (compression or settings.export_compression).lower()
+        self.row_group_size = row_group_size or settings.export_row_group_size
+        if self.compression not in SUPPORTED_COMPRESSION:
+            raise ValueError(f"Unsupported Parquet compression: {self.compression}")
+        if self.row_group_size <= 0:
+            raise ValueError("row_group_size must be positive")
+
+    def export(self, datasets: Optional[list[str]] = None, full: bool = False) -> list[ExportResult]:
+        """Export the requested datasets (all by default).
+
+        With ``full=False`` only partitions whose content changed since the
+        previous export are rewritten.
+        """
+        names = datasets or list(EXPORT_DATASETS)
+        unknown = [name for name in names if name not in EXPORT_DATASETS]
+        if unknown:
+            raise ValueError(f"Unknown export dataset(s): {', '.join(unknown)}")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        results = []
+        # Hold the warehouse lock so every dataset reflects one consistent state.
+        with self.analytics.session() as conn:
+            for name in names:
+                results.append(self._export_dataset(conn, EXPORT_DATASETS[name], full))
+
+        root_manifest_path = self.root / MANIFEST_NAME
+        root_manifest = _load_manifest(root_manifest_path)
+        root_manifest.setdefault("datasets", {})
+        for result in results:
+            root_manifest["datasets"][result.dataset] = {
+                "path": result.dataset,
+                "total_rows": result.total_rows,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+            }
+        root_manifest["format"] = "parquet"
+        _write_json_atomic(root_manifest_path, root_manifest)
+        return results
+
+    def _export_dataset(self, conn, dataset: ExportDataset, full: bool) -> ExportResult:
+        started = time.perf_counter()
+        dataset_root = self.root / dataset.name
+        dataset_root.mkdir(parents=True, exist_ok=True)
+        manifest_path = dataset_root / MANIFEST_NAME
+        previous = _load_manifest(manifest_path)
+        settings_changed = (
+            previous.get("compression") != self.compression
+            or previous.get("row_group_size") != self.row_group_size
+            or tuple(previous.get("partition_by", ())) != dataset.partition_by
+        )
+        previous_partitions = {} if (full or settings_changed) else previous.get("partitions", {})
+
+        group_cols = ", ".join(dataset.partition_by)
+        fingerprint_sql = f"""
+            SELECT {group_cols + "," if group_cols else ""}
+                COUNT(*) AS row_count,
+                COALESCE(bit_xor(hash(src)), 0) AS fingerprint
+            FROM ({dataset.source_sql}) src
+            {"GROUP BY " + group_cols if group_cols else ""}
+        """
+        n_keys = len(dataset.partition_by)
+        result = ExportResult(dataset=dataset.name, path=str(dataset_root))
+        partitions: dict[str, dict[str, Any]] = {}
+
+        for row in conn.execute(fingerprint_sql).fetchall():
+            values, row_count, fingerprint = tuple(row[:n_keys]), int(row[n_keys]), str(row[n_keys + 1])
+            if n_keys and row_count == 0:
+                continue
+            rel_dir = _partition_dir(dataset.partition_by, values)
+            rel_path = f"{rel_dir}/{DATA_FILE_NAME}" if rel_dir else DATA_FILE_NAME
+            entry = {
+                "values": dict(zip(dataset.partition_by, values)),
+                "row_count": row_count,
+                "fingerprint": fingerprint,
+            }
+            result.total_rows += row_count
+
+            old = previous_partitions.get(rel_path)
+            if (
+                old
+                and old.get("fingerprint") == fingerprint
+                and old.get("row_count") == row_count
+                and (dataset_root / rel_path).exists()
+            ):
+                entry["written_at"] = old.get("written_at")
+                partitions[rel_path] = entry
+                result.partitions_skipped += 1
+                continue
+
+            self._write_partition(conn, dataset, values, dataset_root / rel_path)
+            entry["written_at"] = datetime.now(timezone.utc).isoformat()
+            partitions[rel_path] = entry
+            result.partitions_written += 1
+            result.rows_written += row_count
+            result.written.append(rel_path)
+
+        for rel_path in set(previous.get("partitions", {})) - set(partitions):
+            self._remove_partition(dataset_root, rel_path)
+            result.partitions_removed += 1
+
+        _write_json_atomic(
+            manifest_path,
+            {
+                "dataset": dataset.name,
+                "format": "parquet",
+                "partition_by": list(dataset.partition_by),
+                "hive_default_partition": HIVE_DEFAULT_PARTITION,
+                "compression": self.compression,
+                "row_group_size": self.row_group_size,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+                "total_rows": result.total_rows,
+                "partitions": partitions,
+            },
+        )
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "Exported %s: written=%d skipped=%d removed=%d rows=%d in %.1fms",
+            dataset.name,
+            result.partitions_written,
+            result.partitions_skipped,
+            result.partitions_removed,
+            result.rows_written,
+            result.duration_ms,
+        )
+        return result
+
+    def _write_partition(self, conn, dataset: ExportDataset, values: tuple[Any, ...], target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if dataset.partition_by:
+            # Partition columns live in the path, not in the file (Hive layout).
+            predicate = " AND ".join(f"{column} IS NOT DISTINCT FROM ?" for column in dataset.partition_by)
+            relation = conn.sql(
+                f"SELECT * EXCLUDE ({', '.join(dataset.partition_by)}) FROM ({dataset.source_sql}) src WHERE {predicate}",
+                params=list(values),
+            )
+        else:
+            relation = conn.sql(dataset.source_sql)
+
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        relation.write_parquet(
+            str(tmp_path),
+            compression=self.compression,
+            row_group_size=self.row_group_size,
+        )
+        os.replace(tmp_path, target)
+
+    def _remove_partition(self, dataset_root: Path, rel_path: str) -> None:
+        target = dataset_root / rel_path
+        if target.exists():
+            target.unlink()
+        # Prune now-empty partition directories up to the dataset root.
+        parent = target.parent
+        while parent != dataset_root and parent.is_dir() and not any(parent.iterdir()):
+            shutil.rmtree(parent)
+            parent = parent.parent
+
+    def manifest(self) -> dict[str, Any]:
+        """Return the root manifest plus each dataset's manifest."""
+        root_manifest = _load_manifest(self.root / MANIFEST_NAME)
+        datasets = {}
+        for name in root_manifest.get("datasets", {}):
+            datasets[name] = _load_manifest(self.root / name / MANIFEST_NAME)
+        return {"root": str(self.root), "datasets": datasets}
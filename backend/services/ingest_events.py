@@ -0,0 +1,142 @@
+"""In-process broker for document ingestion progress.
+
+Background ingestion (running in worker threads) publishes state transitions
+and per-stage progress; HTTP clients subscribe to the document ids they care
+about over Server-Sent Events instead of polling ``/documents/{id}/status``.
+
+The broker keeps the latest event per document so a new subscriber first
+receives a snapshot, then live updates. State is per process: with several
+workers, clients should reconnect on drop and fall back to the batch status
+endpoint, which reads SQLite.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Optional
+
+# Ordered ingestion stages; "done" and "failed" are terminal.
+STAGES = ("queued", "parsing", "embedding", "indexing", "analytics_sync", "done")
+TERMINAL_STAGES = frozenset({"done", "failed"})
+
+
+@dataclass
+class IngestionEvent:
+    sequence: int
+    document_id: str
+    status: str  # processing | ready | failed
+    stage: str
+    progress: float  # 0.0 - 1.0 across the whole ingestion
+    detail: Optional[str]
+    error: Optional[str]
+    timestamp: float
+
+    @property
+    def terminal(self) -> bool:
+        return self.stage in TERMINAL_STAGES
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class Subscription:
+    """A subscriber's queue of events, fed from any thread."""
+
+    def __init__(self, broker: IngestionEventBroker, document_ids: Optional[set[str]]):
+        self._broker = broker
+        self.document_ids = document_ids
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[IngestionEvent] = asyncio.Queue()
+
+    def wants(self, document_id: str) -> bool:
+        return self.document_ids is None or document_id in self.document_ids
+
+    def push(self, event: IngestionEvent) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+
+    async def get(self, timeout: float) -> Optional[IngestionEvent]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class IngestionEventBroker:
+    def __init__(self, max_tracked: int = 10_000):
+        self._lock = threading.Lock()
+        self._latest: OrderedDict[str, IngestionEvent] = OrderedDict()
+        self._subscribers: set[Subscription] = set()
+        self._sequence = itertools.count(1)
+        self._max_tracked = max_tracked
+
+    def publish(
+        self,
+        document_id: str,
+        status: str,
+        stage: str,
+        progress: float,
+        detail: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> IngestionEvent:
+        with self._lock:
+            event = IngestionEvent(
+                sequence=next(self._sequence),
+                document_id=document_id,
+                status=status,
+                stage=stage,
+                progress=round(min(max(progress, 0.0), 1.0), 4),
+                detail=detail,
+                error=error,
+                timestamp=time.time(),
+            )
+            self._latest[document_id] = event
+            self._latest.move_to_end(document_id)
+            while len(self._latest) > self._max_tracked:
+                self._latest.popitem(last=False)
+            subscribers = [sub for sub in self._subscribers if sub.wants(document_id)]
+
+        for subscriber in subscribers:
+            try:
+                subscriber.push(event)
+            except RuntimeError:
+                # The subscriber's event loop has shut down.
+                self.unsubscribe(subscriber)
+        return event
+
+    def latest(self, document_ids: Iterable[str]) -> dict[str, IngestionEvent]:
+        with self._lock:
+            return {doc_id: self._latest[doc_id] for doc_id in document_ids if doc_id in self._latest}
+
+    def subscribe(self, document_ids: Optional[Iterable[str]] = None) -> Subscription:
+        """Subscribe from inside a running event loop; ``None`` means all documents."""
+        subscription = Subscription(self, set(document_ids) if document_ids is not None else None)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+# Created eagerly: publishers run on arbitrary worker threads.
+_broker = IngestionEventBroker()
+
+
+def get_ingestion_broker() -> IngestionEventBroker:
+    """Return the process-wide ingestion event broker."""
+    return _broker
@@ -0,0 +1,153 @@
+"""Process-wide cache of deal and document metadata.
+
+Retrieval enriches every hit with its document's category and outcome and
+its deal's attributes, the workflow loads the deal, and ``GET /deals``
+lists them all. The data is small and rarely changes, so it is kept as an
+immutable snapshot of two maps:
+
+* document id -> ``DocumentInfo(category, deal_outcome, deal_id)``;
+* deal id     -> ``DealInfo`` (every ``Deal`` column).
+
+Writers call ``invalidate()``, which bumps a version counter. The next
+reader sees that the snapshot's version is old and reloads it. With
+``METADATA_CACHE_MODE=shared`` (the default), a reader also compares the
+snapshot with ``MAX(change_log.id)`` at most every
+``METADATA_CACHE_CHECK_INTERVAL_SECONDS``. That way, writes from other
+worker processes and scripts are picked up without an explicit signal.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Deal, DealDocumentLink, Document
+from backend.services.change_tracking import latest_change_id
+from backend.services.metrics import count_cache, span
+
+settings = get_settings()
+
+PROCESS, SHARED = "process", "shared"
+
+
+@dataclass(frozen=True, slots=True)
+class DocumentInfo:
+    category: Optional[str]
+    deal_outcome: Optional[str]
+    deal_id: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class DealInfo:
+    id: str
+    name: str
+    company_name: Optional[str]
+    sector: Optional[str]
+    geography: Optional[str]
+    stage: Optional[str]
+    fund_name: Optional[str]
+    vintage_year: Optional[int]
+    strategy: Optional[str]
+    decision_status: Optional[str]
+    outcome_status: Optional[str]
+    partner_owner: Optional[str]
+    summary: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+_DEAL_COLUMNS = tuple(getattr(Deal, name) for name in DealInfo.__slots__)
+
+
+@dataclass(frozen=True)
+class MetadataSnapshot:
+    version: int
+    change_id: int
+    documents: dict[str, DocumentInfo]
+    deals: dict[str, DealInfo]
+    # Deal ids, most recently updated first (the ``GET /deals`` order).
+    deal_order: tuple[str, ...]
+
+    def deal(self, deal_id: Optional[str]) -> Optional[DealInfo]:
+        return self.deals.get(deal_id) if deal_id else None
+
+    def list_deals(self) -> list[DealInfo]:
+        return [self.deals[deal_id] for deal_id in self.deal_order]
+
+    @classmethod
+    def load(cls, db: Session, version: int, change_id: int) -> MetadataSnapshot:
+        links: dict[str, str] = {}
+        # The first link is the primary deal, as in chunk_view.primary_deal_subquery.
+        primary = db.query(DealDocumentLink.document_id, DealDocumentLink.deal_id).order_by(DealDocumentLink.id)
+        for document_id, deal_id in primary:
+            links.setdefault(document_id, deal_id)
+        documents = {
+            document_id: DocumentInfo(category, deal_outcome, links.get(document_id))
+            for document_id, category, deal_outcome in db.query(Document.id, Document.category, Document.deal_outcome)
+        }
+        deals = {row.id: DealInfo(*row) for row in db.query(*_DEAL_COLUMNS).order_by(Deal.updated_at.desc())}
+        return cls(version, change_id, documents, deals, tuple(deals))
+
+
+class MetadataCache:
+    def __init__(self, mode: str = SHARED, check_interval_s: float = 1.0):
+        if mode not in (PROCESS, SHARED):
+            raise ValueError(f"Unknown metadata cache mode {mode!r}")
+        self.mode = mode
+        self.check_interval_s = check_interval_s
+        self._version = 0
+        self._snapshot: Optional[MetadataSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> int:
+        """Mark the snapshot stale after a write; returns the new version."""
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def get(self, db: Session) -> MetadataSnapshot:
+        """The current snapshot, reloaded first if a write made it stale."""
+        with self._lock:
+            snapshot, version = self._snapshot, self._version
+            fresh = snapshot is not None and snapshot.version == version
+            if fresh and self.mode == SHARED:
+                now = time.monotonic()
+                if now - self._checked_at >= self.check_interval_s:
+                    self._checked_at = now
+                    fresh = latest_change_id(db) == snapshot.change_id
+            count_cache("metadata", hit=fresh)
+            if fresh:
+                return snapshot
+            with span("metadata_reload"):
+                # Read the watermark first: a write that lands during the load
+                # moves it on, so the next check reloads again.
+                change_id = latest_change_id(db) if self.mode == SHARED else 0
+                snapshot = self._snapshot = MetadataSnapshot.load(db, version, change_id)
+            self._checked_at = time.monotonic()
+            return snapshot
+
+
+_metadata_cache: Optional[MetadataCache] = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Return the process-wide metadata cache."""
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = MetadataCache(
+                settings.metadata_cache_mode, settings.metadata_cache_check_interval_seconds
+            )
+        return _metadata_cache
@@ -0,0 +1,211 @@
+"""Lightweight in-process instrumentation: spans, counters and histograms.
+
+Hot paths wrap their stages in ``span("stage")``::
+
+    with span("embed"):
+        vectors = model.embed(texts)
+
+Every span feeds the ``pe_stage_duration_seconds`` histogram and, when a
+request collects timings (``collect_timings()``), is also recorded there so the
+breakdown can be stored alongside the request (``RetrievalTrace.timings_json``).
+Collection uses a context variable; ``run_in`` executors copy the context,
+so spans opened on worker threads land in the same request's timings.
+
+``render_prometheus()`` renders everything in the Prometheus text exposition
+format for the ``/metrics`` endpoint. No client library is needed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+LabelKey = tuple[tuple[str, str], ...]
+
+# Seconds; spans range from sub-millisecond DB lookups to minute-long parses.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _label_key(labels: dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., +Inf count], sum
+        self._counts: dict[LabelKey, list[int]] = {}
+        self._sums: dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            return sum(self._counts.get(_label_key(labels), ()))
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key in sorted(self._counts):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), self._counts[key]):
+                    cumulative += count
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}"
+                    )
+                lines.append(f"{self.name}_sum{_format_labels(key)} {self._sums[key]!r}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        with self._lock:
+            metric = self._metrics.setdefault(name, Counter(name, help_text))
+        if not isinstance(metric, Counter):
+            raise TypeError(f"Metric {name} is registered as a {type(metric).__name__}")
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+        if not isinstance(metric, Histogram):
+            raise TypeError(f"Metric {name} is registered as a {type(metric).__name__}")
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram("pe_stage_duration_seconds", "Duration of instrumented pipeline stages.")
+CHUNKS = registry.counter("pe_chunks_total", "Chunks processed, by operation.")
+LLM_TOKENS = registry.counter("pe_llm_tokens_total", "LLM tokens, by kind (prompt/completion).")
+CACHE_LOOKUPS = registry.counter("pe_cache_lookups_total", "Cache lookups, by cache and result (hit/miss).")
+
+
+# ---------------------------------------------------------------------------
+# Per-request timing collection
+# ---------------------------------------------------------------------------
+
+_current_timings: contextvars.ContextVar[Optional[dict[str, float]]] = contextvars.ContextVar(
+    "pe_current_timings", default=None
+)
+
+
+@contextmanager
+def collect_timings() -> Iterator[dict[str, float]]:
+    """Collect span durations (milliseconds) for the enclosed work.
+
+    A stage that runs several times (e.g. per embedding batch) accumulates.
+    """
+    timings: dict[str, float] = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def record_duration(stage: str, seconds: float, **labels: object) -> None:
+    STAGE_DURATION.observe(seconds, stage=stage, **labels)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[stage] = round(timings.get(stage, 0.0) + seconds * 1000, 3)
+
+
+@contextmanager
+def span(stage: str, **labels: object) -> Iterator[None]:
+    """Time the enclosed block as ``stage``; recorded even if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_duration(stage, time.perf_counter() - started, **labels)
+
+
+def count_chunks(operation: str, value: int) -> None:
+    CHUNKS.inc(value, operation=operation)
+
+
+def count_tokens(prompt: int, completion: int) -> None:
+    if prompt:
+        LLM_TOKENS.inc(prompt, kind="prompt")
+    if completion:
+        LLM_TOKENS.inc(completion, kind="completion")
+
+
+def count_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_prometheus() -> str:
+    return registry.render()
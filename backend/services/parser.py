@@ -1,8 +1,10 @@
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, List, Tuple
 
 from backend.config import get_settings
+from backend.services.metrics import span
 
 settings = get_settings()
 
@@ -35,6 +37,40 @@ class ParseResult:
 # Structured element export — preserves real page numbers via docling provenance
 # ---------------------------------------------------------------------------
 
+_converter: Any = None
+_converter_lock = threading.Lock()
+
+
+def get_document_converter() -> Any:
+    """Process-wide docling ``DocumentConverter``.
+
+    Importing docling and building its pipelines takes seconds, so the
+    converter is created once, on first parse or by the startup warm-up.
+    """
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            try:
+                from docling.document_converter import DocumentConverter
+            except ImportError as exc:
+                raise RuntimeError(
+                    "docling is required for parsing documents. "
+                    "Install the extras in requirements.txt."
+                ) from exc
+            _converter = DocumentConverter()
+        return _converter
+
+
+def warm_up_parser() -> None:
+    """Build the converter and, where docling supports it, its PDF pipeline (loads layout models)."""
+    converter = get_document_converter()
+    initialize = getattr(converter, "initialize_pipeline", None)
+    if initialize is not None:
+        from docling.datamodel.base_models import InputFormat
+
+        initialize(InputFormat.PDF)
+
+
 def _export_elements(file_path: Path) -> Tuple[List[Tuple[int, str | None, str]], List[ParsedTable]]:
     """
     Use docling's structured document model to extract elements with their
@@ -44,16 +80,7 @@ def _export_elements(file_path: Path) -> Tuple[List[Tuple[int, str | None, str]]
         - List of (page_number, section_header, markdown_content) tuples
         - List of ParsedTable objects for extracted tables
     """
-    try:
-        from docling.document_converter import DocumentConverter
-    except ImportError as exc:
-        raise RuntimeError(
-            "docling is required for parsing documents. "
-            "Install the extras in requirements.txt."
-        ) from exc
-
-    converter = DocumentConverter()
-    result = converter.convert(str(file_path))
+    result = get_document_converter().convert(str(file_path))
     doc = result.document
 
     if doc is None:
@@ -257,12 +284,14 @@ def parse_and_chunk(file_path: str | Path) -> ParseResult:
     Returns a ParseResult containing chunks and extracted tables.
     """
     path = Path(file_path)
-    elements, tables = _export_elements(path)
-    chunks = _chunk_elements(
-        elements,
-        max_len=settings.chunk_size,
-        overlap=settings.chunk_overlap,
-    )
+    with span("parse"):
+        elements, tables = _export_elements(path)
+    with span("chunk"):
+        chunks = _chunk_elements(
+            elements,
+            max_len=settings.chunk_size,
+            overlap=settings.chunk_overlap,
+        )
     # Back-fill source field and re-index chunk_index (chunk_index is set
     # incrementally inside _chunk_elements, but make it explicit here).
     for idx, chunk in enumerate(chunks):
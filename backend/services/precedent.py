@@ -1,32 +1,117 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from typing import Any
 
 from sqlalchemy.orm import Session
 
-from backend.models import Deal, DealDocumentLink, Document
+from backend.services.concurrency import run_db
+from backend.services.evidence import PRECEDENT_VIEW, EvidenceRecord
+from backend.services.metadata_cache import MetadataSnapshot, get_metadata_cache
+from backend.services.metrics import span
 from backend.services.vector import QdrantVectorStore
 
+# Chunks kept per deal: enough to show why a deal matched without letting one
+# long CIM fill the whole scan.
+PRECEDENT_PER_DEAL = 3
+# Local aggregation over-fetches raw chunks so grouping still yields enough deals.
+PRECEDENT_OVERFETCH = 4
+
+
+# A precedent is a search hit enriched in place with its document and deal metadata.
+PrecedentResult = EvidenceRecord
+
 
 @dataclass
-class PrecedentResult:
-    document_id: str
-    filename: str
+class PrecedentGroup:
+    """One precedent deal (or unassigned document) with its best chunks."""
+
+    key: str
     deal_id: str | None
     deal_name: str | None
-    category: str
-    deal_outcome: str | None
     score: float
-    page_number: int
-    chunk_index: int
-    evidence: str
-    sector: str | None
-    stage: str | None
-    geography: str | None
-    decision_status: str | None
-    outcome_status: str | None
+    precedents: list[EvidenceRecord] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Retrieval
+# ---------------------------------------------------------------------------
+
+def group_precedents(
+    results: list[EvidenceRecord], max_deals: int, per_deal: int = PRECEDENT_PER_DEAL
+) -> list[PrecedentGroup]:
+    """Local top-``max_deals`` aggregation, ``per_deal`` best chunks each.
+
+    Documents without a deal form their own group, so unassigned evidence
+    still shows up as a precedent.
+    """
+    groups: dict[str, PrecedentGroup] = {}
+    for result in sorted(results, key=lambda item: item.score, reverse=True):
+        key = result.deal_id or f"document:{result.document_id}"
+        group = groups.get(key)
+        if group is None:
+            if len(groups) >= max_deals:
+                continue
+            group = groups[key] = PrecedentGroup(key, result.deal_id, result.deal_name, result.score)
+        if len(group.precedents) < per_deal:
+            group.precedents.append(result)
+    return list(groups.values())
+
+
+def flatten_groups(groups: list[PrecedentGroup], limit: int | None = None) -> list[EvidenceRecord]:
+    """Group order, best group first; the flat precedent list the scan summarises."""
+    flat = [result for group in groups for result in group.precedents]
+    return flat[:limit] if limit is not None else flat
+
+
+def _deals_for(top_k: int, per_deal: int) -> int:
+    return max(1, math.ceil(top_k / per_deal))
+
+
+def find_precedent_groups(
+    db: Session,
+    vector_store: QdrantVectorStore,
+    query: str,
+    doc_ids: list[str] | None = None,
+    categories: list[str] | None = None,
+    deal_outcomes: list[str] | None = None,
+    max_deals: int = 5,
+    per_deal: int = PRECEDENT_PER_DEAL,
+) -> list[PrecedentGroup]:
+    """Top ``max_deals`` precedents with their best ``per_deal`` chunks.
+
+    Qdrant groups by the ``deal_id`` payload. Unassigned documents carry no
+    ``deal_id``, so when that returns fewer deals than asked for the hits are
+    over-fetched and grouped locally instead.
+    """
+    filters = dict(doc_ids=doc_ids, categories=categories, deal_outcomes=deal_outcomes)
+    grouped = vector_store.search_groups(query, "deal_id", max_deals, per_deal, **filters)
+    raw_hits = [hit for _, hits in grouped for hit in hits]
+    if len(grouped) < max_deals:
+        raw_hits = vector_store.search(query, top_k=max_deals * per_deal * PRECEDENT_OVERFETCH, **filters)
+    return group_precedents(_resolve_precedents(db, raw_hits), max_deals, per_deal)
+
+
+async def afind_precedent_groups(
+    db: Session,
+    vector_store: QdrantVectorStore,
+    query: str,
+    doc_ids: list[str] | None = None,
+    categories: list[str] | None = None,
+    deal_outcomes: list[str] | None = None,
+    max_deals: int = 5,
+    per_deal: int = PRECEDENT_PER_DEAL,
+) -> list[PrecedentGroup]:
+    """Async ``find_precedent_groups``."""
+    filters = dict(doc_ids=doc_ids, categories=categories, deal_outcomes=deal_outcomes)
+    grouped = await vector_store.asearch_groups(query, "deal_id", max_deals, per_deal, **filters)
+    raw_hits = [hit for _, hits in grouped for hit in hits]
+    if len(grouped) < max_deals:
+        raw_hits = await vector_store.asearch(query, top_k=max_deals * per_deal * PRECEDENT_OVERFETCH, **filters)
+    if not raw_hits:
+        return []
+    return group_precedents(await run_db(_resolve_precedents, db, raw_hits), max_deals, per_deal)
 
 
 def find_precedents(
@@ -37,62 +122,50 @@ def find_precedents(
     categories: list[str] | None = None,
     deal_outcomes: list[str] | None = None,
     top_k: int = 12,
-) -> list[PrecedentResult]:
-    raw_hits = vector_store.search(
-        query,
-        doc_ids=doc_ids,
-        top_k=top_k,
-        categories=categories,
-        deal_outcomes=deal_outcomes,
+    per_deal: int = PRECEDENT_PER_DEAL,
+) -> list[EvidenceRecord]:
+    """Up to ``top_k`` precedent chunks, at most ``per_deal`` from any one deal."""
+    groups = find_precedent_groups(
+        db, vector_store, query, doc_ids, categories, deal_outcomes, _deals_for(top_k, per_deal), per_deal
+    )
+    return flatten_groups(groups, top_k)
+
+
+async def afind_precedents(
+    db: Session,
+    vector_store: QdrantVectorStore,
+    query: str,
+    doc_ids: list[str] | None = None,
+    categories: list[str] | None = None,
+    deal_outcomes: list[str] | None = None,
+    top_k: int = 12,
+    per_deal: int = PRECEDENT_PER_DEAL,
+) -> list[EvidenceRecord]:
+    """Async ``find_precedents``: async vector search, SQLite on the DB executor."""
+    groups = await afind_precedent_groups(
+        db, vector_store, query, doc_ids, categories, deal_outcomes, _deals_for(top_k, per_deal), per_deal
     )
+    return flatten_groups(groups, top_k)
+
+
+def _resolve_precedents(db: Session, raw_hits: list[EvidenceRecord]) -> list[EvidenceRecord]:
+    """Attach document and deal metadata to raw vector hits."""
     if not raw_hits:
         return []
+    with span("db_enrichment"):
+        return _attach_metadata(get_metadata_cache().get(db), raw_hits)
 
-    doc_ids_to_fetch = list({hit.document_id for hit in raw_hits})
-    docs = db.query(Document).filter(Document.id.in_(doc_ids_to_fetch)).all()
-    doc_map = {doc.id: doc for doc in docs}
 
-    links = db.query(DealDocumentLink).filter(DealDocumentLink.document_id.in_(doc_ids_to_fetch)).all()
-    deal_ids = list({link.deal_id for link in links})
-    deals = db.query(Deal).filter(Deal.id.in_(deal_ids)).all() if deal_ids else []
+def _attach_metadata(metadata: MetadataSnapshot, raw_hits: list[EvidenceRecord]) -> list[EvidenceRecord]:
+    documents = metadata.documents
+    for hit in raw_hits:
+        doc = documents.get(hit.document_id)
+        hit.enrich(doc, metadata.deal(doc.deal_id) if doc else None)
+    return raw_hits
 
-    link_map = defaultdict(list)
-    for link in links:
-        link_map[link.document_id].append(link)
-    deal_map = {deal.id: deal for deal in deals}
 
-    results: list[PrecedentResult] = []
-    for hit in raw_hits:
-        doc = doc_map.get(hit.document_id)
-        linked_deal = None
-        if hit.document_id in link_map:
-            linked_deal = deal_map.get(link_map[hit.document_id][0].deal_id)
-
-        results.append(
-            PrecedentResult(
-                document_id=hit.document_id,
-                filename=hit.filename,
-                deal_id=linked_deal.id if linked_deal else None,
-                deal_name=linked_deal.name if linked_deal else None,
-                category=doc.category if doc else hit.category,
-                deal_outcome=doc.deal_outcome if doc else hit.deal_outcome,
-                score=hit.score,
-                page_number=hit.page_number,
-                chunk_index=hit.chunk_index,
-                evidence=hit.content,
-                sector=linked_deal.sector if linked_deal else None,
-                stage=linked_deal.stage if linked_deal else None,
-                geography=linked_deal.geography if linked_deal else None,
-                decision_status=linked_deal.decision_status if linked_deal else None,
-                outcome_status=linked_deal.outcome_status if linked_deal else None,
-            )
-        )
-
-    return results
-
-
-def summarize_precedents(results: list[PrecedentResult]) -> dict[str, Any]:
-    buckets: dict[str, list[dict[str, Any]]] = {
+def summarize_precedents(results: list[EvidenceRecord]) -> dict[str, Any]:
+    buckets: dict[str, list[EvidenceRecord]] = {
         "invested": [],
         "passed": [],
         "exited": [],
@@ -103,27 +176,22 @@ def summarize_precedents(results: list[PrecedentResult]) -> dict[str, Any]:
         bucket = item.deal_outcome or "other"
         if bucket not in buckets:
             bucket = "other"
-        buckets[bucket].append(
-            {
-                "document_id": item.document_id,
-                "filename": item.filename,
-                "deal_id": item.deal_id,
-                "deal_name": item.deal_name,
-                "category": item.category,
-                "deal_outcome": item.deal_outcome,
-                "score": item.score,
-                "page_number": item.page_number,
-                "chunk_index": item.chunk_index,
-                "evidence": item.evidence,
-                "sector": item.sector,
-                "stage": item.stage,
-                "geography": item.geography,
-                "decision_status": item.decision_status,
-                "outcome_status": item.outcome_status,
-            }
-        )
+        buckets[bucket].append(item)
 
     return {
         "total": len(results),
-        "buckets": buckets,
+        "buckets": {name: PRECEDENT_VIEW.many(items) for name, items in buckets.items()},
     }
+
+
+def summarize_groups(groups: list[PrecedentGroup]) -> list[dict[str, Any]]:
+    return [
+        {
+            "deal_id": group.deal_id,
+            "deal_name": group.deal_name,
+            "score": group.score,
+            "document_ids": sorted({item.document_id for item in group.precedents}),
+            "chunks": len(group.precedents),
+        }
+        for group in groups
+    ]
@@ -0,0 +1,485 @@
+"""Opt-in, rate-limited profiling of single requests and ingestions.
+
+A request is profiled when it carries ``X-Profile: 1`` (or ``?profile=1``);
+an ingestion when the upload sets the ``profile`` form field. The value picks
+the engine:
+
+* ``sampling`` (default) — a stdlib stack sampler. It reads
+  ``sys._current_frames()`` every few milliseconds for the threads working
+  on the request: the thread that started the capture, plus executor
+  threads while they run ``concurrency.run_in`` calls for it. It writes
+  collapsed stacks (``.folded``, for speedscope or flamegraph.pl) and a
+  text summary.
+* ``cprofile`` — deterministic ``cProfile``. It only sees the thread that
+  started the capture, so it suits ingestion and sync code. It writes a
+  pstats dump (``.prof``) and a text summary.
+
+Captures are safe to leave enabled in production. Only
+``profiling_max_concurrent`` run at a time, a new one may start at most every
+``profiling_min_interval_seconds``, each stops sampling after
+``profiling_max_duration_seconds``, and only the newest
+``profiling_max_profiles`` are kept. Rejected captures do not fail the
+request; the response gets ``X-Profile-Skipped`` instead.
+
+On the event loop thread, a sampled stack can belong to any coroutine that
+happens to be running, so a profile of an async route may include
+concurrent requests.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import parse_qs
+
+from backend.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ENGINES = ("sampling", "cprofile")
+PROFILE_HEADER = "x-profile"
+TOKEN_HEADER = "x-profile-token"
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_PROFILE_ID_RE = re.compile(r"^[0-9A-Za-z_-]+$")
+
+_current_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+
+class ProfileRejected(Exception):
+    """Raised when a capture cannot start; ``reason`` is disabled, busy or rate_limited."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass
+class ProfileRecord:
+    profile_id: str
+    kind: str  # request | ingestion
+    target: str  # "POST /workflow/run" or a document id
+    engine: str
+    started_at: str
+    duration_ms: float = 0.0
+    samples: int = 0
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    artifacts: dict[str, str] = field(default_factory=dict)  # artifact name -> file name
+
+
+def parse_profile_flag(value: Optional[str]) -> Optional[str]:
+    """Map a header/query/form value to an engine, or None when profiling was not asked for."""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ENGINES:
+        return value
+    if value in _TRUE_VALUES:
+        return settings.profiling_engine
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Engines
+# ---------------------------------------------------------------------------
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stacks of registered threads from a daemon thread."""
+
+    def __init__(self, interval_s: float, max_duration_s: float):
+        self.interval_s = interval_s
+        self.max_duration_s = max_duration_s
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._threads: Counter[int] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def add_thread(self, ident: int) -> None:
+        with self._lock:
+            self._threads[ident] += 1
+
+    def remove_thread(self, ident: int) -> None:
+        with self._lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_duration_s
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s) and time.monotonic() < deadline:
+            with self._lock:
+                idents = [ident for ident in self._threads if ident != own]
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 40) -> str:
+        own: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        total = self.samples or 1
+        lines = [f"{self.samples} samples every {self.interval_s * 1000:g} ms", "", "Self time:"]
+        lines += [f"{100 * n / total:6.1f}%  {n:6d}  {label}" for label, n in own.most_common(top)]
+        lines += ["", "Inclusive time:"]
+        lines += [f"{100 * n / total:6.1f}%  {n:6d}  {label}" for label, n in inclusive.most_common(top)]
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+
+class ProfileSession:
+    def __init__(self, profiler: "Profiler", kind: str, target: str, engine: str):
+        self.profiler = profiler
+        stamp = datetime.now(timezone.utc)
+        self.record = ProfileRecord(
+            profile_id=f"{stamp:%Y%m%dT%H%M%S%f}-{kind}-{uuid.uuid4().hex[:8]}",
+            kind=kind,
+            target=target,
+            engine=engine,
+            started_at=stamp.isoformat(),
+        )
+        self._started = time.perf_counter()
+        self._owner = threading.get_ident()
+        self._sampler: Optional[StackSampler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._token: Optional[contextvars.Token] = None
+        if engine == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = StackSampler(
+                settings.profiling_sample_interval_ms / 1000, settings.profiling_max_duration_seconds
+            )
+            self._sampler.add_thread(self._owner)
+            self._sampler.start()
+        self._token = _current_session.set(self)
+
+    @property
+    def profile_id(self) -> str:
+        return self.record.profile_id
+
+    def add_thread(self, ident: int) -> None:
+        if self._sampler is not None:
+            self._sampler.add_thread(ident)
+
+    def remove_thread(self, ident: int) -> None:
+        if self._sampler is not None:
+            self._sampler.remove_thread(ident)
+
+    def finish(self, status_code: Optional[int] = None, error: Optional[str] = None) -> ProfileRecord:
+        """Stop capturing and write the artifacts. Must run on the thread that started the session."""
+        if self._token is not None:
+            _current_session.reset(self._token)
+            self._token = None
+        self.record.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        self.record.status_code = status_code
+        self.record.error = error
+        artifacts: dict[str, str | bytes] = {}
+        try:
+            if self._cprofile is not None:
+                self._cprofile.disable()
+                stats_text = io.StringIO()
+                stats = pstats.Stats(self._cprofile, stream=stats_text)
+                self.record.samples = stats.total_calls
+                stats.sort_stats("cumulative").print_stats(60)
+                artifacts["txt"] = stats_text.getvalue()
+                artifacts["prof"] = self._cprofile
+            elif self._sampler is not None:
+                self._sampler.stop()
+                self.record.samples = self._sampler.samples
+                artifacts["txt"] = self._sampler.summary()
+                artifacts["folded"] = self._sampler.folded()
+            self.profiler.store.save(self.record, artifacts)
+        finally:
+            self.profiler._release()
+        logger.info(
+            "Profile %s captured for %s %s (%.1f ms)",
+            self.profile_id, self.record.kind, self.record.target, self.record.duration_ms,
+        )
+        return self.record
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """Attach the current thread to the active profile, if any, for the duration of the block."""
+    session = _current_session.get()
+    if session is None:
+        yield
+        return
+    ident = threading.get_ident()
+    session.add_thread(ident)
+    try:
+        yield
+    finally:
+        session.remove_thread(ident)
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class ProfileStore:
+    """``<root>/<profile_id>.json`` metadata next to its artifacts (``.txt``, ``.folded``, ``.prof``)."""
+
+    def __init__(self, root: Path, max_profiles: int):
+        self.root = Path(root)
+        self.max_profiles = max_profiles
+
+    def save(self, record: ProfileRecord, artifacts: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for name, content in artifacts.items():
+            path = self.root / f"{record.profile_id}.{name}"
+            if isinstance(content, cProfile.Profile):
+                content.dump_stats(str(path))
+            elif isinstance(content, bytes):
+                path.write_bytes(content)
+            else:
+                path.write_text(content, encoding="utf-8")
+            record.artifacts[name] = path.name
+        tmp = self.root / f"{record.profile_id}.json.tmp"
+        tmp.write_text(json.dumps(asdict(record), indent=2), encoding="utf-8")
+        os.replace(tmp, self.root / f"{record.profile_id}.json")
+        self.prune()
+
+    def _metadata_paths(self) -> list[Path]:
+        if not self.root.exists():
+            return []
+        # Ids start with a UTC timestamp, so name order is age order.
+        return sorted(self.root.glob("*.json"), reverse=True)
+
+    def prune(self) -> None:
+        for path in self._metadata_paths()[self.max_profiles:]:
+            profile_id = path.stem
+            for artifact in self.root.glob(f"{profile_id}.*"):
+                artifact.unlink(missing_ok=True)
+
+    def list(self, limit: int = 50, kind: Optional[str] = None, target: Optional[str] = None) -> list[ProfileRecord]:
+        records = []
+        for path in self._metadata_paths():
+            try:
+                record = ProfileRecord(**json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError):
+                continue
+            if (kind and record.kind != kind) or (target and target not in record.target):
+                continue
+            records.append(record)
+            if len(records) >= limit:
+                break
+        return records
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        if not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = self.root / f"{profile_id}.json"
+        if not path.exists():
+            return None
+        return ProfileRecord(**json.loads(path.read_text(encoding="utf-8")))
+
+    def artifact_path(self, record: ProfileRecord, artifact: str) -> Optional[Path]:
+        name = record.artifacts.get(artifact)
+        return self.root / name if name else None
+
+
+# ---------------------------------------------------------------------------
+# Profiler
+# ---------------------------------------------------------------------------
+
+
+class Profiler:
+    def __init__(self, store: ProfileStore, max_concurrent: int, min_interval_s: float, enabled: bool = True):
+        self.store = store
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval_s = min_interval_s
+        self.enabled = enabled
+        self._active = 0
+        self._last_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self.rejected: Counter[str] = Counter()
+
+    def start(self, kind: str, target: str, engine: Optional[str] = None) -> ProfileSession:
+        engine = engine or settings.profiling_engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown profiling engine {engine!r}; expected one of {ENGINES}")
+        with self._lock:
+            reason = None
+            now = time.monotonic()
+            if not self.enabled:
+                reason = "disabled"
+            elif self._active >= self.max_concurrent or (engine == "cprofile" and sys.getprofile() is not None):
+                reason = "busy"
+            elif self._last_started is not None and now - self._last_started < self.min_interval_s:
+                reason = "rate_limited"
+            if reason:
+                self.rejected[reason] += 1
+                raise ProfileRejected(reason)
+            self._active += 1
+            self._last_started = now
+        try:
+            return ProfileSession(self, kind, target, engine)
+        except BaseException:
+            self._release()
+            raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+    @contextmanager
+    def capture(self, kind: str, target: str, engine: Optional[str] = None) -> Iterator[Optional[ProfileSession]]:
+        """Profile the block; yields None (and runs unprofiled) when the capture is rejected."""
+        try:
+            session = self.start(kind, target, engine)
+        except ProfileRejected as exc:
+            logger.info("Profile of %s %s skipped: %s", kind, target, exc.reason)
+            yield None
+            return
+        error = None
+        try:
+            yield session
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            session.finish(error=error)
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            if settings.profiling_enabled and not settings.profiling_token:
+                logger.warning("Profiling is enabled without PROFILING_TOKEN; any client can request captures")
+            _profiler = Profiler(
+                ProfileStore(Path(settings.logs_root) / "profiles", settings.profiling_max_profiles),
+                max_concurrent=settings.profiling_max_concurrent,
+                min_interval_s=settings.profiling_min_interval_seconds,
+                enabled=settings.profiling_enabled,
+            )
+        return _profiler
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+
+class ProfilingMiddleware:
+    """Profiles HTTP requests that ask for it; every other request passes straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        engine, token = self._requested(scope)
+        if engine is None:
+            await self.app(scope, receive, send)
+            return
+        if settings.profiling_token and token != settings.profiling_token:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-skipped", b"unauthorized"))
+            return
+
+        target = f"{scope['method']} {scope['path']}"
+        try:
+            session = get_profiler().start("request", target, engine)
+        except ProfileRejected as exc:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-skipped", exc.reason.encode()))
+            return
+
+        status: dict[str, int] = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", session.profile_id.encode())]}
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_id)
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            session.finish(status_code=status.get("code"), error=error)
+
+    @staticmethod
+    def _requested(scope) -> tuple[Optional[str], Optional[str]]:
+        engine, token = None, None
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER.encode():
+                engine = parse_profile_flag(value.decode("latin-1"))
+            elif name == TOKEN_HEADER.encode():
+                token = value.decode("latin-1")
+        if engine is None and b"profile" in scope.get("query_string", b""):
+            values = parse_qs(scope["query_string"].decode("latin-1")).get("profile")
+            engine = parse_profile_flag(values[-1]) if values else None
+        return engine, token
+
+    @staticmethod
+    def _with_header(send, name: bytes, value: bytes):
+        async def wrapped(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (name, value)]}
+            await send(message)
+
+        return wrapped
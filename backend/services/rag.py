@@ -1,11 +1,19 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
 from textwrap import dedent
-from typing import List
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Tuple
+import asyncio
 import logging
-
-from openai import OpenAI
+import time
+import weakref
 
 from backend.config import get_settings
-from backend.services.vector import ScoredChunk
+from backend.services.metrics import count_tokens, record_duration, span
+from backend.services.evidence import SOURCE_VIEW, EvidenceRecord
+
+if TYPE_CHECKING:  # the openai package is slow to import; loaded on first LLM call
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -25,7 +33,7 @@ SYSTEM_PROMPT = dedent(
 ).strip()
 
 
-def _build_context(chunks: List[ScoredChunk], max_tokens: int = 4000) -> str:
+def _build_context(chunks: List[EvidenceRecord], max_tokens: int = 4000) -> str:
     """Build context from chunks, limiting total size to avoid exceeding context window."""
     lines: List[str] = []
     total_chars = 0
@@ -48,20 +56,24 @@ def _build_context(chunks: List[ScoredChunk], max_tokens: int = 4000) -> str:
     return "\n\n---\n\n".join(lines)
 
 
-def generate_answer(query: str, retrieved_chunks: List[ScoredChunk]) -> dict:
-    # For LM Studio (local server), api_key can be dummy value if not set
-    api_key = settings.llm_api_key if settings.llm_api_key else "not-needed"
-    client = OpenAI(api_key=api_key, base_url=settings.llm_base_url)
-    context = _build_context(retrieved_chunks)
-
+def _resolve_model_name() -> str:
     # LM Studio often ignores the model name and uses the loaded model
     # Use "local-model" or the configured model name
-    model_name = settings.llm_model
     if "127.0.0.1" in settings.llm_base_url or "localhost" in settings.llm_base_url:
         # Try common LM Studio model names
-        model_name = "local-model"  # LM Studio default
+        return "local-model"  # LM Studio default
+    return settings.llm_model
+
 
-    messages = [
+def _llm_api_key() -> str:
+    # For LM Studio (local server), api_key can be dummy value if not set
+    return settings.llm_api_key if settings.llm_api_key else "not-needed"
+
+
+def _build_messages(query: str, retrieved_chunks: List[EvidenceRecord]) -> List[dict]:
+    with span("context_build"):
+        context = _build_context(retrieved_chunks)
+    return [
         {"role": "system", "content": SYSTEM_PROMPT},
         {
             "role": "user",
@@ -69,28 +81,30 @@ def generate_answer(query: str, retrieved_chunks: List[ScoredChunk]) -> dict:
         },
     ]
 
-    logger.info(f"Sending request to LLM: base_url={settings.llm_base_url}, model={model_name}")
 
-    completion = client.chat.completions.create(
-        model=model_name,
-        messages=messages,
-        temperature=0,
-        max_tokens=500,
-    )
+def estimate_prompt_tokens(messages: List[dict]) -> int:
+    """Approximate prompt size: 1 token ≈ 4 characters, as in ``_build_context``."""
+    return sum(len(message["content"]) for message in messages) // 4
+
+
+def _record_usage(usage, messages: List[dict], answer: str) -> None:
+    """Count LLM tokens; estimate when the server reports no usage."""
+    if usage is not None:
+        count_tokens(usage.prompt_tokens or 0, usage.completion_tokens or 0)
+    else:
+        count_tokens(estimate_prompt_tokens(messages), len(answer) // 4)
 
-    logger.info(f"LLM raw response: choices={len(completion.choices) if completion.choices else 0}")
-    if completion.choices:
-        msg = completion.choices[0].message
-        logger.info(f"Message content: {bool(msg.content)}, reasoning: {hasattr(msg, 'reasoning_content')}")
+
+def _build_answer_payload(content: str, reasoning: str, retrieved_chunks: List[EvidenceRecord]) -> dict:
+    logger.info(f"Message content: {bool(content)}, reasoning: {bool(reasoning)}")
 
     # Handle empty content (LM Studio may return reasoning_content only)
-    message = completion.choices[0].message if completion.choices else None
-    answer = message.content if message and message.content else ""
+    answer = content or ""
     # If still empty, try reasoning_content as fallback
-    if not answer and message:
-        answer = getattr(message, "reasoning_content", "")[:500]
+    if not answer:
+        answer = (reasoning or "")[:500]
 
-    logger.info(f"LLM processed: answer_length={len(answer)}, has_choices={bool(completion.choices)}")
+    logger.info(f"LLM processed: answer_length={len(answer)}")
 
     if not answer:
         # Return a helpful message instead of raising error
@@ -106,18 +120,7 @@ def generate_answer(query: str, retrieved_chunks: List[ScoredChunk]) -> dict:
         )
         logger.warning(f"LLM empty response: model={settings.llm_model}, url={settings.llm_base_url}")
 
-    sources = [
-        {
-            "filename": chunk.filename,
-            "page_number": chunk.page_number,
-            "doc_id": chunk.document_id,
-            "chunk_text": chunk.content,
-            "category": chunk.category,
-            "deal_outcome": chunk.deal_outcome,
-            "chunk_index": chunk.chunk_index,
-        }
-        for chunk in retrieved_chunks
-    ]
+    sources = SOURCE_VIEW.many(retrieved_chunks)
 
     return {
         "answer": answer,
@@ -125,3 +128,131 @@ def generate_answer(query: str, retrieved_chunks: List[ScoredChunk]) -> dict:
         "prompt_version": PROMPT_VERSION,
         "model_name": settings.llm_model,
     }
+
+
+def generate_answer(query: str, retrieved_chunks: List[EvidenceRecord]) -> dict:
+    from openai import OpenAI
+
+    client = OpenAI(api_key=_llm_api_key(), base_url=settings.llm_base_url, timeout=settings.llm_timeout_seconds)
+    model_name = _resolve_model_name()
+    logger.info(f"Sending request to LLM: base_url={settings.llm_base_url}, model={model_name}")
+
+    messages = _build_messages(query, retrieved_chunks)
+    with span("llm_generation"):
+        completion = client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            temperature=0,
+            max_tokens=500,
+        )
+
+    logger.info(f"LLM raw response: choices={len(completion.choices) if completion.choices else 0}")
+    message = completion.choices[0].message if completion.choices else None
+    content = message.content if message and message.content else ""
+    reasoning = (getattr(message, "reasoning_content", "") or "") if message else ""
+    _record_usage(completion.usage, messages, content)
+    return _build_answer_payload(content, reasoning, retrieved_chunks)
+
+
+# One pooled async client per endpoint; /config/llm can switch endpoints at runtime.
+_async_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+
+
+def _get_async_client() -> AsyncOpenAI:
+    key = (settings.llm_base_url, _llm_api_key())
+    client = _async_clients.get(key)
+    if client is None:
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(api_key=key[1], base_url=key[0], timeout=settings.llm_timeout_seconds)
+        _async_clients[key] = client
+    return client
+
+
+# asyncio primitives belong to one event loop; keep one limiter per loop.
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@asynccontextmanager
+async def _llm_slot() -> AsyncIterator[None]:
+    """Hold one of ``settings.llm_max_concurrency`` gateway slots; the wait is timed as ``llm_queue``."""
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(max(1, settings.llm_max_concurrency))
+    started = time.perf_counter()
+    async with semaphore:
+        record_duration("llm_queue", time.perf_counter() - started)
+        yield
+
+
+async def agenerate_answer(query: str, retrieved_chunks: List[EvidenceRecord]) -> dict:
+    """Async ``generate_answer``: awaits the LLM without holding a worker thread.
+
+    The completion is streamed so time-to-first-token can be measured
+    (``llm_ttft``); the answer is still returned whole. At most
+    ``settings.llm_max_concurrency`` completions run at once per process.
+    """
+    model_name = _resolve_model_name()
+    logger.info(f"Sending request to LLM: base_url={settings.llm_base_url}, model={model_name}")
+
+    messages = _build_messages(query, retrieved_chunks)
+    async with _llm_slot():
+        content, reasoning, usage = await _stream_completion(model_name, messages)
+    _record_usage(usage, messages, content)
+    return _build_answer_payload(content, reasoning, retrieved_chunks)
+
+
+# Endpoints that rejected stream_options; their token usage is estimated instead.
+_no_stream_usage: set[str] = set()
+
+
+async def _open_stream(model_name: str, messages: List[dict]):
+    """Start a streamed completion, asking for usage unless the endpoint is known to reject it."""
+    from openai import BadRequestError
+
+    client = _get_async_client()
+    base_url = settings.llm_base_url
+    kwargs = dict(model=model_name, messages=messages, temperature=0, max_tokens=500, stream=True)
+    if not settings.llm_stream_usage or base_url in _no_stream_usage:
+        return await client.chat.completions.create(**kwargs)
+    try:
+        return await client.chat.completions.create(**kwargs, stream_options={"include_usage": True})
+    except BadRequestError as exc:
+        rejected = exc
+    # Raises again if the 400 was about something else.
+    stream = await client.chat.completions.create(**kwargs)
+    logger.warning("LLM endpoint %s rejects stream_options (%s); estimating token usage", base_url, rejected)
+    _no_stream_usage.add(base_url)
+    return stream
+
+
+async def _stream_completion(model_name: str, messages: List[dict]) -> Tuple[str, str, object]:
+    content_parts: List[str] = []
+    reasoning_parts: List[str] = []
+    usage = None
+    started = time.perf_counter()
+    with span("llm_generation"):
+        stream = await _open_stream(model_name, messages)
+        first_token_at = None
+        async for event in stream:
+            if event.usage is not None:
+                usage = event.usage
+            for choice in event.choices:
+                text = choice.delta.content or ""
+                reasoning = getattr(choice.delta, "reasoning_content", None) or ""
+                if first_token_at is None and (text or reasoning):
+                    first_token_at = time.perf_counter()
+                    record_duration("llm_ttft", first_token_at - started)
+                content_parts.append(text)
+                reasoning_parts.append(reasoning)
+    return "".join(content_parts), "".join(reasoning_parts), usage
+
+
+async def close_async_clients() -> None:
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        await client.close()
@@ -0,0 +1,696 @@
+"""Rebuilding the chunk vector index, and blue/green embedding model migrations.
+
+Both are background jobs (``IndexJob``) that fill a new versioned
+collection, ``<QDRANT_COLLECTION>__<model>__<timestamp>``, which records its
+model in the collection metadata. Batches are embedded and upserted in
+parallel (``REINDEX_WORKERS``). Neither writes to the collection that is
+serving, which keeps answering queries throughout. Documents ingested or
+deleted while the bulk pass runs are replayed from ``change_log``, from a
+watermark taken before the scan. The replay runs once before the switch and
+once after, so writes that landed in the old collection at the last moment
+are carried over.
+
+Cutover moves the ``QDRANT_COLLECTION`` alias in one
+``update_collection_aliases`` call, then switches the vector store's
+``ServingIndex``. From its next search, this process queries the new
+collection with the new model. Other processes follow the alias on their
+next write, or on their next search once ``QDRANT_SERVING_TTL_SECONDS`` are
+up. Until then they keep querying the old collection with the old model,
+which stays consistent. The old collection is kept for
+rollback unless ``drop_previous`` is set.
+
+* **Rebuild** (``IndexRebuild``): streams the parsed-chunk artifacts from
+  the workspace, located through ``DocumentProvenance.metadata_json``. This
+  is the way back when the Qdrant collection is lost, without parsing again.
+* **Migration** (``EmbeddingMigration``): re-embeds the chunk text stored in
+  SQLite with another model.
+
+One job runs at a time. Progress and throughput are reported by
+``JobProgress.snapshot``.
+
+A tree created before aliases has a plain collection under the live name. The
+first cutover has to delete that collection before the alias can take its
+name. It only does so with ``replace_legacy``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Chunk, Document, DocumentProvenance
+from backend.services.change_tracking import DELETE, changes_since, latest_change_id, net_changes
+from backend.services.chunk_view import primary_deal_subquery
+from backend.services.metadata_cache import get_metadata_cache
+from backend.services.metrics import count_chunks, span
+from backend.services.parser import ParsedChunk
+from backend.services.vector import (
+    LegacyCollectionError,
+    ServingIndex,
+    chunk_payload,
+    create_chunk_collection,
+    get_embedding_model,
+    live_collection,
+    swap_alias,
+    versioned_collection_name,
+)
+from backend.services.workspace import iter_parsed_chunks
+
+if TYPE_CHECKING:
+    from backend.services.vector import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_DIMENSION_PROBE = "dimension probe"
+_TABLE_PAGE = 2000
+_CHANGES_PAGE = 500
+
+
+def chunk_point_id(document_id: str, chunk_index: int) -> str:
+    """Stable point id, so a retried batch or a replayed document overwrites instead of duplicating."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"pe-chunk:{document_id}:{chunk_index}"))
+
+
+def _check_swappable(client: Any, alias: str, replace_legacy: bool) -> None:
+    """Fail before spending an hour on embeddings, not at the swap."""
+    if not replace_legacy and live_collection(client, alias)[1]:
+        raise LegacyCollectionError(
+            f"{alias!r} is a plain collection, not an alias; pass replace_legacy to delete it and swap"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SourceDocument:
+    document_id: str
+    filename: str
+    metadata: dict[str, Any]
+    chunks_path: Optional[Path] = None
+
+
+Pair = tuple[SourceDocument, ParsedChunk]
+
+
+def artifact_sources(db: Session, document_ids: Optional[Iterable[str]] = None) -> tuple[list[SourceDocument], list[str]]:
+    """Documents with a parsed-chunks file on disk, and the ids of those without one."""
+    query = db.query(Document, DocumentProvenance.metadata_json).outerjoin(
+        DocumentProvenance, DocumentProvenance.document_id == Document.id
+    )
+    if document_ids is not None:
+        query = query.filter(Document.id.in_(list(document_ids)))
+    snapshot = get_metadata_cache().get(db)
+    sources, skipped = [], []
+    for document, metadata_json in query.order_by(Document.id):
+        chunks_path = (metadata_json or {}).get("chunks_path")
+        if not chunks_path or not Path(chunks_path).exists():
+            skipped.append(document.id)
+            continue
+        info = snapshot.documents.get(document.id)
+        sources.append(SourceDocument(
+            document_id=document.id,
+            filename=document.filename,
+            metadata={
+                "category": document.category,
+                "deal_outcome": document.deal_outcome,
+                "deal_id": info.deal_id if info else None,
+            },
+            chunks_path=Path(chunks_path),
+        ))
+    return sources, skipped
+
+
+def artifact_chunks(sources: Iterable[SourceDocument]) -> Iterator[Pair]:
+    for source in sources:
+        for chunk in iter_parsed_chunks(source.chunks_path):
+            yield source, chunk
+
+
+def table_chunks(
+    session_factory: Callable[[], Session], document_ids: Optional[Iterable[str]] = None
+) -> Iterator[Pair]:
+    """Stored chunks with their document payload, in keyset pages.
+
+    Each page is its own short read, so the bulk pass never holds a SQLite
+    read transaction open against ingestion.
+    """
+    primary = primary_deal_subquery()
+    stmt = (
+        select(
+            Chunk.document_id, Chunk.chunk_index, Chunk.content, Chunk.page_number, Chunk.source, Chunk.section,
+            Document.filename, Document.category, Document.deal_outcome, primary.c.deal_id,
+        )
+        .join(Document, Document.id == Chunk.document_id)
+        .outerjoin(primary, primary.c.document_id == Chunk.document_id)
+        .order_by(Chunk.document_id, Chunk.chunk_index)
+        .limit(_TABLE_PAGE)
+    )
+    if document_ids is not None:
+        stmt = stmt.where(Chunk.document_id.in_(list(document_ids)))
+    after: Optional[tuple[str, int]] = None
+    source: Optional[SourceDocument] = None
+    while True:
+        page_stmt = stmt if after is None else stmt.where(tuple_(Chunk.document_id, Chunk.chunk_index) > tuple_(*after))
+        db = session_factory()
+        try:
+            rows = db.execute(page_stmt).all()
+        finally:
+            db.close()
+        for row in rows:
+            if source is None or source.document_id != row.document_id:
+                source = SourceDocument(
+                    document_id=row.document_id,
+                    filename=row.filename,
+                    metadata={"category": row.category, "deal_outcome": row.deal_outcome, "deal_id": row.deal_id},
+                )
+            yield source, ParsedChunk(
+                content=row.content, page_number=row.page_number, chunk_index=row.chunk_index,
+                source=row.source or "", section=row.section,
+            )
+        if len(rows) < _TABLE_PAGE:
+            return
+        after = (rows[-1].document_id, rows[-1].chunk_index)
+
+
+# ---------------------------------------------------------------------------
+# Rebuild
+# ---------------------------------------------------------------------------
+
+class ReindexCancelled(Exception):
+    pass
+
+
+class MissingArtifactsError(RuntimeError):
+    """Documents without a parsed-chunks file would drop out of the index, and ``force`` was not given."""
+
+
+class Reindexer:
+    def __init__(
+        self,
+        vector_store: QdrantVectorStore,
+        model_name: Optional[str] = None,
+        embedding: Optional[Any] = None,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ):
+        self.store = vector_store
+        self.client = vector_store.client
+        self.alias = settings.qdrant_collection
+        self.model_name = model_name or vector_store.serving.model_name
+        self._embedding = embedding
+        self.batch_size = max(1, batch_size or settings.embedding_batch_size)
+        self.workers = max(1, workers or settings.reindex_workers)
+
+    @property
+    def embedding(self) -> Any:
+        if self._embedding is None:
+            self._embedding = get_embedding_model(self.model_name)
+        return self._embedding
+
+    def create_collection(self) -> ServingIndex:
+        """A new, empty versioned collection for ``model_name``."""
+        dimension = len(self.embedding.embed([_DIMENSION_PROBE])[0])
+        target = ServingIndex(versioned_collection_name(self.alias, self.model_name), self.model_name, dimension)
+        create_chunk_collection(self.client, target.collection, dimension, self.model_name)
+        return target
+
+    def cut_over(self, target: ServingIndex, replace_legacy: bool = False) -> Optional[str]:
+        """Move the alias to ``target``, then serve it in this process; returns the previous collection."""
+        previous = swap_alias(self.client, self.alias, target.collection, replace_legacy)
+        # Searches until here used the old collection with the old model, which is consistent.
+        self.store.switch_to(target)
+        return previous
+
+    def _batches(self, pairs: Iterable[Pair]) -> Iterator[list[Pair]]:
+        batch: list[Pair] = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def index(
+        self,
+        collection: str,
+        pairs: Iterable[Pair],
+        on_progress: Optional[Callable[[int], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """Embed and upsert batches on ``workers`` threads, with a bounded number in flight.
+
+        ``on_progress(chunks)`` is called from this thread as each batch lands.
+        """
+        indexed = 0
+
+        def collect(done: Iterable[Future]) -> None:
+            nonlocal indexed
+            for future in done:
+                count = future.result()
+                indexed += count
+                if on_progress:
+                    on_progress(count)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reindex") as pool:
+            pending: set[Future] = set()
+            for batch in self._batches(pairs):
+                if cancel is not None and cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise ReindexCancelled()
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(self._index_batch, collection, batch))
+            collect(wait(pending).done)
+        return indexed
+
+    def _index_batch(self, collection: str, batch: list[Pair]) -> int:
+        from qdrant_client.http import models
+
+        with span("embed"):
+            vectors = self.embedding.embed([chunk.content for _, chunk in batch])
+        points = [
+            models.PointStruct(
+                id=chunk_point_id(source.document_id, chunk.chunk_index),
+                vector=vector,
+                payload=chunk_payload(chunk, source.document_id, source.filename, source.metadata),
+            )
+            for (source, chunk), vector in zip(batch, vectors)
+        ]
+        with span("upsert"):
+            self.client.upsert(collection_name=collection, points=points, wait=True)
+        count_chunks("reindexed", len(points))
+        return len(points)
+
+    def delete_documents(self, collection: str, document_ids: list[str]) -> None:
+        from qdrant_client.http import models
+
+        self.client.delete(
+            collection_name=collection,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    must=[models.FieldCondition(key="document_id", match=models.MatchAny(any=document_ids))]
+                )
+            ),
+            wait=True,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------------
+
+PENDING, EMBEDDING, CATCHING_UP, READY, LIVE, BUILT, FAILED, CANCELLED = (
+    "pending", "embedding", "catching_up", "ready", "live", "built", "failed", "cancelled",
+)
+ACTIVE_STATES = (PENDING, EMBEDDING, CATCHING_UP, READY)
+REBUILD, MIGRATION = "rebuild", "migration"
+
+
+@dataclass
+class JobProgress:
+    id: str
+    kind: str
+    model_name: str
+    source_collection: str
+    target_collection: Optional[str] = None
+    previous_collection: Optional[str] = None
+    state: str = PENDING
+    dimension: Optional[int] = None
+    documents: int = 0
+    skipped_documents: list[str] = field(default_factory=list)
+    # From the chunks table; a rebuild embeds its artifacts, which may differ slightly.
+    total_chunks: int = 0
+    embedded_chunks: int = 0
+    replayed_documents: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    def snapshot(self, now: Optional[float] = None, started: Optional[float] = None) -> dict[str, Any]:
+        """The progress fields plus percent done, throughput and ETA."""
+        data = asdict(self)
+        elapsed = (now - started) if now is not None and started is not None else 0.0
+        rate = self.embedded_chunks / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total_chunks - self.embedded_chunks, 0)
+        data.update(
+            percent=min(round(100.0 * self.embedded_chunks / self.total_chunks, 1), 100.0) if self.total_chunks else 100.0,
+            elapsed_seconds=round(elapsed, 1),
+            chunks_per_second=round(rate, 1),
+            eta_seconds=round(remaining / rate, 1) if rate and self.state == EMBEDDING else None,
+        )
+        return data
+
+
+class IndexJob:
+    """Fill a new versioned collection on a background thread, catch up from change_log, then cut over.
+
+    Subclasses provide the chunks: the bulk pass, and the chunks of the
+    documents a replay re-indexes.
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        vector_store: QdrantVectorStore,
+        session_factory: Callable[[], Session],
+        model_name: Optional[str] = None,
+        auto_cutover: bool = True,
+        replace_legacy: bool = False,
+        drop_previous: bool = False,
+        on_model_change: Optional[Callable[[ServingIndex], None]] = None,
+        reindexer: Optional[Reindexer] = None,
+    ):
+        self.reindexer = reindexer or Reindexer(vector_store, model_name)
+        self.session_factory = session_factory
+        self.auto_cutover = auto_cutover
+        self.replace_legacy = replace_legacy
+        self.drop_previous = drop_previous
+        self.on_model_change = on_model_change
+        # Whether the job ends by moving the alias; checked up front for a legacy collection.
+        self.swaps = True
+        self.document_ids: Optional[set[str]] = None
+        self._source_model = vector_store.serving.model_name
+        self.progress = JobProgress(
+            id=uuid.uuid4().hex,
+            kind=self.kind,
+            model_name=self.reindexer.model_name,
+            source_collection=vector_store.serving.collection,
+        )
+        self._target: Optional[ServingIndex] = None
+        self._watermark = 0
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return self.progress.state in ACTIVE_STATES
+
+    def status(self) -> dict[str, Any]:
+        return self.progress.snapshot(self._finished or time.perf_counter(), self._started)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name=f"index-{self.kind}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def cancel(self) -> None:
+        """Stop the bulk pass, or discard a collection that is waiting for cutover."""
+        self._cancel.set()
+        with self._lock:
+            if self.progress.state == READY:
+                self._abandon(CANCELLED)
+
+    def run(self) -> None:
+        self._started = time.perf_counter()
+        self.progress.started_at = datetime.utcnow()
+        cut_over = False
+        try:
+            if self.swaps:
+                _check_swappable(self.reindexer.client, self.reindexer.alias, self.replace_legacy)
+            db = self.session_factory()
+            try:
+                # Anything written from here on is replayed from change_log.
+                self._watermark = latest_change_id(db)
+                self._prepare(db)
+            finally:
+                db.close()
+            self._target = self.reindexer.create_collection()
+            self.progress.target_collection = self._target.collection
+            self.progress.dimension = self._target.dimension
+            self.progress.state = EMBEDDING
+            logger.info(
+                "Index %s %s: %d chunks into %s with %s",
+                self.kind, self.progress.id, self.progress.total_chunks, self._target.collection,
+                self._target.model_name,
+            )
+            self.reindexer.index(self._target.collection, self._bulk_chunks(), self._advance, self._cancel)
+            self.progress.state = CATCHING_UP
+            self._replay()
+            with self._lock:
+                if self._cancel.is_set():
+                    raise ReindexCancelled()
+                self.progress.state = READY
+                if self.auto_cutover:
+                    self._cut_over_locked()
+                    cut_over = True
+                else:
+                    self._hold()
+        except ReindexCancelled:
+            self._abandon(CANCELLED)
+        except Exception as exc:
+            logger.exception("Index %s %s failed", self.kind, self.progress.id)
+            self._abandon(FAILED, f"{type(exc).__name__}: {exc}")
+        if cut_over:
+            self._after_cutover()
+
+    def cutover(self) -> None:
+        """Switch to the new collection once it is ready."""
+        with self._lock:
+            if self.progress.state != READY:
+                raise RuntimeError(f"{self.kind.capitalize()} {self.progress.id} is {self.progress.state}, not ready")
+            try:
+                self._cut_over_locked()
+            except Exception as exc:
+                self._abandon(FAILED, f"{type(exc).__name__}: {exc}")
+                raise
+        self._after_cutover()
+
+    # Subclass hooks ---------------------------------------------------
+
+    def _prepare(self, db: Session) -> None:
+        """Size the job; runs after the watermark is taken."""
+        raise NotImplementedError
+
+    def _bulk_chunks(self) -> Iterable[Pair]:
+        raise NotImplementedError
+
+    def _chunks_for(self, document_ids: list[str]) -> Iterable[Pair]:
+        raise NotImplementedError
+
+    def _hold(self) -> None:
+        """Without ``auto_cutover``: wait in READY for ``cutover()``."""
+
+    # ------------------------------------------------------------------
+
+    def _cut_over_locked(self) -> None:
+        """Replay the last writes, switch to the new collection, then replay what landed meanwhile."""
+        self._replay()
+        previous = self.reindexer.cut_over(self._target, self.replace_legacy)
+        self.progress.previous_collection = previous
+        # Serving from here on: a failure below must not delete the collection.
+        self.progress.state = LIVE
+        # Writes between the replay and the switch went to the old collection.
+        self._replay()
+        if self.drop_previous and previous:
+            self.reindexer.client.delete_collection(previous)
+        self._finish()
+        logger.info(
+            "Index %s %s is live: %s (%s); previous collection %s %s",
+            self.kind, self.progress.id, self._target.collection, self._target.model_name, previous,
+            "dropped" if self.drop_previous else "kept",
+        )
+
+    def _after_cutover(self) -> None:
+        if self.on_model_change is None or self._target.model_name == self._source_model:
+            return
+        try:
+            self.on_model_change(self._target)
+        except Exception as exc:
+            logger.warning("Index %s %s: model change hook failed: %s", self.kind, self.progress.id, exc)
+
+    def _advance(self, chunks: int) -> None:
+        self.progress.embedded_chunks += chunks
+        if self.progress.embedded_chunks // 10_000 != (self.progress.embedded_chunks - chunks) // 10_000:
+            status = self.status()
+            logger.info(
+                "Index %s %s: %d/%d chunks (%.1f/s, eta %ss)",
+                self.kind, self.progress.id, self.progress.embedded_chunks, self.progress.total_chunks,
+                status["chunks_per_second"], status["eta_seconds"],
+            )
+
+    def _replay(self) -> None:
+        """Bring the new collection up to date with change_log past the watermark."""
+        while True:
+            db = self.session_factory()
+            try:
+                entries = changes_since(db, self._watermark, limit=_CHANGES_PAGE)
+            finally:
+                db.close()
+            if not entries:
+                return
+            operations = net_changes(entries)
+            if self.document_ids is not None:
+                operations = {doc_id: op for doc_id, op in operations.items() if doc_id in self.document_ids}
+            if operations:
+                document_ids = sorted(operations)
+                self.reindexer.delete_documents(self._target.collection, document_ids)
+                upserted = [document_id for document_id in document_ids if operations[document_id] != DELETE]
+                if upserted:
+                    self.reindexer.index(self._target.collection, self._chunks_for(upserted))
+                self.progress.replayed_documents += len(document_ids)
+            self._watermark = entries[-1].id
+
+    def _finish(self) -> None:
+        self._finished = time.perf_counter()
+        self.progress.finished_at = datetime.utcnow()
+
+    def _abandon(self, state: str, error: Optional[str] = None) -> None:
+        self.progress.error = error
+        if self.progress.state in (LIVE, BUILT):
+            # Only a late step failed; the collection is in use and stays.
+            self._finish()
+            return
+        self.progress.state = state
+        self._finish()
+        if self._target is not None:
+            try:
+                self.reindexer.client.delete_collection(self._target.collection)
+            except Exception as exc:
+                logger.warning("Could not delete collection %s: %s", self._target.collection, exc)
+
+
+class IndexRebuild(IndexJob):
+    """Rebuild the chunk index from the parsed-chunk artifacts in the workspace.
+
+    Without ``swap`` the collection is built, caught up and left in place
+    (``built``) for a later cutover by hand. Only such a build may be limited
+    to ``document_ids``; swapping to it would serve a partial index. A swap
+    also fails up front when a document has no artifact, unless ``force``
+    lets those documents drop out of the index.
+    """
+
+    kind = REBUILD
+
+    def __init__(
+        self,
+        vector_store: QdrantVectorStore,
+        session_factory: Callable[[], Session],
+        model_name: Optional[str] = None,
+        document_ids: Optional[Iterable[str]] = None,
+        swap: bool = True,
+        replace_legacy: bool = False,
+        drop_previous: bool = False,
+        force: bool = False,
+        on_model_change: Optional[Callable[[ServingIndex], None]] = None,
+        reindexer: Optional[Reindexer] = None,
+    ):
+        if document_ids is not None and swap:
+            raise ValueError("A rebuild of selected documents cannot be swapped in; pass swap=False")
+        super().__init__(
+            vector_store, session_factory, model_name, auto_cutover=swap, replace_legacy=replace_legacy,
+            drop_previous=drop_previous, on_model_change=on_model_change, reindexer=reindexer,
+        )
+        self.swaps = swap
+        self.force = force
+        self.document_ids = set(document_ids) if document_ids is not None else None
+        self._sources: list[SourceDocument] = []
+
+    def _prepare(self, db: Session) -> None:
+        self._sources, self.progress.skipped_documents = artifact_sources(db, self.document_ids)
+        if self.swaps and self.progress.skipped_documents and not self.force:
+            skipped = self.progress.skipped_documents
+            raise MissingArtifactsError(
+                f"{len(skipped)} documents have no parsed artifact and would drop out of the index "
+                f"({', '.join(skipped[:10])}); pass force to swap anyway"
+            )
+        self.progress.documents = len(self._sources)
+        query = db.query(func.count(Chunk.id))
+        if self.document_ids is not None:
+            query = query.filter(Chunk.document_id.in_(sorted(self.document_ids)))
+        self.progress.total_chunks = query.scalar() or 0
+
+    def _bulk_chunks(self) -> Iterable[Pair]:
+        return artifact_chunks(self._sources)
+
+    def _chunks_for(self, document_ids: list[str]) -> Iterable[Pair]:
+        db = self.session_factory()
+        try:
+            sources, _ = artifact_sources(db, document_ids)
+        finally:
+            db.close()
+        return artifact_chunks(sources)
+
+    def _hold(self) -> None:
+        self.progress.state = BUILT
+        self._finish()
+        logger.info("Index rebuild %s built %s; alias left alone", self.progress.id, self._target.collection)
+
+
+class EmbeddingMigration(IndexJob):
+    """Re-embed every stored chunk with ``model_name`` into a shadow collection, then cut over.
+
+    Without ``auto_cutover`` the migration waits in ``ready`` for ``cutover()``.
+    """
+
+    kind = MIGRATION
+
+    def __init__(
+        self,
+        vector_store: QdrantVectorStore,
+        session_factory: Callable[[], Session],
+        model_name: str,
+        auto_cutover: bool = True,
+        replace_legacy: bool = False,
+        on_model_change: Optional[Callable[[ServingIndex], None]] = None,
+        reindexer: Optional[Reindexer] = None,
+    ):
+        super().__init__(
+            vector_store, session_factory, model_name, auto_cutover=auto_cutover, replace_legacy=replace_legacy,
+            on_model_change=on_model_change, reindexer=reindexer,
+        )
+
+    def _prepare(self, db: Session) -> None:
+        self.progress.documents = db.query(func.count(func.distinct(Chunk.document_id))).scalar() or 0
+        self.progress.total_chunks = db.query(func.count(Chunk.id)).scalar() or 0
+
+    def _bulk_chunks(self) -> Iterable[Pair]:
+        return table_chunks(self.session_factory)
+
+    def _chunks_for(self, document_ids: list[str]) -> Iterable[Pair]:
+        return table_chunks(self.session_factory, document_ids)
+
+
+_job: Optional[IndexJob] = None
+_job_lock = threading.Lock()
+
+
+def start_job(job: IndexJob) -> IndexJob:
+    """Start ``job`` in the background unless another rebuild or migration is still active."""
+    global _job
+    with _job_lock:
+        if _job is not None and _job.active:
+            raise RuntimeError(f"Index {_job.kind} {_job.progress.id} is still {_job.progress.state}")
+        if job.swaps:
+            _check_swappable(job.reindexer.client, job.reindexer.alias, job.replace_legacy)
+        _job = job
+    job.start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[IndexJob]:
+    job = _job
+    return job if job is not None and job.progress.id == job_id else None
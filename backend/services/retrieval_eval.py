@@ -0,0 +1,573 @@
+"""Offline retrieval evaluation: quality next to latency and prompt size.
+
+Queries come either from a labeled golden set (JSONL) or are replayed from
+``RetrievalTrace``. Replayed queries carry pseudo-labels: every chunk shown
+for the logged answer counts as relevant, and chunks the answer actually
+cited ("Source: <file> | Page: <n>") count double.
+
+Each ``RetrievalConfig`` varies top_k, hybrid (dense + BM25 fused with
+reciprocal rank fusion), cross-encoder rerank, chunk size and embedding model.
+Configs that share a chunk size and model share an in-memory evaluation index
+built from the SQLite chunks, so the live collection is never touched. Chunk
+sizes other than the stored one re-chunk each document's paragraphs with the
+production chunker.
+
+Relevance is matched at ``page`` granularity by default, since chunk indexes
+change with chunk size. ``chunk`` granularity is only valid for configs on
+the stored chunking.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Protocol, Sequence
+
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import ChatLog, Chunk, Document, RetrievalTrace
+from backend.services.parser import _chunk_elements
+from backend.services.rag import _build_messages, estimate_prompt_tokens
+from backend.services.vector import ScoredChunk, _build_filter
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GRANULARITIES = ("chunk", "page", "document")
+DEFAULT_RERANK_MODEL = "Xenova/ms-marco-MiniLM-L-6-v2"
+RRF_K = 60
+CITED_GRADE = 2.0
+SHOWN_GRADE = 1.0
+
+MatchKey = tuple
+
+
+class Embedder(Protocol):
+    def embed(self, texts: Sequence[str]) -> list[list[float]]: ...
+
+
+class Reranker(Protocol):
+    def rerank(self, query: str, documents: Sequence[str]) -> Iterable[float]: ...
+
+
+@dataclass
+class EvalQuery:
+    query_id: str
+    query: str
+    relevant: dict[MatchKey, float]  # match key -> graded relevance
+    doc_ids: Optional[list[str]] = None
+    categories: Optional[list[str]] = None
+    deal_outcomes: Optional[list[str]] = None
+
+
+@dataclass
+class RetrievalConfig:
+    name: str
+    top_k: int = 5
+    hybrid: bool = False
+    rerank: bool = False
+    chunk_size: Optional[int] = None  # None: chunks as stored in SQLite
+    embedding_model: Optional[str] = None  # None: settings.embedding_model_name
+    rerank_model: str = DEFAULT_RERANK_MODEL
+    candidate_multiplier: int = 4  # candidates per result fetched for fusion / rerank
+
+    @property
+    def index_key(self) -> tuple[Optional[int], str]:
+        return self.chunk_size, self.embedding_model or settings.embedding_model_name
+
+
+@dataclass
+class ConfigReport:
+    config: dict[str, Any]
+    queries: int
+    recall_at_k: float
+    mrr: float
+    ndcg_at_k: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    prompt_tokens_mean: float
+    prompt_tokens_p95: float
+    index_chunks: int
+    index_build_s: float
+
+
+@dataclass
+class EvalChunk:
+    document_id: str
+    chunk_index: int
+    page_number: int
+    content: str
+    filename: str
+    category: str
+    deal_outcome: Optional[str]
+    section: Optional[str] = None
+
+    def to_scored(self, score: float) -> ScoredChunk:
+        return ScoredChunk(
+            content=self.content,
+            score=score,
+            document_id=self.document_id,
+            filename=self.filename,
+            page_number=self.page_number,
+            chunk_index=self.chunk_index,
+            source=self.filename,
+            section=self.section,
+            category=self.category,
+            deal_outcome=self.deal_outcome,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+def match_key(document_id: str, page_number: int, chunk_index: int, granularity: str) -> MatchKey:
+    if granularity == "chunk":
+        return (document_id, chunk_index)
+    if granularity == "page":
+        return (document_id, page_number)
+    if granularity == "document":
+        return (document_id,)
+    raise ValueError(f"Unknown granularity {granularity!r}; expected one of {GRANULARITIES}")
+
+
+def _dedupe(keys: Iterable[MatchKey]) -> list[MatchKey]:
+    seen: set[MatchKey] = set()
+    return [key for key in keys if not (key in seen or seen.add(key))]
+
+
+def recall_at_k(retrieved: Sequence[MatchKey], relevant: dict[MatchKey, float], k: int) -> float:
+    if not relevant:
+        return 0.0
+    hits = set(_dedupe(retrieved)[:k]) & set(relevant)
+    return len(hits) / len(relevant)
+
+
+def reciprocal_rank(retrieved: Sequence[MatchKey], relevant: dict[MatchKey, float]) -> float:
+    for rank, key in enumerate(_dedupe(retrieved), start=1):
+        if key in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(retrieved: Sequence[MatchKey], relevant: dict[MatchKey, float], k: int) -> float:
+    gains = [relevant.get(key, 0.0) for key in _dedupe(retrieved)[:k]]
+    dcg = sum((2 ** gain - 1) / math.log2(rank + 2) for rank, gain in enumerate(gains))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** gain - 1) / math.log2(rank + 2) for rank, gain in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+
+def load_golden_set(path: str | Path, granularity: str = "page") -> list[EvalQuery]:
+    """Read a JSONL golden set.
+
+    Each line: ``{"query": ..., "relevant": [{"document_id": ..., "page_number": 3,
+    "chunk_index": 7, "grade": 2}], "doc_ids"?, "categories"?, "deal_outcomes"?, "id"?}``.
+    ``grade`` defaults to 1; only the fields the granularity needs are required.
+    """
+    queries = []
+    for line_no, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        relevant: dict[MatchKey, float] = {}
+        for label in item.get("relevant", []):
+            key = match_key(label["document_id"], label.get("page_number", 0), label.get("chunk_index", 0), granularity)
+            relevant[key] = max(relevant.get(key, 0.0), float(label.get("grade", 1)))
+        queries.append(EvalQuery(
+            query_id=str(item.get("id", line_no)),
+            query=item["query"],
+            relevant=relevant,
+            doc_ids=item.get("doc_ids"),
+            categories=item.get("categories"),
+            deal_outcomes=item.get("deal_outcomes"),
+        ))
+    return queries
+
+
+def _is_cited(answer: str, filename: str, page_number: int) -> bool:
+    if not filename or filename not in answer:
+        return False
+    return re.search(rf"Page(?: Number)?\s*:?\s*{int(page_number)}\b", answer) is not None
+
+
+def queries_from_traces(db: Session, limit: int = 500, granularity: str = "page") -> list[EvalQuery]:
+    """Replay logged chats, newest first, one query per distinct question text."""
+    rows = (
+        db.query(RetrievalTrace, ChatLog.ai_response)
+        .join(ChatLog, ChatLog.id == RetrievalTrace.chat_log_id)
+        .order_by(RetrievalTrace.id.desc())
+        .limit(limit * 4)
+        .all()
+    )
+    queries: list[EvalQuery] = []
+    seen: set[str] = set()
+    for trace, answer in rows:
+        normalized = " ".join(trace.query.lower().split())
+        if normalized in seen or not trace.retrieved_chunks:
+            continue
+        seen.add(normalized)
+        relevant: dict[MatchKey, float] = {}
+        for item in trace.retrieved_chunks:
+            key = match_key(item["doc_id"], item.get("page_number", 0), item.get("chunk_index", 0), granularity)
+            grade = CITED_GRADE if _is_cited(answer or "", item.get("filename", ""), item.get("page_number", 0)) else SHOWN_GRADE
+            relevant[key] = max(relevant.get(key, 0.0), grade)
+        queries.append(EvalQuery(
+            query_id=f"trace-{trace.id}",
+            query=trace.query,
+            relevant=relevant,
+            doc_ids=trace.selected_doc_ids or None,
+        ))
+        if len(queries) >= limit:
+            break
+    return queries
+
+
+# ---------------------------------------------------------------------------
+# Corpus and indexes
+# ---------------------------------------------------------------------------
+
+
+def load_corpus(db: Session) -> list[EvalChunk]:
+    rows = (
+        db.query(Chunk, Document.filename, Document.category, Document.deal_outcome)
+        .join(Document, Document.id == Chunk.document_id)
+        .order_by(Chunk.document_id, Chunk.chunk_index)
+        .all()
+    )
+    return [
+        EvalChunk(
+            document_id=chunk.document_id,
+            chunk_index=chunk.chunk_index,
+            page_number=chunk.page_number or 1,
+            content=chunk.content,
+            filename=filename,
+            category=category or "other",
+            deal_outcome=deal_outcome,
+            section=chunk.section,
+        )
+        for chunk, filename, category, deal_outcome in rows
+    ]
+
+
+def rechunk(corpus: Sequence[EvalChunk], chunk_size: int, overlap: Optional[int] = None) -> list[EvalChunk]:
+    """Re-chunk each document from its stored chunks' paragraphs.
+
+    Stored chunks are paragraphs joined by blank lines, so splitting them back
+    recovers (approximately) the parser's elements; the overlap carried into
+    stored chunks is kept, which slightly over-weights boundary text.
+    """
+    overlap = settings.chunk_overlap if overlap is None else overlap
+    by_document: dict[str, list[EvalChunk]] = defaultdict(list)
+    for chunk in corpus:
+        by_document[chunk.document_id].append(chunk)
+
+    result: list[EvalChunk] = []
+    for document_id, chunks in by_document.items():
+        elements = [
+            (chunk.page_number, chunk.section, part)
+            for chunk in chunks
+            for part in chunk.content.split("\n\n")
+            if part.strip()
+        ]
+        first = chunks[0]
+        for parsed in _chunk_elements(elements, max_len=chunk_size, overlap=overlap):
+            result.append(EvalChunk(
+                document_id=document_id,
+                chunk_index=parsed.chunk_index,
+                page_number=parsed.page_number,
+                content=parsed.content,
+                filename=first.filename,
+                category=first.category,
+                deal_outcome=first.deal_outcome,
+                section=parsed.section,
+            ))
+    return result
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over the evaluation corpus, for the lexical half of hybrid."""
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.lengths: list[int] = []
+        for idx, text in enumerate(texts):
+            counts = Counter(_tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((idx, tf))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        n = len(self.lengths)
+        self.idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, limit: int, allowed: Optional[set[int]] = None) -> list[tuple[int, float]]:
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(_tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self.postings[term]:
+                if allowed is not None and idx not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[idx] / (self.avg_length or 1))
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class EvalIndex:
+    """Dense (in-memory Qdrant) plus lazily built BM25 over one corpus variant."""
+
+    def __init__(self, chunks: list[EvalChunk], embedder: Embedder, batch_size: int = 64):
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+
+        self.chunks = chunks
+        self.embedder = embedder
+        self.client = QdrantClient(":memory:")
+        self.collection = "eval"
+        self._bm25: Optional[BM25Index] = None
+
+        started = time.perf_counter()
+        vectors: list[list[float]] = []
+        for start in range(0, len(chunks), batch_size):
+            vectors.extend(embedder.embed([chunk.content for chunk in chunks[start:start + batch_size]]))
+        dim = len(vectors[0]) if vectors else settings.embedding_dim
+        self.client.create_collection(
+            self.collection, vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+        )
+        if vectors:
+            self.client.upsert(
+                self.collection,
+                points=[
+                    models.PointStruct(
+                        id=idx,
+                        vector=list(vector),
+                        payload={
+                            "document_id": chunk.document_id,
+                            "category": chunk.category,
+                            "deal_outcome": chunk.deal_outcome,
+                        },
+                    )
+                    for idx, (chunk, vector) in enumerate(zip(chunks, vectors))
+                ],
+                wait=True,
+            )
+        self.build_s = time.perf_counter() - started
+
+    @property
+    def bm25(self) -> BM25Index:
+        if self._bm25 is None:
+            self._bm25 = BM25Index([chunk.content for chunk in self.chunks])
+        return self._bm25
+
+    def _allowed(self, query: EvalQuery) -> Optional[set[int]]:
+        if not (query.doc_ids or query.categories or query.deal_outcomes):
+            return None
+        return {
+            idx for idx, chunk in enumerate(self.chunks)
+            if (not query.doc_ids or chunk.document_id in query.doc_ids)
+            and (not query.categories or chunk.category in query.categories)
+            and (not query.deal_outcomes or chunk.deal_outcome in query.deal_outcomes)
+        }
+
+    def dense(self, query: EvalQuery, limit: int) -> list[tuple[int, float]]:
+        vector = self.embedder.embed([query.query])[0]
+        response = self.client.query_points(
+            self.collection,
+            query=list(vector),
+            query_filter=_build_filter(query.doc_ids, query.categories, query.deal_outcomes),
+            limit=limit,
+        )
+        return [(int(point.id), point.score or 0.0) for point in response.points]
+
+    def lexical(self, query: EvalQuery, limit: int) -> list[tuple[int, float]]:
+        return self.bm25.search(query.query, limit, allowed=self._allowed(query))
+
+
+def reciprocal_rank_fusion(*rankings: Sequence[tuple[int, float]], k: int = RRF_K) -> list[tuple[int, float]]:
+    fused: dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, (idx, _score) in enumerate(ranking, start=1):
+            fused[idx] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+# ---------------------------------------------------------------------------
+# Evaluator
+# ---------------------------------------------------------------------------
+
+
+def _default_embedder(model_name: str) -> Embedder:
+    from backend.services.vector import EmbeddingModel
+
+    return EmbeddingModel(model_name)
+
+
+def _default_reranker(model_name: str) -> Reranker:
+    from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+    return TextCrossEncoder(model_name=model_name)
+
+
+class RetrievalEvaluator:
+    def __init__(
+        self,
+        corpus: list[EvalChunk],
+        granularity: str = "page",
+        embedder_factory: Callable[[str], Embedder] = _default_embedder,
+        reranker_factory: Callable[[str], Reranker] = _default_reranker,
+    ):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; expected one of {GRANULARITIES}")
+        self.corpus = corpus
+        self.granularity = granularity
+        self.embedder_factory = embedder_factory
+        self.reranker_factory = reranker_factory
+        self._embedders: dict[str, Embedder] = {}
+        self._rerankers: dict[str, Reranker] = {}
+        self._indexes: dict[tuple[Optional[int], str], EvalIndex] = {}
+
+    def _index(self, config: RetrievalConfig) -> EvalIndex:
+        key = config.index_key
+        if key not in self._indexes:
+            chunk_size, model_name = key
+            if model_name not in self._embedders:
+                self._embedders[model_name] = self.embedder_factory(model_name)
+            chunks = rechunk(self.corpus, chunk_size) if chunk_size else list(self.corpus)
+            logger.info("Building eval index chunk_size=%s model=%s chunks=%d", chunk_size, model_name, len(chunks))
+            self._indexes[key] = EvalIndex(chunks, self._embedders[model_name])
+        return self._indexes[key]
+
+    def _reranker(self, model_name: str) -> Reranker:
+        if model_name not in self._rerankers:
+            self._rerankers[model_name] = self.reranker_factory(model_name)
+        return self._rerankers[model_name]
+
+    def retrieve(self, config: RetrievalConfig, query: EvalQuery) -> list[ScoredChunk]:
+        index = self._index(config)
+        pool = config.top_k * max(1, config.candidate_multiplier) if (config.hybrid or config.rerank) else config.top_k
+        ranked = index.dense(query, pool)
+        if config.hybrid:
+            ranked = reciprocal_rank_fusion(ranked, index.lexical(query, pool))
+        if config.rerank and ranked:
+            candidates = [idx for idx, _ in ranked[:pool]]
+            scores = list(self._reranker(config.rerank_model).rerank(
+                query.query, [index.chunks[idx].content for idx in candidates]
+            ))
+            ranked = sorted(zip(candidates, scores), key=lambda item: item[1], reverse=True)
+        return [index.chunks[idx].to_scored(float(score)) for idx, score in ranked[:config.top_k]]
+
+    def evaluate(self, config: RetrievalConfig, queries: Sequence[EvalQuery]) -> ConfigReport:
+        if self.granularity == "chunk" and config.chunk_size:
+            raise ValueError(f"Config {config.name!r} re-chunks the corpus; use page or document granularity")
+        index = self._index(config)
+        recalls, rrs, ndcgs, latencies, tokens = [], [], [], [], []
+        for query in queries:
+            started = time.perf_counter()
+            retrieved = self.retrieve(config, query)
+            latencies.append((time.perf_counter() - started) * 1000)
+            keys = [
+                match_key(chunk.document_id, chunk.page_number, chunk.chunk_index, self.granularity)
+                for chunk in retrieved
+            ]
+            recalls.append(recall_at_k(keys, query.relevant, config.top_k))
+            rrs.append(reciprocal_rank(keys, query.relevant))
+            ndcgs.append(ndcg_at_k(keys, query.relevant, config.top_k))
+            tokens.append(estimate_prompt_tokens(_build_messages(query.query, retrieved)))
+
+        n = len(queries) or 1
+        return ConfigReport(
+            config=asdict(config),
+            queries=len(queries),
+            recall_at_k=round(sum(recalls) / n, 4),
+            mrr=round(sum(rrs) / n, 4),
+            ndcg_at_k=round(sum(ndcgs) / n, 4),
+            latency_p50_ms=round(_percentile(latencies, 50), 3),
+            latency_p95_ms=round(_percentile(latencies, 95), 3),
+            prompt_tokens_mean=round(sum(tokens) / n, 1),
+            prompt_tokens_p95=float(_percentile(tokens, 95)),
+            index_chunks=len(index.chunks),
+            index_build_s=round(index.build_s, 3),
+        )
+
+    def run(self, configs: Sequence[RetrievalConfig], queries: Sequence[EvalQuery]) -> list[ConfigReport]:
+        reports = []
+        for config in configs:
+            # Warm the query path (model sessions, caches) outside the measurement.
+            if queries:
+                self.retrieve(config, queries[0])
+            reports.append(self.evaluate(config, queries))
+        return reports
+
+
+def recommend(reports: Sequence[ConfigReport], tolerance: float = 0.02, metric: str = "ndcg_at_k") -> Optional[ConfigReport]:
+    """Fastest config (p95 latency, then prompt tokens) within ``tolerance`` of the best quality."""
+    if not reports:
+        return None
+    best = max(getattr(report, metric) for report in reports)
+    eligible = [report for report in reports if getattr(report, metric) >= best - tolerance]
+    return min(eligible, key=lambda report: (report.latency_p95_ms, report.prompt_tokens_mean))
+
+
+def default_configs() -> list[RetrievalConfig]:
+    """A small grid around the production /chat setting (dense, top_k=3)."""
+    return [
+        RetrievalConfig(name="dense_k3", top_k=3),
+        RetrievalConfig(name="dense_k5", top_k=5),
+        RetrievalConfig(name="dense_k8", top_k=8),
+        RetrievalConfig(name="hybrid_k5", top_k=5, hybrid=True),
+        RetrievalConfig(name="rerank_k5", top_k=5, rerank=True),
+        RetrievalConfig(name="hybrid_rerank_k5", top_k=5, hybrid=True, rerank=True),
+        RetrievalConfig(name="dense_k5_chunk400", top_k=5, chunk_size=400),
+        RetrievalConfig(name="dense_k5_chunk1600", top_k=5, chunk_size=1600),
+    ]
+
+
+def parse_config(spec: str) -> RetrievalConfig:
+    """Parse ``name:top_k=5,hybrid=1,rerank=0,chunk_size=400,model=BAAI/bge-small-en-v1.5``."""
+    name, _, options = spec.partition(":")
+    kwargs: dict[str, Any] = {"name": name}
+    aliases = {"model": "embedding_model", "k": "top_k"}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        key = aliases.get(key.strip(), key.strip())
+        if key in ("hybrid", "rerank"):
+            kwargs[key] = value.strip().lower() in ("1", "true", "yes", "on")
+        elif key in ("top_k", "chunk_size", "candidate_multiplier"):
+            kwargs[key] = int(value)
+        elif key in ("embedding_model", "rerank_model"):
+            kwargs[key] = value.strip()
+        else:
+            raise ValueError(f"Unknown config option {key!r} in {spec!r}")
+    return RetrievalConfig(**kwargs)
@@ -0,0 +1,275 @@
+"""Compact storage for workflow run outputs.
+
+A workflow payload carries its evidence several times over: the precedent
+scan buckets, the shared ``evidence`` map, the draft's ``sources`` and every
+memo draft's ``sources`` all repeat chunk text that is already in the
+``chunks`` table. Stored as is, every run re-copies it, and the audit DB grows
+with each run.
+
+Runs are therefore stored in three steps:
+
+* **by reference**: every evidence item is reduced to
+  ``[document_id, chunk_index, score]`` (``compact_output``);
+* **compressed**: the compact JSON is zlib-compressed into
+  ``WorkflowRun.output_blob``;
+* **tiered**: ``archive_workflow_runs`` moves outputs older than
+  ``AUDIT_HOT_DAYS`` to files under ``AUDIT_COLD_ROOT`` and records the path
+  in ``output_location``. The same pass also compacts runs recorded before
+  this format, which still sit in ``output_json``. Compacting drops their
+  evidence text, so the original JSON is first written, compressed, to
+  ``workflow_runs/legacy/`` in the cold store (``legacy_output_path``).
+
+``load_output`` reverses all three steps. Chunk text and page numbers come
+from ``chunks``, and document and deal attributes come from the metadata
+cache, so a hydrated run shows current metadata. Evidence whose document has
+since been deleted comes back as a bare reference marked ``"missing"``.
+SQLite only returns the freed pages to the OS on ``VACUUM``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import zlib
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Chunk, Document, WorkflowRun
+from backend.services.evidence import PRECEDENT_VIEW, SOURCE_VIEW, EvidenceRecord, citation
+from backend.services.precedent import _resolve_precedents
+from backend.services.workspace import atomic_write
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FORMAT = "refs-v1"
+COMPRESSION_LEVEL = 6
+# The workflow's snippet length; kept here so hydration does not import the workflow.
+SNIPPET_CHARS = 500
+_ARCHIVE_BATCH = 200
+
+Ref = tuple[str, int]
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def encode_payload(payload: dict[str, Any]) -> bytes:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+    return zlib.compress(raw.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decode_payload(blob: bytes) -> dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+# ---------------------------------------------------------------------------
+# By-reference form
+# ---------------------------------------------------------------------------
+
+def _source_refs(sources: list[dict[str, Any]]) -> list[list[Any]]:
+    return [[source["doc_id"], source["chunk_index"], None] for source in sources]
+
+
+def compact_output(payload: dict[str, Any]) -> dict[str, Any]:
+    """The payload with every evidence item replaced by ``[document_id, chunk_index, score]``."""
+    compact = {**payload, "_format": FORMAT}
+    scan = payload.get("precedent_scan")
+    if scan:
+        compact["precedent_scan"] = {
+            "total": scan["total"],
+            "buckets": {
+                name: [[item["document_id"], item["chunk_index"], item["score"]] for item in items]
+                for name, items in scan["buckets"].items()
+            },
+        }
+    if "evidence" in payload:
+        compact["evidence"] = {ref: entry["score"] for ref, entry in payload["evidence"].items()}
+    if "draft_sources" in payload:
+        compact["draft_sources"] = _source_refs(payload["draft_sources"])
+    if "memo_drafts" in payload:
+        compact["memo_drafts"] = [
+            {**draft, "sources": _source_refs(draft["sources"])} for draft in payload["memo_drafts"]
+        ]
+    return compact
+
+
+def _split_ref(ref: str) -> Ref:
+    document_id, _, chunk_index = ref.rpartition(":")
+    return document_id, int(chunk_index)
+
+
+def _refs_in(compact: dict[str, Any]) -> set[Ref]:
+    refs: set[Ref] = set()
+    for items in (compact.get("precedent_scan") or {}).get("buckets", {}).values():
+        refs.update((document_id, chunk_index) for document_id, chunk_index, _ in items)
+    refs.update(_split_ref(ref) for ref in compact.get("evidence", {}))
+    source_lists = [compact.get("draft_sources", [])]
+    source_lists += [draft["sources"] for draft in compact.get("memo_drafts", [])]
+    for sources in source_lists:
+        refs.update((document_id, chunk_index) for document_id, chunk_index, _ in sources)
+    return refs
+
+
+def _load_records(db: Session, refs: set[Ref]) -> dict[Ref, EvidenceRecord]:
+    """The referenced chunks as enriched evidence records, in one query."""
+    if not refs:
+        return {}
+    rows = (
+        db.query(
+            Chunk.document_id, Chunk.chunk_index, Chunk.content, Chunk.page_number, Chunk.source, Chunk.section,
+            Document.filename, Document.category, Document.deal_outcome,
+        )
+        .join(Document, Document.id == Chunk.document_id)
+        .filter(
+            Chunk.document_id.in_({document_id for document_id, _ in refs}),
+            Chunk.chunk_index.in_({chunk_index for _, chunk_index in refs}),
+        )
+    )
+    records = {
+        (row.document_id, row.chunk_index): EvidenceRecord(
+            content=row.content, score=0.0, document_id=row.document_id, filename=row.filename,
+            page_number=row.page_number, chunk_index=row.chunk_index, source=row.source or "",
+            section=row.section, category=row.category, deal_outcome=row.deal_outcome,
+        )
+        for row in rows
+        if (row.document_id, row.chunk_index) in refs
+    }
+    _resolve_precedents(db, list(records.values()))
+    return records
+
+
+def hydrate_output(db: Session, compact: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of ``compact_output``."""
+    records = _load_records(db, _refs_in(compact))
+    payload = {key: value for key, value in compact.items() if key != "_format"}
+
+    def precedent(document_id: str, chunk_index: int, score: float) -> dict[str, Any]:
+        record = records.get((document_id, chunk_index))
+        if record is None:
+            return {"document_id": document_id, "chunk_index": chunk_index, "score": score, "missing": True}
+        return PRECEDENT_VIEW(replace(record, score=score))
+
+    def sources(refs: list[list[Any]]) -> list[dict[str, Any]]:
+        return [
+            SOURCE_VIEW(records[(document_id, chunk_index)])
+            if (document_id, chunk_index) in records
+            else {"doc_id": document_id, "chunk_index": chunk_index, "missing": True}
+            for document_id, chunk_index, _ in refs
+        ]
+
+    scan = compact.get("precedent_scan")
+    if scan:
+        payload["precedent_scan"] = {
+            "total": scan["total"],
+            "buckets": {name: [precedent(*item) for item in items] for name, items in scan["buckets"].items()},
+        }
+    if "evidence" in compact:
+        evidence = {}
+        for ref, score in compact["evidence"].items():
+            record = records.get(_split_ref(ref))
+            evidence[ref] = (
+                citation(replace(record, score=score), SNIPPET_CHARS) if record is not None
+                else precedent(*_split_ref(ref), score)
+            )
+        payload["evidence"] = evidence
+    if "draft_sources" in compact:
+        payload["draft_sources"] = sources(compact["draft_sources"])
+    if "memo_drafts" in compact:
+        payload["memo_drafts"] = [{**draft, "sources": sources(draft["sources"])} for draft in compact["memo_drafts"]]
+    return payload
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+def store_output(run: WorkflowRun, payload: dict[str, Any]) -> None:
+    run.output_blob = encode_payload(compact_output(payload))
+    run.output_json = None
+
+
+def load_output(db: Session, run: WorkflowRun) -> Optional[dict[str, Any]]:
+    """A run's full output, from the cold store, the compact blob or the legacy column."""
+    if run.output_location:
+        stored = decode_payload((Path(settings.audit_cold_root) / run.output_location).read_bytes())
+    elif run.output_blob is not None:
+        stored = decode_payload(run.output_blob)
+    else:
+        return run.output_json
+    return hydrate_output(db, stored) if stored.get("_format") == FORMAT else stored
+
+
+def _cold_path(run: WorkflowRun) -> str:
+    return f"workflow_runs/{run.created_at:%Y-%m}/{run.id}.json.z"
+
+
+def legacy_output_path(run: WorkflowRun) -> str:
+    """Where the original ``output_json`` of a compacted legacy run is kept, under ``AUDIT_COLD_ROOT``."""
+    return f"workflow_runs/legacy/{run.created_at:%Y-%m}/{run.id}.json.z"
+
+
+def _write_cold(relative: str, blob: bytes) -> None:
+    target = Path(settings.audit_cold_root) / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(target, blob)
+
+
+@dataclass
+class ArchiveStats:
+    compacted: int = 0
+    # Bytes of original legacy JSON kept in the cold store before compacting.
+    bytes_preserved: int = 0
+    tiered: int = 0
+    bytes_tiered: int = 0
+
+
+def _batches(query) -> Iterable[list[WorkflowRun]]:
+    """Rows matching ``query``, a batch at a time; each batch must stop matching once processed."""
+    while True:
+        batch = query.order_by(WorkflowRun.created_at).limit(_ARCHIVE_BATCH).all()
+        if not batch:
+            return
+        yield batch
+
+
+def archive_workflow_runs(db: Session, hot_days: Optional[int] = None, now: Optional[datetime] = None) -> ArchiveStats:
+    """Compact legacy outputs, then move outputs older than ``hot_days`` to the cold store."""
+    hot_days = settings.audit_hot_days if hot_days is None else hot_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=hot_days)
+    stats = ArchiveStats()
+
+    legacy = db.query(WorkflowRun).filter(
+        WorkflowRun.output_json.isnot(None), WorkflowRun.output_blob.is_(None), WorkflowRun.output_location.is_(None)
+    )
+    for batch in _batches(legacy):
+        for run in batch:
+            original = encode_payload(run.output_json or {})
+            # Written before the row changes: the text compacting drops is never only in memory.
+            _write_cold(legacy_output_path(run), original)
+            stats.bytes_preserved += len(original)
+            store_output(run, run.output_json or {})
+        db.commit()
+        stats.compacted += len(batch)
+
+    hot = db.query(WorkflowRun).filter(WorkflowRun.output_blob.isnot(None), WorkflowRun.created_at < cutoff)
+    for batch in _batches(hot):
+        for run in batch:
+            relative = _cold_path(run)
+            _write_cold(relative, run.output_blob)
+            stats.bytes_tiered += len(run.output_blob)
+            run.output_location, run.output_blob = relative, None
+        db.commit()
+        stats.tiered += len(batch)
+
+    logger.info(
+        "Archived workflow runs: compacted=%d preserved=%d tiered=%d bytes=%d",
+        stats.compacted, stats.bytes_preserved, stats.tiered, stats.bytes_tiered,
+    )
+    return stats
@@ -1,78 +1,492 @@
+"""Embeddings and the Qdrant vector store.
+
+fastembed and qdrant_client take well over a second to import, so they are
+imported on first use rather than with this module; ``backend.main`` stays
+cheap to import and the app can answer ``/health`` while the startup warm-up
+loads them in the background.
+
+``QDRANT_COLLECTION`` is an alias over versioned collections,
+``<alias>__<model>__<timestamp>``, each recording the model that built it in
+its metadata. The store serves whatever the alias points at, with that
+collection's own model, so changing ``EMBEDDING_MODEL_NAME`` alone cannot
+put query vectors into a collection built by another model. Moving to a new
+model is a migration (``backend/services/reindex.py``).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Iterable, List, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional, Sequence
+from datetime import datetime
+import functools
+import logging
+import inspect
+import re
+import threading
+import time
 import uuid
 
-import numpy as np
-from fastembed import TextEmbedding
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
-
 from backend.config import get_settings
+from backend.services.evidence import EvidenceRecord
+from backend.services.metrics import count_cache, count_chunks, span
 from backend.services.parser import ParsedChunk
 
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from qdrant_client.http import models
+
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+# Search hits are evidence records from the start; the old name is kept for callers.
+ScoredChunk = EvidenceRecord
+
+
 @dataclass
-class ScoredChunk:
-    content: str
-    score: float
-    document_id: str
-    filename: str
-    page_number: int
-    chunk_index: int
-    source: str
-    section: Optional[str]
-    category: str
-    deal_outcome: Optional[str]
+class SearchRequest:
+    """One search in an ``asearch_many`` batch; each has its own filter and limit."""
+
+    query: str
+    top_k: int = 5
+    doc_ids: Optional[List[str]] = None
+    categories: Optional[List[str]] = None
+    deal_outcomes: Optional[List[str]] = None
 
 
 class EmbeddingModel:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, query_cache_size: int = 0):
+        from fastembed import TextEmbedding
+
         self.model = TextEmbedding(model_name=model_name)
+        # Small LRU for query embeddings: users often re-run the same question.
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_cache_size = query_cache_size
+        self._query_cache_lock = threading.Lock()
 
     def embed(self, texts: Sequence[str]) -> List[List[float]]:
         return [list(vec) for vec in self.model.embed(texts)]
 
     def embed_one(self, text: str) -> List[float]:
-        return self.embed([text])[0]
+        if self._query_cache_size <= 0:
+            return self.embed([text])[0]
+        with self._query_cache_lock:
+            vector = self._query_cache.get(text)
+            if vector is not None:
+                self._query_cache.move_to_end(text)
+        count_cache("query_embedding", hit=vector is not None)
+        if vector is None:
+            vector = self.embed([text])[0]
+            with self._query_cache_lock:
+                self._query_cache[text] = vector
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return vector
+
+    def embed_queries(self, texts: Sequence[str]) -> List[List[float]]:
+        """``embed_one`` for many queries: cache hits are reused, misses go through one ``embed`` call."""
+        vectors: dict[str, List[float]] = {}
+        if self._query_cache_size > 0:
+            with self._query_cache_lock:
+                for text in texts:
+                    cached = self._query_cache.get(text)
+                    if cached is not None:
+                        self._query_cache.move_to_end(text)
+                        vectors[text] = cached
+        for text in texts:
+            count_cache("query_embedding", hit=text in vectors)
+        misses = list(dict.fromkeys(text for text in texts if text not in vectors))
+        if misses:
+            vectors.update(zip(misses, self.embed(misses)))
+            if self._query_cache_size > 0:
+                with self._query_cache_lock:
+                    for text in misses:
+                        self._query_cache[text] = vectors[text]
+                    while len(self._query_cache) > self._query_cache_size:
+                        self._query_cache.popitem(last=False)
+        return [vectors[text] for text in texts]
+
+
+_embedding_model: Optional[EmbeddingModel] = None
+# Models other than EMBEDDING_MODEL_NAME: a migration target, or the model a
+# collection was built with when the setting has moved on.
+_other_embedding_models: dict[str, EmbeddingModel] = {}
+_embedding_model_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: Optional[str] = None) -> EmbeddingModel:
+    """Process-wide embedding model (``EMBEDDING_MODEL_NAME`` by default); loading the ONNX weights is expensive.
+
+    Inference is thread-safe, so every vector store instance shares it.
+    """
+    global _embedding_model
+    model_name = model_name or settings.embedding_model_name
+    with _embedding_model_lock:
+        if model_name != settings.embedding_model_name:
+            model = _other_embedding_models.get(model_name)
+            if model is None:
+                model = EmbeddingModel(model_name, query_cache_size=settings.embedding_query_cache_size)
+                _other_embedding_models[model_name] = model
+            return model
+        if _embedding_model is None:
+            _embedding_model = EmbeddingModel(
+                settings.embedding_model_name, query_cache_size=settings.embedding_query_cache_size
+            )
+        return _embedding_model
+
+
+_async_client: Optional[AsyncQdrantClient] = None
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Shared async client for server mode (embedded mode has no async client)."""
+    global _async_client
+    if _async_client is None:
+        from qdrant_client import AsyncQdrantClient
+
+        _async_client = AsyncQdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key)
+    return _async_client
+
+
+async def close_async_qdrant_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        client, _async_client = _async_client, None
+        await client.close()
+
+
+def _build_filter(
+    doc_ids: Optional[List[str]],
+    categories: Optional[List[str]],
+    deal_outcomes: Optional[List[str]],
+) -> Optional[models.Filter]:
+    from qdrant_client.http import models
+
+    must_conditions = []
+    if doc_ids:
+        must_conditions.append(
+            models.FieldCondition(
+                key="document_id",
+                match=models.MatchAny(any=doc_ids),
+            )
+        )
+    if categories:
+        must_conditions.append(
+            models.FieldCondition(
+                key="category",
+                match=models.MatchAny(any=categories),
+            )
+        )
+    if deal_outcomes:
+        must_conditions.append(
+            models.FieldCondition(
+                key="deal_outcome",
+                match=models.MatchAny(any=deal_outcomes),
+            )
+        )
+    return models.Filter(must=must_conditions) if must_conditions else None
+
+
+def _to_scored_chunks(points: Iterable[Any]) -> List[EvidenceRecord]:
+    scored: List[EvidenceRecord] = []
+    for hit in points:  # query_points returns points in .points attribute
+        payload = hit.payload or {}
+        scored.append(
+            EvidenceRecord(
+                content=payload.get("content", ""),
+                score=hit.score or 0.0,
+                document_id=str(payload.get("document_id", "")),
+                filename=str(payload.get("filename", "")),
+                page_number=int(payload.get("page_number", 1)),
+                chunk_index=int(payload.get("chunk_index", 0)),
+                source=str(payload.get("source", "")),
+                section=payload.get("section"),
+                category=str(payload.get("category", "")),
+                deal_outcome=payload.get("deal_outcome"),
+                deal_id=payload.get("deal_id"),
+            )
+        )
+    return scored
+
+
+def chunk_payload(chunk: ParsedChunk, document_id: str, filename: str, metadata: Optional[dict] = None) -> dict:
+    """The Qdrant payload of one chunk point."""
+    metadata = metadata or {}
+    return {
+        "document_id": document_id,
+        "filename": filename,
+        "page_number": chunk.page_number,
+        "chunk_index": chunk.chunk_index,
+        "source": chunk.source,
+        "section": chunk.section,
+        "content": chunk.content,
+        "category": metadata.get("category"),
+        "deal_outcome": metadata.get("deal_outcome"),
+        "deal_id": metadata.get("deal_id"),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Versioned collections
+# ---------------------------------------------------------------------------
+
+# Collection metadata key naming the model that produced its vectors.
+EMBEDDING_MODEL_KEY = "embedding_model"
+_LEGACY_COLLECTION = "{alias!r} is a plain collection, not an alias; pass replace_legacy to delete it and swap"
+
+
+class LegacyCollectionError(RuntimeError):
+    """The live name is a plain collection and ``replace_legacy`` was not given."""
+
+
+def model_slug(model_name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", model_name.lower()).strip("-")
+
+
+def versioned_collection_name(alias: str, model_name: str, now: Optional[datetime] = None) -> str:
+    # Microseconds and a random suffix keep two builds started together from colliding.
+    stamp = f"{(now or datetime.utcnow()):%Y%m%d%H%M%S%f}"
+    return f"{alias}__{model_slug(model_name)}__{stamp}_{uuid.uuid4().hex[:6]}"
+
+
+def create_chunk_collection(client: Any, name: str, size: int, model_name: str) -> None:
+    from qdrant_client.http import models
+
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(size=size, distance=models.Distance.COSINE),
+        metadata={EMBEDDING_MODEL_KEY: model_name},
+    )
+
+
+def live_collection(client: Any, alias: str) -> tuple[Optional[str], bool]:
+    """The collection behind ``alias``, and whether it is a plain (pre-alias) collection."""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name, False
+    if client.collection_exists(alias):
+        return alias, True
+    return None, False
+
+
+def swap_alias(client: Any, alias: str, collection: str, replace_legacy: bool = False) -> Optional[str]:
+    """Point ``alias`` at ``collection``; returns the collection it pointed at before, if it still exists."""
+    from qdrant_client.http import models
+
+    current, legacy = live_collection(client, alias)
+    operations: list[Any] = []
+    if legacy:
+        if not replace_legacy:
+            raise LegacyCollectionError(_LEGACY_COLLECTION.format(alias=alias))
+        logger.warning("Deleting legacy collection %s so the alias can take its name", alias)
+        client.delete_collection(alias)
+        current = None
+    elif current is not None:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+    operations.append(
+        models.CreateAliasOperation(create_alias=models.CreateAlias(collection_name=collection, alias_name=alias))
+    )
+    # Delete + create in one request: Qdrant applies them atomically.
+    client.update_collection_aliases(change_aliases_operations=operations)
+    return current
+
+
+@dataclass(frozen=True)
+class ServingIndex:
+    """The concrete collection queries go to, and the model that built it.
+
+    A search reads the store's ``ServingIndex`` once and uses it for both the
+    query embedding and the lookup. A cutover replaces it in one assignment,
+    so no query mixes one model's vector with the other model's collection.
+    """
+
+    collection: str
+    model_name: str
+    dimension: int
+
+    @property
+    def embedding(self) -> EmbeddingModel:
+        return get_embedding_model(self.model_name)
+
+
+def collection_model(client: Any, collection: str) -> tuple[Optional[str], int]:
+    """The model recorded in ``collection``'s metadata (None before models were recorded) and its dimension."""
+    info = client.get_collection(collection)
+    return (info.config.metadata or {}).get(EMBEDDING_MODEL_KEY), info.config.params.vectors.size
+
+
+def resolve_serving(client: Any, create: bool = False) -> ServingIndex:
+    """What ``QDRANT_COLLECTION`` points at, checked against the configured model.
+
+    With ``create``, a missing index is created as a versioned collection
+    behind the alias. A collection that records its model is served with
+    that model, whatever ``EMBEDDING_MODEL_NAME`` says; one that does not
+    must at least match ``EMBEDDING_DIM``.
+    """
+    alias = settings.qdrant_collection
+    collection, _ = live_collection(client, alias)
+    if collection is None:
+        serving = ServingIndex(
+            versioned_collection_name(alias, settings.embedding_model_name),
+            settings.embedding_model_name,
+            settings.embedding_dim,
+        )
+        if not create:
+            return ServingIndex(alias, serving.model_name, serving.dimension)
+        try:
+            create_chunk_collection(client, serving.collection, serving.dimension, serving.model_name)
+            swap_alias(client, alias, serving.collection)
+        except Exception as exc:
+            if "already exists" not in str(exc).lower():
+                raise
+            return resolve_serving(client)  # another process created it first
+        return serving
+
+    model_name, dimension = collection_model(client, collection)
+    if model_name is None:
+        if dimension != settings.embedding_dim:
+            raise RuntimeError(
+                f"Collection {collection!r} holds {dimension}-d vectors but EMBEDDING_DIM is "
+                f"{settings.embedding_dim}; migrate it with POST /index/migrations or scripts/reindex.py"
+            )
+        model_name = settings.embedding_model_name
+    elif model_name != settings.embedding_model_name:
+        logger.warning(
+            "Collection %s was built with %s; queries use that model until a migration to %s cuts over",
+            collection, model_name, settings.embedding_model_name,
+        )
+    return ServingIndex(collection, model_name, dimension)
+
+
+class _SerializedClient:
+    """Proxy that serializes calls into an embedded QdrantClient.
+
+    Embedded mode keeps its storage in-process behind a folder lock, so only
+    one client may exist per path and it is not safe for concurrent use.
+    """
+
+    def __init__(self, client: QdrantClient):
+        self._client = client
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return call
+
+
+def _is_missing_collection(exc: Exception) -> bool:
+    # Server mode answers 404; the embedded client raises ValueError("Collection ... not found").
+    return getattr(exc, "status_code", None) == 404 or "not found" in str(exc).lower()
+
+
+def _follows_alias(method: Callable) -> Callable:
+    """Retry a search once on the collection the alias points at now, if the one it used is gone.
+
+    Another process may cut over and drop the previous collection before
+    this one's ``qdrant_serving_ttl_seconds`` are up.
+    """
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def retry_async(self: QdrantVectorStore, *args: Any, **kwargs: Any) -> Any:
+            from backend.services.concurrency import run_io
+
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as exc:
+                if self._serving is None or not _is_missing_collection(exc):
+                    raise
+            await run_io(self.refresh_serving)
+            return await method(self, *args, **kwargs)
+
+        return retry_async
+
+    @functools.wraps(method)
+    def retry(self: QdrantVectorStore, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as exc:
+            if self._serving is None or not _is_missing_collection(exc):
+                raise
+        self.refresh_serving()
+        return method(self, *args, **kwargs)
+
+    return retry
 
 
 class QdrantVectorStore:
+    # Stores built without ``__init__`` (tests) serve QDRANT_COLLECTION with the configured model.
+    _serving: Optional[ServingIndex] = None
+    _resolved_at = 0.0
+
     def __init__(self):
+        from qdrant_client import QdrantClient
+
         # Use embedded mode if qdrant_path is set, otherwise use server mode
         if settings.qdrant_path:
             import os
 
             os.makedirs(settings.qdrant_path, exist_ok=True)
-            self.client = QdrantClient(path=settings.qdrant_path)
+            self.client = _SerializedClient(QdrantClient(path=settings.qdrant_path))
         else:
             self.client = QdrantClient(
                 url=settings.qdrant_url, api_key=settings.qdrant_api_key
             )
-        self.embedding = EmbeddingModel(settings.embedding_model_name)
         self._ensure_collection()
 
+    @property
+    def serving(self) -> ServingIndex:
+        serving = self._serving
+        if serving is None:
+            return ServingIndex(settings.qdrant_collection, settings.embedding_model_name, settings.embedding_dim)
+        return serving
+
+    @property
+    def embedding(self) -> EmbeddingModel:
+        # Resolved per use: the store is usable (deletes, health) before the model has loaded.
+        return self.serving.embedding
+
     def _ensure_collection(self) -> None:
-        """Create the Qdrant collection if it does not already exist."""
-        try:
-            self.client.get_collection(settings.qdrant_collection)
-            return  # already exists
-        except Exception:
-            pass
+        """Resolve the live collection and its model, creating a versioned one on first start."""
+        self._serving = resolve_serving(self.client, create=True)
+        self._resolved_at = time.monotonic()
 
-        try:
-            self.client.create_collection(
-                collection_name=settings.qdrant_collection,
-                vectors_config=models.VectorParams(
-                    size=settings.embedding_dim,
-                    distance=models.Distance.COSINE,
-                ),
-            )
-        except Exception as exc:
-            if "already exists" in str(exc).lower():
-                return
-            raise
+    def switch_to(self, serving: ServingIndex) -> None:
+        """Serve from another collection/model from the next query on (a migration cutover)."""
+        logger.info("Serving %s (%s) instead of %s", serving.collection, serving.model_name, self.serving.collection)
+        self._serving = serving
+        self._resolved_at = time.monotonic()
+
+    def refresh_serving(self) -> ServingIndex:
+        """Follow the alias, in case another process cut over to a new collection."""
+        serving = resolve_serving(self.client)
+        if serving != self._serving:
+            self.switch_to(serving)
+        self._resolved_at = time.monotonic()
+        return serving
+
+    def _serving_stale(self) -> bool:
+        return (
+            self._serving is not None
+            and time.monotonic() - self._resolved_at >= settings.qdrant_serving_ttl_seconds
+        )
+
+    def _search_serving(self) -> ServingIndex:
+        """``serving``, re-resolved once it is older than ``qdrant_serving_ttl_seconds``."""
+        return self.refresh_serving() if self._serving_stale() else self.serving
+
+    async def _asearch_serving(self) -> ServingIndex:
+        from backend.services.concurrency import run_io
+
+        return await run_io(self.refresh_serving) if self._serving_stale() else self.serving
 
     def upsert_chunks(
         self,
@@ -80,10 +494,26 @@ class QdrantVectorStore:
         document_id: str,
         filename: str,
         metadata: Optional[dict] = None,
+        on_progress: Optional[Callable[[str, int, int], None]] = None,
     ) -> None:
+        """Embed and upsert a document's chunks.
+
+        ``on_progress(stage, done, total)`` is called after each embedding
+        batch (stage ``"embedding"``) and once the upsert finished
+        (stage ``"indexing"``).
+        """
+        from qdrant_client.http import models
+
+        serving = self.refresh_serving()
         chunk_list = list(chunks)
-        vectors = self.embedding.embed([chunk.content for chunk in chunk_list])
-        metadata = metadata or {}
+        texts = [chunk.content for chunk in chunk_list]
+        batch_size = max(1, settings.embedding_batch_size)
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), batch_size):
+            with span("embed"):
+                vectors.extend(serving.embedding.embed(texts[start:start + batch_size]))
+            if on_progress:
+                on_progress("embedding", len(vectors), len(texts))
 
         points = []
         for chunk, vector in zip(chunk_list, vectors):
@@ -91,27 +521,21 @@ class QdrantVectorStore:
                 models.PointStruct(
                     id=str(uuid.uuid4()),  # Use UUID for embedded mode compatibility
                     vector=vector,
-                    payload={
-                        "document_id": document_id,
-                        "filename": filename,
-                        "page_number": chunk.page_number,
-                        "chunk_index": chunk.chunk_index,
-                        "source": chunk.source,
-                        "section": chunk.section,
-                        "content": chunk.content,
-                        "category": metadata.get("category"),
-                        "deal_outcome": metadata.get("deal_outcome"),
-                        "deal_id": metadata.get("deal_id"),
-                    },
+                    payload=chunk_payload(chunk, document_id, filename, metadata),
                 )
             )
 
-        self.client.upsert(
-            collection_name=settings.qdrant_collection,
-            points=points,
-            wait=True,
-        )
+        with span("upsert"):
+            self.client.upsert(
+                collection_name=serving.collection,
+                points=points,
+                wait=True,
+            )
+        count_chunks("indexed", len(points))
+        if on_progress:
+            on_progress("indexing", len(points), len(points))
 
+    @_follows_alias
     def search(
         self,
         query: str,
@@ -119,66 +543,185 @@ class QdrantVectorStore:
         top_k: int = 5,
         categories: Optional[List[str]] = None,
         deal_outcomes: Optional[List[str]] = None,
-    ) -> List[ScoredChunk]:
-        query_vector = self.embedding.embed_one(query)
-
-        must_conditions = []
-        if doc_ids:
-            must_conditions.append(
-                models.FieldCondition(
-                    key="document_id",
-                    match=models.MatchAny(any=doc_ids),
-                )
-            )
-        if categories:
-            must_conditions.append(
-                models.FieldCondition(
-                    key="category",
-                    match=models.MatchAny(any=categories),
-                )
-            )
-        if deal_outcomes:
-            must_conditions.append(
-                models.FieldCondition(
-                    key="deal_outcome",
-                    match=models.MatchAny(any=deal_outcomes),
-                )
+    ) -> List[EvidenceRecord]:
+        serving = self._search_serving()
+        with span("embed_query"):
+            query_vector = serving.embedding.embed_one(query)
+
+        # Use query_points() for embedded mode compatibility
+        with span("vector_search"):
+            results = self.client.query_points(
+                collection_name=serving.collection,
+                query=query_vector,
+                query_filter=_build_filter(doc_ids, categories, deal_outcomes),
+                limit=top_k,
+                with_payload=True,
             )
+        return _to_scored_chunks(results.points)
+
+    @_follows_alias
+    async def asearch(
+        self,
+        query: str,
+        doc_ids: Optional[List[str]] = None,
+        top_k: int = 5,
+        categories: Optional[List[str]] = None,
+        deal_outcomes: Optional[List[str]] = None,
+    ) -> List[EvidenceRecord]:
+        """Non-blocking ``search`` for async routes.
 
-        search_filter = models.Filter(must=must_conditions) if must_conditions else None
+        Embedding runs on the bounded embedding executor. In server mode the
+        query goes through the shared ``AsyncQdrantClient``; the embedded client
+        is synchronous, so it runs on the I/O executor instead.
+        """
+        from backend.services.concurrency import run_embedding, run_io
 
-        # Use query_points() for embedded mode compatibility
-        results = self.client.query_points(
-            collection_name=settings.qdrant_collection,
+        serving = await self._asearch_serving()
+        with span("embed_query"):
+            query_vector = await run_embedding(serving.embedding.embed_one, query)
+        kwargs = dict(
+            collection_name=serving.collection,
             query=query_vector,
-            query_filter=search_filter,
+            query_filter=_build_filter(doc_ids, categories, deal_outcomes),
             limit=top_k,
             with_payload=True,
         )
+        with span("vector_search"):
+            if settings.qdrant_path:
+                results = await run_io(self.client.query_points, **kwargs)
+            else:
+                results = await get_async_qdrant_client().query_points(**kwargs)
+        return _to_scored_chunks(results.points)
+
+    async def asearch_batch(
+        self,
+        queries: Sequence[str],
+        doc_ids: Optional[List[str]] = None,
+        top_k: int = 5,
+        categories: Optional[List[str]] = None,
+        deal_outcomes: Optional[List[str]] = None,
+    ) -> List[List[EvidenceRecord]]:
+        """``asearch`` for several queries sharing one filter; results come back in query order."""
+        return await self.asearch_many([
+            SearchRequest(query, top_k, doc_ids, categories, deal_outcomes) for query in queries
+        ])
+
+    @_follows_alias
+    async def asearch_many(self, requests: Sequence[SearchRequest]) -> List[List[EvidenceRecord]]:
+        """Several searches, each with its own filter and limit, at about the cost of one.
+
+        All queries are embedded in one call (repeated texts once) and searched
+        in one ``query_batch_points`` round trip; results come back in request order.
+        """
+        from qdrant_client.http import models
 
-        scored: List[ScoredChunk] = []
-        for hit in results.points:  # query_points returns points in .points attribute
-            payload = hit.payload or {}
-            scored.append(
-                ScoredChunk(
-                    content=payload.get("content", ""),
-                    score=hit.score or 0.0,
-                    document_id=str(payload.get("document_id", "")),
-                    filename=str(payload.get("filename", "")),
-                    page_number=int(payload.get("page_number", 1)),
-                    chunk_index=int(payload.get("chunk_index", 0)),
-                    source=str(payload.get("source", "")),
-                    section=payload.get("section"),
-                    category=str(payload.get("category", "")),
-                    deal_outcome=payload.get("deal_outcome"),
+        from backend.services.concurrency import run_embedding, run_io
+
+        if not requests:
+            return []
+        serving = await self._asearch_serving()
+        with span("embed_query"):
+            vectors = await run_embedding(serving.embedding.embed_queries, [request.query for request in requests])
+        batch = [
+            models.QueryRequest(
+                query=vector,
+                filter=_build_filter(request.doc_ids, request.categories, request.deal_outcomes),
+                limit=request.top_k,
+                with_payload=True,
+            )
+            for request, vector in zip(requests, vectors)
+        ]
+        with span("vector_search"):
+            if settings.qdrant_path:
+                responses = await run_io(
+                    self.client.query_batch_points, collection_name=serving.collection, requests=batch
+                )
+            else:
+                responses = await get_async_qdrant_client().query_batch_points(
+                    collection_name=serving.collection, requests=batch
+                )
+        return [_to_scored_chunks(response.points) for response in responses]
+
+    def _groups_kwargs(
+        self,
+        collection: str,
+        query_vector: List[float],
+        group_by: str,
+        limit: int,
+        group_size: int,
+        doc_ids: Optional[List[str]],
+        categories: Optional[List[str]],
+        deal_outcomes: Optional[List[str]],
+    ) -> dict:
+        return dict(
+            collection_name=collection,
+            query=query_vector,
+            query_filter=_build_filter(doc_ids, categories, deal_outcomes),
+            group_by=group_by,
+            limit=limit,
+            group_size=group_size,
+            with_payload=True,
+        )
+
+    @_follows_alias
+    def search_groups(
+        self,
+        query: str,
+        group_by: str = "deal_id",
+        limit: int = 5,
+        group_size: int = 3,
+        doc_ids: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        deal_outcomes: Optional[List[str]] = None,
+    ) -> List[tuple[str, List[EvidenceRecord]]]:
+        """Top ``limit`` values of the ``group_by`` payload key, each with its best ``group_size`` chunks.
+
+        Points without the key are not grouped, so they are not returned.
+        """
+        serving = self._search_serving()
+        with span("embed_query"):
+            query_vector = serving.embedding.embed_one(query)
+        with span("vector_search"):
+            results = self.client.query_points_groups(
+                **self._groups_kwargs(
+                    serving.collection, query_vector, group_by, limit, group_size, doc_ids, categories, deal_outcomes
                 )
             )
+        return [(str(group.id), _to_scored_chunks(group.hits)) for group in results.groups]
 
-        return scored
+    @_follows_alias
+    async def asearch_groups(
+        self,
+        query: str,
+        group_by: str = "deal_id",
+        limit: int = 5,
+        group_size: int = 3,
+        doc_ids: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        deal_outcomes: Optional[List[str]] = None,
+    ) -> List[tuple[str, List[EvidenceRecord]]]:
+        """Non-blocking ``search_groups``."""
+        from backend.services.concurrency import run_embedding, run_io
+
+        serving = await self._asearch_serving()
+        with span("embed_query"):
+            query_vector = await run_embedding(serving.embedding.embed_one, query)
+        kwargs = self._groups_kwargs(
+            serving.collection, query_vector, group_by, limit, group_size, doc_ids, categories, deal_outcomes
+        )
+        with span("vector_search"):
+            if settings.qdrant_path:
+                results = await run_io(self.client.query_points_groups, **kwargs)
+            else:
+                results = await get_async_qdrant_client().query_points_groups(**kwargs)
+        return [(str(group.id), _to_scored_chunks(group.hits)) for group in results.groups]
 
     def delete_document(self, document_id: str) -> None:
+        from qdrant_client.http import models
+
+        serving = self.refresh_serving()
         self.client.delete(
-            collection_name=settings.qdrant_collection,
+            collection_name=serving.collection,
             points_selector=models.FilterSelector(
                 filter=models.Filter(
                     must=[
@@ -0,0 +1,94 @@
+"""Background warm-up of slow subsystems and per-subsystem readiness.
+
+Startup only does what every request needs: create the SQLite schema and
+run migrations. The expensive parts are imported and initialised on daemon
+threads, one per subsystem, so a slow model download does not hold up the
+others. ``/health`` answers (and the packaged app opens the browser) within
+about a second:
+
+* ``vector_store``    — qdrant_client import, client, collection check;
+* ``embedding_model`` — fastembed import, ONNX weights, one inference;
+* ``parser``          — docling import and its PDF pipeline;
+* ``analytics``       — DuckDB import and connection.
+
+A request that needs a subsystem before its warm-up finished simply
+initialises it (or waits on the same lock); the warm-up then finds it done.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PENDING, WARMING, READY, FAILED = "pending", "warming", "ready", "failed"
+
+
+@dataclass
+class SubsystemStatus:
+    state: str = PENDING
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class Readiness:
+    def __init__(self):
+        self._subsystems: dict[str, SubsystemStatus] = {}
+        self._lock = threading.Lock()
+
+    def register(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._subsystems.setdefault(name, SubsystemStatus())
+
+    def mark_ready(self, name: str, duration_ms: Optional[float] = None) -> None:
+        with self._lock:
+            self._subsystems[name] = SubsystemStatus(READY, duration_ms)
+
+    def run(self, name: str, fn: Callable[[], object]) -> bool:
+        """Run one warm-up step, recording its state and duration. Never raises."""
+        with self._lock:
+            self._subsystems[name] = SubsystemStatus(WARMING)
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception as exc:  # reported through /health; the route that needs it will raise again
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            logger.warning("Warm-up of %s failed after %.0f ms: %s", name, duration_ms, exc)
+            with self._lock:
+                self._subsystems[name] = SubsystemStatus(FAILED, duration_ms, f"{type(exc).__name__}: {exc}")
+            return False
+        self.mark_ready(name, round((time.perf_counter() - started) * 1000, 1))
+        logger.info("Warm-up of %s done in %.0f ms", name, self._subsystems[name].duration_ms)
+        return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            subsystems = {name: asdict(status) for name, status in self._subsystems.items()}
+        return {
+            "ready": all(status["state"] == READY for status in subsystems.values()),
+            "subsystems": subsystems,
+        }
+
+
+def start_warmup(readiness: Readiness, steps: Sequence[tuple[str, Callable[[], object]]]) -> list[threading.Thread]:
+    """Run each step on its own daemon thread; a failed step does not affect the others."""
+    readiness.register(*(name for name, _ in steps))
+    threads = [
+        threading.Thread(target=readiness.run, args=(name, fn), name=f"warmup-{name}", daemon=True)
+        for name, fn in steps
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+_readiness = Readiness()
+
+
+def get_readiness() -> Readiness:
+    return _readiness
@@ -1,17 +1,41 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import itertools
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator
 
 from sqlalchemy.orm import Session
 
-from backend.models import Deal
-from backend.services.precedent import find_precedents, summarize_precedents
-from backend.services.rag import generate_answer
-from backend.services.vector import QdrantVectorStore
+from backend.services.concurrency import run_db, run_io
+from backend.services.dag import DAG, FAILED, Node, NodeResult
+from backend.services.deal_index import DealIndex
+from backend.services.metadata_cache import DealInfo, get_metadata_cache
+from backend.services.precedent import (
+    PRECEDENT_OVERFETCH,
+    PRECEDENT_PER_DEAL,
+    _resolve_precedents,
+    flatten_groups,
+    group_precedents,
+    summarize_precedents,
+)
+from backend.services.rag import agenerate_answer
+from backend.services.evidence import EvidenceRecord, citation
+from backend.services.vector import QdrantVectorStore, SearchRequest
 
 
 WORKFLOW_PROMPT_VERSION = "ic_workflow_v1"
+WORKFLOW_TOP_K = 8  # Reduced from 16 to avoid context window overflow
+# Outcome facets are searched separately so each bucket gets evidence even
+# when one outcome dominates the overall top-k.
+PRECEDENT_FACETS = ("invested", "passed", "exited")
+FACET_TOP_K = 4
+SIMILAR_DEALS_TOP_K = 5
+# Evidence chunks cited per risk gap / question / challenge.
+ITEM_EVIDENCE_TOP_K = 3
+EVIDENCE_SNIPPET_CHARS = 500
+# Pack sections whose items get their own evidence search.
+CITED_SECTIONS = ("risk_gaps", "diligence_questions", "committee_challenges")
 
 
 @dataclass
@@ -21,9 +45,21 @@ class WorkflowPack:
     diligence_questions: list[str]
     ic_memo_outline: list[str]
     committee_challenges: list[str]
+    # One entry per cited item: {"section", "item", "evidence": [evidence ids]}.
+    item_evidence: list[dict[str, Any]] = field(default_factory=list)
+    # Evidence id ("document_id:chunk_index") -> chunk, shared across items.
+    evidence: dict[str, dict[str, Any]] = field(default_factory=dict)
 
 
-def _derive_risk_gaps(query: str, precedent_summary: dict[str, Any], deal: Deal | None) -> list[str]:
+@dataclass
+class FacetHits:
+    """Output of the workflow's single batched search."""
+
+    precedent_hits: dict[str, list[EvidenceRecord]]
+    item_hits: dict[tuple[str, str], list[EvidenceRecord]]
+
+
+def _derive_risk_gaps(query: str, precedent_summary: dict[str, Any], deal: DealInfo | None) -> list[str]:
     gaps: list[str] = []
     if deal and not deal.outcome_status:
         gaps.append("Outcome data is missing for the current deal shell; compare only against historical precedent, not realized performance.")
@@ -38,7 +74,7 @@ def _derive_risk_gaps(query: str, precedent_summary: dict[str, Any], deal: Deal
     return gaps
 
 
-def _derive_questions(deal: Deal | None, precedent_summary: dict[str, Any]) -> list[str]:
+def _derive_questions(deal: DealInfo | None, precedent_summary: dict[str, Any]) -> list[str]:
     questions = [
         "Which assumptions in the current memo are unsupported by cited evidence?",
         "Which historical passed deals most closely resemble this opportunity, and what killed them?",
@@ -53,7 +89,7 @@ def _derive_questions(deal: Deal | None, precedent_summary: dict[str, Any]) -> l
     return questions
 
 
-def _build_memo_outline(deal: Deal | None) -> list[str]:
+def _build_memo_outline(deal: DealInfo | None) -> list[str]:
     deal_name = deal.name if deal else "Current Opportunity"
     return [
         f"Executive summary for {deal_name}",
@@ -65,7 +101,7 @@ def _build_memo_outline(deal: Deal | None) -> list[str]:
     ]
 
 
-def _build_committee_challenges(precedent_summary: dict[str, Any], deal: Deal | None) -> list[str]:
+def _build_committee_challenges(precedent_summary: dict[str, Any], deal: DealInfo | None) -> list[str]:
     challenges = [
         "What is the strongest argument that this deal fits historical style but not historical success?",
         "Which piece of evidence in the current packet would an opposing partner attack first?",
@@ -78,47 +114,21 @@ def _build_committee_challenges(precedent_summary: dict[str, Any], deal: Deal |
     return challenges
 
 
-def run_ic_workflow(
-    db: Session,
-    vector_store: QdrantVectorStore,
-    query: str,
-    deal_id: str | None = None,
-    doc_ids: list[str] | None = None,
-    categories: list[str] | None = None,
-    deal_outcomes: list[str] | None = None,
-) -> dict[str, Any]:
-    deal = db.query(Deal).filter(Deal.id == deal_id).first() if deal_id else None
-    precedents = find_precedents(
-        db,
-        vector_store,
-        query,
-        doc_ids=doc_ids,
-        categories=categories,
-        deal_outcomes=deal_outcomes,
-        top_k=8,  # Reduced from 16 to avoid context window overflow
-    )
-    precedent_summary = summarize_precedents(precedents)
-
-    top_hits = precedents[:5]
-    llm_answer = generate_answer(query, [
-        type("WorkflowChunk", (), {
-            "filename": item.filename,
-            "page_number": item.page_number,
-            "document_id": item.document_id,
-            "content": item.evidence,
-            "category": item.category,
-            "deal_outcome": item.deal_outcome,
-            "chunk_index": item.chunk_index,
-        })()
-        for item in top_hits
-    ]) if top_hits else {
+def _no_evidence_answer() -> dict[str, Any]:
+    return {
         "answer": "No precedent evidence was retrieved.",
         "sources": [],
         "prompt_version": WORKFLOW_PROMPT_VERSION,
         "model_name": "",
     }
 
-    pack = WorkflowPack(
+
+def _load_deal(db: Session, deal_id: str | None) -> DealInfo | None:
+    return get_metadata_cache().get(db).deal(deal_id)
+
+
+def _build_pack(query: str, deal: DealInfo | None, precedent_summary: dict[str, Any]) -> WorkflowPack:
+    return WorkflowPack(
         precedent_scan=precedent_summary,
         risk_gaps=_derive_risk_gaps(query, precedent_summary, deal),
         diligence_questions=_derive_questions(deal, precedent_summary),
@@ -126,24 +136,305 @@ def run_ic_workflow(
         committee_challenges=_build_committee_challenges(precedent_summary, deal),
     )
 
+
+def _pack_items(pack: WorkflowPack) -> list[tuple[str, str]]:
+    return [(section, item) for section in CITED_SECTIONS for item in getattr(pack, section)]
+
+
+def _candidate_items(query: str, deal: DealInfo | None) -> list[tuple[str, str]]:
+    """Every item the pack could contain for this query and deal, before the scan.
+
+    The templates only depend on which outcome buckets are empty, so building
+    the pack once per empty/non-empty combination enumerates them all. Their
+    evidence can then be searched in the same batch as the precedents.
+    """
+    items: dict[tuple[str, str], None] = {}
+    for flags in itertools.product((False, True), repeat=3):
+        buckets = {name: [None] if flag else [] for name, flag in zip(PRECEDENT_FACETS, flags)}
+        for key in _pack_items(_build_pack(query, deal, {"buckets": buckets})):
+            items[key] = None
+    return list(items)
+
+
+def _item_query(query: str, item: str) -> str:
+    return f"{query}. {item}"
+
+
+def _attribute_facets(query: str, deal: DealInfo | None) -> list[tuple[str, str]]:
+    if deal is None:
+        return []
+    facets = [
+        ("sector", deal.sector and f"{query} in the {deal.sector} sector"),
+        ("stage", deal.stage and f"{query} at {deal.stage} stage"),
+        ("geography", deal.geography and f"{query} in {deal.geography}"),
+    ]
+    return [(f"facet_{name}", text) for name, text in facets if text]
+
+
+def _cite_items(pack: WorkflowPack, item_hits: dict[tuple[str, str], list[EvidenceRecord]]) -> None:
+    """Attach each pack item's evidence, with chunks shared across items stored once."""
+    evidence: dict[str, dict[str, Any]] = {}
+    cited = []
+    for section, item in _pack_items(pack):
+        refs = []
+        for hit in item_hits.get((section, item), []):
+            ref = hit.ref
+            if ref not in evidence or hit.score > evidence[ref]["score"]:
+                evidence[ref] = citation(hit, EVIDENCE_SNIPPET_CHARS)
+            refs.append(ref)
+        cited.append({"section": section, "item": item, "evidence": refs})
+    pack.item_evidence = cited
+    pack.evidence = evidence
+
+
+def _deal_summary(deal: DealInfo | None) -> dict[str, Any] | None:
+    if deal is None:
+        return None
+    return {
+        "id": deal.id,
+        "name": deal.name,
+        "sector": deal.sector,
+        "stage": deal.stage,
+        "geography": deal.geography,
+        "decision_status": deal.decision_status,
+        "outcome_status": deal.outcome_status,
+    }
+
+
+def _assemble_workflow_payload(
+    query: str,
+    deal: DealInfo | None,
+    pack: WorkflowPack,
+    llm_answer: dict[str, Any],
+) -> dict[str, Any]:
     return {
-        "deal": {
-            "id": deal.id,
-            "name": deal.name,
-            "sector": deal.sector,
-            "stage": deal.stage,
-            "geography": deal.geography,
-            "decision_status": deal.decision_status,
-            "outcome_status": deal.outcome_status,
-        } if deal else None,
+        "deal": _deal_summary(deal),
         "query": query,
         "precedent_scan": pack.precedent_scan,
         "risk_gaps": pack.risk_gaps,
         "diligence_questions": pack.diligence_questions,
         "ic_memo_outline": pack.ic_memo_outline,
         "committee_challenges": pack.committee_challenges,
+        "item_evidence": pack.item_evidence,
+        "evidence": pack.evidence,
         "draft_answer": llm_answer["answer"],
         "draft_sources": llm_answer["sources"],
         "prompt_version": llm_answer.get("prompt_version", WORKFLOW_PROMPT_VERSION),
         "model_name": llm_answer.get("model_name", ""),
     }
+
+
+def _merge_hits(hit_lists: list[list[EvidenceRecord]]) -> list[EvidenceRecord]:
+    """Union of facet hits, one per chunk (best score), best first."""
+    best: dict[tuple[str, int], EvidenceRecord] = {}
+    for hits in hit_lists:
+        for hit in hits:
+            key = (hit.document_id, hit.chunk_index)
+            if key not in best or hit.score > best[key].score:
+                best[key] = hit
+    return sorted(best.values(), key=lambda hit: hit.score, reverse=True)
+
+
+def _section_prompt(query: str, section: str) -> str:
+    return f"Draft the '{section}' section of an IC memo. Focus: {query}"
+
+
+def build_ic_workflow_dag(
+    db: Session,
+    vector_store: QdrantVectorStore,
+    query: str,
+    deal_id: str | None = None,
+    doc_ids: list[str] | None = None,
+    categories: list[str] | None = None,
+    deal_outcomes: list[str] | None = None,
+    draft_sections: bool = False,
+    deal_index: DealIndex | None = None,
+) -> DAG:
+    """The IC workflow as a DAG.
+
+    Once the deal is loaded (from the metadata cache), one ``retrieve`` node
+    runs every search in a single batch. The batch holds the overall query,
+    one search per outcome facet and per deal attribute (sector, stage,
+    geography), and one per risk gap, question and challenge the pack could
+    contain. It is one embedding call and one Qdrant round trip. The pack
+    builders and the LLM drafts start as soon as the evidence is resolved.
+    With ``draft_sections`` every memo section is drafted concurrently too,
+    within the LLM gateway limit.
+
+    With a ``deal_index`` and a ``deal_id``, a ``similar_deals`` node looks up
+    the nearest whole deals (one ANN query) alongside the chunk searches.
+
+    A Session is not thread-safe, so the nodes that use ``db`` are chained:
+    ``precedents`` waits for ``deal``.
+    """
+    outcome_facets = [("retrieve_all", deal_outcomes, WORKFLOW_TOP_K)] + [
+        (f"retrieve_{outcome}", [outcome], FACET_TOP_K)
+        for outcome in PRECEDENT_FACETS
+        if not deal_outcomes or outcome in deal_outcomes
+    ]
+
+    async def load_deal():
+        return await run_db(_load_deal, db, deal_id)
+
+    async def retrieve(deal):
+        def request(text: str, top_k: int, outcomes: list[str] | None = deal_outcomes) -> SearchRequest:
+            return SearchRequest(text, top_k, doc_ids, categories, outcomes)
+
+        # Precedent searches are over-fetched so the per-deal cap in
+        # ``precedents`` still leaves enough deals.
+        named = [(name, request(query, top_k * PRECEDENT_OVERFETCH, outcomes)) for name, outcomes, top_k in outcome_facets]
+        named += [(name, request(text, FACET_TOP_K * PRECEDENT_OVERFETCH)) for name, text in _attribute_facets(query, deal)]
+        items = _candidate_items(query, deal)
+        requests = [req for _, req in named] + [request(_item_query(query, item), ITEM_EVIDENCE_TOP_K) for _, item in items]
+        results = await vector_store.asearch_many(requests)
+        return FacetHits(
+            precedent_hits={name: hits for (name, _), hits in zip(named, results)},
+            item_hits=dict(zip(items, results[len(named):])),
+        )
+
+    async def resolve(deal, retrieve):
+        hits = _merge_hits(list(retrieve.precedent_hits.values()))
+        if not hits:
+            return []
+        precedents = await run_db(_resolve_precedents, db, hits)
+        max_deals = math.ceil(WORKFLOW_TOP_K / PRECEDENT_PER_DEAL)
+        return flatten_groups(group_precedents(precedents, max_deals), WORKFLOW_TOP_K)
+
+    async def scan(precedents):
+        return summarize_precedents(precedents)
+
+    async def pack(deal, precedent_scan, retrieve):
+        built = _build_pack(query, deal, precedent_scan)
+        _cite_items(built, retrieve.item_hits)
+        return built
+
+    async def draft(precedents):
+        top_hits = precedents[:5]
+        return await agenerate_answer(query, top_hits) if top_hits else _no_evidence_answer()
+
+    def draft_section(index: int):
+        async def run(deal, precedents):
+            section = _build_memo_outline(deal)[index]
+            top_hits = precedents[:5]
+            if not top_hits:
+                return {"section": section, **_no_evidence_answer()}
+            answer = await agenerate_answer(_section_prompt(query, section), top_hits)
+            return {"section": section, **answer}
+
+        return run
+
+    async def similar():
+        return await run_io(deal_index.similar_deals, deal_id=deal_id, top_k=SIMILAR_DEALS_TOP_K)
+
+    nodes = [Node("deal", load_deal)]
+    if deal_index is not None and deal_id:
+        nodes.append(Node("similar_deals", similar))
+    nodes += [
+        Node("retrieve", retrieve, deps=("deal",)),
+        Node("precedents", resolve, deps=("deal", "retrieve")),
+        Node("precedent_scan", scan, deps=("precedents",)),
+        Node("ic_pack", pack, deps=("deal", "precedent_scan", "retrieve")),
+        Node("draft_answer", draft, deps=("precedents",)),
+    ]
+    if draft_sections:
+        # The outline has a fixed shape; only the first heading names the deal.
+        nodes += [
+            Node(f"draft_section_{index}", draft_section(index), deps=("deal", "precedents"))
+            for index in range(len(_build_memo_outline(None)))
+        ]
+    return DAG(nodes)
+
+
+def _node_preview(result: NodeResult) -> Any:
+    """What a streaming client sees of a finished node."""
+    value = result.value
+    if result.name == "deal":
+        return _deal_summary(value)
+    if result.name == "retrieve":
+        return {
+            "searches": len(value.precedent_hits) + len(value.item_hits),
+            "precedent_hits": {name: len(hits) for name, hits in value.precedent_hits.items()},
+        }
+    if result.name == "precedents":
+        return {"count": len(value)}
+    if result.name == "similar_deals":
+        return [asdict(deal) for deal in value]
+    if result.name == "ic_pack":
+        return {key: item for key, item in asdict(value).items() if key != "precedent_scan"}
+    if result.name == "draft_answer" or result.name.startswith("draft_section_"):
+        return {key: value[key] for key in ("section", "answer", "sources") if key in value}
+    return value  # precedent_scan
+
+
+def _workflow_payload(query: str, dag: DAG) -> dict[str, Any]:
+    results = {name: result.value for name, result in dag.results.items()}
+    payload = _assemble_workflow_payload(query, results["deal"], results["ic_pack"], results["draft_answer"])
+    section_nodes = (f"draft_section_{index}" for index in range(len(_build_memo_outline(None))))
+    drafts = [results[name] for name in section_nodes if name in results]
+    if drafts:
+        payload["memo_drafts"] = [
+            {"section": item["section"], "answer": item["answer"], "sources": item["sources"]} for item in drafts
+        ]
+    if "similar_deals" in results:
+        payload["similar_deals"] = [asdict(deal) for deal in results["similar_deals"]]
+    payload["node_timings"] = dag.timings()
+    return payload
+
+
+async def astream_ic_workflow(
+    db: Session,
+    vector_store: QdrantVectorStore,
+    query: str,
+    deal_id: str | None = None,
+    doc_ids: list[str] | None = None,
+    categories: list[str] | None = None,
+    deal_outcomes: list[str] | None = None,
+    draft_sections: bool = False,
+    deal_index: DealIndex | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Run the workflow DAG and yield events as it progresses.
+
+    Each node yields a ``{"event": "node", ...}`` event. The run ends with a
+    ``{"event": "result", "payload": ...}`` event. If a node failed, the
+    first failure is raised once the rest of the graph has settled.
+    """
+    dag = build_ic_workflow_dag(
+        db, vector_store, query, deal_id, doc_ids, categories, deal_outcomes, draft_sections, deal_index
+    )
+    async for result in dag.stream():
+        event = {
+            "event": "node",
+            "node": result.name,
+            "status": result.status,
+            "started_ms": result.started_ms,
+            "duration_ms": result.duration_ms,
+        }
+        if result.error is not None:
+            event["error"] = str(result.error)
+        else:
+            event["result"] = _node_preview(result)
+        yield event
+    failed = next((result for result in dag.results.values() if result.status == FAILED), None)
+    if failed is not None:
+        raise failed.error
+    yield {"event": "result", "payload": _workflow_payload(query, dag)}
+
+
+async def arun_ic_workflow(
+    db: Session,
+    vector_store: QdrantVectorStore,
+    query: str,
+    deal_id: str | None = None,
+    doc_ids: list[str] | None = None,
+    categories: list[str] | None = None,
+    deal_outcomes: list[str] | None = None,
+    draft_sections: bool = False,
+    deal_index: DealIndex | None = None,
+) -> dict[str, Any]:
+    """Run the workflow DAG to completion and return its payload, including ``node_timings``."""
+    async for event in astream_ic_workflow(
+        db, vector_store, query, deal_id, doc_ids, categories, deal_outcomes, draft_sections, deal_index
+    ):
+        if event["event"] == "result":
+            return event["payload"]
+    raise RuntimeError("Workflow finished without a result")
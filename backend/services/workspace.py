@@ -1,23 +1,111 @@
+"""The on-disk workspace: raw uploads, parsed artifacts, postmortems, skills.
+
+Directories are created once per process. Each file is written in one call to
+a temporary name in the target directory and then renamed into place, so a
+crash or a concurrent reader never sees a half-written artifact.
+
+Parsed chunks are stored as JSONL, one compact object per line, compressed
+with ``PARSED_CHUNKS_COMPRESSION`` (``gzip`` by default, ``zstd`` when the
+``zstandard`` package is installed, or ``none``). ``iter_parsed_chunks``
+streams them back, one line at a time. It also reads the older indented
+``.chunks.json`` files.
+"""
+
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import os
 import re
+import threading
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Iterator
 
 from backend.config import get_settings
 from backend.services.parser import ParsedChunk
 
 settings = get_settings()
 
+DEAL_SUBDIRS = ("raw", "parsed", "notes", "models", "outputs")
+CHUNK_SUFFIXES = {"none": ".chunks.jsonl", "gzip": ".chunks.jsonl.gz", "zstd": ".chunks.jsonl.zst"}
+LEGACY_CHUNK_SUFFIX = ".chunks.json"
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
 
 def _slugify(value: str) -> str:
     slug = re.sub(r"[^a-zA-Z0-9]+", "-", value).strip("-").lower()
     return slug or "artifact"
 
 
+def atomic_write(target: Path, data: bytes) -> Path:
+    """Write ``data`` to a temporary sibling of ``target``, then rename it into place."""
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return target
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError("zstd-compressed chunk files need the optional zstandard package") from exc
+    return zstandard
+
+
+# ---------------------------------------------------------------------------
+# Parsed chunk files
+# ---------------------------------------------------------------------------
+
+def encode_chunks(chunks: list[ParsedChunk], compression: str) -> bytes:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    data = "".join(
+        dumps({
+            "content": chunk.content,
+            "page_number": chunk.page_number,
+            "chunk_index": chunk.chunk_index,
+            "source": chunk.source,
+            "section": chunk.section,
+        }) + "\n"
+        for chunk in chunks
+    ).encode("utf-8")
+    if compression == "gzip":
+        # mtime=0 keeps the bytes identical for identical chunks.
+        return gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+    return data
+
+
+def _open_chunk_lines(path: Path) -> IO[str]:
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.name.endswith(".zst"):
+        raw = path.open("rb")
+        return io.TextIOWrapper(_zstandard().ZstdDecompressor().stream_reader(raw, closefd=True), encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def iter_parsed_chunks(path: str | Path) -> Iterator[ParsedChunk]:
+    """Stream the chunks of a parsed-chunks file written by any version of the workspace."""
+    path = Path(path)
+    if path.name.endswith(LEGACY_CHUNK_SUFFIX):
+        yield from (ParsedChunk(**item) for item in json.loads(path.read_text(encoding="utf-8")))
+        return
+    with _open_chunk_lines(path) as lines:
+        for line in lines:
+            if line.strip():
+                yield ParsedChunk(**json.loads(line))
+
+
 class WorkspaceManager:
-    def __init__(self) -> None:
+    def __init__(self, compression: str | None = None) -> None:
         self.workspace_root = Path(settings.workspace_root)
         self.deals_root = Path(settings.deals_root)
         self.skills_root = Path(settings.skills_root)
@@ -26,8 +114,25 @@ class WorkspaceManager:
         self.templates_root = Path(settings.templates_root)
         self.cache_root = Path(settings.cache_root)
         self.logs_root = Path(settings.logs_root)
+        self.compression = (compression or settings.parsed_chunks_compression).lower()
+        if self.compression not in CHUNK_SUFFIXES:
+            raise ValueError(f"Unsupported parsed chunk compression: {self.compression}")
+        if self.compression == "zstd":
+            _zstandard()
+        self._dirs: set[Path] = set()
+        self._dirs_lock = threading.Lock()
         self.ensure_layout()
 
+    def _ensure_dir(self, path: Path) -> Path:
+        """``mkdir -p`` once per directory per process."""
+        if path in self._dirs:
+            return path
+        with self._dirs_lock:
+            if path not in self._dirs:
+                path.mkdir(parents=True, exist_ok=True)
+                self._dirs.add(path)
+        return path
+
     def ensure_layout(self) -> None:
         for path in (
             self.workspace_root,
@@ -39,23 +144,23 @@ class WorkspaceManager:
             self.cache_root,
             self.logs_root,
         ):
-            path.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(path)
 
         for stage in ("draft", "candidate", "tested", "blessed", "deprecated"):
-            (self.skills_root / stage).mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(self.skills_root / stage)
 
     def deal_root(self, deal_id: str | None) -> Path:
         deal_segment = f"deal_{deal_id}" if deal_id else "deal_unassigned"
         root = self.deals_root / deal_segment
-        for name in ("raw", "parsed", "notes", "models", "outputs"):
-            (root / name).mkdir(parents=True, exist_ok=True)
+        if root not in self._dirs:
+            for name in DEAL_SUBDIRS:
+                self._ensure_dir(root / name)
+            self._dirs.add(root)
         return root
 
     def store_raw_document(self, document_id: str, filename: str, content: bytes, deal_id: str | None = None) -> Path:
         deal_root = self.deal_root(deal_id)
-        target = deal_root / "raw" / f"{document_id}_{filename}"
-        target.write_bytes(content)
-        return target
+        return atomic_write(deal_root / "raw" / f"{document_id}_{filename}", content)
 
     def write_parsed_artifacts(
         self,
@@ -68,59 +173,15 @@ class WorkspaceManager:
         parsed_dir = deal_root / "parsed"
         stem = _slugify(Path(filename).stem)
         markdown_path = parsed_dir / f"{document_id}_{stem}.md"
-        chunks_path = parsed_dir / f"{document_id}_{stem}.chunks.json"
-
-        markdown_path.write_text("\n\n---\n\n".join(chunk.content for chunk in chunks), encoding="utf-8")
-        chunks_path.write_text(
-            json.dumps(
-                [
-                    {
-                        "content": chunk.content,
-                        "page_number": chunk.page_number,
-                        "chunk_index": chunk.chunk_index,
-                        "source": chunk.source,
-                        "section": chunk.section,
-                    }
-                    for chunk in chunks
-                ],
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
-        )
+        chunks_path = parsed_dir / f"{document_id}_{stem}{CHUNK_SUFFIXES[self.compression]}"
+
+        atomic_write(markdown_path, "\n\n---\n\n".join(chunk.content for chunk in chunks).encode("utf-8"))
+        atomic_write(chunks_path, encode_chunks(chunks, self.compression))
         return {
             "markdown_path": str(markdown_path),
             "chunks_path": str(chunks_path),
         }
 
-    def write_workflow_output(
-        self,
-        workflow_id: str,
-        deal_id: str | None,
-        title: str,
-        payload: dict[str, Any],
-    ) -> Path:
-        deal_root = self.deal_root(deal_id)
-        output_path = deal_root / "outputs" / f"{workflow_id}_{_slugify(title)}.md"
-        lines = [
-            f"# {title}",
-            "",
-            f"- workflow_id: `{workflow_id}`",
-            f"- deal_id: `{deal_id or 'unassigned'}`",
-            "",
-            "## Draft Answer",
-            payload.get("draft_answer", "No answer"),
-            "",
-            "## Risk Gaps",
-        ]
-        lines.extend([f"- {item}" for item in payload.get("risk_gaps", [])] or ["- None"])
-        lines.extend(["", "## Diligence Questions"])
-        lines.extend([f"- {item}" for item in payload.get("diligence_questions", [])] or ["- None"])
-        lines.extend(["", "## Committee Challenges"])
-        lines.extend([f"- {item}" for item in payload.get("committee_challenges", [])] or ["- None"])
-        output_path.write_text("\n".join(lines), encoding="utf-8")
-        return output_path
-
     def write_postmortem(
         self,
         workflow_id: str,
@@ -130,25 +191,19 @@ class WorkspaceManager:
     ) -> Path:
         target = self.postmortems_root / f"{workflow_id}.md"
         frontmatter = "\n".join([f"- {key}: {value}" for key, value in metadata.items()])
-        target.write_text(
-            f"# Postmortem {workflow_id}\n\n{summary}\n\n## Metadata\n{frontmatter}\n",
-            encoding="utf-8",
+        return atomic_write(
+            target, f"# Postmortem {workflow_id}\n\n{summary}\n\n## Metadata\n{frontmatter}\n".encode("utf-8")
         )
-        return target
 
     def write_skill_file(self, stage: str, name: str, content: str) -> Path:
-        stage_dir = self.skills_root / stage
-        stage_dir.mkdir(parents=True, exist_ok=True)
-        target = stage_dir / f"{_slugify(name)}.md"
-        target.write_text(content, encoding="utf-8")
-        return target
+        stage_dir = self._ensure_dir(self.skills_root / stage)
+        return atomic_write(stage_dir / f"{_slugify(name)}.md", content.encode("utf-8"))
 
     def write_mempalace_artifact(self, memory_id: str, payload: dict[str, Any]) -> Path:
-        export_dir = self.mempalace_root / "exports"
-        export_dir.mkdir(parents=True, exist_ok=True)
-        target = export_dir / f"{memory_id}.json"
-        target.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        return target
+        export_dir = self._ensure_dir(self.mempalace_root / "exports")
+        return atomic_write(
+            export_dir / f"{memory_id}.json", json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        )
 
     def summary(self) -> dict[str, str]:
         return {
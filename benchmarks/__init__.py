@@ -0,0 +1,5 @@
+"""Reproducible performance benchmarks for ingestion, retrieval and generation.
+
+Run ``python -m benchmarks run --scale smoke`` from the repository root; see
+``benchmarks/README.md``.
+"""
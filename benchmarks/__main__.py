@@ -0,0 +1,147 @@
+"""Benchmark runner CLI.
+
+    python -m benchmarks run --scale default [--suites chunking,qdrant] [--qdrant-url http://localhost:6333]
+    python -m benchmarks compare base.json head.json
+
+The backend reads its settings once at import, so the runner points every
+path, Qdrant and the LLM at a throwaway benchmark workspace (and the stub LLM
+server) *before* importing any suite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from contextlib import ExitStack
+from pathlib import Path
+
+from benchmarks.config import SCALES, build_config
+from benchmarks.harness import BenchmarkResult, compare_reports, write_report
+from benchmarks.suites import SUITES
+
+RESULTS_DIR = Path(__file__).parent / "results"
+_ROOT_SETTINGS = (
+    "MEMPALACE_ROOT", "DEALS_ROOT", "SKILLS_ROOT", "TEMPLATES_ROOT", "POSTMORTEMS_ROOT",
+    "CACHE_ROOT", "LOGS_ROOT", "EXPORTS_ROOT", "CONNECTORS_ROOT",
+)
+
+
+def _configure_backend(workspace: Path, llm_base_url: str, qdrant_url: str | None) -> None:
+    if "backend.config" in sys.modules:
+        raise RuntimeError("backend was imported before the benchmark environment was configured")
+    os.environ["WORKSPACE_ROOT"] = str(workspace)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workspace / 'sqlite' / 'bench.db'}"
+    os.environ["DUCKDB_PATH"] = str(workspace / "duckdb" / "bench.duckdb")
+    for name in _ROOT_SETTINGS:
+        os.environ[name] = str(workspace / name.lower().removesuffix("_root"))
+    if qdrant_url:
+        os.environ["QDRANT_URL"] = qdrant_url
+        os.environ["QDRANT_COLLECTION"] = "bench_chat"
+        os.environ.pop("QDRANT_PATH", None)
+    else:
+        os.environ["QDRANT_PATH"] = str(workspace / "qdrant_app")
+    os.environ["LLM_BASE_URL"] = llm_base_url
+    os.environ["LLM_API_KEY"] = "benchmark"
+    os.environ["LLM_MODEL"] = "stub-model"
+
+
+def _default_output(scale: str) -> Path:
+    import subprocess
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = "local"
+    return RESULTS_DIR / f"{commit}-{scale}.json"
+
+
+def _print_result(result: BenchmarkResult) -> None:
+    if result.status != "ok":
+        print(f"  {result.key}: {result.status.upper()} ({result.detail})")
+        return
+    metrics = ", ".join(f"{k}={v}" for k, v in result.metrics.items() if not k.startswith("stage_"))
+    print(f"  {result.key}: {metrics}")
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    from benchmarks.stub_llm import StubLLMServer
+
+    suites = [s.strip() for s in args.suites.split(",")] if args.suites else list(SUITES)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        print(f"Unknown suites: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    workspace = Path(args.workspace or tempfile.mkdtemp(prefix="pe-bench-")).resolve()
+    workspace.mkdir(parents=True, exist_ok=True)
+    config = build_config(args.scale, workspace, seed=args.seed, qdrant_url=args.qdrant_url)
+    output = Path(args.output) if args.output else _default_output(args.scale)
+
+    results: list[BenchmarkResult] = []
+    with ExitStack() as stack:
+        stub = stack.enter_context(StubLLMServer(ttft_s=config.stub_ttft_ms / 1000))
+        _configure_backend(workspace, stub.base_url, config.qdrant_url)
+        for suite in suites:
+            print(f"[{suite}]")
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(f"benchmarks.suites.{suite}")
+                suite_results = module.run(config)
+            except Exception as exc:
+                traceback.print_exc()
+                suite_results = [BenchmarkResult(suite=suite, name=suite, status="failed", detail=repr(exc))]
+            for result in suite_results:
+                _print_result(result)
+            print(f"  ({time.perf_counter() - started:.1f}s)")
+            results.extend(suite_results)
+
+    config_dict = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(config).items()}
+    config_dict["suites"] = suites
+    write_report(output, config_dict, results)
+    print(f"Wrote {output}")
+    if not args.keep_workspace and not args.workspace:
+        shutil.rmtree(workspace, ignore_errors=True)
+    return 1 if any(r.status == "failed" for r in results) else 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    lines = compare_reports(Path(args.base), Path(args.head), threshold_pct=args.threshold)
+    print("\n".join(lines) if lines else "No comparable results.")
+    return 1 if args.fail_on_regression and any("REGRESSION" in line for line in lines) else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmark suites and write a JSON report")
+    run.add_argument("--scale", choices=sorted(SCALES), default="default")
+    run.add_argument("--suites", help=f"Comma-separated subset of: {', '.join(SUITES)}")
+    run.add_argument("--output", help="Report path (default: benchmarks/results/<commit>-<scale>.json)")
+    run.add_argument("--workspace", help="Benchmark workspace (default: a temp dir, removed afterwards)")
+    run.add_argument("--keep-workspace", action="store_true")
+    run.add_argument("--qdrant-url", help="Benchmark a Qdrant server instead of embedded mode")
+    run.add_argument("--seed", type=int, default=0)
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two reports")
+    compare.add_argument("base")
+    compare.add_argument("head")
+    compare.add_argument("--threshold", type=float, default=5.0, help="Regression threshold in percent")
+    compare.add_argument("--fail-on-regression", action="store_true")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Benchmark scales and run configuration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+
+@dataclass
+class BenchConfig:
+    scale: str
+    workspace: Path
+    seed: int = 0
+    chunk_docs: int = 500
+    embed_texts: int = 2_048
+    embed_batch_sizes: tuple[int, ...] = (16, 64, 256)
+    qdrant_sizes: tuple[int, ...] = (10_000, 100_000)
+    qdrant_url: str | None = None  # None -> embedded mode in the workspace
+    qdrant_batch_size: int = 1_024
+    search_queries: int = 200
+    sync_chunks: int = 100_000
+    chat_chunks: int = 5_000
+    chat_requests: int = 100
+    chat_concurrency: tuple[int, ...] = (1, 8)
+    stub_ttft_ms: float = 50.0
+    evidence_hits: int = 1_000
+    extra: dict = field(default_factory=dict)
+
+
+SCALES: dict[str, dict] = {
+    # Seconds; for checking the harness itself.
+    "smoke": dict(
+        chunk_docs=50, embed_texts=256, embed_batch_sizes=(64,), qdrant_sizes=(2_000,),
+        search_queries=50, sync_chunks=10_000, chat_chunks=500, chat_requests=20, chat_concurrency=(1, 4),
+    ),
+    "default": {},
+    # Point --qdrant-url at a server: embedded mode is brute force and holds every vector in memory.
+    "full": dict(
+        chunk_docs=2_000, embed_texts=10_000, qdrant_sizes=(10_000, 100_000, 1_000_000),
+        search_queries=500, sync_chunks=1_000_000, chat_chunks=20_000, chat_requests=300,
+        chat_concurrency=(1, 8, 32),
+    ),
+}
+
+
+def build_config(scale: str, workspace: Path, **overrides) -> BenchConfig:
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale {scale!r}; choose from {', '.join(SCALES)}")
+    config = BenchConfig(scale=scale, workspace=workspace)
+    return replace(config, **SCALES[scale], **{k: v for k, v in overrides.items() if v is not None})
@@ -0,0 +1,151 @@
+"""Deterministic synthetic private-equity corpora.
+
+Documents look like what ingestion sees after docling: a list of
+``(page_number, section, content)`` elements with section headers, prose
+containing financial figures, and Markdown tables (financial summaries and
+cap tables) that the chunker must keep atomic. The same seed always yields the
+same corpus, so results are comparable across commits.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import numpy as np
+
+CATEGORIES = ("cim", "ic_memo", "financials", "management_presentation", "other")
+OUTCOMES = ("invested", "passed", "exited", None)
+SECTORS = ("software", "healthcare", "industrials", "consumer", "fintech", "logistics")
+GEOGRAPHIES = ("US", "UK", "DACH", "Nordics", "APAC")
+SECTIONS = (
+    "Executive Summary",
+    "Investment Thesis",
+    "Market Overview",
+    "Competitive Landscape",
+    "Financial Performance",
+    "Management Team",
+    "Key Risks",
+    "Valuation",
+    "Exit Considerations",
+)
+_PHRASES = (
+    "The company has delivered consistent growth across its core {sector} franchise",
+    "Management expects margin expansion driven by pricing and procurement initiatives",
+    "Customer concentration remains a diligence item, with the top ten accounts at {pct}% of revenue",
+    "Net revenue retention of {nrr}% supports the recurring revenue thesis",
+    "The sponsor underwrote a {multiple}x entry multiple on LTM EBITDA of ${ebitda}m",
+    "Working capital normalisation adds roughly ${wc}m to free cash flow in the base case",
+    "Regulatory exposure in {geo} is limited but should be validated with local counsel",
+    "Revenue grew from ${rev0}m to ${rev1}m over the period, a CAGR of {cagr}%",
+    "The downside case assumes churn doubles and no new logo growth for two years",
+    "Comparable transactions in {sector} cleared at {comp}x to {comp_hi}x EBITDA",
+)
+
+
+@dataclass
+class SyntheticDocument:
+    document_id: str
+    filename: str
+    category: str
+    deal_outcome: str | None
+    deal_index: int
+    sector: str
+    geography: str
+    elements: list[tuple[int, str | None, str]] = field(default_factory=list)
+
+
+def _sentence(rng: random.Random, sector: str, geography: str) -> str:
+    rev0 = rng.randint(20, 400)
+    return rng.choice(_PHRASES).format(
+        sector=sector,
+        geo=geography,
+        pct=rng.randint(15, 60),
+        nrr=rng.randint(95, 135),
+        multiple=round(rng.uniform(7, 18), 1),
+        ebitda=rng.randint(5, 120),
+        wc=rng.randint(1, 25),
+        rev0=rev0,
+        rev1=int(rev0 * rng.uniform(1.1, 2.5)),
+        cagr=round(rng.uniform(3, 35), 1),
+        comp=round(rng.uniform(8, 12), 1),
+        comp_hi=round(rng.uniform(12, 20), 1),
+    ) + "."
+
+
+def _financial_table(rng: random.Random, start_year: int) -> str:
+    years = list(range(start_year, start_year + 4))
+    revenue = [rng.randint(50, 300)]
+    for _ in years[1:]:
+        revenue.append(int(revenue[-1] * rng.uniform(1.02, 1.3)))
+    rows = ["| Metric | " + " | ".join(f"FY{y}" for y in years) + " |", "|---" * (len(years) + 1) + "|"]
+    rows.append("| Revenue ($m) | " + " | ".join(str(v) for v in revenue) + " |")
+    rows.append("| EBITDA ($m) | " + " | ".join(str(int(v * rng.uniform(0.12, 0.35))) for v in revenue) + " |")
+    rows.append("| Capex ($m) | " + " | ".join(str(int(v * rng.uniform(0.02, 0.08))) for v in revenue) + " |")
+    return "\n".join(rows)
+
+
+def _cap_table(rng: random.Random) -> str:
+    holders = ["Sponsor Fund III", "Management", "Co-investor", "Founder"]
+    shares = [rng.randint(10, 60) for _ in holders]
+    total = sum(shares)
+    rows = ["| Holder | Ownership % |", "|---|---|"]
+    rows.extend(f"| {h} | {round(100 * s / total, 1)} |" for h, s in zip(holders, shares))
+    return "\n".join(rows)
+
+
+def generate_document(index: int, seed: int = 0, pages: int = 8, n_deals: int = 50) -> SyntheticDocument:
+    rng = random.Random(seed * 1_000_003 + index)
+    sector = SECTORS[index % len(SECTORS)]
+    geography = GEOGRAPHIES[index % len(GEOGRAPHIES)]
+    doc = SyntheticDocument(
+        document_id=f"bench-doc-{index:07d}",
+        filename=f"{sector}_{index:05d}.pdf",
+        category=CATEGORIES[index % len(CATEGORIES)],
+        deal_outcome=OUTCOMES[index % len(OUTCOMES)],
+        deal_index=index % max(1, n_deals),
+        sector=sector,
+        geography=geography,
+    )
+    section: str | None = None
+    for page in range(1, pages + 1):
+        if page == 1 or rng.random() < 0.5:
+            section = rng.choice(SECTIONS)
+            doc.elements.append((page, section, f"## {section}"))
+        for _ in range(rng.randint(2, 5)):
+            paragraph = " ".join(_sentence(rng, sector, geography) for _ in range(rng.randint(2, 6)))
+            doc.elements.append((page, section, paragraph))
+        if rng.random() < 0.4:
+            doc.elements.append((page, section, _financial_table(rng, 2019 + rng.randint(0, 3))))
+        elif rng.random() < 0.1:
+            doc.elements.append((page, section, _cap_table(rng)))
+    return doc
+
+
+def generate_corpus(n_docs: int, seed: int = 0, pages: int = 8, n_deals: int = 50) -> Iterator[SyntheticDocument]:
+    for index in range(n_docs):
+        yield generate_document(index, seed=seed, pages=pages, n_deals=n_deals)
+
+
+def chunk_texts(n_chunks: int, seed: int = 0) -> list[str]:
+    """At least ``n_chunks`` chunk texts produced by the real chunker."""
+    from backend.config import get_settings
+    from backend.services.parser import _chunk_elements
+
+    settings = get_settings()
+    texts: list[str] = []
+    for doc in generate_corpus(10**9, seed=seed):
+        chunks = _chunk_elements(doc.elements, max_len=settings.chunk_size, overlap=settings.chunk_overlap)
+        texts.extend(chunk.content for chunk in chunks)
+        if len(texts) >= n_chunks:
+            return texts[:n_chunks]
+    return texts
+
+
+def random_unit_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Deterministic L2-normalised float32 vectors (cosine-ready)."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
@@ -0,0 +1,144 @@
+"""Result types, timing helpers and the JSON report format."""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+REPORT_SCHEMA_VERSION = 1
+_TRACKED_PACKAGES = ("fastapi", "sqlalchemy", "duckdb", "qdrant-client", "fastembed", "openai", "numpy", "pandas")
+
+
+@dataclass
+class BenchmarkResult:
+    """One measurement. Metric names end in ``_ms``/``_s`` (lower is better) or ``_per_s`` (higher is better)."""
+
+    suite: str
+    name: str
+    params: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, float] = field(default_factory=dict)
+    status: str = "ok"  # ok | skipped | failed
+    detail: str | None = None
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.suite}/{self.name}[{params}]"
+
+
+def skipped(suite: str, name: str, reason: str, **params: Any) -> BenchmarkResult:
+    return BenchmarkResult(suite=suite, name=name, params=params, status="skipped", detail=reason)
+
+
+def latency_summary(samples_s: Iterable[float]) -> dict[str, float]:
+    """Percentiles in milliseconds for a list of durations in seconds."""
+    values = sorted(s * 1000 for s in samples_s)
+    if not values:
+        return {}
+
+    def pct(p: float) -> float:
+        index = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+        return round(values[index], 3)
+
+    return {
+        "n": len(values),
+        "mean_ms": round(statistics.fmean(values), 3),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def time_calls(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> list[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict[str, Any]:
+    packages = {}
+    for name in _TRACKED_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+def write_report(path: Path, config: dict[str, Any], results: list[BenchmarkResult]) -> dict[str, Any]:
+    report = {
+        "schema_version": REPORT_SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "config": config,
+        "results": [asdict(result) for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2, default=str))
+    os.replace(tmp, path)
+    return report
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    report = json.loads(Path(path).read_text())
+    results = [BenchmarkResult(**item) for item in report["results"]]
+    return {result.key: result for result in results}
+
+
+def compare_reports(base_path: Path, head_path: Path, threshold_pct: float = 5.0) -> list[str]:
+    """Human-readable metric deltas; regressions beyond the threshold are flagged."""
+    base, head = load_results(base_path), load_results(head_path)
+    lines = []
+    for key in sorted(set(base) & set(head)):
+        before, after = base[key], head[key]
+        if before.status != "ok" or after.status != "ok":
+            continue
+        for metric in sorted(set(before.metrics) & set(after.metrics)):
+            old, new = before.metrics[metric], after.metrics[metric]
+            if metric == "n" or not old:
+                continue
+            change = (new - old) / old * 100
+            if metric.endswith("_per_s"):
+                regressed = change < -threshold_pct
+            elif metric.endswith(("_ms", "_s")):
+                regressed = change > threshold_pct
+            else:  # counts and sizes: informational
+                regressed = False
+            flag = "  REGRESSION" if regressed else ""
+            lines.append(f"{key} {metric}: {old:g} -> {new:g} ({change:+.1f}%){flag}")
+    for key in sorted(set(head) - set(base)):
+        lines.append(f"{key}: new")
+    return lines
@@ -0,0 +1,113 @@
+"""Minimal OpenAI-compatible chat completions server for end-to-end benchmarks.
+
+Serves ``POST /v1/chat/completions`` (streaming and non-streaming) with a
+fixed answer and configurable latency, so ``/chat`` can be measured without a
+real model. Standard library only.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = (
+    "Revenue grew from $120m to $182m (Source: cim_00001.pdf, Page 3). "
+    "CAGR = (182 / 120) ^ (1/3) - 1 = 14.9%. Evidence on churn is thin."
+)
+
+
+class StubLLMServer:
+    def __init__(self, ttft_s: float = 0.05, token_interval_s: float = 0.002, host: str = "127.0.0.1"):
+        self.ttft_s = ttft_s
+        self.token_interval_s = token_interval_s
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):  # keep benchmark output clean
+                pass
+
+            def do_GET(self):
+                self._json(200, {"object": "list", "data": [{"id": "stub-model", "object": "model"}]})
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+                prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+                tokens = ANSWER.split(" ")
+                time.sleep(stub.ttft_s)
+                if body.get("stream"):
+                    self._stream(tokens, prompt_tokens, body.get("model", "stub-model"))
+                else:
+                    time.sleep(stub.token_interval_s * len(tokens))
+                    self._json(200, {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "stub-model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": ANSWER},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(tokens),
+                            "total_tokens": prompt_tokens + len(tokens),
+                        },
+                    })
+
+            def _json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, tokens, prompt_tokens, model):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("transfer-encoding", "chunked")
+                self.end_headers()
+
+                def send(payload):
+                    data = f"data: {payload}\n\n".encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+
+                base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+                for i, token in enumerate(tokens):
+                    text = token if i == 0 else " " + token
+                    send(json.dumps({**base, "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}))
+                    time.sleep(stub.token_interval_s)
+                send(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+                send(json.dumps({**base, "choices": [], "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                }}))
+                send("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+
+        self._server = ThreadingHTTPServer((host, 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "StubLLMServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
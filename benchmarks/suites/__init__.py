@@ -0,0 +1,3 @@
+"""Benchmark suites; each module exposes ``run(config) -> list[BenchmarkResult]``."""
+
+SUITES = ("chunking", "embedding", "qdrant", "duckdb_sync", "chat", "evidence")
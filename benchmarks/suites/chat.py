@@ -0,0 +1,149 @@
+"""End-to-end ``/chat`` latency against a stub OpenAI-compatible server.
+
+Runs the real FastAPI app in-process (ASGI transport), with real query
+embedding and Qdrant search, and the LLM replaced by ``StubLLMServer`` so the
+numbers reflect this service rather than model speed. The runner points the
+app's settings at the benchmark workspace and the stub before importing it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+
+from benchmarks.config import BenchConfig
+from benchmarks.corpus import CATEGORIES, chunk_texts
+from benchmarks.harness import BenchmarkResult, latency_summary, skipped
+
+SUITE = "chat"
+CHUNKS_PER_DOC = 40
+QUESTIONS = (
+    "What was the revenue CAGR and how was it calculated?",
+    "Which precedents had high customer concentration?",
+    "Summarize the key risks flagged in the IC memos.",
+    "What entry multiples were underwritten for software deals?",
+    "How did net revenue retention compare across invested deals?",
+    "What regulatory exposure was identified in DACH?",
+    "Which deals assumed margin expansion from pricing?",
+    "What does the downside case assume about churn?",
+)
+
+
+def _index_corpus(config: BenchConfig) -> float:
+    from backend.main import get_vector_store
+    from backend.services.parser import ParsedChunk
+
+    store = get_vector_store()
+    texts = chunk_texts(config.chat_chunks, seed=config.seed)
+    started = time.perf_counter()
+    for d, start in enumerate(range(0, len(texts), CHUNKS_PER_DOC)):
+        chunks = [
+            ParsedChunk(content=text, page_number=1 + i // 4, chunk_index=i, source=f"doc_{d}.pdf")
+            for i, text in enumerate(texts[start:start + CHUNKS_PER_DOC])
+        ]
+        store.upsert_chunks(
+            chunks,
+            f"bench-doc-{d:07d}",
+            f"doc_{d}.pdf",
+            metadata={"category": CATEGORIES[d % len(CATEGORIES)], "deal_outcome": None, "deal_id": None},
+        )
+    return time.perf_counter() - started
+
+
+async def _drive(app, requests: int, concurrency: int) -> tuple[list[float], dict[int, int]]:
+    import httpx
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker(client):
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post("/chat", json={"query": QUESTIONS[i % len(QUESTIONS)]})
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return latencies, statuses
+
+
+def _stage_medians(since_id: int) -> dict[str, float]:
+    from backend.database import SessionLocal
+    from backend.models import RetrievalTrace
+
+    db = SessionLocal()
+    try:
+        rows = db.query(RetrievalTrace.timings_json).filter(RetrievalTrace.id > since_id).all()
+    finally:
+        db.close()
+    stages: dict[str, list[float]] = {}
+    for (timings,) in rows:
+        for stage, ms in (timings or {}).items():
+            stages.setdefault(stage, []).append(ms)
+    return {f"stage_{stage}_p50_ms": round(statistics.median(values), 3) for stage, values in sorted(stages.items())}
+
+
+def _last_trace_id() -> int:
+    from sqlalchemy import func
+
+    from backend.database import SessionLocal
+    from backend.models import RetrievalTrace
+
+    db = SessionLocal()
+    try:
+        return db.query(func.max(RetrievalTrace.id)).scalar() or 0
+    finally:
+        db.close()
+
+
+def run(config: BenchConfig) -> list[BenchmarkResult]:
+    from backend.database import Base, engine
+    from backend.main import app
+    from backend.migrations import run_migrations
+    from backend.services.vector import get_embedding_model
+
+    try:
+        get_embedding_model()
+    except Exception as exc:
+        return [skipped(SUITE, "chat", f"embedding model unavailable: {exc}")]
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    index_s = _index_corpus(config)
+    results = [BenchmarkResult(
+        suite=SUITE,
+        name="index_corpus",
+        params={"chunks": config.chat_chunks},
+        metrics={"total_s": round(index_s, 3), "chunks_per_s": round(config.chat_chunks / index_s, 1)},
+    )]
+
+    asyncio.run(_drive(app, requests=min(5, config.chat_requests), concurrency=1))  # warm-up
+    for concurrency in config.chat_concurrency:
+        since = _last_trace_id()
+        started = time.perf_counter()
+        latencies, statuses = asyncio.run(_drive(app, config.chat_requests, concurrency))
+        elapsed = time.perf_counter() - started
+        results.append(BenchmarkResult(
+            suite=SUITE,
+            name="chat",
+            params={
+                "chunks": config.chat_chunks,
+                "concurrency": concurrency,
+                "requests": config.chat_requests,
+                "stub_ttft_ms": config.stub_ttft_ms,
+            },
+            metrics={
+                **latency_summary(latencies),
+                "requests_per_s": round(len(latencies) / elapsed, 2),
+                "errors": sum(count for status, count in statuses.items() if status != 200),
+                **_stage_medians(since),
+            },
+        ))
+    return results
@@ -0,0 +1,52 @@
+"""``_chunk_elements`` throughput over the synthetic corpus."""
+
+from __future__ import annotations
+
+import time
+
+from benchmarks.config import BenchConfig
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import BenchmarkResult, latency_summary
+
+SUITE = "chunking"
+REPEAT = 5
+
+
+def run(config: BenchConfig) -> list[BenchmarkResult]:
+    from backend.config import get_settings
+    from backend.services.parser import _chunk_elements
+
+    overlap = get_settings().chunk_overlap
+    docs = list(generate_corpus(config.chunk_docs, seed=config.seed))
+    n_elements = sum(len(doc.elements) for doc in docs)
+    n_chars = sum(len(content) for doc in docs for _, _, content in doc.elements)
+
+    results = []
+    for max_len in (400, 800, 1600):
+        per_doc: list[float] = []
+        totals: list[float] = []
+        n_chunks = 0
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            n_chunks = 0
+            for doc in docs:
+                doc_started = time.perf_counter()
+                n_chunks += len(_chunk_elements(doc.elements, max_len=max_len, overlap=overlap))
+                per_doc.append(time.perf_counter() - doc_started)
+            totals.append(time.perf_counter() - started)
+        best = min(totals)
+        results.append(BenchmarkResult(
+            suite=SUITE,
+            name="chunk_elements",
+            params={"docs": len(docs), "max_len": max_len, "overlap": overlap},
+            metrics={
+                "total_s": round(best, 4),
+                "docs_per_s": round(len(docs) / best, 1),
+                "elements_per_s": round(n_elements / best, 1),
+                "chunks_per_s": round(n_chunks / best, 1),
+                "mb_per_s": round(n_chars / best / 1e6, 3),
+                "chunks": n_chunks,
+                **{f"doc_{k}": v for k, v in latency_summary(per_doc).items() if k != "n"},
+            },
+        ))
+    return results
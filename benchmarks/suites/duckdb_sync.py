@@ -0,0 +1,132 @@
+"""SQLite -> DuckDB analytics sync: full, incremental and single-document."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.config import BenchConfig
+from benchmarks.corpus import CATEGORIES, OUTCOMES, chunk_texts
+from benchmarks.harness import BenchmarkResult, latency_summary
+
+SUITE = "duckdb_sync"
+CHUNKS_PER_DOC = 40
+N_DEALS = 50
+INSERT_BATCH = 20_000
+
+
+def _seed(db, n_chunks: int, seed: int) -> list[str]:
+    from sqlalchemy import insert
+
+    from backend.models import Chunk, Deal, DealDocumentLink, Document
+    from backend.services.change_tracking import record_changes
+
+    texts = chunk_texts(min(n_chunks, 5_000), seed=seed)
+    n_docs = max(1, n_chunks // CHUNKS_PER_DOC)
+    deals = [Deal(name=f"Bench Deal {i}", sector="software") for i in range(N_DEALS)]
+    db.add_all(deals)
+    db.flush()
+    base_time = datetime(2024, 1, 1)
+    doc_ids = [f"bench-doc-{i:07d}" for i in range(n_docs)]
+    db.execute(insert(Document), [
+        {
+            "id": doc_id,
+            "filename": f"doc_{i}.pdf",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "deal_outcome": OUTCOMES[i % len(OUTCOMES)],
+            "status": "ready",
+            "tags": [],
+            "upload_timestamp": base_time + timedelta(minutes=i),
+        }
+        for i, doc_id in enumerate(doc_ids)
+    ])
+    db.execute(insert(DealDocumentLink), [
+        {"deal_id": deals[i % N_DEALS].id, "document_id": doc_id, "relation_type": "evidence"}
+        for i, doc_id in enumerate(doc_ids)
+        if i % 3
+    ])
+    rows = []
+    for d, doc_id in enumerate(doc_ids):
+        for idx in range(CHUNKS_PER_DOC):
+            rows.append({
+                "id": f"{doc_id}-{idx}",
+                "document_id": doc_id,
+                "content": texts[(d * CHUNKS_PER_DOC + idx) % len(texts)],
+                "page_number": idx // 4 + 1,
+                "chunk_index": idx,
+            })
+            if len(rows) >= INSERT_BATCH:
+                db.execute(insert(Chunk), rows)
+                rows.clear()
+    if rows:
+        db.execute(insert(Chunk), rows)
+    record_changes(db, doc_ids)
+    db.commit()
+    return doc_ids
+
+
+def run(config: BenchConfig) -> list[BenchmarkResult]:
+    from sqlalchemy import create_engine, update
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.database import Base
+    from backend.models import Document
+    from backend.services.analytics import DuckDBAnalytics
+    from backend.services.change_tracking import record_changes
+
+    root = config.workspace / "duckdb_sync"
+    root.mkdir(parents=True, exist_ok=True)
+    for stale in root.glob("*"):
+        stale.unlink()
+    engine = create_engine(f"sqlite:///{root / 'core.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False, future=True)()
+    analytics = DuckDBAnalytics(db_path=str(root / "analytics.duckdb"))
+    params = {"chunks": config.sync_chunks, "chunks_per_doc": CHUNKS_PER_DOC}
+    results = []
+    try:
+        started = time.perf_counter()
+        doc_ids = _seed(db, config.sync_chunks, config.seed)
+        seed_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        full = analytics.sync_from_sqlite(db)
+        full_s = time.perf_counter() - started
+        results.append(BenchmarkResult(
+            suite=SUITE, name="full_sync", params=params,
+            metrics={
+                "total_s": round(full_s, 3),
+                "chunks_per_s": round(full.chunks_written / full_s, 1),
+                "sqlite_seed_s": round(seed_s, 3),
+            },
+        ))
+
+        # Touch 1% of documents, then replay the change log.
+        touched = doc_ids[:: max(1, len(doc_ids) // max(1, len(doc_ids) // 100))]
+        db.execute(update(Document).where(Document.id.in_(touched)).values(category="ic_memo"))
+        record_changes(db, touched)
+        db.commit()
+        started = time.perf_counter()
+        incremental = analytics.sync_incremental(db)
+        incremental_s = time.perf_counter() - started
+        results.append(BenchmarkResult(
+            suite=SUITE, name="incremental_sync", params={**params, "documents_changed": len(touched)},
+            metrics={
+                "total_s": round(incremental_s, 3),
+                "documents_per_s": round(incremental.documents_upserted / incremental_s, 1),
+            },
+        ))
+
+        samples = []
+        for doc_id in doc_ids[:20]:
+            started = time.perf_counter()
+            analytics.sync_from_sqlite(db, document_id=doc_id)
+            samples.append(time.perf_counter() - started)
+        results.append(BenchmarkResult(
+            suite=SUITE, name="document_sync", params=params, metrics=latency_summary(samples),
+        ))
+    finally:
+        analytics.close()
+        db.close()
+        engine.dispose()
+    return results
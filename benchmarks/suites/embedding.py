@@ -0,0 +1,49 @@
+"""fastembed throughput for ingestion-style batches and single queries."""
+
+from __future__ import annotations
+
+import time
+
+from benchmarks.config import BenchConfig
+from benchmarks.corpus import chunk_texts
+from benchmarks.harness import BenchmarkResult, latency_summary, skipped, time_calls
+
+SUITE = "embedding"
+
+
+def run(config: BenchConfig) -> list[BenchmarkResult]:
+    from backend.config import get_settings
+    from backend.services.vector import EmbeddingModel
+
+    model_name = get_settings().embedding_model_name
+    try:
+        model = EmbeddingModel(model_name)  # uncached: the query LRU would flatter the numbers
+    except Exception as exc:
+        return [skipped(SUITE, "embed", f"embedding model unavailable: {exc}", model=model_name)]
+
+    texts = chunk_texts(config.embed_texts, seed=config.seed)
+    model.embed(texts[:8])  # load ONNX session / warm caches
+
+    results = []
+    for batch_size in config.embed_batch_sizes:
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            model.embed(texts[start:start + batch_size])
+        elapsed = time.perf_counter() - started
+        results.append(BenchmarkResult(
+            suite=SUITE,
+            name="embed_batch",
+            params={"model": model_name, "texts": len(texts), "batch_size": batch_size},
+            metrics={"total_s": round(elapsed, 3), "texts_per_s": round(len(texts) / elapsed, 1)},
+        ))
+
+    queries = [text[:120] for text in texts[:100]]
+    position = iter(range(10**9))
+    samples = time_calls(lambda: model.embed_one(queries[next(position) % len(queries)]), repeat=len(queries))
+    results.append(BenchmarkResult(
+        suite=SUITE,
+        name="embed_query",
+        params={"model": model_name},
+        metrics=latency_summary(samples),
+    ))
+    return results
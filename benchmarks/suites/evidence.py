@@ -0,0 +1,213 @@
+"""Allocations of a precedent scan: vector hits to enriched evidence to JSON.
+
+Qdrant points are faked, so the measurement covers only this process's
+object churn: hit construction, metadata enrichment, grouping, the bucketed
+scan, answer sources, trace rows and ``json.dumps``. The ``copy`` variant
+replays the pre-``EvidenceRecord`` path as a baseline: ``__dict__``-backed
+hits, a result dataclass copied from each one, and a throwaway class per
+prompt chunk.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+
+from benchmarks.config import BenchConfig
+from benchmarks.corpus import CATEGORIES, OUTCOMES, SECTORS, chunk_texts
+from benchmarks.harness import BenchmarkResult, latency_summary
+
+SUITE = "evidence"
+REPEAT = 20
+N_DEALS = 50
+
+
+def _points(n_hits: int, seed: int):
+    rng = random.Random(seed)
+    texts = chunk_texts(n_hits, seed=seed)
+    return [
+        SimpleNamespace(
+            score=1.0 - i / n_hits,
+            payload={
+                "content": texts[i], "document_id": f"doc-{i % 200}", "filename": f"doc-{i % 200}.pdf",
+                "page_number": i % 40 + 1, "chunk_index": i, "source": "text", "section": None,
+                "category": rng.choice(CATEGORIES), "deal_outcome": rng.choice(OUTCOMES),
+                "deal_id": f"deal-{i % N_DEALS}",
+            },
+        )
+        for i in range(n_hits)
+    ]
+
+
+def _snapshot():
+    from backend.services.metadata_cache import DealInfo, DocumentInfo, MetadataSnapshot
+
+    now = datetime(2024, 1, 1)
+    deals = {
+        f"deal-{i}": DealInfo(
+            id=f"deal-{i}", name=f"Project {i}", company_name=None, sector=SECTORS[i % len(SECTORS)],
+            geography="US", stage="growth", fund_name=None, vintage_year=2020, strategy="buyout",
+            decision_status=None, outcome_status=None, partner_owner=None, summary=None,
+            created_at=now, updated_at=now,
+        )
+        for i in range(N_DEALS)
+    }
+    documents = {
+        f"doc-{i}": DocumentInfo(CATEGORIES[i % len(CATEGORIES)], OUTCOMES[i % len(OUTCOMES)], f"deal-{i % N_DEALS}")
+        for i in range(200)
+    }
+    return MetadataSnapshot(1, 0, documents, deals, tuple(deals))
+
+
+def _record_hits(points, snapshot) -> list:
+    from backend.services.precedent import _attach_metadata
+    from backend.services.vector import _to_scored_chunks
+
+    return _attach_metadata(snapshot, _to_scored_chunks(points))
+
+
+def _record_scan(points, snapshot) -> str:
+    from backend.services.evidence import SOURCE_VIEW, TRACE_VIEW
+    from backend.services.precedent import group_precedents, summarize_precedents
+
+    hits = _record_hits(points, snapshot)
+    groups = group_precedents(hits, max_deals=N_DEALS)
+    flat = [hit for group in groups for hit in group.precedents]
+    payload = {"scan": summarize_precedents(flat), "sources": SOURCE_VIEW.many(flat[:5]), "trace": TRACE_VIEW.many(hits)}
+    return json.dumps(payload)
+
+
+@dataclass
+class _CopiedChunk:
+    content: str
+    score: float
+    document_id: str
+    filename: str
+    page_number: int
+    chunk_index: int
+    source: str
+    section: str | None
+    category: str
+    deal_outcome: str | None
+    deal_id: str | None = None
+
+
+@dataclass
+class _CopiedResult:
+    document_id: str
+    filename: str
+    deal_id: str | None
+    deal_name: str | None
+    category: str
+    deal_outcome: str | None
+    score: float
+    page_number: int
+    chunk_index: int
+    evidence: str
+    sector: str | None
+    stage: str | None
+    geography: str | None
+    decision_status: str | None
+    outcome_status: str | None
+
+
+_COPIED_FIELDS = tuple(_CopiedResult.__dataclass_fields__)
+
+
+def _copy_hits(points, snapshot) -> list:
+    hits = []
+    for point in points:
+        payload = point.payload or {}
+        hits.append(_CopiedChunk(
+            content=payload.get("content", ""), score=point.score or 0.0,
+            document_id=str(payload.get("document_id", "")), filename=str(payload.get("filename", "")),
+            page_number=int(payload.get("page_number", 1)), chunk_index=int(payload.get("chunk_index", 0)),
+            source=str(payload.get("source", "")), section=payload.get("section"),
+            category=str(payload.get("category", "")), deal_outcome=payload.get("deal_outcome"),
+            deal_id=payload.get("deal_id"),
+        ))
+    results = []
+    for hit in hits:
+        doc = snapshot.documents.get(hit.document_id)
+        deal = snapshot.deal(doc.deal_id) if doc else None
+        results.append(_CopiedResult(
+            hit.document_id, hit.filename, deal and deal.id, deal and deal.name,
+            doc.category if doc else hit.category, doc.deal_outcome if doc else hit.deal_outcome,
+            hit.score, hit.page_number, hit.chunk_index, hit.content,
+            deal and deal.sector, deal and deal.stage, deal and deal.geography,
+            deal and deal.decision_status, deal and deal.outcome_status,
+        ))
+    return results
+
+
+def _copy_scan(points, snapshot) -> str:
+    from backend.services.precedent import group_precedents
+
+    results = _copy_hits(points, snapshot)
+    groups = group_precedents(results, max_deals=N_DEALS)
+    flat = [hit for group in groups for hit in group.precedents]
+    buckets: dict[str, list] = {"invested": [], "passed": [], "exited": [], "other": []}
+    for item in flat:
+        buckets[item.deal_outcome if item.deal_outcome in buckets else "other"].append(
+            {name: getattr(item, name) for name in _COPIED_FIELDS}
+        )
+    chunks = [
+        type("WorkflowChunk", (), {"filename": item.filename, "page_number": item.page_number,
+                                   "document_id": item.document_id, "content": item.evidence,
+                                   "category": item.category, "deal_outcome": item.deal_outcome,
+                                   "chunk_index": item.chunk_index})()
+        for item in flat[:5]
+    ]
+    sources = [{"filename": c.filename, "page_number": c.page_number, "doc_id": c.document_id,
+                "chunk_text": c.content, "category": c.category, "deal_outcome": c.deal_outcome,
+                "chunk_index": c.chunk_index} for c in chunks]
+    trace = [{"doc_id": r.document_id, "filename": r.filename, "page_number": r.page_number,
+              "chunk_index": r.chunk_index, "score": r.score, "category": r.category,
+              "deal_outcome": r.deal_outcome} for r in results]
+    return json.dumps({"scan": {"total": len(flat), "buckets": buckets}, "sources": sources, "trace": trace})
+
+
+def _measure(build_hits, scan, points, snapshot) -> dict[str, float]:
+    scan(points, snapshot)  # warm imports and caches outside the trace
+    tracemalloc.start()
+    try:
+        hits = build_hits(points, snapshot)
+        retained, _ = tracemalloc.get_traced_memory()
+        del hits
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        scan(points, snapshot)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        scan(points, snapshot)
+        samples.append(time.perf_counter() - started)
+    return {
+        # Memory held by the enriched hits alone, then the whole scan's peak (JSON text included).
+        "hits_kb": round(retained / 1024, 1),
+        "peak_kb": round((peak - baseline) / 1024, 1),
+        **{f"scan_{k}": v for k, v in latency_summary(samples).items() if k != "n"},
+    }
+
+
+def run(config: BenchConfig) -> list[BenchmarkResult]:
+    n_hits = config.evidence_hits
+    points = _points(n_hits, config.seed)
+    snapshot = _snapshot()
+    return [
+        BenchmarkResult(
+            suite=SUITE,
+            name="precedent_scan",
+            params={"hits": n_hits, "variant": variant},
+            metrics=_measure(build_hits, scan, points, snapshot),
+        )
+        for variant, build_hits, scan in (("record", _record_hits, _record_scan), ("copy", _copy_hits, _copy_scan))
+    ]
@@ -0,0 +1,148 @@
+"""Qdrant upsert and search latency at increasing collection sizes.
+
+Vectors are random unit vectors of the configured dimension, so the numbers
+isolate Qdrant from the embedding model. Payloads have the same shape as
+``QdrantVectorStore.upsert_chunks`` writes, and searches go through the same
+filter builder and result conversion as ``QdrantVectorStore.search``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from benchmarks.config import BenchConfig
+from benchmarks.corpus import CATEGORIES, OUTCOMES, chunk_texts, random_unit_vectors
+from benchmarks.harness import BenchmarkResult, latency_summary
+
+SUITE = "qdrant"
+CHUNKS_PER_DOC = 40
+TEXT_POOL = 2_000
+
+
+def _client(config: BenchConfig):
+    from qdrant_client import QdrantClient
+
+    if config.qdrant_url:
+        return QdrantClient(url=config.qdrant_url, timeout=300), "server"
+    path = config.workspace / "qdrant_bench"
+    path.mkdir(parents=True, exist_ok=True)
+    return QdrantClient(path=str(path)), "embedded"
+
+
+def _points(start: int, count: int, dim: int, seed: int, texts: list[str]):
+    from qdrant_client.http import models
+
+    vectors = random_unit_vectors(count, dim, seed=seed * 7_919 + start)
+    points = []
+    for offset, vector in enumerate(vectors):
+        i = start + offset
+        doc = i // CHUNKS_PER_DOC
+        points.append(models.PointStruct(
+            id=i,
+            vector=vector.tolist(),
+            payload={
+                "document_id": f"bench-doc-{doc:07d}",
+                "filename": f"doc_{doc}.pdf",
+                "page_number": 1 + (i % CHUNKS_PER_DOC) // 4,
+                "chunk_index": i % CHUNKS_PER_DOC,
+                "source": f"doc_{doc}.pdf",
+                "section": None,
+                "content": texts[i % len(texts)],
+                "category": CATEGORIES[doc % len(CATEGORIES)],
+                "deal_outcome": OUTCOMES[doc % len(OUTCOMES)],
+                "deal_id": f"deal-{doc % 50}",
+            },
+        ))
+    return points
+
+
+def _search_samples(client, collection: str, queries, query_filter) -> list[float]:
+    from backend.services.vector import _to_scored_chunks
+
+    samples = []
+    for vector in queries:
+        started = time.perf_counter()
+        response = client.query_points(
+            collection_name=collection, query=vector.tolist(), query_filter=query_filter, limit=5, with_payload=True
+        )
+        _to_scored_chunks(response.points)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run(config: BenchConfig) -> list[BenchmarkResult]:
+    from qdrant_client.http import models
+
+    from backend.config import get_settings
+    from backend.services.vector import _build_filter
+
+    dim = get_settings().embedding_dim
+    texts = chunk_texts(TEXT_POOL, seed=config.seed)
+    client, mode = _client(config)
+    queries = random_unit_vectors(config.search_queries, dim, seed=config.seed + 1)
+    results = []
+    try:
+        for size in config.qdrant_sizes:
+            collection = f"bench_{size}"
+            if client.collection_exists(collection):
+                client.delete_collection(collection)
+            client.create_collection(
+                collection_name=collection,
+                vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+            )
+            params = {"mode": mode, "points": size, "dim": dim}
+
+            batch_samples = []
+            started = time.perf_counter()
+            for start in range(0, size, config.qdrant_batch_size):
+                count = min(config.qdrant_batch_size, size - start)
+                points = _points(start, count, dim, config.seed, texts)
+                batch_started = time.perf_counter()
+                client.upsert(collection_name=collection, points=points, wait=True)
+                batch_samples.append(time.perf_counter() - batch_started)
+            elapsed = time.perf_counter() - started
+            upsert_s = sum(batch_samples)
+            results.append(BenchmarkResult(
+                suite=SUITE,
+                name="upsert",
+                params={**params, "batch_size": config.qdrant_batch_size},
+                metrics={
+                    "total_s": round(elapsed, 3),
+                    "upsert_s": round(upsert_s, 3),
+                    "points_per_s": round(size / upsert_s, 1),
+                    **{f"batch_{k}": v for k, v in latency_summary(batch_samples).items() if k != "n"},
+                },
+            ))
+
+            n_docs = max(1, size // CHUNKS_PER_DOC)
+            filters = {
+                "none": None,
+                "category": _build_filter(None, [CATEGORIES[0]], None),
+                "doc_ids_20": _build_filter([f"bench-doc-{d:07d}" for d in range(0, n_docs, max(1, n_docs // 20))][:20], None, None),
+            }
+            for filter_name, query_filter in filters.items():
+                _search_samples(client, collection, queries[:5], query_filter)  # warm-up
+                samples = _search_samples(client, collection, queries, query_filter)
+                results.append(BenchmarkResult(
+                    suite=SUITE,
+                    name="search",
+                    params={**params, "filter": filter_name, "limit": 5},
+                    metrics=latency_summary(samples),
+                ))
+
+            started = time.perf_counter()
+            client.delete(
+                collection_name=collection,
+                points_selector=models.FilterSelector(filter=_build_filter(["bench-doc-0000000"], None, None)),
+                wait=True,
+            )
+            results.append(BenchmarkResult(
+                suite=SUITE,
+                name="delete_document",
+                params=params,
+                metrics={"latency_ms": round((time.perf_counter() - started) * 1000, 3)},
+            ))
+            client.delete_collection(collection)
+    finally:
+        client.close()
+    return results
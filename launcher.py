@@ -34,15 +34,13 @@ def get_project_root() -> Path:
 
 def check_dependencies() -> bool:
     """Check if Python dependencies are installed."""
-    try:
-        import fastapi
-        import uvicorn
-        import sqlalchemy
-        import qdrant_client
-        import docling
-        return True
-    except ImportError as e:
-        return False
+    # find_spec locates the packages without importing them (docling alone takes seconds).
+    from importlib.util import find_spec
+
+    return all(
+        find_spec(name) is not None
+        for name in ("fastapi", "uvicorn", "sqlalchemy", "qdrant_client", "docling")
+    )
 
 def setup_environment(project_root: Path) -> dict:
     """Set up environment variables and workspace."""
@@ -106,8 +104,8 @@ def wait_for_server(host: str, port: int, timeout: int = 30) -> bool:
         try:
             urllib.request.urlopen(url, timeout=1)
             return True
-        except (urllib.error.URLError, urllib.error.HTTPError):
-            time.sleep(0.5)
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.1)
 
     return False
 
@@ -0,0 +1,33 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+from backend.migrations import run_migrations  # noqa: E402
+from backend.services.run_store import archive_workflow_runs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact legacy workflow run outputs and move old ones to the cold store."
+    )
+    parser.add_argument("--hot-days", type=int, help="Keep outputs newer than this in SQLite (default: AUDIT_HOT_DAYS)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        stats = archive_workflow_runs(db, hot_days=args.hot_days)
+    finally:
+        db.close()
+    print(
+        f"Compacted {stats.compacted} legacy runs (originals kept in cold storage, {stats.bytes_preserved} bytes); "
+        f"moved {stats.tiered} runs ({stats.bytes_tiered} bytes) to cold storage"
+    )
+
+
+if __name__ == "__main__":
+    main()
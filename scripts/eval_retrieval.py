@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+from backend.migrations import run_migrations  # noqa: E402
+from backend.services.retrieval_eval import (  # noqa: E402
+    GRANULARITIES,
+    RetrievalEvaluator,
+    default_configs,
+    load_corpus,
+    load_golden_set,
+    parse_config,
+    queries_from_traces,
+    recommend,
+)
+
+COLUMNS = (
+    ("config", 22), ("recall@k", 9), ("mrr", 7), ("ndcg@k", 7),
+    ("p50_ms", 9), ("p95_ms", 9), ("tokens", 8), ("chunks", 8),
+)
+
+
+def _print_table(reports, chosen) -> None:
+    print("  ".join(name.ljust(width) for name, width in COLUMNS))
+    for report in reports:
+        row = (
+            report.config["name"], f"{report.recall_at_k:.3f}", f"{report.mrr:.3f}", f"{report.ndcg_at_k:.3f}",
+            f"{report.latency_p50_ms:.1f}", f"{report.latency_p95_ms:.1f}",
+            f"{report.prompt_tokens_mean:.0f}", str(report.index_chunks),
+        )
+        marker = "  <- recommended" if report is chosen else ""
+        print("  ".join(value.ljust(width) for value, (_, width) in zip(row, COLUMNS)) + marker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieval configs on quality, latency and prompt size.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--golden", type=Path, help="Labeled JSONL golden set")
+    source.add_argument("--from-traces", type=int, default=200, metavar="N", help="Replay the N most recent logged queries")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="page", help="What counts as a relevant hit")
+    parser.add_argument(
+        "--config", action="append", default=[], metavar="SPEC",
+        help="name:top_k=5,hybrid=1,rerank=1,chunk_size=400,model=...  (repeatable; default grid if omitted)",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Allowed nDCG drop for the recommendation")
+    parser.add_argument("--output", type=Path, help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    configs = [parse_config(spec) for spec in args.config] or default_configs()
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        if args.golden:
+            queries = load_golden_set(args.golden, granularity=args.granularity)
+        else:
+            queries = queries_from_traces(db, limit=args.from_traces, granularity=args.granularity)
+        corpus = load_corpus(db)
+    finally:
+        db.close()
+
+    if not queries or not corpus:
+        print(f"Nothing to evaluate: {len(queries)} queries, {len(corpus)} indexed chunks")
+        return
+
+    if args.granularity == "chunk":
+        skipped = [c.name for c in configs if c.chunk_size]
+        configs = [c for c in configs if not c.chunk_size]
+        if skipped:
+            print(f"Skipping re-chunked configs at chunk granularity: {', '.join(skipped)}")
+
+    print(f"Evaluating {len(configs)} configs on {len(queries)} queries over {len(corpus)} chunks")
+    reports = RetrievalEvaluator(corpus, granularity=args.granularity).run(configs, queries)
+    chosen = recommend(reports, tolerance=args.tolerance)
+    _print_table(reports, chosen)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({
+            "granularity": args.granularity,
+            "queries": len(queries),
+            "tolerance": args.tolerance,
+            "recommended": chosen.config["name"] if chosen else None,
+            "reports": [asdict(report) for report in reports],
+        }, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+from backend.migrations import run_migrations  # noqa: E402
+from backend.services.reindex import BUILT, LIVE, IndexRebuild, Reindexer  # noqa: E402
+from backend.services.vector import QdrantVectorStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the Qdrant chunk index (and optionally DuckDB) from the parsed artifacts in the workspace."
+    )
+    parser.add_argument("--document-id", action="append", dest="document_ids", help="Only these documents (repeatable)")
+    parser.add_argument("--model", help="Embedding model to build with (default: the live collection's model)")
+    parser.add_argument("--batch-size", type=int, help="Chunks per embedding batch (default: EMBEDDING_BATCH_SIZE)")
+    parser.add_argument("--workers", type=int, help="Batches embedded in parallel (default: REINDEX_WORKERS)")
+    parser.add_argument("--no-swap", action="store_true", help="Build the collection but leave the alias alone")
+    parser.add_argument(
+        "--replace-legacy", action="store_true", help="Delete a pre-alias collection under the live name to swap"
+    )
+    parser.add_argument("--drop-previous", action="store_true", help="Delete the collection the alias pointed at")
+    parser.add_argument(
+        "--force", action="store_true", help="Swap even if some documents have no parsed artifact and drop out"
+    )
+    parser.add_argument("--analytics", action="store_true", help="Also rebuild the DuckDB warehouse from SQLite")
+    args = parser.parse_args()
+    if args.document_ids and not args.no_swap:
+        parser.error("--document-id builds a partial collection; it needs --no-swap")
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    store = QdrantVectorStore()
+    rebuild = IndexRebuild(
+        store,
+        SessionLocal,
+        document_ids=args.document_ids,
+        swap=not args.no_swap,
+        replace_legacy=args.replace_legacy,
+        drop_previous=args.drop_previous,
+        force=args.force,
+        reindexer=Reindexer(store, model_name=args.model, batch_size=args.batch_size, workers=args.workers),
+    )
+    rebuild.run()  # in the foreground; writes made meanwhile are replayed before the swap
+    status = rebuild.status()
+    if status["state"] not in (LIVE, BUILT):
+        sys.exit(f"Rebuild {status['state']}: {status['error']}")
+    print(
+        f"Indexed {status['embedded_chunks']} chunks from {status['documents']} documents into "
+        f"{status['target_collection']} ({status['model_name']}, dim {status['dimension']}) "
+        f"in {status['elapsed_seconds']:.1f}s; {status['replayed_documents']} documents replayed"
+    )
+    if status["skipped_documents"]:
+        skipped = status["skipped_documents"]
+        print(f"Skipped {len(skipped)} documents without a parsed artifact: {', '.join(skipped)}")
+    if status["state"] == LIVE:
+        print(f"{rebuild.reindexer.alias} now points at {status['target_collection']} "
+              f"(was {status['previous_collection'] or 'unset'})")
+    if args.analytics:
+        from backend.services.analytics import get_duckdb_analytics
+
+        db = SessionLocal()
+        try:
+            result = get_duckdb_analytics().sync_from_sqlite(db)
+        finally:
+            db.close()
+        print(f"DuckDB rebuilt: {result.documents_upserted} documents, {result.chunks_written} chunks")
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,11 @@ import { FileText, Play, Clock, ChevronDown, ChevronUp, AlertTriangle } from 'lu
 import type { Deal, WorkflowRun } from '../lib/api';
 import { PrecedentCard } from './PrecedentCard';
 
+// The run history is summaries: the query, but no output.
+type WorkflowRunSummary = WorkflowRun & { query?: string | null };
+
 interface WorkflowPageProps {
-  workflowRuns: WorkflowRun[];
+  workflowRuns: WorkflowRunSummary[];
   deals: Deal[];
   selectedDocIds: string[];
   latestWorkflow: WorkflowRun | null;
@@ -20,6 +23,24 @@ export function WorkflowPage({ workflowRuns, deals, selectedDocIds, onRunWorkflo
   const [query, setQuery] = useState('');
   const [selectedDealId, setSelectedDealId] = useState<string>('');
   const [expandedRunId, setExpandedRunId] = useState<string | null>(null);
+  const [loadedOutputs, setLoadedOutputs] = useState<Record<string, WorkflowRun['output']>>({});
+
+  const toggleRun = async (run: WorkflowRunSummary) => {
+    if (expandedRunId === run.id) {
+      setExpandedRunId(null);
+      return;
+    }
+    setExpandedRunId(run.id);
+    if (run.output || loadedOutputs[run.id]) return;
+    try {
+      const response = await fetch(`/api/workflow/runs/${encodeURIComponent(run.id)}`);
+      if (!response.ok) return;
+      const detail: WorkflowRun = await response.json();
+      setLoadedOutputs((prev) => ({ ...prev, [run.id]: detail.output }));
+    } catch {
+      // Leave the run collapsed to its header.
+    }
+  };
 
   const handleLaunch = () => {
     if (!query.trim()) return;
@@ -90,6 +111,7 @@ export function WorkflowPage({ workflowRuns, deals, selectedDocIds, onRunWorkflo
           ) : (
             workflowRuns.map((run) => {
               const isExpanded = expandedRunId === run.id;
+              const output = run.output ?? loadedOutputs[run.id];
               const deal = deals.find(d => d.id === run.deal_id);
               
               return (
@@ -97,13 +119,13 @@ export function WorkflowPage({ workflowRuns, deals, selectedDocIds, onRunWorkflo
                   {/* Collapsed Header */}
                   <div 
                     className="flex items-center justify-between p-4 cursor-pointer"
-                    onClick={() => setExpandedRunId(isExpanded ? null : run.id)}
+                    onClick={() => toggleRun(run)}
                   >
                     <div className="flex items-center gap-4">
                       {getStatusBadge(run.status)}
                       <div className="flex flex-col">
                         <span className="font-medium text-gray-900">
-                          {run.output?.query || 'Workflow Run'}
+                          {run.query || output?.query || 'Workflow Run'}
                         </span>
                         <div className="flex items-center gap-2 text-sm text-gray-500 mt-1">
                           <span>{new Date(run.created_at).toLocaleString()}</span>
@@ -122,16 +144,16 @@ export function WorkflowPage({ workflowRuns, deals, selectedDocIds, onRunWorkflo
                   </div>
 
                   {/* Expanded Detail View */}
-                  {isExpanded && run.output && (
+                  {isExpanded && output && (
                     <div className="border-t border-gray-100 p-6 bg-gray-50/50 space-y-8">
                       {/* 1. Precedent Scan (if any) */}
-                      {run.output.precedent_scan && run.output.precedent_scan.total > 0 && (
+                      {output.precedent_scan && output.precedent_scan.total > 0 && (
                         <div>
                           <h3 className="text-sm font-bold tracking-wide text-gray-900 uppercase mb-4 flex items-center gap-2">
-                            Similar Past Deals ({run.output.precedent_scan.total})
+                            Similar Past Deals ({output.precedent_scan.total})
                           </h3>
                           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-                            {Object.values(run.output.precedent_scan.buckets).flat().slice(0, 4).map((record, i) => (
+                            {Object.values(output.precedent_scan.buckets).flat().slice(0, 4).map((record, i) => (
                               <PrecedentCard key={`${run.id}-prec-${i}`} precedent={record} onViewDealDocs={onNavigateToDeal} />
                             ))}
                           </div>
@@ -139,26 +161,26 @@ export function WorkflowPage({ workflowRuns, deals, selectedDocIds, onRunWorkflo
                       )}
 
                       {/* 2. Synthesis & Draft Answer */}
-                      {run.output.draft_answer && (
+                      {output.draft_answer && (
                         <div>
                           <h3 className="text-sm font-bold tracking-wide text-gray-900 uppercase mb-3">
                             Analysis Synthesis
                           </h3>
                           <div className="bg-white p-4 rounded-lg border border-gray-200 shadow-sm text-sm text-gray-800 whitespace-pre-wrap leading-relaxed">
-                            {run.output.draft_answer}
+                            {output.draft_answer}
                           </div>
                         </div>
                       )}
 
                       {/* 3. Risk Gaps */}
-                      {run.output.risk_gaps && run.output.risk_gaps.length > 0 && (
+                      {output.risk_gaps && output.risk_gaps.length > 0 && (
                         <div>
                           <h3 className="text-sm font-bold tracking-wide text-red-900 uppercase mb-3 flex items-center gap-2">
                             <AlertTriangle className="h-4 w-4 text-red-600" />
                             Identified Risk Gaps
                           </h3>
                           <ul className="list-disc pl-5 space-y-2 text-sm text-red-800 bg-red-50 p-4 rounded-lg border border-red-100">
-                            {run.output.risk_gaps.map((gap, i) => (
+                            {output.risk_gaps.map((gap, i) => (
                               <li key={i}>{gap}</li>
                             ))}
                           </ul>
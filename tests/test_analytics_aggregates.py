@@ -0,0 +1,125 @@
+"""
+Tier 2 tests for the materialized DuckDB aggregates — delta maintenance on
+document sync and delete, and the consistency check and rebuild that catch
+and repair drift, through the service and the /analytics routes.
+"""
+
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pandas")
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend.api import analytics as analytics_api
+from backend.database import Base
+from backend.models import Chunk, Deal, DealDocumentLink, Document
+from backend.services.analytics import DuckDBAnalytics
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add_all([
+        Deal(id="atlas", name="Project Atlas"),
+        Document(id="cim", filename="cim.pdf", category="cim", deal_outcome="invested"),
+        Document(id="memo", filename="memo.pdf", category="ic_memo", deal_outcome="invested"),
+        Document(id="model", filename="model.xlsx", category="cim"),
+        DealDocumentLink(deal_id="atlas", document_id="cim"),
+        DealDocumentLink(deal_id="atlas", document_id="memo"),
+        *[Chunk(document_id="cim", content=f"cim {i}", page_number=i + 1, chunk_index=i) for i in range(3)],
+        *[Chunk(document_id="memo", content=f"memo {i}", chunk_index=i) for i in range(2)],
+        Chunk(document_id="model", content="model", chunk_index=0),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    warehouse = DuckDBAnalytics(db_path=str(tmp_path / "analytics.duckdb"))
+    yield warehouse
+    warehouse.close()
+
+
+def _categories(analytics):
+    return {row["category"]: (row["document_count"], row["chunk_count"]) for row in analytics.query_category_stats()}
+
+
+def _outcomes(analytics):
+    return {row["deal_outcome"]: row["document_count"] for row in analytics.query_outcome_stats()}
+
+
+# ---------------------------------------------------------------------------
+# Delta maintenance
+# ---------------------------------------------------------------------------
+
+class TestDeltas:
+    def test_each_document_sync_adds_its_contribution(self, db, analytics):
+        analytics.sync_from_sqlite(db, document_id="cim")
+        assert _categories(analytics) == {"cim": (1, 3)}
+
+        analytics.sync_from_sqlite(db, document_id="memo")
+        analytics.sync_from_sqlite(db, document_id="model")
+
+        assert _categories(analytics) == {"cim": (2, 4), "ic_memo": (1, 2)}
+        assert _outcomes(analytics) == {"invested": 2, "unspecified": 1}
+        deal = analytics.query_deal_stats("atlas")
+        assert (deal["document_count"], deal["total_chunks"]) == (2, 5)
+        assert analytics.check_consistency()["consistent"]
+
+    def test_resync_moves_the_document_between_groups(self, db, analytics):
+        analytics.sync_from_sqlite(db)
+        db.get(Document, "model").category = "ic_memo"
+        db.commit()
+
+        analytics.sync_from_sqlite(db, document_id="model")
+
+        assert _categories(analytics) == {"cim": (1, 3), "ic_memo": (2, 3)}
+        assert analytics.check_consistency()["consistent"]
+
+    def test_delete_retracts_and_drops_empty_groups(self, db, analytics):
+        analytics.sync_from_sqlite(db)
+
+        analytics.delete_document("memo")
+
+        assert _categories(analytics) == {"cim": (2, 4)}
+        assert analytics.query_deal_stats("atlas")["document_count"] == 1
+        analytics.delete_document("cim")
+        assert analytics.query_deal_stats("atlas") is None
+        assert analytics.check_consistency()["consistent"]
+
+
+# ---------------------------------------------------------------------------
+# Drift detection and repair
+# ---------------------------------------------------------------------------
+
+class TestConsistency:
+    def test_drift_is_reported_and_rebuilt_over_the_api(self, db, analytics, monkeypatch):
+        analytics.sync_from_sqlite(db)
+        with analytics.transaction() as conn:
+            conn.execute("UPDATE category_analytics SET chunk_count = 99 WHERE category = 'cim'")
+            conn.execute("DELETE FROM outcome_analytics WHERE deal_outcome = 'unspecified'")
+        monkeypatch.setattr(analytics_api, "get_duckdb_analytics", lambda: analytics)
+        client = TestClient(main.app)
+
+        report = client.get("/analytics/consistency").json()
+
+        assert report["consistent"] is False
+        assert sorted(report["mismatches"]) == ["category_analytics", "outcome_analytics"]
+        [row] = report["mismatches"]["category_analytics"]
+        assert (row["key"], row["materialized_chunk_count"], row["expected_chunk_count"]) == ("cim", 99, 4)
+        assert report["mismatches"]["outcome_analytics"][0]["key"] == "unspecified"
+
+        repaired = client.post("/analytics/rebuild-aggregates").json()
+
+        assert repaired == {"consistent": True, "mismatches": {}}
+        assert client.get("/analytics/category-stats").json()[0]["chunk_count"] == 4
@@ -0,0 +1,196 @@
+"""
+Tier 2 tests for the SQLite -> DuckDB analytics sync.
+
+These run against a throwaway SQLite file and DuckDB file — no Qdrant, docling
+or LLM needed — and cover the denormalized chunk view, incremental change-log
+replay, the materialized aggregates and sync throughput on a 100k-chunk corpus.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pandas")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Chunk, Deal, DealDocumentLink, Document
+from backend.services.analytics import DuckDBAnalytics
+from backend.services.change_tracking import record_changes
+
+
+# ---------------------------------------------------------------------------
+# Fixtures / helpers
+# ---------------------------------------------------------------------------
+
+CATEGORIES = ["cim", "ic_memo", "financials", "other"]
+OUTCOMES = ["invested", "passed", "exited", None]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    warehouse = DuckDBAnalytics(db_path=str(tmp_path / "analytics.duckdb"))
+    try:
+        yield warehouse
+    finally:
+        warehouse.close()
+
+
+def _seed_corpus(db, n_docs: int, chunks_per_doc: int, n_deals: int = 10) -> list[str]:
+    """Create deals, documents (via the ORM) and chunks (bulk insert)."""
+    deals = [Deal(name=f"Deal {i}", sector="software") for i in range(n_deals)]
+    db.add_all(deals)
+    db.flush()
+
+    base_time = datetime(2024, 1, 1)
+    documents = [
+        Document(
+            filename=f"doc_{i}.pdf",
+            category=CATEGORIES[i % len(CATEGORIES)],
+            deal_outcome=OUTCOMES[i % len(OUTCOMES)],
+            upload_timestamp=base_time + timedelta(minutes=i),
+        )
+        for i in range(n_docs)
+    ]
+    db.add_all(documents)
+    db.flush()
+    # Every third document stays unlinked
+    db.add_all(
+        DealDocumentLink(deal_id=deals[i % n_deals].id, document_id=doc.id)
+        for i, doc in enumerate(documents)
+        if i % 3
+    )
+    db.commit()
+
+    body = "Revenue grew 18% to $42.0M with EBITDA margin of 31%. " * 6
+    rows = [
+        {
+            "id": f"{doc.id}-{idx}",
+            "document_id": doc.id,
+            "content": body,
+            "page_number": idx // 4 + 1,
+            "chunk_index": idx,
+        }
+        for doc in documents
+        for idx in range(chunks_per_doc)
+    ]
+    db.execute(insert(Chunk), rows)
+    record_changes(db, [doc.id for doc in documents])
+    db.commit()
+    return [doc.id for doc in documents]
+
+
+def _count(analytics, sql, params=None):
+    with analytics.session() as conn:
+        return conn.execute(sql, params or []).fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+# Denormalized sync
+# ---------------------------------------------------------------------------
+
+class TestFullSync:
+    def test_chunks_carry_deal_category_and_outcome(self, db, analytics):
+        doc_ids = _seed_corpus(db, n_docs=6, chunks_per_doc=3, n_deals=2)
+        result = analytics.sync_from_sqlite(db)
+
+        assert result.chunks_written == 18
+        assert result.documents_upserted == 6
+        linked = db.query(DealDocumentLink).filter(DealDocumentLink.document_id == doc_ids[1]).one()
+        with analytics.session() as conn:
+            row = conn.execute(
+                "SELECT deal_id, category, deal_outcome, filename FROM document_chunks WHERE chunk_id = ?",
+                [f"{doc_ids[1]}_0"],
+            ).fetchone()
+        assert row == (linked.deal_id, "ic_memo", "passed", "doc_1.pdf")
+        # Unlinked documents sync with no deal
+        assert _count(analytics, "SELECT COUNT(*) FROM document_chunks WHERE deal_id IS NULL") == 6
+
+    def test_aggregates_match_full_recompute(self, db, analytics):
+        _seed_corpus(db, n_docs=12, chunks_per_doc=5, n_deals=3)
+        analytics.sync_from_sqlite(db)
+
+        assert analytics.check_consistency() == {"consistent": True, "mismatches": {}}
+        stats = {row["category"]: row for row in analytics.query_category_stats()}
+        assert stats["cim"]["document_count"] == 3
+        assert stats["cim"]["chunk_count"] == 15
+
+    def test_full_sync_moves_watermark(self, db, analytics):
+        _seed_corpus(db, n_docs=3, chunks_per_doc=2)
+        result = analytics.sync_from_sqlite(db)
+        assert result.watermark > 0
+        assert analytics.sync_incremental(db).changes_applied == 0
+
+
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+
+class TestIncrementalSync:
+    def test_applies_only_changed_documents(self, db, analytics):
+        doc_ids = _seed_corpus(db, n_docs=8, chunks_per_doc=4, n_deals=2)
+        analytics.sync_from_sqlite(db)
+
+        updated = db.get(Document, doc_ids[0])
+        updated.category = "financials"
+        db.delete(db.get(Document, doc_ids[1]))
+        db.commit()
+
+        result = analytics.sync_incremental(db)
+        assert result.documents_upserted == 1
+        assert result.documents_deleted == 1
+        assert result.chunks_written == 4
+        assert result.chunks_deleted == 8
+        assert _count(analytics, "SELECT COUNT(*) FROM document_chunks") == 28
+        assert _count(
+            analytics, "SELECT category FROM document_stats WHERE document_id = ?", [doc_ids[0]]
+        ) == "financials"
+        assert analytics.check_consistency()["consistent"]
+
+    def test_document_sync_then_delete_keeps_aggregates_consistent(self, db, analytics):
+        doc_ids = _seed_corpus(db, n_docs=5, chunks_per_doc=2, n_deals=1)
+        for doc_id in doc_ids:
+            analytics.sync_from_sqlite(db, document_id=doc_id)
+        assert analytics.check_consistency()["consistent"]
+
+        analytics.delete_document(doc_ids[2])
+        assert analytics.check_consistency()["consistent"]
+        assert _count(analytics, "SELECT SUM(document_count) FROM category_analytics") == 4
+
+
+# ---------------------------------------------------------------------------
+# Throughput
+# ---------------------------------------------------------------------------
+
+class TestSyncThroughput:
+    # Generous ceiling so the test only trips on order-of-magnitude regressions
+    # (the per-row implementation took minutes at this size).
+    BUDGET_SECONDS = 60.0
+
+    def test_full_sync_100k_chunks(self, db, analytics):
+        _seed_corpus(db, n_docs=1000, chunks_per_doc=100, n_deals=50)
+
+        started = time.perf_counter()
+        result = analytics.sync_from_sqlite(db)
+        elapsed = time.perf_counter() - started
+
+        assert result.chunks_written == 100_000
+        assert _count(analytics, "SELECT COUNT(*) FROM document_chunks") == 100_000
+        assert elapsed < self.BUDGET_SECONDS, f"full sync of 100k chunks took {elapsed:.2f}s"
+        assert analytics.check_consistency()["consistent"]
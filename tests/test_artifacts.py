@@ -0,0 +1,204 @@
+"""
+Tier 2 tests for workflow report artifacts — rendering, the content-addressed
+store, background rendering status, recovery of renders cut short and the
+retrieval routes.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend.database import Base, get_db
+from backend.models import Artifact, WorkflowRun
+from backend.services import artifacts
+from backend.services.artifacts import (
+    FAILED,
+    PENDING,
+    READY,
+    ArtifactService,
+    ContentStore,
+    build_report,
+    render_html,
+    render_markdown,
+)
+from backend.services.run_store import store_output
+
+PAYLOAD = {
+    "query": "churn <risk>",
+    "draft_answer": "Retention is the main risk.",
+    "risk_gaps": ["Retention is unproven."],
+    "diligence_questions": [],
+    "committee_challenges": ["Why now?"],
+}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    db = factory()
+    db.add_all([WorkflowRun(id="run-1"), WorkflowRun(id="run-2")])
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def service(session_factory, tmp_path):
+    return ArtifactService(session_factory, ContentStore(tmp_path / "artifacts"))
+
+
+def _request(service, session_factory, run_id, formats):
+    db = session_factory()
+    ids = [artifact.id for artifact in service.request(db, run_id, "deal1", formats)]
+    db.commit()
+    db.close()
+    return ids
+
+
+# ---------------------------------------------------------------------------
+# Rendering and storage
+# ---------------------------------------------------------------------------
+
+class TestRendering:
+    def test_markdown_and_html_reports(self):
+        report = build_report("deal1", PAYLOAD)
+
+        markdown = render_markdown(report).decode()
+        assert markdown.startswith("# IC Workflow Output")
+        assert "## Diligence Questions\n- None" in markdown
+        assert "&lt;risk&gt;" in render_html(report).decode()
+
+    def test_identical_content_is_written_once(self, tmp_path, monkeypatch):
+        store = ContentStore(tmp_path)
+        first = store.put(b"report", "md")
+        mkdirs = []
+        monkeypatch.setattr(type(tmp_path), "mkdir", lambda self, *a, **k: mkdirs.append(self))
+
+        assert store.put(b"report", "md") == (first[0], False)
+        assert store.put(b"report", "html")[1] is True  # same directory: no mkdir
+        assert first[1] is True and mkdirs == []
+        assert store.path_for(first[0], "md").read_bytes() == b"report"
+
+
+class TestBackgroundRendering:
+    def test_each_format_ends_ready_or_failed(self, service, session_factory):
+        ids = _request(service, session_factory, "run-1", ["md", "html", "pdf"])
+        db = session_factory()
+        assert {a.status for a in db.query(Artifact)} == {PENDING}
+        db.close()
+
+        service.schedule(ids, "deal1", PAYLOAD).result(timeout=5)
+
+        db = session_factory()
+        status = {a.format: (a.status, a.error) for a in db.query(Artifact)}
+        db.close()
+        assert status["md"] == (READY, None) and status["html"] == (READY, None)
+        try:
+            import weasyprint  # noqa: F401
+        except ImportError:
+            assert status["pdf"][0] == FAILED and "weasyprint" in status["pdf"][1]
+
+    def test_identical_runs_share_one_object(self, service, session_factory, tmp_path):
+        for run_id in ("run-1", "run-2"):
+            service.render(_request(service, session_factory, run_id, ["md"]), "deal1", PAYLOAD)
+
+        db = session_factory()
+        assert len({a.sha256 for a in db.query(Artifact)}) == 1
+        db.close()
+        assert len(list((tmp_path / "artifacts" / "objects").rglob("*.md"))) == 1
+
+    def test_a_render_that_breaks_early_fails_every_pending_artifact(self, service, session_factory, monkeypatch):
+        ids = _request(service, session_factory, "run-1", ["md", "html"])
+
+        def broken(deal_id, payload):
+            raise KeyError("draft_answer")
+
+        monkeypatch.setattr(artifacts, "build_report", broken)
+        service.render(ids, "deal1", PAYLOAD)
+
+        db = session_factory()
+        assert {(a.status, a.error) for a in db.query(Artifact)} == {(FAILED, "KeyError: 'draft_answer'")}
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Recovery at start-up
+# ---------------------------------------------------------------------------
+
+class TestRecovery:
+    def test_stale_pending_reports_are_rendered_again_or_failed(self, service, session_factory):
+        db = session_factory()
+        store_output(db.get(WorkflowRun, "run-1"), PAYLOAD)
+        db.commit()
+        db.close()
+        [stale] = _request(service, session_factory, "run-1", ["md"])
+        [lost] = _request(service, session_factory, "run-2", ["md"])
+        [fresh] = _request(service, session_factory, "run-1", ["html"])
+        now = datetime.utcnow() + timedelta(hours=1)
+        db = session_factory()
+        db.get(Artifact, fresh).created_at = now
+        db.commit()
+        db.close()
+
+        assert service.recover_stale(now=now) == 2
+        service.drain(timeout=5)
+
+        db = session_factory()
+        status = {a.id: (a.status, a.error) for a in db.query(Artifact)}
+        db.close()
+        assert status[stale] == (READY, None)
+        assert status[lost][0] == FAILED and "unavailable" in status[lost][1]
+        assert status[fresh] == (PENDING, None)
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+class TestArtifactRoutes:
+    def test_list_download_and_revalidate(self, service, session_factory, monkeypatch):
+        md_id, html_id = _request(service, session_factory, "run-1", ["md", "html"])
+        service.render([md_id], "deal1", PAYLOAD)
+
+        def _override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        monkeypatch.setattr(main, "get_artifact_service", lambda: service)
+        main.app.dependency_overrides[get_db] = _override_get_db
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                listed = await client.get("/workflow/runs/run-1/artifacts")
+                ready = await client.get(f"/artifacts/{md_id}")
+                cached = await client.get(f"/artifacts/{md_id}", headers={"If-None-Match": ready.headers["etag"]})
+                pending = await client.get(f"/artifacts/{html_id}")
+                missing = await client.get("/workflow/runs/nope/artifacts")
+            return listed, ready, cached, pending, missing
+
+        try:
+            listed, ready, cached, pending, missing = asyncio.run(scenario())
+        finally:
+            main.app.dependency_overrides.pop(get_db, None)
+
+        assert {(a["format"], a["status"]) for a in listed.json()} == {("md", READY), ("html", PENDING)}
+        assert ready.status_code == 200 and ready.text.startswith("# IC Workflow Output")
+        assert ready.headers["content-type"].startswith("text/markdown")
+        assert cached.status_code == 304
+        assert pending.status_code == 202 and pending.json()["status"] == PENDING
+        assert missing.status_code == 404
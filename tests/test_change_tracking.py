@@ -0,0 +1,120 @@
+"""
+Tier 2 tests for change-data capture — the after_flush listener, collapsing
+a run of change_log entries to the net change per document, and the DuckDB
+incremental sync resuming from its saved watermark.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import ChangeLogEntry, Chunk, Document
+from backend.services.change_tracking import DELETE, UPSERT, changes_since, net_changes
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    pytest.importorskip("duckdb")
+    pytest.importorskip("pandas")
+    from backend.services.analytics import DuckDBAnalytics
+
+    warehouse = DuckDBAnalytics(db_path=str(tmp_path / "analytics.duckdb"))
+    yield warehouse
+    warehouse.close()
+
+
+def _add_document(db, document_id, chunks=2):
+    db.add(Document(id=document_id, filename=f"{document_id}.pdf", category="cim"))
+    db.add_all(Chunk(document_id=document_id, content=f"{document_id} {i}", chunk_index=i) for i in range(chunks))
+    db.commit()
+
+
+# ---------------------------------------------------------------------------
+# Listener and net changes
+# ---------------------------------------------------------------------------
+
+class TestChangeLog:
+    def test_flush_logs_one_entry_per_document(self, db):
+        _add_document(db, "cim", chunks=3)
+
+        entries = changes_since(db, 0)
+        assert [(e.entity_type, e.entity_id, e.operation) for e in entries] == [("document", "cim", UPSERT)]
+
+    def test_insert_then_delete_collapses_to_the_delete(self, db):
+        _add_document(db, "cim")
+        _add_document(db, "memo")
+        db.delete(db.get(Document, "cim"))
+        db.commit()
+
+        entries = changes_since(db, 0)
+        assert len(entries) == 3
+        assert net_changes(entries) == {"cim": DELETE, "memo": UPSERT}
+
+    def test_delete_wins_within_one_flush(self, db):
+        _add_document(db, "cim")
+        document = db.get(Document, "cim")
+        document.category = "ic_memo"
+        db.delete(document)
+        db.commit()
+
+        latest = db.query(ChangeLogEntry).order_by(ChangeLogEntry.id.desc()).first()
+        assert (latest.entity_id, latest.operation) == ("cim", DELETE)
+
+
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+
+class TestIncrementalSync:
+    def test_document_created_and_deleted_between_syncs_never_lands(self, db, analytics):
+        analytics.sync_from_sqlite(db)
+        _add_document(db, "cim")
+        db.delete(db.get(Document, "cim"))
+        db.commit()
+
+        result = analytics.sync_incremental(db)
+
+        assert (result.changes_applied, result.documents_upserted) == (2, 0)
+        with analytics.session() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM document_chunks").fetchone()[0] == 0
+
+    def test_interrupted_sync_resumes_from_the_saved_watermark(self, db, analytics, monkeypatch):
+        analytics.sync_from_sqlite(db)
+        start = analytics.get_sync_watermark()
+        for document_id in ("a", "b", "c"):
+            _add_document(db, document_id)
+
+        original = type(analytics)._sync_documents
+        calls = []
+
+        def flaky(self, conn, session, document_ids, result):
+            calls.append(document_ids)
+            if len(calls) == 2:
+                raise RuntimeError("warehouse went away")
+            return original(self, conn, session, document_ids, result)
+
+        monkeypatch.setattr(type(analytics), "_sync_documents", flaky)
+        with pytest.raises(RuntimeError):
+            analytics.sync_incremental(db, batch_size=1)
+        # The first batch committed with its watermark; the failed one did not.
+        assert analytics.get_sync_watermark() == start + 1
+
+        monkeypatch.setattr(type(analytics), "_sync_documents", original)
+        result = analytics.sync_incremental(db, batch_size=1)
+
+        assert result.changes_applied == 2
+        assert result.watermark == start + 3
+        with analytics.session() as conn:
+            synced = conn.execute("SELECT document_id FROM document_stats ORDER BY 1").fetchall()
+        assert [row[0] for row in synced] == ["a", "b", "c"]
@@ -0,0 +1,366 @@
+"""
+Tier 2 tests for the async retrieval path — admission control and event-loop
+isolation. The vector store and LLM are replaced with in-process fakes, so no
+Qdrant, embedding model or LLM server is needed.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend import database
+from backend.database import Base, get_db
+from backend.models import ChatLog, RetrievalTrace
+from backend.services.concurrency import AdmissionController, AdmissionRejected
+from backend.services.vector import ScoredChunk
+
+
+# ---------------------------------------------------------------------------
+# AdmissionController
+# ---------------------------------------------------------------------------
+
+class TestAdmissionController:
+    def test_rejects_when_queue_is_full(self):
+        async def scenario():
+            controller = AdmissionController("test", max_in_flight=1, max_queued=0, queue_timeout=1)
+            await controller.acquire()
+            with pytest.raises(AdmissionRejected) as excinfo:
+                await controller.acquire()
+            assert excinfo.value.status_code == 429
+            assert excinfo.value.retry_after >= 1
+            return controller.snapshot()
+
+        snapshot = asyncio.run(scenario())
+        assert snapshot["rejected"] == 1
+        assert snapshot["in_flight"] == 1
+
+    def test_queued_request_times_out_with_503(self):
+        async def scenario():
+            controller = AdmissionController("test", max_in_flight=1, max_queued=1, queue_timeout=0.05)
+            await controller.acquire()
+            with pytest.raises(AdmissionRejected) as excinfo:
+                await controller.acquire()
+            assert excinfo.value.status_code == 503
+            return controller.snapshot()
+
+        snapshot = asyncio.run(scenario())
+        assert snapshot["timed_out"] == 1
+        assert snapshot["queued"] == 0
+
+    def test_slots_are_handed_over_in_order(self):
+        async def scenario():
+            controller = AdmissionController("test", max_in_flight=1, max_queued=4, queue_timeout=1)
+            order = []
+
+            async def worker(i):
+                async with controller.admit():
+                    order.append(i)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(worker(i) for i in range(4)))
+            return order, controller.snapshot()
+
+        order, snapshot = asyncio.run(scenario())
+        assert order == [0, 1, 2, 3]
+        assert snapshot["in_flight"] == 0
+        assert snapshot["admitted"] == 4
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+class _BlockingVectorStore:
+    """Async search that waits until released, like a slow Qdrant."""
+
+    def __init__(self, release: asyncio.Event):
+        self.release = release
+        self.started = 0
+
+    async def asearch(self, query, **kwargs):
+        self.started += 1
+        await self.release.wait()
+        return [
+            ScoredChunk(
+                content="Revenue grew 12%.", score=0.9, document_id="doc1", filename="cim.pdf",
+                page_number=1, chunk_index=0, source="text", section=None, category="cim", deal_outcome=None,
+            )
+        ]
+
+
+async def _fake_answer(query, retrieved):
+    return {"answer": "12%", "sources": [], "prompt_version": "test", "model_name": "fake"}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False}, future=True
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False, future=True)
+    engine.dispose()
+
+
+@pytest.fixture
+def app(session_factory, monkeypatch):
+    def _override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(main, "agenerate_answer", _fake_answer)
+    # Streaming routes open their own sessions rather than borrowing the request's.
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    main.app.dependency_overrides[get_db] = _override_get_db
+    try:
+        yield main.app
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+
+
+class TestRetrievalRoutes:
+    def test_health_is_served_while_chats_are_in_flight(self, app, monkeypatch):
+        async def scenario():
+            release = asyncio.Event()
+            store = _BlockingVectorStore(release)
+            monkeypatch.setattr(main, "get_vector_store", lambda: store)
+            monkeypatch.setattr(
+                main, "get_retrieval_admission",
+                lambda controller=AdmissionController("retrieval", 64, 0, 1): controller,
+            )
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                chats = [
+                    asyncio.create_task(client.post("/chat", json={"query": f"q{i}"})) for i in range(48)
+                ]
+                while store.started < len(chats):
+                    await asyncio.sleep(0.01)
+                health = await asyncio.wait_for(client.get("/health"), timeout=2)
+                release.set()
+                responses = await asyncio.gather(*chats)
+            return health, responses
+
+        health, responses = asyncio.run(scenario())
+        assert health.status_code == 200
+        assert health.json()["retrieval"]["in_flight"] == 48
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[0].json()["answer"] == "12%"
+
+    def test_chat_trace_stores_stage_timings(self, app, session_factory, monkeypatch):
+        release = asyncio.Event()
+        release.set()
+        monkeypatch.setattr(main, "get_vector_store", lambda: _BlockingVectorStore(release))
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/chat", json={"query": "revenue growth"})
+
+        assert asyncio.run(scenario()).status_code == 200
+        db = session_factory()
+        trace = db.query(RetrievalTrace).one()
+        db.close()
+        assert trace.timings_json["chat_total"] > 0
+
+    def test_saturated_retrieval_returns_429_with_retry_after(self, app, monkeypatch):
+        controller = AdmissionController("retrieval", max_in_flight=1, max_queued=0, queue_timeout=3)
+        asyncio.run(controller.acquire())
+        monkeypatch.setattr(main, "get_retrieval_admission", lambda: controller)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/precedents", json={"query": "churn"})
+
+        response = asyncio.run(scenario())
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "3"
+
+
+# ---------------------------------------------------------------------------
+# Batch chat
+# ---------------------------------------------------------------------------
+
+class _BatchVectorStore:
+    def __init__(self):
+        self.batches = []
+
+    async def asearch_batch(self, queries, **kwargs):
+        self.batches.append(list(queries))
+        return [
+            [] if "unknown" in query else [
+                ScoredChunk(
+                    content=f"Evidence for {query}", score=0.9, document_id="doc1", filename="cim.pdf",
+                    page_number=1, chunk_index=0, source="text", section=None, category="cim", deal_outcome=None,
+                )
+            ]
+            for query in queries
+        ]
+
+
+class _FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class TestChatBatch:
+    def test_streams_answers_as_they_complete_and_dedupes_questions(self, app, session_factory, monkeypatch):
+        store = _BatchVectorStore()
+        monkeypatch.setattr(main, "get_vector_store", lambda: store)
+
+        async def slow_first_answer(query, retrieved):
+            await asyncio.sleep(0.2 if query == "Revenue growth?" else 0)
+            return {"answer": f"A: {query}", "sources": [], "prompt_version": "test", "model_name": "fake"}
+
+        monkeypatch.setattr(main, "agenerate_answer", slow_first_answer)
+        queries = ["Revenue growth?", "Churn?", "  revenue GROWTH?", "unknown metric?"]
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/chat/batch", json={"queries": queries, "doc_ids": ["doc1"]})
+
+        response = asyncio.run(scenario())
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert store.batches == [["Revenue growth?", "Churn?", "unknown metric?"]]
+        assert lines[-1]["done"] is True and lines[-1]["unique_questions"] == 3
+        results = lines[:-1]
+        assert results[-1]["query"] in ("Revenue growth?", "  revenue GROWTH?")  # slowest finishes last
+        by_index = {line["index"]: line for line in results}
+        assert sorted(by_index) == [0, 1, 2, 3]
+        assert by_index[2]["answer"] == "A: Revenue growth?"
+        assert by_index[3]["status"] == "no_context"
+
+        db = session_factory()
+        traces = db.query(RetrievalTrace).all()
+        db.close()
+        assert sorted(trace.query for trace in traces) == ["Churn?", "Revenue growth?"]
+        assert all(trace.timings_json["batch_size"] == 3 for trace in traces)
+
+    def test_every_answer_of_a_large_batch_is_recorded(self, app, session_factory, monkeypatch):
+        monkeypatch.setattr(main, "get_vector_store", lambda: _BatchVectorStore())
+        queries = [f"Metric {i}?" for i in range(12)]  # three times the db executor's threads
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/chat/batch", json={"queries": queries})
+
+        response = asyncio.run(scenario())
+        assert response.status_code == 200
+        assert json.loads(response.text.splitlines()[-1])["done"] is True
+
+        db = session_factory()
+        logs = db.query(ChatLog).all()
+        traces = db.query(RetrievalTrace).all()
+        db.close()
+        assert sorted(log.user_query for log in logs) == sorted(queries)
+        assert sorted(trace.chat_log_id for trace in traces) == sorted(log.id for log in logs)
+
+    def test_llm_calls_respect_gateway_concurrency(self, monkeypatch):
+        from backend.services import rag
+
+        active, peak = 0, 0
+
+        async def fake_completion(model_name, messages):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return "ok", "", None
+
+        monkeypatch.setattr(rag, "_stream_completion", fake_completion)
+        monkeypatch.setattr(rag.settings, "llm_max_concurrency", 2)
+
+        async def scenario():
+            return await asyncio.gather(*(rag.agenerate_answer(f"q{i}", []) for i in range(6)))
+
+        answers = asyncio.run(scenario())
+        assert peak == 2
+        assert all(answer["answer"] == "ok" for answer in answers)
+
+    def test_a_gateway_rejecting_stream_options_is_retried_without_them(self, monkeypatch):
+        from types import SimpleNamespace
+
+        from openai import BadRequestError
+
+        from backend.services import rag
+
+        sent_options = []
+
+        async def events():
+            delta = SimpleNamespace(content="Retention fell.", reasoning_content=None)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+        async def create(**kwargs):
+            sent_options.append("stream_options" in kwargs)
+            if "stream_options" in kwargs:
+                request = httpx.Request("POST", "http://gateway/v1/chat/completions")
+                raise BadRequestError("unknown field", response=httpx.Response(400, request=request), body=None)
+            return events()
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        monkeypatch.setattr(rag, "_get_async_client", lambda: client)
+        monkeypatch.setattr(rag, "_no_stream_usage", set())
+        counted = []
+        monkeypatch.setattr(rag, "count_tokens", lambda prompt, completion: counted.append((prompt, completion)))
+
+        answers = [asyncio.run(rag.agenerate_answer("Churn?", [])) for _ in range(2)]
+
+        assert [answer["answer"] for answer in answers] == ["Retention fell."] * 2
+        # Rejected once, then remembered for the endpoint.
+        assert sent_options == [True, False, False]
+        assert len(counted) == 2 and all(prompt > 0 and completion > 0 for prompt, completion in counted)
+
+    def test_batch_search_embeds_once_and_uses_query_cache(self, monkeypatch):
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+
+        from backend.services import vector
+
+        embedder = vector.EmbeddingModel.__new__(vector.EmbeddingModel)
+        embedder.model = None
+        embedder._query_cache = vector.OrderedDict()
+        embedder._query_cache_size = 8
+        embedder._query_cache_lock = threading.Lock()
+        fake = _FakeEmbedder()
+        monkeypatch.setattr(embedder, "embed", fake.embed)
+        monkeypatch.setattr(vector, "_embedding_model", embedder)
+        monkeypatch.setattr(vector.settings, "qdrant_path", "in-memory")
+
+        client = QdrantClient(":memory:")
+        client.create_collection(
+            vector.settings.qdrant_collection,
+            vectors_config=models.VectorParams(size=2, distance=models.Distance.DOT),
+        )
+        client.upsert(vector.settings.qdrant_collection, points=[
+            models.PointStruct(id=1, vector=[1.0, 0.0], payload={"document_id": "a", "content": "x"}),
+            models.PointStruct(id=2, vector=[0.0, 1.0], payload={"document_id": "b", "content": "y"}),
+        ])
+        store = vector.QdrantVectorStore.__new__(vector.QdrantVectorStore)
+        store.client = client
+
+        embedder.embed_one("cached?")
+        results = asyncio.run(store.asearch_batch(["cached?", "new one", "new one"], top_k=1, doc_ids=["b"]))
+
+        assert fake.calls == [["cached?"], ["new one"]]
+        assert [[hit.document_id for hit in hits] for hits in results] == [["b"], ["b"], ["b"]]
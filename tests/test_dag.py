@@ -0,0 +1,245 @@
+"""
+Tier 2 tests for the DAG executor and the pipelined IC workflow built on it.
+The vector store and LLM are in-process fakes.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend import database
+from backend.database import Base, get_db
+from backend.models import Deal, Document, WorkflowRun
+from backend.services import workflow
+from backend.services.dag import DAG, FAILED, OK, SKIPPED, Node
+from backend.services.deal_index import SimilarDeal
+from backend.services.metadata_cache import get_metadata_cache
+from backend.services.artifacts import ArtifactService, ContentStore
+from backend.services.run_store import load_output
+from backend.services.vector import ScoredChunk
+
+
+# ---------------------------------------------------------------------------
+# DAG executor
+# ---------------------------------------------------------------------------
+
+def _sleeper(value, seconds, log=None):
+    async def fn(**deps):
+        if log is not None:
+            log.append(("start", value))
+        await asyncio.sleep(seconds)
+        return value, deps
+
+    return fn
+
+
+class TestDAG:
+    def test_independent_nodes_overlap_and_results_stream_in_completion_order(self):
+        log = []
+        dag = DAG([
+            Node("slow", _sleeper("slow", 0.1, log)),
+            Node("fast", _sleeper("fast", 0.01, log)),
+            Node("join", _sleeper("join", 0, log), deps=("slow", "fast")),
+        ])
+
+        async def scenario():
+            return [result.name async for result in dag.stream()]
+
+        order = asyncio.run(scenario())
+        assert order == ["fast", "slow", "join"]
+        assert log[:2] == [("start", "slow"), ("start", "fast")]
+        value, deps = dag.results["join"].value
+        assert deps == {"slow": ("slow", {}), "fast": ("fast", {})}
+        timings = dag.timings()
+        assert timings["slow"]["started_ms"] < 50  # not queued behind "fast"
+        assert timings["join"]["started_ms"] >= timings["slow"]["duration_ms"]
+
+    def test_failure_skips_downstream_but_not_siblings(self):
+        async def boom():
+            raise ValueError("qdrant down")
+
+        dag = DAG([
+            Node("search", boom),
+            Node("deal", _sleeper("deal", 0.01)),
+            Node("pack", _sleeper("pack", 0), deps=("search", "deal")),
+            Node("report", _sleeper("report", 0), deps=("pack",)),
+        ])
+
+        with pytest.raises(ValueError, match="qdrant down"):
+            asyncio.run(dag.run())
+        statuses = {name: result.status for name, result in dag.results.items()}
+        assert statuses == {"search": FAILED, "deal": OK, "pack": SKIPPED, "report": SKIPPED}
+
+    def test_rejects_cycles_and_unknown_dependencies(self):
+        noop = _sleeper(None, 0)
+        with pytest.raises(ValueError, match="cycle"):
+            DAG([Node("a", noop, deps=("b",)), Node("b", noop, deps=("a",)), Node("c", noop)])
+        with pytest.raises(ValueError, match="unknown"):
+            DAG([Node("a", noop, deps=("missing",))])
+
+
+# ---------------------------------------------------------------------------
+# IC workflow
+# ---------------------------------------------------------------------------
+
+class _FacetVectorStore:
+    """Batched search returning one hit per matching outcome; the unfiltered searches see them all."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def asearch_many(self, requests):
+        self.batches.append(list(requests))
+        await asyncio.sleep(0.05)
+        return [self._hits(request.deal_outcomes) for request in requests]
+
+    @staticmethod
+    def _hits(deal_outcomes):
+        return [
+            ScoredChunk(
+                content=f"{outcome} precedent", score=0.9 if outcome == "invested" else 0.5,
+                document_id=f"doc-{outcome}", filename=f"{outcome}.pdf", page_number=1, chunk_index=0,
+                source="text", section=None, category="memo", deal_outcome=outcome,
+            )
+            for outcome in deal_outcomes or ["invested", "passed"]
+            if outcome in ("invested", "passed")
+        ]
+
+    def searches(self):
+        return sorted(((r.deal_outcomes, r.top_k) for batch in self.batches for r in batch), key=str)
+
+
+class _FakeDealIndex:
+    def similar_deals(self, deal_id=None, top_k=10, **filters):
+        return [SimilarDeal(
+            deal_id="deal2", name="Project Borealis", score=0.8, sector="Software", stage=None, geography=None,
+            vintage_year=None, strategy=None, decision_status=None, outcome_status=None, document_count=2,
+            chunk_count=40,
+        )]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False}, future=True
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False, future=True)
+    db = factory()
+    db.add(Deal(id="deal1", name="Project Atlas", sector="Software"))
+    for outcome in ("invested", "passed"):
+        db.add(Document(id=f"doc-{outcome}", filename=f"{outcome}.pdf", deal_outcome=outcome))
+    db.commit()
+    db.close()
+    get_metadata_cache().invalidate()
+    yield factory
+    engine.dispose()
+    get_metadata_cache().invalidate()
+
+
+@pytest.fixture
+def app(session_factory, tmp_path, monkeypatch):
+    def _override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    active, peak = 0, 0
+
+    async def fake_answer(query, retrieved):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return {"answer": f"Draft: {query}", "sources": [], "prompt_version": "test", "model_name": "fake"}
+
+    store = _FacetVectorStore()
+    monkeypatch.setattr(workflow, "agenerate_answer", fake_answer)
+    monkeypatch.setattr(main, "get_vector_store", lambda: store)
+    artifacts = ArtifactService(session_factory, ContentStore(tmp_path / "artifacts"))
+    monkeypatch.setattr(main, "get_artifact_service", lambda: artifacts)
+    monkeypatch.setattr(main, "get_deal_index", _FakeDealIndex)
+    monkeypatch.setattr(database, "SessionLocal", session_factory)  # the streaming route opens its own
+    main.app.dependency_overrides[get_db] = _override_get_db
+    try:
+        yield main.app, store, lambda: peak
+    finally:
+        artifacts.drain(timeout=5)
+        main.app.dependency_overrides.pop(get_db, None)
+
+
+def _post(app, path, body):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+
+    return asyncio.run(scenario())
+
+
+class TestWorkflowDAG:
+    def test_stream_reports_each_node_then_the_persisted_run(self, app, session_factory):
+        app, store, llm_peak = app
+        response = _post(app, "/workflow/run/stream", {
+            "query": "churn risk", "deal_id": "deal1", "draft_sections": True,
+        })
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        nodes = {line["node"]: line for line in lines if line["event"] == "node"}
+        # Every search runs in one batch: 4 outcome facets, the sector facet and one per candidate item.
+        assert len(store.batches) == 1
+        searches = store.searches()
+        assert [s for s in searches if s[1] != 3] == sorted(
+            [(None, 32), (["invested"], 16), (["passed"], 16), (["exited"], 16), (None, 16)], key=str
+        )
+        assert any("Software sector" in r.query for r in store.batches[0])
+        # The deal lookup, the similar-deals lookup and the batched search do not queue behind each other.
+        assert max(nodes[name]["started_ms"] for name in ("deal", "similar_deals", "retrieve")) < 40
+        assert nodes["deal"]["result"]["name"] == "Project Atlas"
+        assert nodes["precedents"]["result"] == {"count": 2}
+        assert nodes["precedent_scan"]["result"]["buckets"]["invested"]
+        assert nodes["draft_section_0"]["result"]["section"] == "Executive summary for Project Atlas"
+        assert llm_peak() > 1
+
+        done = lines[-1]
+        assert done["event"] == "done" and done["workflow_id"]
+        assert done["draft_answer"] == "Draft: churn risk"
+        assert len(done["memo_drafts"]) == 6
+        assert done["similar_deals"][0]["name"] == "Project Borealis"
+        cited = {(entry["section"], entry["item"]): entry["evidence"] for entry in done["item_evidence"]}
+        assert len(cited) == sum(len(done[section]) for section in workflow.CITED_SECTIONS)
+        assert all(refs == ["doc-invested:0", "doc-passed:0"] for refs in cited.values())
+        assert sorted(done["evidence"]) == ["doc-invested:0", "doc-passed:0"]  # shared, stored once
+        assert set(done["node_timings"]) == set(nodes)
+
+        db = session_factory()
+        run = db.query(WorkflowRun).one()
+        output = load_output(db, run)
+        db.close()
+        assert output["node_timings"]["precedents"]["status"] == "ok"
+
+    def test_run_returns_full_payload_and_respects_outcome_filter(self, app):
+        app, store, _ = app
+        response = _post(app, "/workflow/run", {"query": "churn risk", "deal_outcomes": ["passed"]})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert len(store.batches) == 1
+        # Outcome facets are restricted to the request's outcomes; item and attribute searches inherit the filter.
+        assert all(outcomes == ["passed"] for outcomes, _ in store.searches())
+        assert body["precedent_scan"]["buckets"]["passed"]
+        assert "memo_drafts" not in body
+        assert "similar_deals" not in body  # no deal_id to compare against
+        assert body["node_timings"]["draft_answer"]["status"] == "ok"
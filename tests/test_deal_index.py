@@ -0,0 +1,120 @@
+"""
+Tier 2 tests for the deal similarity index — deal vectors from chunk
+centroids plus profiles, incremental refresh and filtered ANN lookups.
+Qdrant runs in memory with a keyword-axis fake embedder.
+"""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from backend.services import deal_index as deal_index_module
+from backend.services import vector
+from backend.services.deal_index import DealIndex, blend_vectors, deal_point_id
+from backend.services.metadata_cache import DealInfo
+
+AXES = ("software", "healthcare", "logistics", "consumer")
+
+
+class _AxisEmbedder:
+    """One axis per sector keyword, so similarity is easy to reason about."""
+
+    def embed(self, texts):
+        return [[float(axis in text.lower()) + 0.01 for axis in AXES] for text in texts]
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+
+def _deal(deal_id, sector, vintage=2020):
+    now = datetime(2024, 1, 1)
+    return DealInfo(
+        id=deal_id, name=f"Project {deal_id.title()}", company_name=None, sector=sector, geography="US",
+        stage="growth", fund_name=None, vintage_year=vintage, strategy="buyout", decision_status=None,
+        outcome_status=None, partner_owner=None, summary=None, created_at=now, updated_at=now,
+    )
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(vector, "_embedding_model", _AxisEmbedder())
+    monkeypatch.setattr(deal_index_module.settings, "embedding_dim", len(AXES))
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        vector.settings.qdrant_collection,
+        vectors_config=models.VectorParams(size=len(AXES), distance=models.Distance.COSINE),
+    )
+    chunks = [
+        # Atlas and Cygnus are software businesses; Borealis is healthcare.
+        ("atlas", "atlas-cim", [1.0, 0.1, 0.0, 0.0]),
+        ("atlas", "atlas-cim", [0.9, 0.0, 0.2, 0.0]),
+        ("borealis", "borealis-memo", [0.0, 1.0, 0.0, 0.1]),
+        ("cygnus", "cygnus-cim", [0.8, 0.0, 0.0, 0.3]),
+        ("cygnus", "cygnus-qoe", [0.0, 0.0, 0.0, 1.0]),
+    ]
+    client.upsert(vector.settings.qdrant_collection, points=[
+        models.PointStruct(id=i, vector=vec, payload={"deal_id": deal, "document_id": doc})
+        for i, (deal, doc, vec) in enumerate(chunks)
+    ])
+    store = vector.QdrantVectorStore.__new__(vector.QdrantVectorStore)
+    store.client = client
+    index = DealIndex(store)
+    index.rebuild([_deal("atlas", "Software"), _deal("borealis", "Healthcare", 2015), _deal("cygnus", "Software")])
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Deal vectors
+# ---------------------------------------------------------------------------
+
+class TestDealVectors:
+    def test_blend_weights_profile_against_centroid(self):
+        assert blend_vectors(None, [0.0, 2.0], 0.25) == [0.0, 1.0]
+        blended = blend_vectors([1.0, 0.0], [0.0, 1.0], 0.25)
+        assert blended[0] > blended[1] > 0
+
+    def test_refresh_records_counts_and_is_incremental(self, index):
+        point = index.client.retrieve(index.collection, ids=[deal_point_id("cygnus")])[0]
+        assert (point.payload["document_count"], point.payload["chunk_count"]) == (2, 2)
+
+        index.client.delete(vector.settings.qdrant_collection, points_selector=models.FilterSelector(
+            filter=models.Filter(must=[models.FieldCondition(key="document_id", match=models.MatchValue(value="cygnus-qoe"))])
+        ))
+        index.refresh_deal(_deal("cygnus", "Software"))
+
+        point = index.client.retrieve(index.collection, ids=[deal_point_id("cygnus")])[0]
+        assert (point.payload["document_count"], point.payload["chunk_count"]) == (1, 1)
+        assert index.client.count(index.collection).count == 3
+
+    def test_deal_without_documents_is_placed_by_its_profile(self, index):
+        index.refresh_deal(_deal("delta", "Healthcare"))
+
+        results = index.similar_deals(deal_id="delta", top_k=1)
+        assert [r.deal_id for r in results] == ["borealis"]
+
+
+# ---------------------------------------------------------------------------
+# Similar deals
+# ---------------------------------------------------------------------------
+
+class TestSimilarDeals:
+    def test_nearest_deal_excludes_itself(self, index):
+        results = index.similar_deals(deal_id="atlas", top_k=5)
+
+        assert [r.deal_id for r in results] == ["cygnus", "borealis"]
+        assert results[0].name == "Project Cygnus"
+
+    def test_attribute_filters_and_vintage_range(self, index):
+        assert [r.deal_id for r in index.similar_deals(deal_id="atlas", sector=["Healthcare"])] == ["borealis"]
+        assert [r.deal_id for r in index.similar_deals(deal_id="atlas", vintage_to=2018)] == ["borealis"]
+
+    def test_free_text_query_and_unindexed_deal(self, index):
+        assert index.similar_deals(query="healthcare services", top_k=1)[0].deal_id == "borealis"
+        assert index.similar_deals(deal_id="unknown") == []
+        with pytest.raises(ValueError):
+            index.similar_deals(deal_id="atlas", query="both")
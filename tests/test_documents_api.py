@@ -0,0 +1,251 @@
+"""
+Tier 2 tests for the /documents listing — SQLite only, no Qdrant/docling/LLM.
+
+Covers keyset pagination, filters, conditional requests (ETag / 304), that
+the listing issues a constant number of queries regardless of page size, and
+the batch ingestion status and its SSE stream.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend.database import Base, get_db
+from backend.main import app
+from backend.models import Deal, DealDocumentLink, Document
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'core.db'}",
+        connect_args={"check_same_thread": False},
+        future=True,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, future=True)
+
+
+@pytest.fixture
+def client(session_factory):
+    def _override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def seeded(session_factory):
+    db = session_factory()
+    deal = Deal(name="Project Atlas")
+    db.add(deal)
+    db.flush()
+    base_time = datetime(2024, 6, 1)
+    docs = []
+    for i in range(25):
+        doc = Document(
+            filename=f"doc_{i}.pdf",
+            category="cim" if i % 2 else "financials",
+            status="ready" if i % 5 else "processing",
+            tags=["q3"] if i % 3 == 0 else [],
+            upload_timestamp=base_time + timedelta(hours=i),
+        )
+        db.add(doc)
+        docs.append(doc)
+    db.flush()
+    for doc in docs[:10]:
+        db.add(DealDocumentLink(deal_id=deal.id, document_id=doc.id))
+    db.commit()
+    ids = [doc.id for doc in docs]
+    deal_id = deal.id
+    db.close()
+    return {"deal_id": deal_id, "document_ids": ids}
+
+
+# ---------------------------------------------------------------------------
+# Pagination and filters
+# ---------------------------------------------------------------------------
+
+class TestListing:
+    def test_keyset_pages_cover_everything_in_order(self, client, seeded):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/documents", params=params)
+            assert response.status_code == 200
+            seen.extend(item["id"] for item in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        assert seen == list(reversed(seeded["document_ids"]))
+
+    def test_without_limit_or_cursor_the_whole_library_comes_back(self, client, seeded, monkeypatch):
+        monkeypatch.setattr(main, "_DOCUMENTS_PAGE_SIZE", 3)
+
+        everything = client.get("/documents")
+
+        assert [item["id"] for item in everything.json()] == list(reversed(seeded["document_ids"]))
+        assert "x-next-cursor" not in everything.headers
+        first = client.get("/documents", params={"limit": 2})
+        following = client.get("/documents", params={"cursor": first.headers["x-next-cursor"]})
+        assert len(following.json()) == 3 and "x-next-cursor" in following.headers
+
+    def test_deal_id_is_resolved_from_links(self, client, seeded):
+        items = client.get("/documents", params={"deal_id": seeded["deal_id"]}).json()
+        assert len(items) == 10
+        assert {item["deal_id"] for item in items} == {seeded["deal_id"]}
+
+    def test_status_category_and_tag_filters(self, client, seeded):
+        processing = client.get("/documents", params={"status": "processing"}).json()
+        assert len(processing) == 5
+        cim = client.get("/documents", params={"category": "cim"}).json()
+        assert {item["category"] for item in cim} == {"cim"}
+        tagged = client.get("/documents", params={"tag": "q3"}).json()
+        assert len(tagged) == 9
+        assert all("q3" in item["tags"] for item in tagged)
+
+    def test_invalid_cursor_is_rejected(self, client, seeded):
+        assert client.get("/documents", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    def test_query_count_does_not_grow_with_page_size(self, client, seeded, engine):
+        statements = []
+
+        def _count(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            client.get("/documents", params={"limit": 2})
+            small = len(statements)
+            statements.clear()
+            client.get("/documents", params={"limit": 25})
+            large = len(statements)
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        assert small == large <= 2
+
+
+# ---------------------------------------------------------------------------
+# Conditional requests
+# ---------------------------------------------------------------------------
+
+class TestConditionalRequests:
+    def test_etag_round_trip_and_invalidation(self, client, seeded, session_factory):
+        first = client.get("/documents")
+        etag = first.headers["etag"]
+        assert first.headers["last-modified"]
+
+        cached = client.get("/documents", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+        db = session_factory()
+        doc = db.get(Document, seeded["document_ids"][0])
+        doc.status = "ready"
+        db.commit()
+        db.close()
+
+        refreshed = client.get("/documents", headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag
+
+    def test_etag_depends_on_query(self, client, seeded):
+        all_docs = client.get("/documents").headers["etag"]
+        filtered = client.get("/documents", params={"status": "ready"}).headers["etag"]
+        assert all_docs != filtered
+
+
+# ---------------------------------------------------------------------------
+# Ingestion status
+# ---------------------------------------------------------------------------
+
+class TestIngestionStatus:
+    def test_batch_status_merges_live_stage(self, client, seeded):
+        from backend.services.ingest_events import get_ingestion_broker
+
+        ready_id, processing_id = seeded["document_ids"][1], seeded["document_ids"][0]
+        get_ingestion_broker().publish(processing_id, "processing", "embedding", 0.5)
+
+        response = client.post("/documents/status", json={"ids": [ready_id, processing_id, "missing"]})
+        assert response.status_code == 200
+        by_id = {item["id"]: item for item in response.json()}
+        assert set(by_id) == {ready_id, processing_id}
+        assert by_id[ready_id]["stage"] == "done"
+        assert by_id[processing_id]["stage"] == "embedding"
+        assert by_id[processing_id]["progress"] == 0.5
+
+    def test_event_stream_closes_once_all_documents_are_terminal(self, client, seeded):
+        ids = seeded["document_ids"][1:3]
+        with client.stream("GET", "/documents/events", params={"ids": ",".join(ids)}) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = "".join(response.iter_text())
+        assert body.count("event: snapshot") == 2
+        for doc_id in ids:
+            assert doc_id in body
+
+    def test_live_progress_reaches_the_stream_until_every_document_settles(self, client, seeded, monkeypatch):
+        from backend.services.ingest_events import get_ingestion_broker
+
+        broker = get_ingestion_broker()
+        first, second = seeded["document_ids"][0], seeded["document_ids"][5]  # both still processing
+        # The route subscribes before it takes the snapshot; publish once both happened.
+        snapshotted = threading.Event()
+        document_statuses = main._document_statuses
+
+        def _snapshot(db, document_ids):
+            statuses = document_statuses(db, document_ids)
+            snapshotted.set()
+            return statuses
+
+        def _ingest():
+            assert snapshotted.wait(timeout=5)
+            broker.publish(first, "processing", "parsing", 0.1)
+            broker.publish(first, "processing", "embedding", 0.5)
+            broker.publish(first, "ready", "done", 1.0)
+            broker.publish(second, "failed", "failed", 0.3, error="parse error")
+            broker.publish(second, "processing", "parsing", 0.1)  # after the stream closed
+
+        monkeypatch.setattr(main, "_document_statuses", _snapshot)
+        publisher = threading.Thread(target=_ingest)
+        publisher.start()
+        with client.stream("GET", "/documents/events", params={"ids": f"{first},{second}"}) as response:
+            body = "".join(response.iter_text())
+        publisher.join(timeout=5)
+
+        events = []
+        for block in body.strip().split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((fields["event"], json.loads(fields["data"])))
+        assert [name for name, _ in events] == ["snapshot", "snapshot"] + ["ingestion"] * 4
+        live = [(data["document_id"], data["stage"], data["progress"]) for _, data in events[2:]]
+        assert live == [(first, "parsing", 0.1), (first, "embedding", 0.5), (first, "done", 1.0), (second, "failed", 0.3)]
+        assert events[-1][1]["error"] == "parse error"
+
@@ -0,0 +1,85 @@
+"""
+Tier 2 tests for the shared evidence record — in-place enrichment and the
+serialized views used by precedent scans, answer sources and traces.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from backend.services.evidence import PRECEDENT_VIEW, SOURCE_VIEW, TRACE_VIEW, EvidenceRecord, EvidenceView
+from backend.services.metadata_cache import DealInfo, DocumentInfo, MetadataSnapshot
+from backend.services.precedent import _attach_metadata, summarize_precedents
+
+
+def _hit(document_id="cim", chunk_index=4, outcome=None):
+    return EvidenceRecord(
+        content="ARR grew 40%", score=0.8, document_id=document_id, filename=f"{document_id}.pdf",
+        page_number=2, chunk_index=chunk_index, source="text", category="other", deal_outcome=outcome,
+    )
+
+
+@pytest.fixture
+def snapshot():
+    now = datetime(2024, 1, 1)
+    atlas = DealInfo(
+        id="atlas", name="Project Atlas", company_name=None, sector="Software", geography="US", stage="growth",
+        fund_name=None, vintage_year=2021, strategy=None, decision_status="approved", outcome_status=None,
+        partner_owner=None, summary=None, created_at=now, updated_at=now,
+    )
+    return MetadataSnapshot(1, 0, {"cim": DocumentInfo("cim", "invested", "atlas")}, {"atlas": atlas}, ("atlas",))
+
+
+# ---------------------------------------------------------------------------
+# Enrichment
+# ---------------------------------------------------------------------------
+
+class TestEnrichment:
+    def test_hits_are_enriched_in_place(self, snapshot):
+        hits = [_hit(), _hit("loose", 0, outcome="passed")]
+
+        enriched = _attach_metadata(snapshot, hits)
+
+        assert enriched is hits
+        assert (hits[0].category, hits[0].deal_outcome, hits[0].deal_name) == ("cim", "invested", "Project Atlas")
+        assert hits[0].sector == "Software"
+        # No document row: the payload's own fields stand, and there is no deal.
+        assert (hits[1].category, hits[1].deal_outcome, hits[1].deal_id) == ("other", "passed", None)
+
+    def test_records_have_no_instance_dict(self):
+        assert not hasattr(_hit(), "__dict__")
+        assert _hit().ref == "cim:4"
+
+
+# ---------------------------------------------------------------------------
+# Views
+# ---------------------------------------------------------------------------
+
+class TestViews:
+    def test_views_keep_the_api_key_names(self, snapshot):
+        hit = _attach_metadata(snapshot, [_hit()])[0]
+
+        assert PRECEDENT_VIEW(hit)["evidence"] is hit.content
+        assert PRECEDENT_VIEW(hit)["deal_name"] == "Project Atlas"
+        assert SOURCE_VIEW(hit) == {
+            "filename": "cim.pdf", "page_number": 2, "doc_id": "cim", "chunk_text": "ARR grew 40%",
+            "category": "cim", "deal_outcome": "invested", "chunk_index": 4,
+        }
+        assert "chunk_text" not in TRACE_VIEW(hit) and TRACE_VIEW(hit)["score"] == 0.8
+
+    def test_scan_buckets_serialize_directly(self, snapshot):
+        scan = summarize_precedents(_attach_metadata(snapshot, [_hit(), _hit("loose", 1, outcome="written_off")]))
+
+        assert scan["total"] == 2
+        assert [item["document_id"] for item in scan["buckets"]["invested"]] == ["cim"]
+        assert [item["document_id"] for item in scan["buckets"]["other"]] == ["loose"]
+        assert json.loads(json.dumps(scan)) == scan
+
+    def test_unknown_field_is_rejected(self):
+        with pytest.raises(ValueError):
+            EvidenceView(text="body")
+
+    def test_single_field_view(self, snapshot):
+        hit = _attach_metadata(snapshot, [_hit()])[0]
+        assert EvidenceView(doc_id="document_id").many([hit, hit]) == [{"doc_id": "cim"}, {"doc_id": "cim"}]
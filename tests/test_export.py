@@ -0,0 +1,124 @@
+"""
+Tier 2 tests for the partitioned Parquet snapshot export — the Hive layout and
+manifests, and the incremental skip / rewrite / remove decision per partition.
+"""
+
+import json
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+pytest.importorskip("pandas")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Chunk, Deal, DealDocumentLink, Document
+from backend.services.analytics import DuckDBAnalytics
+from backend.services.export import HIVE_DEFAULT_PARTITION, MANIFEST_NAME, ParquetSnapshotExporter
+
+ATLAS_CIM = "deal_id=atlas/category=cim/data.parquet"
+ATLAS_MEMO = "deal_id=atlas/category=ic_memo/data.parquet"
+UNLINKED_CIM = f"deal_id={HIVE_DEFAULT_PARTITION}/category=cim/data.parquet"
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add_all([
+        Deal(id="atlas", name="Project Atlas"),
+        Document(id="cim", filename="cim.pdf", category="cim"),
+        Document(id="memo", filename="memo.pdf", category="ic_memo"),
+        Document(id="model", filename="model.xlsx", category="cim"),
+        DealDocumentLink(deal_id="atlas", document_id="cim"),
+        DealDocumentLink(deal_id="atlas", document_id="memo"),
+        *[Chunk(document_id=doc, content=f"{doc} {i}", chunk_index=i) for doc in ("cim", "memo", "model") for i in range(2)],
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def analytics(tmp_path, db):
+    warehouse = DuckDBAnalytics(db_path=str(tmp_path / "analytics.duckdb"))
+    warehouse.sync_from_sqlite(db)
+    yield warehouse
+    warehouse.close()
+
+
+@pytest.fixture
+def exporter(tmp_path, analytics):
+    return ParquetSnapshotExporter(analytics, root=tmp_path / "exports")
+
+
+def _export(exporter):
+    [result] = exporter.export(["document_stats"])
+    return result
+
+
+def _manifest(exporter):
+    return json.loads((exporter.root / "document_stats" / MANIFEST_NAME).read_text(encoding="utf-8"))
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+
+class TestLayout:
+    def test_first_export_writes_hive_partitions_and_manifests(self, exporter):
+        result = _export(exporter)
+
+        assert sorted(result.written) == sorted([ATLAS_CIM, ATLAS_MEMO, UNLINKED_CIM])
+        assert (result.partitions_written, result.partitions_skipped, result.total_rows) == (3, 0, 3)
+        manifest = _manifest(exporter)
+        assert manifest["partition_by"] == ["deal_id", "category"]
+        assert manifest["partitions"][UNLINKED_CIM]["values"] == {"deal_id": None, "category": "cim"}
+        assert json.loads((exporter.root / MANIFEST_NAME).read_text())["datasets"]["document_stats"]["total_rows"] == 3
+
+        rows = duckdb.sql(
+            f"SELECT document_id, deal_id, category FROM read_parquet('{exporter.root}/document_stats/**/*.parquet', "
+            "hive_partitioning = true) ORDER BY document_id"
+        ).fetchall()
+        assert rows == [("cim", "atlas", "cim"), ("memo", "atlas", "ic_memo"), ("model", None, "cim")]
+
+
+# ---------------------------------------------------------------------------
+# Incremental export
+# ---------------------------------------------------------------------------
+
+class TestIncremental:
+    def test_unchanged_re_export_skips_every_partition(self, exporter):
+        _export(exporter)
+        before = _manifest(exporter)["partitions"]
+
+        result = _export(exporter)
+
+        assert (result.partitions_written, result.partitions_skipped, result.rows_written) == (0, 3, 0)
+        assert _manifest(exporter)["partitions"] == before
+
+    def test_only_the_changed_partition_is_rewritten(self, exporter, analytics, db):
+        _export(exporter)
+        db.add(Chunk(document_id="memo", content="memo 2", chunk_index=2))
+        db.commit()
+        analytics.sync_from_sqlite(db, document_id="memo")
+
+        result = _export(exporter)
+
+        assert result.written == [ATLAS_MEMO]
+        assert (result.partitions_skipped, result.rows_written) == (2, 1)
+        assert _manifest(exporter)["partitions"][ATLAS_MEMO]["row_count"] == 1
+
+    def test_vanished_partition_is_removed_and_pruned_from_the_manifest(self, exporter, analytics):
+        _export(exporter)
+
+        analytics.delete_document("model")
+        result = _export(exporter)
+
+        assert (result.partitions_removed, result.partitions_written, result.partitions_skipped) == (1, 0, 2)
+        assert UNLINKED_CIM not in _manifest(exporter)["partitions"]
+        assert not (exporter.root / "document_stats" / f"deal_id={HIVE_DEFAULT_PARTITION}").exists()
@@ -0,0 +1,131 @@
+"""
+Tier 2 tests for the deal/document metadata cache — version-counter
+invalidation, change_log based cross-process refresh and the routes that
+read through it.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend.database import Base, get_db
+from backend.models import ChangeLogEntry, Deal, DealDocumentLink, Document
+from backend.services import metadata_cache
+from backend.services.chunk_view import primary_deal_subquery
+from backend.services.metadata_cache import PROCESS, SHARED, MetadataCache
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add_all([
+        Deal(id="atlas", name="Project Atlas", sector="Software"),
+        Document(id="cim", filename="cim.pdf", category="cim", deal_outcome="invested"),
+        DealDocumentLink(deal_id="atlas", document_id="cim", relation_type="evidence"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class TestMetadataCache:
+    def test_snapshot_maps_documents_and_deals(self, db):
+        snapshot = MetadataCache(PROCESS).get(db)
+
+        assert snapshot.documents["cim"].deal_id == "atlas"
+        assert snapshot.documents["cim"].category == "cim"
+        assert snapshot.deal("atlas").sector == "Software"
+        assert snapshot.deal(None) is None
+
+    def test_primary_deal_is_the_first_link_as_in_the_chunk_view(self, db):
+        db.add_all([Deal(id="zeta", name="Project Zeta"), Deal(id="alpha", name="Project Alpha"),
+                    Document(id="memo", filename="memo.pdf")])
+        db.flush()
+        db.add(DealDocumentLink(deal_id="zeta", document_id="memo"))
+        db.flush()
+        db.add(DealDocumentLink(deal_id="alpha", document_id="memo"))
+        db.commit()
+
+        view = dict(db.execute(select(primary_deal_subquery())).all())
+        assert MetadataCache(PROCESS).get(db).documents["memo"].deal_id == view["memo"] == "zeta"
+
+    def test_process_mode_reloads_only_after_invalidate(self, db):
+        cache = MetadataCache(PROCESS)
+        first = cache.get(db)
+        db.add(Deal(id="borealis", name="Project Borealis"))
+        db.commit()
+
+        assert cache.get(db) is first
+        assert cache.invalidate() == 1
+        assert cache.get(db).deal("borealis").name == "Project Borealis"
+
+    def test_shared_mode_notices_writes_from_another_process(self, db, engine):
+        cache = MetadataCache(SHARED, check_interval_s=0)
+        first = cache.get(db)
+
+        other_worker = sessionmaker(bind=engine)()
+        other_worker.add(Deal(id="cygnus", name="Project Cygnus"))
+        other_worker.commit()
+        other_worker.close()
+
+        assert db.query(ChangeLogEntry).filter_by(entity_type="deal", entity_id="cygnus").count() == 1
+        refreshed = cache.get(db)
+        assert refreshed is not first
+        assert [deal.id for deal in refreshed.list_deals()][0] == "cygnus"
+        assert cache.get(db) is refreshed  # no further writes, no reload
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+class TestRoutes:
+    def test_created_deal_is_listed_immediately(self, engine, monkeypatch):
+        factory = sessionmaker(bind=engine, autoflush=False)
+
+        def _override_get_db():
+            session = factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        # A long check interval: only the write-through invalidation can make the new deal visible.
+        monkeypatch.setattr(metadata_cache, "_metadata_cache", MetadataCache(SHARED, check_interval_s=3600))
+        monkeypatch.setattr(main, "_refresh_deal_vector", lambda deal_id: None)
+        main.app.dependency_overrides[get_db] = _override_get_db
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                before = await client.get("/deals")
+                created = await client.post("/deals", json={"name": "Project Atlas", "sector": "Software"})
+                after = await client.get("/deals")
+            return before, created, after
+
+        try:
+            before, created, after = asyncio.run(scenario())
+        finally:
+            main.app.dependency_overrides.pop(get_db, None)
+        assert before.json() == []
+        assert [deal["id"] for deal in after.json()] == [created.json()["id"]]
+        assert after.json()[0]["sector"] == "Software"
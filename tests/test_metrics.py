@@ -0,0 +1,93 @@
+"""
+Tier 2 tests for the in-process instrumentation layer and /metrics.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.concurrency import run_db
+from backend.services.metrics import (
+    MetricsRegistry,
+    collect_timings,
+    count_cache,
+    render_prometheus,
+    span,
+)
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+class TestRegistry:
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, stage="x")
+        text = registry.render()
+        assert 'test_seconds_bucket{stage="x",le="0.1"} 1' in text
+        assert 'test_seconds_bucket{stage="x",le="1"} 2' in text
+        assert 'test_seconds_bucket{stage="x",le="+Inf"} 3' in text
+        assert 'test_seconds_count{stage="x"} 3' in text
+
+    def test_metric_names_cannot_change_type(self):
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test.")
+        with pytest.raises(TypeError):
+            registry.histogram("test_total", "Test.")
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test.").inc(cache='a"b\nc')
+        assert 'test_total{cache="a\\"b\\nc"} 1' in registry.render()
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+class TestSpans:
+    def test_spans_accumulate_into_collected_timings(self):
+        with collect_timings() as timings:
+            for _ in range(2):
+                with span("test_stage"):
+                    time.sleep(0.005)
+        assert timings["test_stage"] >= 10
+
+    def test_spans_outside_collection_only_feed_histograms(self):
+        with span("test_uncollected"):
+            pass
+        assert 'stage="test_uncollected"' in render_prometheus()
+
+    def test_executor_spans_land_in_the_request_timings(self):
+        def blocking_work():
+            with span("test_executor_stage"):
+                time.sleep(0.001)
+
+        async def scenario():
+            with collect_timings() as timings:
+                await run_db(blocking_work)
+            return timings
+
+        assert "test_executor_stage" in asyncio.run(scenario())
+
+
+# ---------------------------------------------------------------------------
+# Endpoint
+# ---------------------------------------------------------------------------
+
+def test_metrics_endpoint_serves_prometheus_text():
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    count_cache("test_cache", hit=True)
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE pe_stage_duration_seconds histogram" in response.text
+    assert 'pe_cache_lookups_total{cache="test_cache",result="hit"}' in response.text
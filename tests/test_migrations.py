@@ -0,0 +1,156 @@
+"""
+Tier 2 tests for schema migrations and the SQLite query plans they enable.
+
+Each hot lookup is run through EXPLAIN QUERY PLAN and must be served by an
+index rather than a full table scan.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.database import Base
+from backend.migrations import applied_revisions, load_migrations, run_migrations
+from backend import models  # noqa: F401 — register tables on Base.metadata
+
+
+# ---------------------------------------------------------------------------
+# Fixtures / helpers
+# ---------------------------------------------------------------------------
+
+NEW_INDEXES = (
+    "ix_documents_upload_timestamp",
+    "ix_documents_status",
+    "ix_documents_category",
+    "ix_deals_updated_at",
+    "ix_workflow_runs_created_at",
+    "ix_workflow_runs_deal_created_at",
+    "ix_audit_logs_entity",
+    "ix_document_provenance_sha256",
+    "uq_deal_document_links_deal_document",
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", future=True)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def legacy_engine(engine):
+    """A database created before the indexes existed, with a duplicate link."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text(
+            "INSERT INTO deals (id, name, created_at, updated_at) VALUES ('d1', 'Deal', '2024-01-01', '2024-01-01')"
+        ))
+        conn.execute(text(
+            "INSERT INTO documents (id, filename, upload_timestamp, status) VALUES ('doc1', 'a.pdf', '2024-01-01', 'ready')"
+        ))
+        for _ in range(2):
+            conn.execute(text(
+                "INSERT INTO deal_document_links (deal_id, document_id, relation_type, created_at)"
+                " VALUES ('d1', 'doc1', 'evidence', '2024-01-01')"
+            ))
+    return engine
+
+
+def _index_names(engine) -> set[str]:
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+
+
+def _plan(engine, sql: str, params: dict | None = None) -> str:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params or {}).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+class TestMigrationRunner:
+    def test_chain_is_linear(self):
+        revisions = [m.revision for m in load_migrations()]
+        assert revisions == sorted(revisions)
+
+    def test_upgrades_legacy_database(self, legacy_engine):
+        applied = run_migrations(legacy_engine)
+        assert applied == [m.revision for m in load_migrations()]
+        assert set(NEW_INDEXES) <= _index_names(legacy_engine)
+        with legacy_engine.connect() as conn:
+            links = conn.execute(text("SELECT COUNT(*) FROM deal_document_links")).scalar()
+        assert links == 1
+
+    def test_is_idempotent_on_fresh_database(self, engine):
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        assert run_migrations(engine) == []
+        assert applied_revisions(engine) == {m.revision for m in load_migrations()}
+
+
+# ---------------------------------------------------------------------------
+# Query plans
+# ---------------------------------------------------------------------------
+
+HOT_QUERIES = {
+    "documents listing": (
+        "SELECT id FROM documents ORDER BY upload_timestamp DESC, id DESC LIMIT 50",
+        {},
+        "ix_documents_upload_timestamp",
+    ),
+    "documents keyset page": (
+        "SELECT id FROM documents WHERE upload_timestamp < :ts"
+        " ORDER BY upload_timestamp DESC, id DESC LIMIT 50",
+        {"ts": "2024-01-01"},
+        "ix_documents_upload_timestamp",
+    ),
+    "documents by status": (
+        "SELECT id FROM documents WHERE status = :status ORDER BY upload_timestamp DESC LIMIT 50",
+        {"status": "processing"},
+        "ix_documents_status",
+    ),
+    "deals listing": (
+        "SELECT id FROM deals ORDER BY updated_at DESC",
+        {},
+        "ix_deals_updated_at",
+    ),
+    "workflow runs listing": (
+        "SELECT id FROM workflow_runs ORDER BY created_at DESC LIMIT 50",
+        {},
+        "ix_workflow_runs_created_at",
+    ),
+    "workflow runs by deal": (
+        "SELECT id FROM workflow_runs WHERE deal_id = :deal ORDER BY created_at DESC LIMIT 50",
+        {"deal": "d1"},
+        "ix_workflow_runs_deal_created_at",
+    ),
+    "audit log by entity": (
+        "SELECT id FROM audit_logs WHERE entity_type = :type AND entity_id = :id",
+        {"type": "document", "id": "doc1"},
+        "ix_audit_logs_entity",
+    ),
+    "provenance by hash": (
+        "SELECT document_id FROM document_provenance WHERE sha256 = :sha",
+        {"sha": "abc"},
+        "ix_document_provenance_sha256",
+    ),
+    "deal link lookup": (
+        "SELECT id FROM deal_document_links WHERE deal_id = :deal AND document_id = :doc",
+        {"deal": "d1", "doc": "doc1"},
+        "uq_deal_document_links_deal_document",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(legacy_engine, name):
+    run_migrations(legacy_engine)
+    sql, params, index = HOT_QUERIES[name]
+    plan = _plan(legacy_engine, sql, params)
+    assert index in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
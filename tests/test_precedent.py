@@ -0,0 +1,120 @@
+"""
+Tier 2 tests for deal-aware precedent retrieval — grouped top-k per deal and
+enrichment from the metadata cache. Qdrant runs in memory with a fake embedder.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Deal, DealDocumentLink, Document
+from backend.services import vector
+from backend.services.metadata_cache import get_metadata_cache
+from backend.services.precedent import afind_precedent_groups, find_precedents
+
+
+class _FakeEmbedder:
+    def embed_one(self, text):
+        return [1.0, 0.0]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add_all([
+        Deal(id="atlas", name="Project Atlas", sector="Software"),
+        Deal(id="borealis", name="Project Borealis", sector="Healthcare"),
+        Document(id="cim-atlas", filename="atlas_cim.pdf", category="cim", deal_outcome="invested"),
+        Document(id="memo-borealis", filename="borealis_memo.pdf", category="memo", deal_outcome="passed"),
+        Document(id="loose", filename="market_note.pdf", category="research"),
+        DealDocumentLink(deal_id="atlas", document_id="cim-atlas", relation_type="evidence"),
+        DealDocumentLink(deal_id="borealis", document_id="memo-borealis", relation_type="evidence"),
+    ])
+    session.commit()
+    get_metadata_cache().invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+    get_metadata_cache().invalidate()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """The Atlas CIM dominates raw similarity: ten chunks above everything else."""
+    monkeypatch.setattr(vector, "_embedding_model", _FakeEmbedder())
+    monkeypatch.setattr(vector.settings, "qdrant_path", "in-memory")
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        vector.settings.qdrant_collection,
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.DOT),
+    )
+    points = [("cim-atlas", "atlas", 0.99 - i * 0.01) for i in range(10)]
+    points += [("memo-borealis", "borealis", 0.6), ("memo-borealis", "borealis", 0.5), ("loose", None, 0.4)]
+    client.upsert(vector.settings.qdrant_collection, points=[
+        models.PointStruct(
+            id=index, vector=[score, 0.0],
+            payload={"document_id": doc, "deal_id": deal, "chunk_index": index, "content": f"chunk {index}"},
+        )
+        for index, (doc, deal, score) in enumerate(points)
+    ])
+    instance = vector.QdrantVectorStore.__new__(vector.QdrantVectorStore)
+    instance.client = client
+    return instance
+
+
+# ---------------------------------------------------------------------------
+# Grouped retrieval
+# ---------------------------------------------------------------------------
+
+class TestGroupedPrecedents:
+    def test_one_long_document_cannot_fill_the_scan(self, db, store):
+        results = find_precedents(db, store, "churn", top_k=6, per_deal=2)
+
+        assert [r.deal_name for r in results] == [
+            "Project Atlas", "Project Atlas", "Project Borealis", "Project Borealis", None,
+        ]
+        assert results[0].sector == "Software"
+        assert results[-1].document_id == "loose"
+
+    def test_qdrant_groups_are_used_when_they_cover_the_request(self, db, store, monkeypatch):
+        def no_flat_search(*args, **kwargs):
+            raise AssertionError("fell back to local aggregation")
+
+        monkeypatch.setattr(store, "asearch", no_flat_search)
+        groups = asyncio.run(afind_precedent_groups(db, store, "churn", max_deals=2, per_deal=3))
+
+        assert [(g.deal_id, len(g.precedents)) for g in groups] == [("atlas", 3), ("borealis", 2)]
+        assert groups[0].score == pytest.approx(0.99)
+
+    def test_filters_apply_before_grouping(self, db, store):
+        groups = asyncio.run(afind_precedent_groups(db, store, "churn", doc_ids=["memo-borealis", "loose"]))
+
+        assert [g.key for g in groups] == ["borealis", "document:loose"]
+
+
+# ---------------------------------------------------------------------------
+# Enrichment
+# ---------------------------------------------------------------------------
+
+class TestEnrichment:
+    def test_enrichment_is_served_from_the_metadata_cache(self, db, store, monkeypatch):
+        monkeypatch.setattr(get_metadata_cache(), "check_interval_s", 60)
+        find_precedents(db, store, "churn")
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            find_precedents(db, store, "churn")
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        assert statements == []
@@ -0,0 +1,132 @@
+"""
+Tier 2 tests for on-demand profiling — rate limiting, thread attribution,
+artifact storage and the X-Profile request hook.
+"""
+
+import asyncio
+import pstats
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+
+import backend.main as main
+from backend.services import profiling
+from backend.services.concurrency import run_io
+from backend.services.profiling import Profiler, ProfileRejected, ProfileStore
+
+
+def _busy_wait_in_worker(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    instance = Profiler(ProfileStore(tmp_path / "profiles", max_profiles=3), max_concurrent=1, min_interval_s=60)
+    monkeypatch.setattr(profiling, "_profiler", instance)
+    monkeypatch.setattr(profiling.settings, "profiling_sample_interval_ms", 1.0)
+    return instance
+
+
+# ---------------------------------------------------------------------------
+# Profiler
+# ---------------------------------------------------------------------------
+
+class TestProfiler:
+    def test_rate_limits_and_single_flight(self, profiler):
+        session = profiler.start("request", "GET /x")
+        with pytest.raises(ProfileRejected) as excinfo:
+            profiler.start("request", "GET /y")
+        assert excinfo.value.reason == "busy"
+        session.finish(status_code=200)
+        with pytest.raises(ProfileRejected) as excinfo:
+            profiler.start("request", "GET /y")
+        assert excinfo.value.reason == "rate_limited"
+        assert profiler.rejected == {"busy": 1, "rate_limited": 1}
+
+    def test_sampler_follows_work_onto_executor_threads(self, profiler):
+        async def scenario():
+            session = profiler.start("request", "POST /workflow/run", "sampling")
+            await run_io(_busy_wait_in_worker, 0.1)
+            return session.finish(status_code=200)
+
+        record = asyncio.run(scenario())
+        folded = (profiler.store.root / record.artifacts["folded"]).read_text()
+        assert record.samples > 0
+        assert "_busy_wait_in_worker" in folded
+        assert profiler.store.get(record.profile_id).target == "POST /workflow/run"
+
+    def test_cprofile_capture_writes_pstats_and_prunes_old_profiles(self, profiler):
+        profiler.min_interval_s = 0
+        for i in range(4):
+            with profiler.capture("ingestion", f"doc{i}", "cprofile") as session:
+                _busy_wait_in_worker(0.001)
+        records = profiler.store.list()
+        assert [record.target for record in records] == ["doc3", "doc2", "doc1"]
+        stats = pstats.Stats(str(profiler.store.artifact_path(records[0], "prof")))
+        assert any(func[2] == "_busy_wait_in_worker" for func in stats.stats)
+        assert session.record.error is None
+
+
+# ---------------------------------------------------------------------------
+# Request hook
+# ---------------------------------------------------------------------------
+
+class TestProfilingMiddleware:
+    def test_flagged_request_is_profiled_and_retrievable(self, profiler):
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                plain = await client.get("/health")
+                profiled = await client.get("/health", headers={"X-Profile": "1"})
+                throttled = await client.get("/health?profile=cprofile")
+                detail = await client.get(f"/profiles/{profiled.headers['x-profile-id']}")
+                listing = await client.get("/profiles", params={"kind": "request"})
+                folded = await client.get(f"/profiles/{profiled.headers['x-profile-id']}/folded")
+                missing = await client.get("/profiles/../../etc/passwd")
+            return plain, profiled, throttled, detail, listing, folded, missing
+
+        plain, profiled, throttled, detail, listing, folded, missing = asyncio.run(scenario())
+        assert "x-profile-id" not in plain.headers
+        assert profiled.status_code == 200
+        assert throttled.headers["x-profile-skipped"] == "rate_limited"
+        assert detail.json()["target"] == "GET /health"
+        assert detail.json()["status_code"] == 200
+        assert "samples every" in detail.json()["summary"]
+        assert len(listing.json()["profiles"]) == 1
+        assert folded.status_code == 200
+        assert missing.status_code == 404
+
+    def test_profiling_is_off_by_default(self, tmp_path, monkeypatch):
+        from backend.config import Settings
+
+        assert Settings.model_fields["profiling_enabled"].default is False
+        monkeypatch.setattr(profiling.settings, "profiling_enabled", False)
+        monkeypatch.setattr(profiling.settings, "logs_root", str(tmp_path))
+        monkeypatch.setattr(profiling, "_profiler", None)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/health", headers={"X-Profile": "1"})
+
+        response = asyncio.run(scenario())
+        assert response.headers["x-profile-skipped"] == "disabled"
+        assert profiling.get_profiler().store.list() == []
+
+    def test_token_is_required_when_configured(self, profiler, monkeypatch):
+        monkeypatch.setattr(profiling.settings, "profiling_token", "secret")
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/health", headers={"X-Profile": "1"})
+
+        response = asyncio.run(scenario())
+        assert response.headers["x-profile-skipped"] == "unauthorized"
+        assert profiler.store.list() == []
@@ -0,0 +1,333 @@
+"""
+Tier 2 tests for the index jobs: rebuilding the chunk index from parsed
+workspace artifacts — parallel batches into a versioned collection, change_log
+catch-up and the atomic alias swap — blue/green embedding-model migrations
+from the chunks table, and other workers' stores following the alias.
+Qdrant runs in memory with fake embedders.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Chunk, Deal, DealDocumentLink, Document, DocumentProvenance
+from backend.services import reindex, vector
+from backend.services.metadata_cache import get_metadata_cache
+from backend.services.parser import ParsedChunk
+from backend.services.reindex import (
+    BUILT,
+    CANCELLED,
+    FAILED,
+    LIVE,
+    READY,
+    EmbeddingMigration,
+    IndexRebuild,
+    LegacyCollectionError,
+    MissingArtifactsError,
+    Reindexer,
+    live_collection,
+    start_job,
+)
+from backend.services.vector import ServingIndex, collection_model, create_chunk_collection, resolve_serving, swap_alias
+from backend.services.workspace import atomic_write, encode_chunks
+
+ALIAS = vector.settings.qdrant_collection
+
+
+class _LengthEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+
+class _WideEmbedder(_LengthEmbedder):
+    def embed(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0, 0.5, 0.25] for text in texts]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    chunks = [ParsedChunk(f"Chunk {i} of the CIM", page_number=1 + i // 3, chunk_index=i, source="text") for i in range(7)]
+    cim = atomic_write(tmp_path / "cim.chunks.jsonl.gz", encode_chunks(chunks, "gzip"))
+    session.add_all([
+        Deal(id="atlas", name="Project Atlas"),
+        Document(id="cim", filename="cim.pdf", category="cim", deal_outcome="invested"),
+        Document(id="lost", filename="lost.pdf"),
+        DealDocumentLink(deal_id="atlas", document_id="cim", relation_type="evidence"),
+        DocumentProvenance(document_id="cim", sha256="x", source_path="cim.pdf", metadata_json={"chunks_path": str(cim)}),
+        DocumentProvenance(document_id="lost", sha256="y", source_path="lost.pdf", metadata_json={}),
+        *[Chunk(document_id="cim", content=c.content, page_number=c.page_number, chunk_index=c.chunk_index,
+                source=c.source) for c in chunks],
+    ])
+    session.commit()
+    get_metadata_cache().invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+    get_metadata_cache().invalidate()
+
+
+@pytest.fixture
+def store():
+    client = QdrantClient(":memory:")
+    # The pre-alias layout: a plain collection under the live name.
+    client.create_collection(ALIAS, vectors_config=models.VectorParams(size=3, distance=models.Distance.COSINE))
+    store = vector.QdrantVectorStore.__new__(vector.QdrantVectorStore)
+    store.client = client
+    return store
+
+
+def _sessions(db):
+    return sessionmaker(bind=db.get_bind(), autoflush=False)
+
+
+def _rebuild(db, store, embedding=None, model_name=None, **kwargs):
+    reindexer = Reindexer(store, model_name, embedding=embedding or _LengthEmbedder(), batch_size=2, workers=3)
+    return IndexRebuild(store, _sessions(db), reindexer=reindexer, **kwargs)
+
+
+def _run(job):
+    job.run()
+    return job.status()
+
+
+# ---------------------------------------------------------------------------
+# Rebuild and swap
+# ---------------------------------------------------------------------------
+
+class TestReindex:
+    def test_legacy_collection_is_only_replaced_on_request(self, db, store):
+        with pytest.raises(LegacyCollectionError):
+            start_job(_rebuild(db, store))
+        status = _run(_rebuild(db, store))
+        assert status["state"] == FAILED and "replace_legacy" in status["error"]
+        assert [c.name for c in store.client.get_collections().collections] == [ALIAS]
+
+        status = _run(_rebuild(db, store, replace_legacy=True, force=True))
+
+        assert status["state"] == LIVE
+        assert (status["documents"], status["embedded_chunks"], status["skipped_documents"]) == (1, 7, ["lost"])
+        assert status["percent"] == 100.0
+        assert live_collection(store.client, ALIAS) == (status["target_collection"], False)
+        points, _ = store.client.scroll(ALIAS, limit=10, with_payload=True)
+        assert len(points) == 7
+        assert {point.payload["deal_id"] for point in points} == {"atlas"}
+        assert {point.payload["category"] for point in points} == {"cim"}
+
+    def test_rebuild_swaps_the_alias_and_keeps_the_previous_collection(self, db, store, monkeypatch):
+        first = _run(_rebuild(db, store, replace_legacy=True, force=True))
+        monkeypatch.setattr(reindex, "versioned_collection_name", lambda alias, model: f"{alias}__next")
+
+        second = _run(_rebuild(db, store, force=True))
+
+        assert second["previous_collection"] == first["target_collection"]
+        assert live_collection(store.client, ALIAS) == (f"{ALIAS}__next", False)
+        assert store.client.count(first["target_collection"]).count == 7
+
+        monkeypatch.setattr(reindex, "versioned_collection_name", lambda alias, model: f"{alias}__third")
+        _run(_rebuild(db, store, drop_previous=True, force=True))
+        assert not store.client.collection_exists(f"{ALIAS}__next")
+
+    def test_unswapped_build_leaves_serving_alone(self, db, store):
+        status = _run(_rebuild(db, store, model_name="BAAI/bge-small-en-v1.5", swap=False))
+
+        assert status["state"] == BUILT
+        assert status["target_collection"].startswith(f"{ALIAS}__baai-bge-small-en-v1-5__")
+        assert status["dimension"] == 3 and status["previous_collection"] is None
+        assert live_collection(store.client, ALIAS) == (ALIAS, True)
+        assert store.client.count(status["target_collection"]).count == 7
+
+    def test_missing_artifacts_block_the_swap_unless_forced(self, db, store):
+        embedder = _LengthEmbedder()
+
+        status = _run(_rebuild(db, store, embedding=embedder, replace_legacy=True))
+
+        assert status["state"] == FAILED and status["skipped_documents"] == ["lost"]
+        assert MissingArtifactsError.__name__ in status["error"] and "lost" in status["error"]
+        # Refused before creating a collection or embedding anything.
+        assert status["target_collection"] is None and embedder.calls == 0
+        assert live_collection(store.client, ALIAS) == (ALIAS, True)
+
+    def test_a_subset_rebuild_cannot_be_swapped_in(self, db, store):
+        with pytest.raises(ValueError, match="swap=False"):
+            _rebuild(db, store, document_ids=["cim"])
+
+        status = _run(_rebuild(db, store, document_ids=["cim"], swap=False))
+
+        assert (status["state"], status["embedded_chunks"]) == (BUILT, 7)
+        assert live_collection(store.client, ALIAS) == (ALIAS, True)
+
+    def test_writes_during_the_rebuild_are_replayed_before_the_swap(self, db, store, tmp_path, monkeypatch):
+        sessions = _sessions(db)
+        memo_chunks = [ParsedChunk("IC memo: approve at 9x", page_number=1, chunk_index=0, source="text")]
+        memo_path = atomic_write(tmp_path / "memo.chunks.jsonl.gz", encode_chunks(memo_chunks, "gzip"))
+
+        ingested = threading.Lock()
+
+        class _IngestingEmbedder(_LengthEmbedder):
+            def embed(self, texts):
+                # Once, from the first batch to land after the dimension probe.
+                if self.calls and ingested.acquire(blocking=False):
+                    session = sessions()
+                    session.add_all([
+                        Document(id="memo", filename="memo.pdf", category="ic_memo"),
+                        DocumentProvenance(document_id="memo", sha256="z", source_path="memo.pdf",
+                                           metadata_json={"chunks_path": str(memo_path)}),
+                        Chunk(document_id="memo", content=memo_chunks[0].content, chunk_index=0),
+                    ])
+                    session.delete(session.get(Document, "cim"))
+                    session.commit()
+                    session.close()
+                return super().embed(texts)
+
+        embedder = _IngestingEmbedder()
+        status = _run(_rebuild(db, store, embedding=embedder, replace_legacy=True, force=True))
+
+        assert status["state"] == LIVE and status["replayed_documents"] == 2
+        monkeypatch.setattr(vector, "_embedding_model", embedder)
+        hits = store.search("IC memo", top_k=10)
+        assert {hit.document_id for hit in hits} == {"memo"}
+        assert store.client.count(status["target_collection"]).count == 1
+
+
+def _migration(db, store, **kwargs):
+    reindexer = Reindexer(store, model_name="new-model", embedding=_WideEmbedder(), batch_size=2, workers=2)
+    return EmbeddingMigration(store, _sessions(db), "new-model", replace_legacy=True, reindexer=reindexer, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Serving index
+# ---------------------------------------------------------------------------
+
+class TestServing:
+    def test_collection_without_metadata_must_match_the_configured_dimension(self, store):
+        assert vector.settings.embedding_dim != 3
+        with pytest.raises(RuntimeError, match="/index/migrations"):
+            resolve_serving(store.client)
+
+    def test_the_model_recorded_on_the_collection_wins(self, store):
+        create_chunk_collection(store.client, f"{ALIAS}__other", 3, "other-model")
+        swap_alias(store.client, ALIAS, f"{ALIAS}__other", replace_legacy=True)
+
+        assert resolve_serving(store.client) == ServingIndex(f"{ALIAS}__other", "other-model", 3)
+
+    def test_versioned_names_started_in_the_same_instant_do_not_collide(self):
+        now = datetime(2026, 1, 2, 3, 4, 5, 678901)
+        first, second = (vector.versioned_collection_name(ALIAS, "BAAI/bge-small-en-v1.5", now) for _ in range(2))
+
+        assert first != second
+        assert first.startswith(f"{ALIAS}__baai-bge-small-en-v1-5__20260102030405678901_")
+
+
+def _worker(client):
+    worker = vector.QdrantVectorStore.__new__(vector.QdrantVectorStore)
+    worker.client = client
+    worker.refresh_serving()
+    return worker
+
+
+@pytest.fixture
+def workers(store, monkeypatch):
+    """Two processes' stores on one Qdrant, serving an old-model collection; the first will cut over."""
+    monkeypatch.setattr(vector.settings, "qdrant_path", "in-memory")
+    embedders = {"old-model": _LengthEmbedder(), "new-model": _WideEmbedder()}
+    monkeypatch.setattr(vector, "get_embedding_model", embedders.__getitem__)
+    for name, dimension in (("old", 3), ("new", 4)):
+        create_chunk_collection(store.client, f"{ALIAS}__{name}", dimension, f"{name}-model")
+        store.client.upsert(f"{ALIAS}__{name}", points=[models.PointStruct(
+            id=1, vector=[1.0] * dimension, payload={"document_id": f"{name}-doc", "chunk_index": 0, "content": name},
+        )])
+    swap_alias(store.client, ALIAS, f"{ALIAS}__old", replace_legacy=True)
+    return _worker(store.client), _worker(store.client)
+
+
+def _cut_over_to_new(writer):
+    Reindexer(writer, "new-model").cut_over(ServingIndex(f"{ALIAS}__new", "new-model", 4))
+
+
+class TestFollowingTheAlias:
+    def test_another_worker_follows_a_cutover_once_the_ttl_is_up(self, workers, monkeypatch):
+        writer, reader = workers
+        _cut_over_to_new(writer)
+
+        assert [hit.document_id for hit in reader.search("query")] == ["old-doc"]
+
+        monkeypatch.setattr(vector.settings, "qdrant_serving_ttl_seconds", 0.0)
+
+        assert [hit.document_id for hit in reader.search("query")] == ["new-doc"]
+        assert reader.serving == ServingIndex(f"{ALIAS}__new", "new-model", 4)
+
+    def test_a_dropped_collection_is_followed_at_once(self, workers):
+        writer, reader = workers
+        _cut_over_to_new(writer)
+        writer.client.delete_collection(f"{ALIAS}__old")
+
+        hits = asyncio.run(reader.asearch("query"))
+
+        assert [hit.document_id for hit in hits] == ["new-doc"]
+        assert [hit.document_id for hit in reader.search_groups("query", group_by="document_id")[0][1]] == ["new-doc"]
+
+
+# ---------------------------------------------------------------------------
+# Embedding-model migration
+# ---------------------------------------------------------------------------
+
+class TestMigration:
+    def test_old_collection_serves_until_cutover_and_late_writes_are_replayed(self, db, store):
+        cut_over = []
+        migration = _migration(db, store, auto_cutover=False, on_model_change=cut_over.append)
+
+        migration.run()
+
+        status = migration.status()
+        target = status["target_collection"]
+        assert (status["state"], status["embedded_chunks"], status["percent"]) == (READY, 7, 100.0)
+        assert status["dimension"] == 4 and status["chunks_per_second"] > 0
+        assert store.serving.collection == ALIAS
+        assert live_collection(store.client, ALIAS) == (ALIAS, True)
+
+        db.add_all([Document(id="memo", filename="memo.pdf"), Chunk(document_id="memo", content="IC memo", chunk_index=0)])
+        db.commit()
+        migration.cutover()
+
+        assert migration.status()["state"] == LIVE
+        assert store.serving == ServingIndex(target, "new-model", 4) == cut_over[0]
+        assert live_collection(store.client, ALIAS) == (target, False)
+        assert collection_model(store.client, target) == ("new-model", 4)
+        points, _ = store.client.scroll(target, limit=20, with_payload=True)
+        assert {point.payload["document_id"] for point in points} == {"cim", "memo"}
+        assert len(points) == 8
+
+    @pytest.mark.parametrize("when", ["embedding", "ready"])
+    def test_cancelled_migration_drops_its_shadow_collection(self, db, store, when):
+        migration = _migration(db, store, auto_cutover=False)
+        if when == "embedding":
+            migration.cancel()
+        migration.run()
+        if when == "ready":
+            assert migration.status()["state"] == READY
+            migration.cancel()
+
+        assert migration.status()["state"] == CANCELLED
+        assert [c.name for c in store.client.get_collections().collections] == [ALIAS]
+        assert store.serving.collection == ALIAS
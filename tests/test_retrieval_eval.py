@@ -0,0 +1,197 @@
+"""
+Tier 2 tests for the retrieval evaluation harness — metrics, trace replay and
+an end-to-end config sweep. A hashing bag-of-words embedder stands in for
+fastembed, so no model download is needed.
+"""
+
+import hashlib
+import math
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import ChatLog, Chunk, Document, RetrievalTrace
+from backend.services.retrieval_eval import (
+    ConfigReport,
+    EvalChunk,
+    EvalQuery,
+    RetrievalConfig,
+    RetrievalEvaluator,
+    load_corpus,
+    ndcg_at_k,
+    parse_config,
+    queries_from_traces,
+    recall_at_k,
+    reciprocal_rank,
+    recommend,
+)
+
+
+class _HashingEmbedder:
+    dim = 64
+
+    def embed(self, texts):
+        vectors = []
+        for text in texts:
+            vec = [0.0] * self.dim
+            for token in text.lower().split():
+                vec[int(hashlib.md5(token.encode()).hexdigest(), 16) % self.dim] += 1.0
+            norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+            vectors.append([v / norm for v in vec])
+        return vectors
+
+
+class _KeywordReranker:
+    """Scores by occurrences of the query's last word."""
+
+    def rerank(self, query, documents):
+        needle = query.lower().split()[-1]
+        return [float(doc.lower().count(needle)) for doc in documents]
+
+
+def _corpus():
+    texts = {
+        ("cim", 1): "revenue grew strongly with recurring subscription revenue",
+        ("cim", 2): "customer churn remained low and retention improved",
+        ("cim", 3): "management team has deep sector experience",
+        ("memo", 1): "ebitda margin expansion from pricing initiatives",
+        ("memo", 2): "key risks include customer concentration and churn",
+    }
+    return [
+        EvalChunk(
+            document_id=doc, chunk_index=page - 1, page_number=page, content=text,
+            filename=f"{doc}.pdf", category="cim" if doc == "cim" else "ic_memo", deal_outcome=None,
+        )
+        for (doc, page), text in texts.items()
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+class TestMetrics:
+    def test_recall_and_mrr(self):
+        relevant = {("a", 1): 1.0, ("b", 2): 1.0}
+        retrieved = [("c", 1), ("a", 1), ("a", 1), ("d", 1)]
+        assert recall_at_k(retrieved, relevant, k=3) == 0.5
+        assert reciprocal_rank(retrieved, relevant) == 0.5
+        assert reciprocal_rank([("z", 1)], relevant) == 0.0
+
+    def test_ndcg_rewards_graded_order(self):
+        relevant = {("a", 1): 2.0, ("b", 1): 1.0}
+        assert ndcg_at_k([("a", 1), ("b", 1)], relevant, k=2) == pytest.approx(1.0)
+        assert ndcg_at_k([("b", 1), ("a", 1)], relevant, k=2) < 1.0
+        assert ndcg_at_k([], relevant, k=2) == 0.0
+
+    def test_recommend_prefers_fastest_within_tolerance(self):
+        def report(name, ndcg, p95):
+            return ConfigReport(
+                config={"name": name}, queries=1, recall_at_k=0, mrr=0, ndcg_at_k=ndcg,
+                latency_p50_ms=p95, latency_p95_ms=p95, prompt_tokens_mean=0, prompt_tokens_p95=0,
+                index_chunks=0, index_build_s=0,
+            )
+
+        reports = [report("best", 0.80, 40), report("close", 0.79, 10), report("fast", 0.50, 1)]
+        assert recommend(reports, tolerance=0.02).config["name"] == "close"
+
+    def test_parse_config_spec(self):
+        config = parse_config("h:k=8,hybrid=1,rerank=false,chunk_size=400")
+        assert (config.name, config.top_k, config.hybrid, config.rerank, config.chunk_size) == ("h", 8, True, False, 400)
+        with pytest.raises(ValueError):
+            parse_config("bad:colour=blue")
+
+
+# ---------------------------------------------------------------------------
+# Trace replay
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, future=True)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestTraceReplay:
+    def test_cited_chunks_get_higher_grade_and_queries_are_deduplicated(self, db):
+        db.add(Document(id="doc1", filename="cim.pdf", category="cim", status="indexed"))
+        db.add_all([
+            Chunk(document_id="doc1", content="Revenue grew 12%.", page_number=3, chunk_index=0),
+            Chunk(document_id="doc1", content="Churn was 4%.", page_number=5, chunk_index=1),
+        ])
+        for _ in range(2):
+            log = ChatLog(user_query="Revenue growth?", ai_response="12% (Source: cim.pdf | Page: 3)")
+            db.add(log)
+            db.flush()
+            db.add(RetrievalTrace(
+                chat_log_id=log.id, query="Revenue growth?", prompt_version="v1", model_name="m",
+                retrieved_chunks=[
+                    {"doc_id": "doc1", "filename": "cim.pdf", "page_number": 3, "chunk_index": 0},
+                    {"doc_id": "doc1", "filename": "cim.pdf", "page_number": 5, "chunk_index": 1},
+                ],
+            ))
+        db.commit()
+
+        queries = queries_from_traces(db)
+        assert len(queries) == 1
+        assert queries[0].relevant == {("doc1", 3): 2.0, ("doc1", 5): 1.0}
+        assert [chunk.page_number for chunk in load_corpus(db)] == [3, 5]
+
+
+# ---------------------------------------------------------------------------
+# Evaluator
+# ---------------------------------------------------------------------------
+
+class TestEvaluator:
+    def _evaluator(self, granularity="page"):
+        return RetrievalEvaluator(
+            _corpus(),
+            granularity=granularity,
+            embedder_factory=lambda name: _HashingEmbedder(),
+            reranker_factory=lambda name: _KeywordReranker(),
+        )
+
+    def test_sweep_reports_quality_latency_and_tokens(self):
+        queries = [
+            EvalQuery("q1", "customer churn", {("cim", 2): 2.0, ("memo", 2): 1.0}),
+            EvalQuery("q2", "revenue growth", {("cim", 1): 1.0}),
+        ]
+        configs = [
+            RetrievalConfig(name="dense_k1", top_k=1),
+            RetrievalConfig(name="dense_k3", top_k=3),
+            RetrievalConfig(name="hybrid_rerank_k3", top_k=3, hybrid=True, rerank=True),
+        ]
+        reports = self._evaluator().run(configs, queries)
+
+        by_name = {report.config["name"]: report for report in reports}
+        assert by_name["dense_k3"].recall_at_k >= by_name["dense_k1"].recall_at_k
+        assert by_name["hybrid_rerank_k3"].mrr == pytest.approx(1.0)
+        assert by_name["dense_k3"].prompt_tokens_mean > by_name["dense_k1"].prompt_tokens_mean
+        assert all(report.latency_p95_ms >= report.latency_p50_ms > 0 for report in reports)
+        assert recommend(reports) is not None
+
+    def test_filters_restrict_candidates(self):
+        query = EvalQuery("q", "customer churn", {("memo", 2): 1.0}, doc_ids=["memo"])
+        evaluator = self._evaluator()
+        for config in (RetrievalConfig(name="d"), RetrievalConfig(name="h", hybrid=True)):
+            assert {chunk.document_id for chunk in evaluator.retrieve(config, query)} == {"memo"}
+
+    def test_rechunked_config_builds_separate_index(self):
+        evaluator = self._evaluator()
+        query = EvalQuery("q", "churn", {("cim", 2): 1.0})
+        base = evaluator.evaluate(RetrievalConfig(name="stored"), [query])
+        merged = evaluator.evaluate(RetrievalConfig(name="big", chunk_size=4000), [query])
+        assert merged.index_chunks < base.index_chunks
+
+    def test_chunk_granularity_rejects_rechunked_configs(self):
+        with pytest.raises(ValueError):
+            self._evaluator("chunk").evaluate(RetrievalConfig(name="c", chunk_size=400), [])
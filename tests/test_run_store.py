@@ -0,0 +1,192 @@
+"""
+Tier 2 tests for compact workflow run storage — evidence by reference,
+compressed blobs, cold-store tiering and the paginated run history.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import backend.main as main
+from backend.database import Base, get_db
+from backend.models import Chunk, Deal, DealDocumentLink, Document, WorkflowRun
+from backend.services import run_store
+from backend.services.evidence import PRECEDENT_VIEW, SOURCE_VIEW, EvidenceRecord, citation
+from backend.services.metadata_cache import get_metadata_cache
+from backend.services.run_store import (
+    archive_workflow_runs,
+    compact_output,
+    decode_payload,
+    hydrate_output,
+    legacy_output_path,
+    load_output,
+    store_output,
+)
+
+TEXT = "Net revenue retention fell to 92% after the pricing change. " * 20
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_store.settings, "audit_cold_root", str(tmp_path / "cold"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    session = factory()
+    session.add_all([
+        Deal(id="atlas", name="Project Atlas", sector="Software"),
+        Document(id="cim", filename="cim.pdf", category="cim", deal_outcome="invested"),
+        DealDocumentLink(deal_id="atlas", document_id="cim", relation_type="evidence"),
+        Chunk(document_id="cim", content=TEXT, page_number=7, chunk_index=3, source="text"),
+    ])
+    session.commit()
+    session.close()
+    get_metadata_cache().invalidate()
+    yield factory
+    engine.dispose()
+    get_metadata_cache().invalidate()
+
+
+def _payload(db):
+    record = EvidenceRecord(
+        content=TEXT, score=0.9, document_id="cim", filename="cim.pdf", page_number=7, chunk_index=3, source="text",
+    )
+    run_store._resolve_precedents(db, [record])
+    return {
+        "query": "retention",
+        "precedent_scan": {"total": 1, "buckets": {"invested": [PRECEDENT_VIEW(record)], "passed": []}},
+        "risk_gaps": ["Retention is unproven."],
+        "item_evidence": [{"section": "risk_gaps", "item": "Retention is unproven.", "evidence": ["cim:3"]}],
+        "evidence": {"cim:3": citation(record, run_store.SNIPPET_CHARS)},
+        "draft_answer": "Retention is the main risk.",
+        "draft_sources": [SOURCE_VIEW(record)],
+        "memo_drafts": [{"section": "Executive summary", "answer": "...", "sources": [SOURCE_VIEW(record)]}],
+    }
+
+
+# ---------------------------------------------------------------------------
+# By-reference storage
+# ---------------------------------------------------------------------------
+
+class TestCompactOutput:
+    def test_round_trip_restores_the_payload_without_storing_text(self, session_factory):
+        db = session_factory()
+        payload = _payload(db)
+        run = WorkflowRun(input_json={"query": "retention"})
+        store_output(run, payload)
+
+        stored = decode_payload(run.output_blob)
+        assert TEXT[:40] not in str(stored)
+        assert stored["precedent_scan"]["buckets"]["invested"] == [["cim", 3, 0.9]]
+        assert len(run.output_blob) < len(TEXT) // 4
+        assert load_output(db, run) == payload
+        db.close()
+
+    def test_deleted_evidence_comes_back_as_a_reference(self, session_factory):
+        db = session_factory()
+        compact = compact_output(_payload(db))
+        db.query(Chunk).delete()
+        db.commit()
+
+        hydrated = hydrate_output(db, compact)
+        assert hydrated["precedent_scan"]["buckets"]["invested"] == [
+            {"document_id": "cim", "chunk_index": 3, "score": 0.9, "missing": True}
+        ]
+        assert hydrated["draft_sources"] == [{"doc_id": "cim", "chunk_index": 3, "missing": True}]
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Archiving
+# ---------------------------------------------------------------------------
+
+class TestArchive:
+    def test_legacy_runs_are_compacted_and_old_runs_tiered(self, session_factory, tmp_path):
+        db = session_factory()
+        payload = _payload(db)
+        now = datetime(2025, 6, 1)
+        db.add_all([
+            WorkflowRun(id="legacy", output_json=payload, created_at=now - timedelta(days=1)),
+            WorkflowRun(id="old", output_json=payload, created_at=now - timedelta(days=90)),
+        ])
+        db.commit()
+
+        stats = archive_workflow_runs(db, hot_days=30, now=now)
+
+        assert (stats.compacted, stats.tiered) == (2, 1)
+        legacy, old = db.get(WorkflowRun, "legacy"), db.get(WorkflowRun, "old")
+        assert legacy.output_json is None and legacy.output_blob is not None
+        assert old.output_blob is None and old.output_location == "workflow_runs/2025-03/old.json.z"
+        assert (tmp_path / "cold" / old.output_location).exists()
+        assert load_output(db, old) == load_output(db, legacy) == payload
+        assert archive_workflow_runs(db, hot_days=30, now=now).tiered == 0
+        db.close()
+
+    def test_legacy_output_is_kept_verbatim_before_compacting(self, session_factory, tmp_path):
+        db = session_factory()
+        original = {**_payload(db), "notes": "a field compact storage would not know about"}
+        db.add(WorkflowRun(id="legacy", output_json=original, created_at=datetime(2025, 6, 1)))
+        db.commit()
+
+        stats = archive_workflow_runs(db, hot_days=30, now=datetime(2025, 6, 2))
+
+        run = db.get(WorkflowRun, "legacy")
+        kept = tmp_path / "cold" / legacy_output_path(run)
+        assert kept.stat().st_size == stats.bytes_preserved > 0
+        assert decode_payload(kept.read_bytes()) == original
+        assert decode_payload(run.output_blob)["draft_sources"] == [["cim", 3, None]]
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+class TestRunRoutes:
+    def test_history_is_paginated_and_excludes_outputs(self, session_factory):
+        db = session_factory()
+        payload = _payload(db)
+        started = datetime(2025, 6, 1)
+        for index in range(3):
+            run = WorkflowRun(id=f"run-{index}", input_json={"query": f"q{index}"}, created_at=started + timedelta(hours=index))
+            store_output(run, payload)
+            db.add(run)
+        db.commit()
+        db.close()
+
+        def _override_get_db():
+            session = session_factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        main.app.dependency_overrides[get_db] = _override_get_db
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = await client.get("/workflow/runs", params={"limit": 2})
+                second = await client.get("/workflow/runs", params={"limit": 2, "cursor": first.headers["x-next-cursor"]})
+                detail = await client.get("/workflow/runs/run-0")
+                missing = await client.get("/workflow/runs/nope")
+            return first, second, detail, missing
+
+        try:
+            first, second, detail, missing = asyncio.run(scenario())
+        finally:
+            main.app.dependency_overrides.pop(get_db, None)
+
+        assert [run["id"] for run in first.json()] == ["run-2", "run-1"]
+        assert first.json()[0]["query"] == "q2" and "output" not in first.json()[0]
+        assert [run["id"] for run in second.json()] == ["run-0"]
+        assert "x-next-cursor" not in second.headers
+        assert detail.json()["output"]["evidence"]["cim:3"]["snippet"] == TEXT[:run_store.SNIPPET_CHARS]
+        assert missing.status_code == 404
@@ -0,0 +1,93 @@
+"""
+Tier 2 tests for the workspace I/O layer — memoized directories, atomic
+writes and the JSONL parsed-chunk format.
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from backend.services import workspace
+from backend.services.parser import ParsedChunk
+from backend.services.workspace import WorkspaceManager, atomic_write, iter_parsed_chunks
+
+CHUNKS = [
+    ParsedChunk(content="ARR grew 40% — driven by upsell.", page_number=1, chunk_index=0, source="text", section="KPIs"),
+    ParsedChunk(content="Churn: 8%\nNRR: 112%", page_number=2, chunk_index=1, source="table"),
+]
+
+
+@pytest.fixture
+def manager_factory(tmp_path, monkeypatch):
+    for name in ("workspace_root", "deals_root", "skills_root", "postmortems_root", "mempalace_root",
+                 "templates_root", "cache_root", "logs_root"):
+        monkeypatch.setattr(workspace.settings, name, str(tmp_path / name))
+    return WorkspaceManager
+
+
+# ---------------------------------------------------------------------------
+# Directories and atomic writes
+# ---------------------------------------------------------------------------
+
+class TestLayout:
+    def test_deal_directories_are_created_once(self, manager_factory, monkeypatch):
+        manager = manager_factory()
+        root = manager.deal_root("atlas")
+        calls = []
+        monkeypatch.setattr(Path, "mkdir", lambda self, *a, **kw: calls.append(self))
+
+        for _ in range(3):
+            assert manager.deal_root("atlas") == root
+            manager.store_raw_document("doc", "cim.pdf", b"%PDF", deal_id="atlas")
+
+        assert calls == []
+        assert sorted(path.name for path in root.iterdir()) == sorted(workspace.DEAL_SUBDIRS)
+        assert (root / "raw" / "doc_cim.pdf").read_bytes() == b"%PDF"
+
+    def test_failed_write_leaves_the_old_file_and_no_temp(self, tmp_path, monkeypatch):
+        target = atomic_write(tmp_path / "report.md", b"v1")
+        monkeypatch.setattr(workspace.os, "replace", lambda *_: (_ for _ in ()).throw(OSError("disk full")))
+
+        with pytest.raises(OSError):
+            atomic_write(target, b"v2")
+
+        assert target.read_bytes() == b"v1"
+        assert [path.name for path in tmp_path.iterdir()] == ["report.md"]
+
+
+# ---------------------------------------------------------------------------
+# Parsed chunks
+# ---------------------------------------------------------------------------
+
+class TestParsedChunks:
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_round_trip(self, manager_factory, compression):
+        paths = manager_factory(compression=compression).write_parsed_artifacts("doc", "Project Atlas CIM.pdf", CHUNKS)
+
+        chunks_path = Path(paths["chunks_path"])
+        assert chunks_path.name == f"doc_project-atlas-cim{workspace.CHUNK_SUFFIXES[compression]}"
+        assert list(iter_parsed_chunks(chunks_path)) == CHUNKS
+        assert Path(paths["markdown_path"]).read_text(encoding="utf-8").startswith("ARR grew 40%")
+
+    def test_jsonl_is_one_compact_object_per_line(self, manager_factory):
+        paths = manager_factory(compression="gzip").write_parsed_artifacts("doc", "cim.pdf", CHUNKS)
+
+        lines = gzip.decompress(Path(paths["chunks_path"]).read_bytes()).decode("utf-8").splitlines()
+        assert len(lines) == 2 and ": " not in lines[0]
+        assert json.loads(lines[1])["content"] == "Churn: 8%\nNRR: 112%"
+
+    def test_zstd_round_trip(self, manager_factory):
+        pytest.importorskip("zstandard")
+        paths = manager_factory(compression="zstd").write_parsed_artifacts("doc", "cim.pdf", CHUNKS)
+        assert list(iter_parsed_chunks(paths["chunks_path"])) == CHUNKS
+
+    def test_legacy_indented_json_is_still_readable(self, tmp_path):
+        legacy = tmp_path / "doc_cim.chunks.json"
+        legacy.write_text(json.dumps([vars(chunk) for chunk in CHUNKS], indent=2), encoding="utf-8")
+        assert list(iter_parsed_chunks(legacy)) == CHUNKS
+
+    def test_unknown_compression_is_rejected(self, manager_factory):
+        with pytest.raises(ValueError):
+            manager_factory(compression="lzma")